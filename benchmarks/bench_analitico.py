@@ -0,0 +1,45 @@
+"""
+Compara o relatório financeiro em laço Python com o motor analítico vetorizado (NumPy).
+
+Uso: python -m benchmarks.bench_analitico [quantidade_de_reservas]
+"""
+
+from hotel import config, analitico
+from hotel.models import Hospede, Quarto, Reserva
+from hotel.services import calcular_total_reserva
+from datetime import date, timedelta
+import sys
+import time
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    config.carregar_configuracoes()
+
+    quartos = [Quarto(100 + i, "DUPLO", 2, 150.0) for i in range(200)]
+    hospede = Hospede("Hóspede", "00000000000", "h@hotel.com", "(88) 0000-0000")
+    reservas = []
+    for i in range(total):
+        entrada = date(2020, 1, 1) + timedelta(days=i % 2000)
+        reservas.append(Reserva(hospede, quartos[i % len(quartos)], entrada, entrada + timedelta(days=1 + i % 7), 1, "CHECKOUT"))
+
+    t0 = time.perf_counter()
+    receita_laco = sum(calcular_total_reserva(r) for r in reservas)
+    t_laco = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    colunas = analitico.ColunasReservas(reservas)
+    t_exportar = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    receita_numpy = analitico.relatorio_financeiro(colunas, len(quartos))["receita"]
+    t_numpy = time.perf_counter() - t0
+
+    print(f"Reservas:                {total}")
+    print(f"Laço Python:             {t_laco * 1000:.1f} ms (R$ {receita_laco:.2f})")
+    print(f"Exportação para colunas: {t_exportar * 1000:.1f} ms")
+    print(f"Cálculo vetorizado:      {t_numpy * 1000:.1f} ms (R$ {receita_numpy:.2f})")
+
+
+if __name__ == "__main__":
+    main()
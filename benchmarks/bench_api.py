@@ -0,0 +1,130 @@
+"""
+Teste de carga da API HTTP: várias conexões keep-alive enviando leituras e reservas ao mesmo tempo.
+Sem --porta, sobe uma instância local (dados temporários, 300 quartos) em uma thread separada.
+
+Uso: python -m benchmarks.bench_api [--requisicoes N] [--conexoes C] [--escritas FRACAO] [--porta P]
+"""
+
+from hotel import config, services
+from hotel.api import ServidorAPI
+from hotel.models import Hospede, Quarto
+from benchmarks.comum import usar_pasta_de_dados
+from datetime import date, timedelta
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+
+TOTAL_QUARTOS = 300
+
+
+def subir_instancia_local(pasta: str):
+    """
+    Popula uma base temporária e inicia o servidor em uma thread com seu próprio loop de eventos.
+    Retorna (servidor, porta).
+    """
+    usar_pasta_de_dados(pasta)
+
+    for i in range(TOTAL_QUARTOS):
+        services.repositorio.adicionar_quarto(Quarto(1000 + i, "DUPLO", 2, 150.0))
+    services.repositorio.adicionar_hospede(Hospede("Hóspede", "00000000000", "h@hotel.com", "(88) 0000-0000"))
+    services.salvar_tudo()
+
+    servidor = ServidorAPI()
+    pronto = threading.Event()
+
+    def executar():
+        async def principal():
+            await servidor.iniciar("127.0.0.1", 0)
+            pronto.set()
+            await asyncio.Event().wait()
+        asyncio.run(principal())
+
+    threading.Thread(target=executar, daemon=True).start()
+    pronto.wait()
+    return servidor, servidor.porta
+
+
+async def _enviar(leitor, escritor, metodo: str, caminho: str, corpo=None) -> int:
+    dados = json.dumps(corpo).encode() if corpo is not None else b""
+    escritor.write(f"{metodo} {caminho} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(dados)}\r\n\r\n".encode() + dados)
+    await escritor.drain()
+
+    cabecalho = await leitor.readuntil(b"\r\n\r\n")
+    linhas = cabecalho.decode("latin-1").split("\r\n")
+    tamanho = next(int(l.split(":")[1]) for l in linhas if l.lower().startswith("content-length"))
+    await leitor.readexactly(tamanho)
+    return int(linhas[0].split()[1])
+
+async def _cliente(porta: int, pedidos: list, latencias: list, status: list):
+    leitor, escritor = await asyncio.open_connection("127.0.0.1", porta)
+    for metodo, caminho, corpo in pedidos:
+        t0 = time.perf_counter()
+        status.append(await _enviar(leitor, escritor, metodo, caminho, corpo))
+        latencias.append(time.perf_counter() - t0)
+    escritor.close()
+
+def gerar_pedidos(total: int, fracao_escritas: float) -> list:
+    """
+    Mistura consultas de disponibilidade e de reserva com novas reservas de 1 noite (sem conflitos entre si).
+    """
+    pedidos = []
+    for i in range(total):
+        entrada = date(2027, 1, 1) + timedelta(days=i // TOTAL_QUARTOS)
+        if random.random() < fracao_escritas:
+            corpo = {"documento": "00000000000", "quarto": 1000 + i % TOTAL_QUARTOS,
+                     "entrada": entrada.isoformat(), "saida": (entrada + timedelta(days=1)).isoformat()}
+            pedidos.append(("POST", "/reservas", corpo))
+        elif i % 2:
+            pedidos.append(("GET", f"/disponibilidade?entrada={entrada}&saida={entrada + timedelta(days=2)}&hospedes=2", None))
+        else:
+            pedidos.append(("GET", f"/quartos/{1000 + i % TOTAL_QUARTOS}", None))
+    return pedidos
+
+async def disparar(porta: int, pedidos: list, conexoes: int):
+    latencias, status = [], []
+    partes = [pedidos[i::conexoes] for i in range(conexoes)]
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_cliente(porta, parte, latencias, status) for parte in partes))
+    return time.perf_counter() - t0, latencias, status
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requisicoes", type=int, default=5000)
+    parser.add_argument("--conexoes", type=int, default=32)
+    parser.add_argument("--escritas", type=float, default=0.3, help="fração de requisições que criam reservas")
+    parser.add_argument("--porta", type=int, help="porta de uma instância já em execução em 127.0.0.1")
+    args = parser.parse_args()
+
+    random.seed(42)
+    pedidos = gerar_pedidos(args.requisicoes, args.escritas)
+
+    with tempfile.TemporaryDirectory() as pasta, contextlib.redirect_stdout(io.StringIO()):
+        servidor = None
+        porta = args.porta
+        if porta is None:
+            config.carregar_configuracoes()
+            servidor, porta = subir_instancia_local(pasta)
+        tempo, latencias, status = asyncio.run(disparar(porta, pedidos, args.conexoes))
+
+    latencias.sort()
+    escritas = sum(1 for metodo, _, _ in pedidos if metodo == "POST")
+    print(f"Requisições:       {len(pedidos)} ({escritas} escritas) em {args.conexoes} conexões")
+    print(f"Tempo total:       {tempo:.2f} s")
+    print(f"Vazão:             {len(pedidos) / tempo:,.0f} req/s")
+    print(f"Latência p50/p99:  {statistics.median(latencias) * 1000:.2f} / {latencias[int(len(latencias) * 0.99)] * 1000:.2f} ms")
+    print(f"Respostas 2xx:     {sum(1 for s in status if s < 300)}")
+    if servidor is not None:
+        print(f"Gravações:         {servidor.gravacoes} para {servidor.operacoes} alterações")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Compara a busca de quartos livres pelo bitmap de ocupação com o laço por quarto em _verificar_disponibilidade.
+
+Uso: python -m benchmarks.bench_busca_disponibilidade [quantidade_de_quartos]
+"""
+
+from hotel import config, services
+from hotel.models import Hospede, Quarto, Reserva
+from datetime import date, timedelta
+import random
+import sys
+import time
+
+
+def main():
+    total_quartos = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    config.carregar_configuracoes()
+    gerador = random.Random(1)
+
+    for i in range(total_quartos):
+        services.repositorio.adicionar_quarto(Quarto(1000 + i, ["SIMPLES", "DUPLO", "LUXO"][i % 3], 2, 150.0))
+    hospede = Hospede("Hóspede", "00000000000", "h@hotel.com", "(88) 0000-0000")
+    services.repositorio.adicionar_hospede(hospede)
+
+    # Cada quarto recebe estadias sem sobreposição ao longo de três anos:
+    for quarto in services.quartos_db:
+        dia = date(2025, 1, 1) + timedelta(days=gerador.randrange(10))
+        while dia < date(2028, 1, 1):
+            saida = dia + timedelta(days=gerador.randint(1, 7))
+            services.repositorio.adicionar_reserva(Reserva(hospede, quarto, dia, saida, 1, "CONFIRMADA"))
+            dia = saida + timedelta(days=gerador.randint(0, 6))
+
+    entrada, saida = date(2026, 7, 1), date(2026, 7, 29)
+    repeticoes = 50
+
+    t0 = time.perf_counter()
+    for _ in range(repeticoes):
+        por_laco = [q for q in services.quartos_db if services._verificar_disponibilidade(q.numero, entrada, saida)]
+    t_laco = (time.perf_counter() - t0) / repeticoes
+
+    t0 = time.perf_counter()
+    for _ in range(repeticoes):
+        por_bitmap = services.repositorio.ocupacao.livres(entrada, saida)
+    t_bitmap = (time.perf_counter() - t0) / repeticoes
+
+    print(f"Quartos / reservas:     {total_quartos} / {len(services.reservas_db)}")
+    print(f"Laço por quarto:        {t_laco * 1000:.3f} ms")
+    print(f"Bitmap de ocupação:     {t_bitmap * 1000:.3f} ms")
+    print(f"Mesmo resultado:        {sorted(q.numero for q in por_laco) == sorted(q.numero for q in por_bitmap)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Mede o tempo de inicialização de data.carregar_dados com um histórico grande de reservas.
+
+Uso: python -m benchmarks.bench_carregar_dados [quantidade_de_reservas]
+"""
+
+from hotel import data
+from hotel.models import Hospede, Quarto, Reserva, Pagamento
+from benchmarks.comum import usar_pasta_de_dados
+from datetime import date, timedelta
+from time import perf_counter
+import random
+import sys
+import tempfile
+
+
+def gerar_dados(total_reservas: int, total_quartos: int = 300, total_hospedes: int = 20000):
+    """
+    Cria quartos, hóspedes e reservas sintéticos (sem sobreposição por quarto).
+    """
+    random.seed(42)
+    quartos = [Quarto(100 + i, "DUPLO", 2, 150.0) for i in range(total_quartos)]
+    hospedes = [Hospede(f"Hóspede {i}", f"{i:011d}", f"h{i}@hotel.com", "(88) 0000-0000") for i in range(total_hospedes)]
+
+    proxima_data = {q.numero: date(2015, 1, 1) for q in quartos}
+    reservas = []
+    for i in range(total_reservas):
+        quarto = quartos[i % total_quartos]
+        entrada = proxima_data[quarto.numero] + timedelta(days=random.randint(0, 3))
+        saida = entrada + timedelta(days=random.randint(1, 5))
+        proxima_data[quarto.numero] = saida
+
+        reserva = Reserva(random.choice(hospedes), quarto, entrada, saida, 1, "CHECKOUT")
+        reserva.pagamentos.append(Pagamento(150.0, "PIX"))
+        reservas.append(reserva)
+
+    return quartos, hospedes, reservas
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    with tempfile.TemporaryDirectory() as pasta:
+        usar_pasta_de_dados(pasta)
+
+        data.salvar_dados(*gerar_dados(total))
+
+        inicio = perf_counter()
+        _, _, reservas = data.carregar_dados()
+        duracao = perf_counter() - inicio
+
+    print(f"Reservas carregadas: {len(reservas)}")
+    print(f"Tempo de carga:      {duracao:.2f} s ({len(reservas) / duracao:,.0f} reservas/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Mede a vazão da fachada segura para threads (hotel/concorrente.py) conforme cresce o número de threads.
+Cada thread faz reservas em quartos sorteados (com conflitos), cotações e pagamentos; no final confere que não houve overbooking.
+
+Uso: python -m benchmarks.bench_concorrencia [operacoes_por_rodada]
+"""
+
+from hotel import concorrente, config, services
+from hotel.models import Hospede, Quarto
+from benchmarks.comum import usar_pasta_de_dados
+from datetime import date, timedelta
+import contextlib
+import io
+import random
+import sys
+import tempfile
+import threading
+import time
+
+
+TOTAL_QUARTOS = 100
+
+
+def preparar(pasta: str):
+    usar_pasta_de_dados(pasta)
+    services.armazenamento = None
+    services.repositorio.limpar()
+    for i in range(TOTAL_QUARTOS):
+        services.repositorio.adicionar_quarto(Quarto(1000 + i, "DUPLO", 2, 150.0))
+    services.repositorio.adicionar_hospede(Hospede("Hóspede", "00000000000", "h@hotel.com", "(88) 0000-0000"))
+    services.salvar_tudo()
+
+def trabalhar(semente: int, operacoes: int):
+    sorteio = random.Random(semente)
+    for _ in range(operacoes):
+        numero = 1000 + sorteio.randrange(TOTAL_QUARTOS)
+        entrada = date(2027, 1, 1) + timedelta(days=sorteio.randrange(365))
+        acao = sorteio.random()
+        try:
+            if acao < 0.5:
+                concorrente.realizar_reserva("00000000000", numero, entrada, entrada + timedelta(days=2), 1)
+            elif acao < 0.8:
+                concorrente.buscar_quartos_disponiveis(entrada, entrada + timedelta(days=2), 2)
+            else:
+                concorrente.registrar_pagamento("00000000000", numero, 10.0, "PIX")
+        except ValueError:
+            pass
+
+def sem_overbooking() -> bool:
+    por_quarto = {}
+    for r in services.reservas_db:
+        por_quarto.setdefault(r.quarto.numero, []).append((r.data_entrada, r.data_saida))
+    for estadias in por_quarto.values():
+        estadias.sort()
+        if any(saida > proxima for (_, saida), (proxima, _) in zip(estadias, estadias[1:])):
+            return False
+    return True
+
+
+def main():
+    operacoes = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+    with contextlib.redirect_stdout(io.StringIO()):
+        config.carregar_configuracoes()
+
+    print(f"Operações por rodada: {operacoes} (50% reservas, 30% cotações, 20% pagamentos)")
+    for quantidade in (1, 2, 4, 8, 16):
+        with tempfile.TemporaryDirectory() as pasta, contextlib.redirect_stdout(io.StringIO()):
+            preparar(pasta)
+            threads = [threading.Thread(target=trabalhar, args=(i, operacoes // quantidade)) for i in range(quantidade)]
+            t0 = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            tempo = time.perf_counter() - t0
+            ok = sem_overbooking()
+        print(f"{quantidade:>2} thread(s): {operacoes / tempo:>8,.0f} op/s  reservas: {len(services.reservas_db):>5}  overbooking: {'não' if ok else 'SIM'}")
+
+
+if __name__ == "__main__":
+    main()
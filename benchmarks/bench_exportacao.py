@@ -0,0 +1,56 @@
+"""
+Mede a vazão da exportação em fluxo das reservas (CSV e JSON Lines) e o pico de memória durante a escrita.
+
+Uso: python -m benchmarks.bench_exportacao [quantidade_de_reservas]
+"""
+
+from hotel import config, services, exportacao
+from hotel.models import Adicional, Hospede, Pagamento, Quarto, Reserva
+from datetime import date, timedelta
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+
+def popular(total: int, total_quartos: int):
+    """
+    Cria estadias de 2 noites em sequência para cada quarto, com um pagamento e um adicional cada.
+    """
+    quartos = [Quarto(1000 + i, "DUPLO", 2, 150.0) for i in range(total_quartos)]
+    for q in quartos:
+        services.repositorio.adicionar_quarto(q)
+    hospede = Hospede("Hóspede", "00000000000", "h@hotel.com", "(88) 0000-0000")
+    services.repositorio.adicionar_hospede(hospede)
+
+    for i in range(total):
+        entrada = date(2027, 1, 1) + timedelta(days=2 * (i // total_quartos))
+        reserva = Reserva(hospede, quartos[i % total_quartos], entrada, entrada + timedelta(days=2), 1, "CONFIRMADA")
+        reserva.pagamentos.append(Pagamento(100.0, "PIX"))
+        reserva.adicionais.append(Adicional("Frigobar", 12.5))
+        services.repositorio.adicionar_reserva(reserva)
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    config.carregar_configuracoes()
+    popular(total, 300)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        print(f"Reservas:          {total}")
+        for extensao in ("csv", "jsonl"):
+            caminho = os.path.join(pasta, f"reservas.{extensao}")
+
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            exportacao.exportar_reservas(caminho)
+            tempo = time.perf_counter() - t0
+            pico = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            print(f"{extensao.upper():6} {tempo:6.2f} s  {total / tempo:>10,.0f} reservas/s  pico de memória {pico / 1024:,.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Mede a vazão (linhas por segundo) da importação em lote de reservas a partir de um CSV.
+
+Uso: python -m benchmarks.bench_importacao [quantidade_de_linhas]
+"""
+
+from hotel import config, services, importacao
+from hotel.models import Hospede, Quarto
+from benchmarks.comum import usar_pasta_de_dados
+from datetime import date, timedelta
+import contextlib
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+
+
+def gerar_csv(caminho: str, total: int, total_quartos: int):
+    """
+    Escreve estadias de 2 noites em sequência para cada quarto, metade com hóspedes novos.
+    """
+    with open(caminho, "w", encoding="utf-8", newline="") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(["documento", "nome", "email", "telefone", "quarto", "data_entrada", "data_saida", "num_hospedes"])
+        for i in range(total):
+            entrada = date(2027, 1, 1) + timedelta(days=2 * (i // total_quartos))
+            documento = f"{i:011d}" if i % 2 else "00000000000"
+            escritor.writerow([documento, f"Hóspede {i}", f"h{i}@hotel.com", "(88) 0000-0000",
+                               1000 + i % total_quartos, entrada.isoformat(), (entrada + timedelta(days=2)).isoformat(), 1])
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    config.carregar_configuracoes()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        usar_pasta_de_dados(pasta)
+
+        for i in range(300):
+            services.repositorio.adicionar_quarto(Quarto(1000 + i, "DUPLO", 2, 150.0))
+        services.repositorio.adicionar_hospede(Hospede("Hóspede", "00000000000", "h@hotel.com", "(88) 0000-0000"))
+
+        arquivo = os.path.join(pasta, "lote.csv")
+        gerar_csv(arquivo, total, 300)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            resultado = importacao.importar_reservas(arquivo)
+            tempo = time.perf_counter() - t0
+
+    print(f"Linhas:            {total}")
+    print(f"Importadas:        {len(resultado['importadas'])} ({len(resultado['erros'])} com erro)")
+    print(f"Tempo total:       {tempo:.2f} s")
+    print(f"Vazão:             {total / tempo:,.0f} linhas/s")
+
+
+if __name__ == "__main__":
+    main()
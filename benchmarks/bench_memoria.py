@@ -0,0 +1,47 @@
+"""
+Mede a memória ocupada por reserva (com um pagamento e um adicional) no modelo em memória.
+
+Uso: python -m benchmarks.bench_memoria [quantidade_de_reservas]
+"""
+
+from hotel.models import Hospede, Quarto, Reserva, Pagamento, Adicional
+from datetime import date, datetime, timedelta
+import json
+import sys
+import tracemalloc
+
+
+def criar_reservas(total: int, quartos, hospedes):
+    """
+    Cria as reservas a partir de dicionários, como acontece na leitura do disco
+    (os textos vindos do JSON não são compartilhados entre as instâncias).
+    """
+    reservas = []
+    for i in range(total):
+        dado = json.loads(json.dumps({"status": "CHECKOUT", "forma": "CARTAO_CREDITO", "descricao": "Frigobar"}))
+        entrada = date(2020, 1, 1) + timedelta(days=i % 2000)
+        reserva = Reserva(hospedes[i % len(hospedes)], quartos[i % len(quartos)], entrada, entrada + timedelta(days=3), 1, dado["status"])
+        reserva.pagamentos = [Pagamento(450.0, dado["forma"], datetime(2020, 1, 1, 12, 0))]
+        reserva.adicionais = [Adicional(dado["descricao"], 12.5)]
+        reservas.append(reserva)
+    return reservas
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    quartos = [Quarto(100 + i, "DUPLO", 2, 150.0) for i in range(200)]
+    hospedes = [Hospede(f"Hóspede {i}", f"{i:011d}", f"h{i}@hotel.com", "(88) 0000-0000") for i in range(1000)]
+
+    tracemalloc.start()
+    antes, _ = tracemalloc.get_traced_memory()
+    reservas = criar_reservas(total, quartos, hospedes)
+    depois, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"Reservas criadas:    {len(reservas)}")
+    print(f"Bytes por reserva:   {(depois - antes) / total:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
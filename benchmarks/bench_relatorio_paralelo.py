@@ -0,0 +1,47 @@
+"""
+Compara o relatório financeiro serial com o modo paralelo (ProcessPoolExecutor).
+
+Uso: python -m benchmarks.bench_relatorio_paralelo [quantidade_de_reservas] [processos]
+"""
+
+from hotel import config, services
+from hotel.models import Hospede, Quarto, Reserva
+from datetime import date, timedelta
+import contextlib
+import io
+import sys
+import time
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    config.carregar_configuracoes()
+    if len(sys.argv) > 2:
+        config.regras.setdefault("relatorios", {})["processos"] = int(sys.argv[2])
+
+    for i in range(200):
+        services.repositorio.adicionar_quarto(Quarto(100 + i, "DUPLO", 2, 150.0))
+    hospede = Hospede("Hóspede", "00000000000", "h@hotel.com", "(88) 0000-0000")
+    services.repositorio.adicionar_hospede(hospede)
+    for i in range(total):
+        entrada = date(2018, 1, 1) + timedelta(days=i % 3000)
+        services.repositorio.adicionar_reserva(
+            Reserva(hospede, services.quartos_db[i % 200], entrada, entrada + timedelta(days=1 + i % 20), 1, "CHECKOUT"))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        paralelo = services.gerar_relatorio_financeiro(paralelo=True)
+        t_paralelo = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        serial = services.gerar_relatorio_financeiro()
+        t_serial = time.perf_counter() - t0
+
+    print(f"Reservas:   {total}")
+    print(f"Serial:     {t_serial * 1000:.0f} ms")
+    print(f"Paralelo:   {t_paralelo * 1000:.0f} ms")
+    print(f"Idênticos:  {serial == paralelo}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Compara o relatório por período lido dos agregados diários com a varredura completa das reservas.
+
+Uso: python -m benchmarks.bench_relatorio_periodo [quantidade_de_reservas]
+"""
+
+from hotel import config
+from hotel.models import Hospede, Quarto, Reserva
+from hotel.agregados import AgregadoDiario
+from hotel.services import calcular_total_reserva
+from datetime import date, timedelta
+import sys
+import time
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    config.carregar_configuracoes()
+
+    quartos = [Quarto(100 + i, "DUPLO", 2, 150.0) for i in range(200)]
+    hospede = Hospede("Hóspede", "00000000000", "h@hotel.com", "(88) 0000-0000")
+    reservas = []
+    for i in range(total):
+        entrada = date(2020, 1, 1) + timedelta(days=i % 2000)
+        reservas.append(Reserva(hospede, quartos[i % len(quartos)], entrada, entrada + timedelta(days=3), 1, "CHECKOUT"))
+
+    inicio_mes, fim_mes = date(2022, 3, 1), date(2022, 4, 1)
+
+    t0 = time.perf_counter()
+    receita = sum(calcular_total_reserva(r) for r in reservas if inicio_mes <= r.data_entrada < fim_mes)
+    t_varredura = time.perf_counter() - t0
+
+    agregado = AgregadoDiario()
+    t0 = time.perf_counter()
+    agregado.reconstruir([], reservas)
+    t_montagem = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    agregado.consultar(inicio_mes, fim_mes)
+    t_mes = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    agregado.consultar(date(2022, 1, 1), date(2023, 1, 1))
+    t_ano = time.perf_counter() - t0
+
+    print(f"Reservas:                     {total}")
+    print(f"Varredura completa (1 mês):   {t_varredura * 1000:.1f} ms (receita por entrada R$ {receita:.2f})")
+    print(f"Montagem dos agregados:       {t_montagem * 1000:.1f} ms")
+    print(f"Consulta de 1 mês:            {t_mes * 1000:.3f} ms")
+    print(f"Consulta de 1 ano:            {t_ano * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Compara os serializadores JSON (orjson, msgspec, json da biblioteca padrão) ao salvar e carregar um histórico grande,
+com o JSON compacto padrão e com o formatado (indentado).
+
+Uso: python -m benchmarks.bench_serializacao [quantidade_de_reservas]
+"""
+
+from hotel import config, data, serializacao
+from benchmarks.bench_carregar_dados import gerar_dados
+from benchmarks.comum import usar_pasta_de_dados
+from contextlib import redirect_stdout
+from time import perf_counter
+import io
+import sys
+import tempfile
+import os
+
+
+def medir(backend: str, formatado: bool, quartos, hospedes, reservas):
+    """
+    Salva e carrega o snapshot com o serializador pedido. Retorna (segundos salvando, segundos carregando, bytes no disco).
+    """
+    config.regras = {"persistencia": {"serializador": backend, "json_formatado": formatado, "fsync": False}}
+
+    with tempfile.TemporaryDirectory() as pasta:
+        usar_pasta_de_dados(pasta)
+
+        with redirect_stdout(io.StringIO()):
+            inicio = perf_counter()
+            data.salvar_dados(quartos, hospedes, reservas)
+            salvar = perf_counter() - inicio
+
+            inicio = perf_counter()
+            _, _, carregadas = data.carregar_dados()
+            carregar = perf_counter() - inicio
+
+        assert len(carregadas) == len(reservas)
+        tamanho = sum(os.path.getsize(c) for c in (data.ARQUIVO_QUARTOS, data.ARQUIVO_HOSPEDES, data.ARQUIVO_RESERVAS))
+
+    return salvar, carregar, tamanho
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    quartos, hospedes, reservas = gerar_dados(total)
+
+    print(f"{total:,} reservas")
+    print(f"{'serializador':<22}{'salvar':>10}{'carregar':>10}{'disco':>12}")
+    for backend in serializacao.backends_disponiveis():
+        for formatado in (False, True):
+            salvar, carregar, tamanho = medir(backend, formatado, quartos, hospedes, reservas)
+            nome = backend + (" (formatado)" if formatado else "")
+            print(f"{nome:<22}{salvar:>9.2f}s{carregar:>9.2f}s{tamanho / 2**20:>9.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
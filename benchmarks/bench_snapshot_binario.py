@@ -0,0 +1,69 @@
+"""
+Compara a leitura do histórico de reservas pelo JSON (carregar_dados) com o snapshot binário lido por mmap:
+uma varredura em Python puro (SnapshotBinario.iterar) e as colunas do motor analítico (NumPy).
+
+Uso: python -m benchmarks.bench_snapshot_binario [quantidade_de_reservas]
+"""
+
+from hotel import config, data, snapshot_binario, analitico
+from hotel.snapshot_binario import SnapshotBinario
+from benchmarks.bench_carregar_dados import gerar_dados
+from benchmarks.comum import usar_pasta_de_dados
+from contextlib import redirect_stdout
+from time import perf_counter
+import io
+import sys
+import tempfile
+import os
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    config.regras = {"persistencia": {"fsync": False}}
+    quartos, hospedes, reservas = gerar_dados(total)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        usar_pasta_de_dados(pasta)
+        binario = os.path.join(pasta, "reservas.bin")
+
+        with redirect_stdout(io.StringIO()):
+            data.salvar_dados(quartos, hospedes, reservas)
+
+        inicio = perf_counter()
+        snapshot_binario.gerar_do_json(binario)
+        conversao = perf_counter() - inicio
+
+        with redirect_stdout(io.StringIO()):
+            inicio = perf_counter()
+            _, _, carregadas = data.carregar_dados()
+            receita_json = sum(p.valor_centavos for r in carregadas if r.status == "CHECKOUT" for p in r.pagamentos)
+            tempo_json = perf_counter() - inicio
+
+        inicio = perf_counter()
+        with SnapshotBinario(binario) as snapshot:
+            receita_binario = sum(r.pago_centavos for r in snapshot.iterar(status=["CHECKOUT"]))
+        tempo_varredura = perf_counter() - inicio
+        assert receita_binario == receita_json
+
+        tempo_colunas = None
+        if analitico.numpy_disponivel():
+            inicio = perf_counter()
+            with SnapshotBinario(binario) as snapshot:
+                colunas = analitico.ColunasReservas.do_snapshot_binario(snapshot, quartos)
+            tempo_colunas = perf_counter() - inicio
+            assert len(colunas) == total
+
+        tamanho_json = os.path.getsize(data.ARQUIVO_RESERVAS)
+        tamanho_binario = os.path.getsize(binario)
+
+    print(f"{total:,} reservas")
+    print(f"Arquivos:                  JSON {tamanho_json / 2**20:.1f} MiB | binário {tamanho_binario / 2**20:.1f} MiB")
+    print(f"Conversão JSON -> binário: {conversao:.2f} s")
+    print(f"JSON (carregar_dados):     {tempo_json:.2f} s")
+    print(f"Binário (varredura mmap):  {tempo_varredura:.2f} s")
+    if tempo_colunas is not None:
+        print(f"Binário (colunas NumPy):   {tempo_colunas:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""
+Preparação compartilhada pelos benchmarks.
+"""
+
+from hotel import data
+import os
+
+
+def usar_pasta_de_dados(pasta: str):
+    """
+    Aponta os arquivos de dados do backend JSON para a pasta e zera o estado da rodada anterior (journal e histórico em disco).
+    """
+    data.ARQUIVO_QUARTOS = os.path.join(pasta, "quartos.json")
+    data.ARQUIVO_HOSPEDES = os.path.join(pasta, "hospedes.json")
+    data.ARQUIVO_RESERVAS = os.path.join(pasta, "reservas.json")
+    data.ARQUIVO_JOURNAL = os.path.join(pasta, "journal.jsonl")
+    data.eventos_pendentes = 0
+    data.reservas_orfas = []
+    data.historico_em_disco = False
+    data._leitura = data._LeituraJournal()
+    data._cache_historico = data._CacheHistorico()
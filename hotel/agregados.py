@@ -0,0 +1,142 @@
+"""
+Tabela de agregados diários (diárias vendidas, receita, reservas e cancelamentos) usada nos relatórios por período.
+"""
+
+from datetime import date
+from typing import Dict, Iterable, Optional, Tuple
+from .models import Reserva, StatusReserva
+from . import config
+
+
+# Status cuja receita entra nos relatórios (os mesmos do relatório financeiro):
+STATUS_RECEITA = (StatusReserva.CONFIRMADA, StatusReserva.CHECKIN, StatusReserva.CHECKOUT)
+
+
+class AgregadoDiario:
+    """
+    Totais por dia, indexados pelo ordinal da data:
+    - diárias vendidas e receita (em centavos) de cada noite ocupada;
+    - reservas e cancelamentos contados no dia de entrada (onde também entram os adicionais).
+
+    A receita segue a regra do relatório financeiro: a noite k da estadia recebe a diferença, em centavos,
+    entre o total acumulado até ela e até a noite anterior (services._totais_acumulados), e o dia de entrada
+    também recebe os adicionais com a taxa. Somadas, as noites de uma reserva dão exatamente
+    para_centavos(calcular_total_reserva(reserva)).
+
+    A tabela é montada uma vez e depois atualizada a cada mudança de reserva, guardando
+    a última chave aplicada por reserva para conseguir desfazer a contribuição antiga.
+    """
+    def __init__(self):
+        self.pronto = False
+        self.versao_config: Optional[int] = None
+        self._noites: Dict[int, int] = {}
+        self._receita: Dict[int, int] = {}
+        self._reservas: Dict[int, int] = {}
+        self._cancelamentos: Dict[int, int] = {}
+        self._chaves: Dict[str, Tuple] = {}
+
+    def reconstruir(self, reservas: Iterable[Reserva], historico: Iterable[Reserva] = ()):
+        """
+        Monta a tabela do zero. As reservas do histórico (que não mudam mais)
+        são somadas sem guardar chave, para não ocupar memória.
+        """
+        self.limpar()
+        for r in reservas:
+            chave = self._chave(r)
+            self._aplicar(chave, 1)
+            self._chaves[r.id] = chave
+        for r in historico:
+            self._aplicar(self._chave(r), 1)
+        self.versao_config = config.versao
+        self.pronto = True
+
+    def atualizar(self, reserva: Reserva):
+        """
+        Substitui a contribuição antiga da reserva pela atual. Não faz nada enquanto a tabela não estiver montada.
+        """
+        if not self.pronto:
+            return
+
+        chave = self._chave(reserva)
+        anterior = self._chaves.get(reserva.id)
+        if anterior == chave:
+            return
+        if anterior is not None:
+            self._aplicar(anterior, -1)
+        self._aplicar(chave, 1)
+        self._chaves[reserva.id] = chave
+
+    def atualizado(self) -> bool:
+        """
+        Indica se a tabela está montada e foi calculada com as configurações atuais.
+        """
+        return self.pronto and self.versao_config == config.versao
+
+    def consultar(self, data_inicio: date, data_fim: date) -> Dict:
+        """
+        Soma os totais dos dias em [data_inicio, data_fim).
+        """
+        noites = 0
+        receita_centavos = 0
+        reservas = 0
+        cancelamentos = 0
+        for dia in range(data_inicio.toordinal(), data_fim.toordinal()):
+            noites += self._noites.get(dia, 0)
+            receita_centavos += self._receita.get(dia, 0)
+            reservas += self._reservas.get(dia, 0)
+            cancelamentos += self._cancelamentos.get(dia, 0)
+
+        return {
+            "noites": noites,
+            "receita": receita_centavos / 100,
+            "reservas": reservas,
+            "cancelamentos": cancelamentos
+        }
+
+    def limpar(self):
+        """
+        Esvazia a tabela e marca que ela precisa ser montada de novo.
+        """
+        self.pronto = False
+        self.versao_config = None
+        self._noites.clear()
+        self._receita.clear()
+        self._reservas.clear()
+        self._cancelamentos.clear()
+        self._chaves.clear()
+
+    @staticmethod
+    def _chave(reserva: Reserva) -> Tuple:
+        """
+        Informações da reserva que afetam a tabela.
+        """
+        return (reserva.status, reserva.data_entrada, reserva.data_saida,
+                reserva.quarto.tarifa_centavos, reserva.adicionais.total_centavos)
+
+    def _aplicar(self, chave: Tuple, sinal: int):
+        """
+        Soma (sinal 1) ou desfaz (sinal -1) a contribuição de uma reserva.
+        """
+        status, entrada, saida, tarifa_centavos, adicionais_centavos = chave
+        dia_entrada = entrada.toordinal()
+
+        self._reservas[dia_entrada] = self._reservas.get(dia_entrada, 0) + sinal
+        if status == StatusReserva.CANCELADA:
+            self._cancelamentos[dia_entrada] = self._cancelamentos.get(dia_entrada, 0) + sinal
+
+        if status not in STATUS_RECEITA:
+            return
+
+        from hotel.services import _totais_acumulados
+        acumulados = _totais_acumulados(entrada, saida, tarifa_centavos / 100, adicionais_centavos / 100)
+
+        receita = self._receita
+        noites = self._noites
+        anterior = round(acumulados[0] * 100)  # models.para_centavos, sem a chamada por noite
+        receita[dia_entrada] = receita.get(dia_entrada, 0) + sinal * anterior
+
+        for ordinal, total in enumerate(acumulados[1:], dia_entrada):
+            centavos = round(total * 100)
+            noites[ordinal] = noites.get(ordinal, 0) + sinal
+            receita[ordinal] = receita.get(ordinal, 0) + sinal * (centavos - anterior)
+            anterior = centavos
@@ -0,0 +1,305 @@
+"""
+Motor analítico dos relatórios: exporta as reservas para colunas NumPy e calcula as métricas de forma vetorizada.
+O NumPy é opcional; sem ele, apenas este módulo fica indisponível.
+"""
+
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Tuple
+from .models import Quarto, Reserva, StatusReserva
+from .agregados import STATUS_RECEITA
+from .config import Cores
+from . import config
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Código numérico de cada status na coluna "status":
+CODIGOS_STATUS = (StatusReserva.PENDENTE, StatusReserva.CONFIRMADA, StatusReserva.CHECKIN,
+                  StatusReserva.CHECKOUT, StatusReserva.CANCELADA, StatusReserva.NO_SHOW)
+_CODIGO_POR_STATUS = {status: codigo for codigo, status in enumerate(CODIGOS_STATUS)}
+CODIGOS_RECEITA = tuple(_CODIGO_POR_STATUS[s] for s in STATUS_RECEITA)
+CODIGO_CANCELADA = _CODIGO_POR_STATUS[StatusReserva.CANCELADA]
+
+
+def numpy_disponivel() -> bool:
+    """
+    Indica se o NumPy está instalado.
+    """
+    return np is not None
+
+def _exigir_numpy():
+    if np is None:
+        raise ImportError(f"{Cores.VERMELHO}O motor analítico precisa do NumPy (pip install numpy).{Cores.RESET}")
+
+
+class ColunasReservas:
+    """
+    Reservas exportadas em colunas (um array por atributo, uma posição por reserva):
+    quarto, entrada e saida (ordinais das datas), status (código), tipo (código do tipo do quarto),
+    tarifa_centavos e adicionais_centavos.
+    """
+    def __init__(self, reservas: Iterable[Reserva]):
+        _exigir_numpy()
+
+        self.tipos: List[str] = []
+        codigo_por_tipo: Dict[str, int] = {}
+
+        quartos, entradas, saidas, status, tipos, tarifas, adicionais = [], [], [], [], [], [], []
+        for r in reservas:
+            tipo = r.quarto.tipo
+            if tipo not in codigo_por_tipo:
+                codigo_por_tipo[tipo] = len(self.tipos)
+                self.tipos.append(tipo)
+
+            quartos.append(r.quarto.numero)
+            entradas.append(r.data_entrada.toordinal())
+            saidas.append(r.data_saida.toordinal())
+            status.append(_CODIGO_POR_STATUS[r.status])
+            tipos.append(codigo_por_tipo[tipo])
+            tarifas.append(r.quarto.tarifa_centavos)
+            adicionais.append(r.adicionais.total_centavos)
+
+        self.quarto = np.array(quartos, dtype=np.int64)
+        self.entrada = np.array(entradas, dtype=np.int64)
+        self.saida = np.array(saidas, dtype=np.int64)
+        self.status = np.array(status, dtype=np.int8)
+        self.tipo = np.array(tipos, dtype=np.int16)
+        self.tarifa_centavos = np.array(tarifas, dtype=np.int64)
+        self.adicionais_centavos = np.array(adicionais, dtype=np.int64)
+
+    @classmethod
+    def do_snapshot_binario(cls, snapshot, quartos: Iterable[Quarto]) -> "ColunasReservas":
+        """
+        Monta as colunas direto dos registros de um SnapshotBinario (hotel/snapshot_binario.py), sem criar objetos Reserva.
+        Tarifa e tipo vêm do quarto cadastrado; reservas de quartos que não existem mais ficam de fora.
+        """
+        _exigir_numpy()
+        colunas = cls([])
+
+        numeros, tarifas, tipos = [], [], []
+        codigo_por_tipo: Dict[str, int] = {}
+        for q in quartos:
+            if q.tipo not in codigo_por_tipo:
+                codigo_por_tipo[q.tipo] = len(colunas.tipos)
+                colunas.tipos.append(q.tipo)
+            numeros.append(q.numero)
+            tarifas.append(q.tarifa_centavos)
+            tipos.append(codigo_por_tipo[q.tipo])
+        if not numeros:
+            return colunas
+
+        ordem = np.argsort(numeros)
+        numeros = np.array(numeros, dtype=np.int64)[ordem]
+
+        registros = snapshot.registros_numpy()
+        posicao = np.searchsorted(numeros, registros["quarto"]).clip(max=len(numeros) - 1)
+        existe = numeros[posicao] == registros["quarto"]
+        posicao = ordem[posicao[existe]]
+
+        # Os códigos de status do arquivo são convertidos para os deste módulo (-1 para status desconhecidos):
+        conversao = np.array([_CODIGO_POR_STATUS.get(s, -1) for s in snapshot.status], dtype=np.int8)
+
+        colunas.quarto = registros["quarto"][existe].astype(np.int64)
+        colunas.entrada = registros["entrada"][existe].astype(np.int64)
+        colunas.saida = registros["saida"][existe].astype(np.int64)
+        colunas.status = conversao[registros["status"][existe]]
+        colunas.tipo = np.array(tipos, dtype=np.int16)[posicao]
+        colunas.tarifa_centavos = np.array(tarifas, dtype=np.int64)[posicao]
+        colunas.adicionais_centavos = registros["adicionais_centavos"][existe].astype(np.int64)
+        return colunas
+
+    def __len__(self) -> int:
+        return len(self.entrada)
+
+    def com_receita(self):
+        """
+        Máscara das reservas cuja receita entra nos relatórios.
+        """
+        return np.isin(self.status, CODIGOS_RECEITA)
+
+
+# PREÇOS:
+
+def _segmentos_temporada(inicio: int, fim: int) -> Iterator[Tuple[int, int, float]]:
+    """
+    Segmentos de temporada (ordinal inicial, ordinal final exclusivo, multiplicador) que cruzam
+    os ordinais [inicio, fim), na mesma ordem de services._segmentos_temporada.
+    """
+    for ano in range(date.fromordinal(inicio).year, date.fromordinal(fim - 1).year + 1):
+        primeiro_dia = date(ano, 1, 1).toordinal()
+        for i_ini, i_fim, multiplicador in config.get_segmentos_temporada(ano):
+            if primeiro_dia + i_fim > inicio and primeiro_dia + i_ini < fim:
+                yield primeiro_dia + i_ini, primeiro_dia + i_fim, multiplicador
+
+def _totais_da_estadia(entrada, saida, tarifa_centavos, adicionais_centavos):
+    """
+    services._total_da_estadia de cada posição, com as mesmas operações em float e na mesma ordem
+    (e portanto o mesmo resultado): cada segmento de temporada soma as noites úteis e depois as de fim de semana.
+
+    As estadias são ordenadas pela entrada, e cada segmento só percorre as que podem cruzá-lo;
+    as demais somariam 0.0, que não altera o total.
+    """
+    total = np.zeros(len(entrada))
+    if (saida > entrada).any():
+        ordem = np.argsort(entrada, kind="stable")
+        entrada, saida = entrada[ordem], saida[ordem]
+        tarifa = tarifa_centavos[ordem] / 100
+        mult_fds = config.get_multiplicador_fim_de_semana()
+        maior_estadia = int((saida - entrada).max())
+
+        # Sábados e domingos antes de cada ordinal da tabela (o ordinal 1, 01/01/0001, é uma segunda-feira):
+        base = int(entrada[0])
+        dias = np.arange(base, int(saida.max()) + 1)
+        fins_de_semana = np.concatenate(([0], np.cumsum((dias - 1) % 7 >= 5)))
+
+        parcial = np.zeros(len(entrada))
+        for seg_inicio, seg_fim, mult_temp in _segmentos_temporada(base, int(saida.max())):
+            lo = np.searchsorted(entrada, seg_inicio - maior_estadia, side="right")
+            hi = np.searchsorted(entrada, seg_fim, side="left")
+            de = np.maximum(entrada[lo:hi], seg_inicio)
+            ate = np.maximum(np.minimum(saida[lo:hi], seg_fim), de)
+            noites_fds = fins_de_semana[ate - base] - fins_de_semana[de - base]
+            parcial[lo:hi] += tarifa[lo:hi] * mult_temp * (ate - de - noites_fds)
+            parcial[lo:hi] += tarifa[lo:hi] * mult_temp * mult_fds * noites_fds
+        total[ordem] = parcial
+
+    subtotal = total + adicionais_centavos / 100
+    return subtotal + subtotal * config.get_taxa_servico()
+
+def _centavos(valores):
+    """
+    models.para_centavos de cada posição (np.rint também arredonda o meio para o par, como round).
+    """
+    return np.rint(valores * 100).astype(np.int64)
+
+def calcular_totais(colunas: ColunasReservas):
+    """
+    Valor final de cada reserva (diárias + adicionais + taxa de serviço), igual ao de services.calcular_total_reserva.
+    """
+    return _totais_da_estadia(colunas.entrada, colunas.saida, colunas.tarifa_centavos, colunas.adicionais_centavos)
+
+
+# RELATÓRIOS:
+
+def relatorio_financeiro(colunas: ColunasReservas, total_quartos: int) -> Dict:
+    """
+    Mesmas métricas de services.gerar_relatorio_financeiro (receita, ADR, RevPAR e cancelamento),
+    com a receita somada em centavos como lá.
+    """
+    com_receita = colunas.com_receita()
+    totais = _totais_da_estadia(colunas.entrada[com_receita], colunas.saida[com_receita],
+                                colunas.tarifa_centavos[com_receita], colunas.adicionais_centavos[com_receita])
+    total_receita = int(_centavos(totais).sum()) / 100
+    quartos_vendidos = int(com_receita.sum())
+    total_canceladas = int((colunas.status == CODIGO_CANCELADA).sum())
+    total_reservas = len(colunas)
+
+    return {
+        "receita": total_receita,
+        "adr": total_receita / quartos_vendidos if quartos_vendidos > 0 else 0.0,
+        "revpar": total_receita / total_quartos,
+        "cancelamento": (total_canceladas / total_reservas * 100) if total_reservas > 0 else 0.0
+    }
+
+def relatorio_periodo(colunas: ColunasReservas, total_quartos: int, data_inicio: date, data_fim: date) -> Dict:
+    """
+    Mesmas métricas de services.gerar_relatorio_periodo para as noites em [data_inicio, data_fim).
+
+    A receita segue a regra dos agregados diários: as noites de uma estadia dentro do período valem
+    a diferença, em centavos, entre o total acumulado até a última delas e até a noite anterior à primeira;
+    se a entrada cai no período, a conta começa do zero (o dia de entrada leva os adicionais com a taxa).
+    """
+    inicio, fim = data_inicio.toordinal(), data_fim.toordinal()
+
+    com_receita = colunas.com_receita()
+    entrada = colunas.entrada[com_receita]
+    saida = colunas.saida[com_receita]
+    tarifas = colunas.tarifa_centavos[com_receita]
+    adicionais = colunas.adicionais_centavos[com_receita]
+    entra_no_periodo = (colunas.entrada >= inicio) & (colunas.entrada < fim)
+
+    noites_da_estadia = saida - entrada
+    noites_antes = np.clip(inicio - entrada, 0, noites_da_estadia)
+    noites_ate_o_fim = np.clip(fim - entrada, 0, noites_da_estadia)
+    noites = int((noites_ate_o_fim - noites_antes).sum())
+
+    acumulado_fim = _centavos(_totais_da_estadia(entrada, entrada + noites_ate_o_fim, tarifas, adicionais))
+    acumulado_antes = _centavos(_totais_da_estadia(entrada, entrada + noites_antes, tarifas, adicionais))
+    receita_centavos = acumulado_fim - np.where(entra_no_periodo[com_receita], 0, acumulado_antes)
+    receita = int(receita_centavos.sum()) / 100
+
+    reservas = int(entra_no_periodo.sum())
+    canceladas = int((entra_no_periodo & (colunas.status == CODIGO_CANCELADA)).sum())
+    noites_disponiveis = total_quartos * (fim - inicio)
+
+    return {
+        "receita": receita,
+        "noites_vendidas": noites,
+        "ocupacao": noites / noites_disponiveis * 100,
+        "adr": receita / noites if noites > 0 else 0.0,
+        "revpar": receita / noites_disponiveis,
+        "cancelamento": (canceladas / reservas * 100) if reservas > 0 else 0.0
+    }
+
+def distribuicao_permanencia(colunas: ColunasReservas) -> Dict[int, int]:
+    """
+    Quantidade de reservas (com receita) por número de noites.
+    """
+    noites = (colunas.saida - colunas.entrada)[colunas.com_receita()]
+    if len(noites) == 0:
+        return {}
+    contagem = np.bincount(noites.clip(min=0))
+    return {int(n): int(qtd) for n, qtd in enumerate(contagem) if qtd}
+
+def ocupacao_diaria(colunas: ColunasReservas, data_inicio: date, data_fim: date, mascara=None):
+    """
+    Quartos ocupados em cada noite de [data_inicio, data_fim), somando +1 na entrada e -1 na saída.
+    """
+    inicio, fim = data_inicio.toordinal(), data_fim.toordinal()
+    dias = fim - inicio
+
+    selecao = colunas.com_receita()
+    if mascara is not None:
+        selecao &= mascara
+
+    entradas = np.clip(colunas.entrada[selecao] - inicio, 0, dias)
+    saidas = np.clip(colunas.saida[selecao] - inicio, 0, dias)
+    variacao = np.bincount(entradas, minlength=dias + 1) - np.bincount(saidas, minlength=dias + 1)
+    return np.cumsum(variacao[:dias])
+
+def ocupacao_por_tipo(colunas: ColunasReservas, quartos: Iterable[Quarto], data_inicio: date, data_fim: date) -> Dict[str, float]:
+    """
+    Taxa de ocupação (%) de cada tipo de quarto no período.
+    """
+    dias = (data_fim - data_inicio).days
+    quartos_por_tipo: Dict[str, int] = {}
+    for q in quartos:
+        quartos_por_tipo[q.tipo] = quartos_por_tipo.get(q.tipo, 0) + 1
+
+    resultado = {}
+    for tipo, quantidade in quartos_por_tipo.items():
+        if tipo in colunas.tipos:
+            mascara = colunas.tipo == colunas.tipos.index(tipo)
+            vendidas = int(ocupacao_diaria(colunas, data_inicio, data_fim, mascara).sum())
+        else:
+            vendidas = 0
+        resultado[tipo] = vendidas / (quantidade * dias) * 100
+    return resultado
+
+def ocupacao_por_dia_semana(colunas: ColunasReservas, total_quartos: int, data_inicio: date, data_fim: date) -> Dict[int, float]:
+    """
+    Taxa de ocupação (%) por dia da semana (0 = segunda ... 6 = domingo) no período.
+    """
+    ocupados = ocupacao_diaria(colunas, data_inicio, data_fim)
+    dias_semana = (np.arange(data_inicio.toordinal(), data_fim.toordinal()) - 1) % 7
+
+    resultado = {}
+    for dia_semana in range(7):
+        mascara = dias_semana == dia_semana
+        noites = int(mascara.sum())
+        if noites:
+            resultado[dia_semana] = int(ocupados[mascara].sum()) / (total_quartos * noites) * 100
+    return resultado
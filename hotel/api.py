@@ -0,0 +1,335 @@
+"""
+API HTTP (JSON) para os terminais da recepção, feita só com a biblioteca padrão (asyncio).
+
+- Leituras rodam em outra thread, com a trava global do repositório em leitura;
+- Alterações entram em uma fila e são aplicadas, em ordem, por uma única tarefa escritora;
+- A escritora aplica as alterações que chegaram juntas como um lote e grava o lote inteiro de uma vez
+  (fora do loop de eventos, com a trava global em escrita), respondendo às requisições só depois da gravação.
+  Uma leitura nunca vê um lote aplicado e ainda não gravado, nem um lote recusado pelo armazenamento.
+
+Uso: python -m hotel.api [--host HOST] [--porta PORTA]
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import sys
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from hotel import services, config
+from .models import ConflitoVersao
+from .data import DadosCorrompidos
+from .importacao import ler_data, mensagem_de_erro
+from .exportacao import resumo_reserva
+
+
+MOTIVOS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 409: "Conflict", 500: "Internal Server Error"}
+
+
+class NaoEncontrado(LookupError):
+    """
+    Recurso pedido não existe (responde 404).
+    """
+
+
+# LEITURAS:
+
+def _obter_quarto(parametros: Dict, consulta: Dict, corpo: Dict):
+    quarto = services.buscar_quarto(int(parametros["numero"]))
+    if not quarto:
+        raise NaoEncontrado(f"Quarto {parametros['numero']} não encontrado.")
+    return quarto.to_dict()
+
+def _obter_hospede(parametros: Dict, consulta: Dict, corpo: Dict):
+    hospede = services.buscar_hospede(parametros["documento"])
+    if not hospede:
+        raise NaoEncontrado(f"Hóspede {parametros['documento']} não encontrado.")
+    return _resumo_hospede(hospede)
+
+def _obter_reserva(parametros: Dict, consulta: Dict, corpo: Dict):
+    return resumo_reserva(_buscar_reserva(consulta["documento"], consulta["quarto"]))
+
+def _obter_disponibilidade(parametros: Dict, consulta: Dict, corpo: Dict):
+    opcoes = services.buscar_quartos_disponiveis(ler_data(consulta["entrada"]), ler_data(consulta["saida"]),
+                                                 int(consulta.get("hospedes", 1)), consulta.get("tipo"))
+    return [{"quarto": q.numero, "tipo": q.tipo, "valor": round(valor, 2)} for q, valor in opcoes]
+
+
+# ALTERAÇÕES (executadas pela tarefa escritora):
+
+def _criar_hospede(parametros: Dict, consulta: Dict, corpo: Dict):
+    hospede = services.cadastrar_hospede(corpo["nome"], str(corpo["documento"]), corpo.get("email", ""), corpo.get("telefone", ""))
+    return _resumo_hospede(hospede)
+
+def _criar_reserva(parametros: Dict, consulta: Dict, corpo: Dict):
+    reserva = services.realizar_reserva(str(corpo["documento"]), int(corpo["quarto"]), ler_data(corpo["entrada"]),
+                                        ler_data(corpo["saida"]), int(corpo.get("hospedes", 1)))
+    return resumo_reserva(reserva)
+
+def _operacao_da_reserva(operacao: Callable[[str, int], None], parametros: Dict, consulta: Dict, corpo: Dict):
+    documento, numero = str(corpo["documento"]), int(corpo["quarto"])
+    operacao(documento, numero)
+    return resumo_reserva(_buscar_reserva(documento, numero))
+
+def _registrar_pagamento(parametros: Dict, consulta: Dict, corpo: Dict):
+    documento, numero = str(corpo["documento"]), int(corpo["quarto"])
+    services.registrar_pagamento(documento, numero, float(corpo["valor"]), str(corpo.get("forma", "DINHEIRO")).upper())
+    return resumo_reserva(_buscar_reserva(documento, numero))
+
+def _registrar_adicional(parametros: Dict, consulta: Dict, corpo: Dict):
+    documento, numero = str(corpo["documento"]), int(corpo["quarto"])
+    services.registrar_adicional(documento, numero, corpo["descricao"], float(corpo["valor"]))
+    return resumo_reserva(_buscar_reserva(documento, numero))
+
+
+# LOTES E LEITURAS (fora do loop de eventos):
+
+def _aplicar_lote(operacoes: List[Callable]) -> Tuple[List[Tuple[object, Optional[Exception]]], bool]:
+    """
+    Com a trava global em escrita, executa as operações em ordem e grava uma única vez as entidades alteradas.
+    Se outro processo gravou as mesmas entidades antes (ConflitoVersao), persistir() recarrega a memória
+    ainda com a trava em escrita, e o lote inteiro responde 409.
+    Devolve (valor, erro) de cada operação e se houve gravação.
+    """
+    with services.repositorio.trava_global.escrita():
+        services.sincronizar()
+        resultados = []
+        with services.adiar_persistencia() as entidades:
+            for operacao in operacoes:
+                try:
+                    resultados.append((operacao(), None))
+                except Exception as e:
+                    resultados.append((None, e))
+
+        if not entidades:
+            return resultados, False
+        try:
+            services.persistir(*entidades)
+        except Exception as e:
+            return [(None, e)] * len(resultados), False
+        return resultados, True
+
+def _ler(operacao: Callable):
+    """
+    Executa a leitura com a trava global em leitura (espera o lote em andamento terminar de gravar).
+    """
+    with services.repositorio.trava_global.leitura():
+        return operacao()
+
+
+# AUXILIARES:
+
+def _buscar_reserva(documento: str, numero):
+    reserva = services.buscar_reserva(documento, int(numero))
+    if not reserva:
+        raise NaoEncontrado("Reserva não encontrada.")
+    return reserva
+
+def _resumo_hospede(hospede) -> Dict:
+    return {"nome": hospede.nome, "documento": hospede.documento, "email": hospede.email, "telefone": hospede.telefone}
+
+
+# (método, caminho, função, é alteração, status de sucesso):
+ROTAS = [
+    ("GET", r"/quartos/(?P<numero>\d+)", _obter_quarto, False, 200),
+    ("GET", r"/hospedes/(?P<documento>[^/]+)", _obter_hospede, False, 200),
+    ("GET", r"/reservas", _obter_reserva, False, 200),
+    ("GET", r"/disponibilidade", _obter_disponibilidade, False, 200),
+    ("POST", r"/hospedes", _criar_hospede, True, 201),
+    ("POST", r"/reservas", _criar_reserva, True, 201),
+    ("POST", r"/reservas/confirmar", partial(_operacao_da_reserva, services.confirmar_reserva), True, 200),
+    ("POST", r"/reservas/cancelar", partial(_operacao_da_reserva, services.cancelar_reserva), True, 200),
+    ("POST", r"/checkin", partial(_operacao_da_reserva, services.realizar_checkin), True, 200),
+    ("POST", r"/checkout", partial(_operacao_da_reserva, services.realizar_checkout), True, 200),
+    ("POST", r"/pagamentos", _registrar_pagamento, True, 200),
+    ("POST", r"/adicionais", _registrar_adicional, True, 200),
+]
+_ROTAS_COMPILADAS = [(metodo, re.compile(padrao + "$"), funcao, escrita, sucesso)
+                     for metodo, padrao, funcao, escrita, sucesso in ROTAS]
+
+
+class ServidorAPI:
+    """
+    Servidor HTTP/1.1 (com keep-alive) sobre asyncio, com uma única tarefa escritora.
+    """
+    def __init__(self, lote_maximo: Optional[int] = None):
+        self.lote_maximo = lote_maximo or config.get_lote_maximo_api()
+        self.porta: Optional[int] = None
+        self.operacoes = 0
+        self.gravacoes = 0
+        self._servidor: Optional[asyncio.AbstractServer] = None
+        self._fila: Optional[asyncio.Queue] = None
+        self._escritora: Optional[asyncio.Task] = None
+
+    async def iniciar(self, host: str, porta: int):
+        """
+        Abre o socket (porta 0 escolhe uma livre, lida depois em self.porta) e inicia a tarefa escritora.
+        """
+        self._fila = asyncio.Queue()
+        self._escritora = asyncio.create_task(self._escrever())
+        self._servidor = await asyncio.start_server(self._atender, host, porta)
+        self.porta = self._servidor.sockets[0].getsockname()[1]
+
+    async def encerrar(self):
+        """
+        Para de aceitar conexões, aplica o que ainda está na fila e encerra a escritora.
+        """
+        self._servidor.close()
+        await self._servidor.wait_closed()
+        await self._fila.put(None)
+        await self._escritora
+
+    # ESCRITA:
+
+    async def _enfileirar(self, operacao: Callable):
+        futuro = asyncio.get_running_loop().create_future()
+        await self._fila.put((operacao, futuro))
+        return await futuro
+
+    async def _escrever(self):
+        """
+        Junta as alterações já enfileiradas (até lote_maximo) e as aplica como um lote.
+        """
+        while True:
+            item = await self._fila.get()
+            if item is None:
+                return
+            lote = [item]
+            while len(lote) < self.lote_maximo and not self._fila.empty():
+                proximo = self._fila.get_nowait()
+                if proximo is None:
+                    self._fila.put_nowait(None)
+                    break
+                lote.append(proximo)
+            await self._aplicar(lote)
+
+    async def _aplicar(self, lote: List[Tuple[Callable, asyncio.Future]]):
+        """
+        Aplica e grava o lote em outra thread (_aplicar_lote) e responde às requisições com o resultado.
+        """
+        resultados, gravou = await asyncio.to_thread(_aplicar_lote, [operacao for operacao, _ in lote])
+        if gravou:
+            self.gravacoes += 1
+
+        self.operacoes += len(lote)
+        for (_, futuro), (valor, erro) in zip(lote, resultados):
+            if futuro.cancelled():
+                continue
+            if erro is not None:
+                futuro.set_exception(erro)
+            else:
+                futuro.set_result(valor)
+
+    # HTTP:
+
+    async def _atender(self, leitor: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        """
+        Atende as requisições de uma conexão até o cliente fechá-la (ou pedir Connection: close).
+        """
+        try:
+            while True:
+                linha = await leitor.readline()
+                if not linha:
+                    break
+                metodo, alvo, versao = linha.decode("latin-1").split()
+
+                cabecalhos = {}
+                while True:
+                    linha = await leitor.readline()
+                    if linha in (b"\r\n", b"\n", b""):
+                        break
+                    nome, _, valor = linha.decode("latin-1").partition(":")
+                    cabecalhos[nome.strip().lower()] = valor.strip()
+
+                tamanho = int(cabecalhos.get("content-length", 0))
+                corpo = await leitor.readexactly(tamanho) if tamanho else b""
+
+                status, dados = await self._despachar(metodo, alvo, corpo)
+                manter = versao == "HTTP/1.1" and cabecalhos.get("connection", "").lower() != "close"
+                escritor.write(_resposta(status, dados, manter))
+                await escritor.drain()
+                if not manter:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            escritor.close()
+
+    async def _despachar(self, metodo: str, alvo: str, corpo: bytes) -> Tuple[int, object]:
+        """
+        Encontra a rota, executa (direto ou pela escritora) e converte erros em status HTTP.
+        """
+        url = urlsplit(alvo)
+        consulta = {chave: valores[0] for chave, valores in parse_qs(url.query).items()}
+
+        for metodo_rota, padrao, funcao, escrita, sucesso in _ROTAS_COMPILADAS:
+            encontrado = padrao.match(url.path)
+            if metodo_rota != metodo or not encontrado:
+                continue
+            try:
+                dados = json.loads(corpo) if corpo else {}
+                operacao = partial(funcao, encontrado.groupdict(), consulta, dados)
+                resultado = await (self._enfileirar(operacao) if escrita else asyncio.to_thread(_ler, operacao))
+                return sucesso, resultado
+            except NaoEncontrado as e:
+                return 404, {"erro": str(e)}
+            except ConflitoVersao as e:
+                return 409, {"erro": mensagem_de_erro(e)}
+            except KeyError as e:
+                return 400, {"erro": f"Campo obrigatório ausente: {e.args[0]}"}
+            except (ValueError, TypeError) as e:
+                return 400, {"erro": mensagem_de_erro(e)}
+            except Exception as e:
+                return 500, {"erro": mensagem_de_erro(e)}
+
+        return 404, {"erro": f"Rota não encontrada: {metodo} {url.path}"}
+
+
+def _resposta(status: int, dados, manter: bool) -> bytes:
+    corpo = json.dumps(dados, ensure_ascii=False, default=str).encode("utf-8")
+    conexao = "" if manter else "Connection: close\r\n"
+    cabecalho = (f"HTTP/1.1 {status} {MOTIVOS[status]}\r\n"
+                 f"Content-Type: application/json; charset=utf-8\r\n"
+                 f"Content-Length: {len(corpo)}\r\n"
+                 f"{conexao}\r\n")
+    return cabecalho.encode("latin-1") + corpo
+
+
+# EXECUÇÃO:
+
+async def servir(host: str, porta: int):
+    """
+    Inicia o servidor e atende até o processo ser interrompido.
+    """
+    servidor = ServidorAPI()
+    await servidor.iniciar(host, porta)
+    print(f"{config.Cores.VERDE}API ouvindo em http://{host}:{servidor.porta}{config.Cores.RESET}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await servidor.encerrar()
+
+def main():
+    config.carregar_configuracoes()
+    host, porta = config.get_endereco_api()
+
+    parser = argparse.ArgumentParser(description="API HTTP do sistema de hotel.")
+    parser.add_argument("--host", default=host)
+    parser.add_argument("--porta", type=int, default=porta)
+    args = parser.parse_args()
+
+    try:
+        services.inicializar_sistema()
+    except DadosCorrompidos as e:
+        print(e)
+        sys.exit(1)
+    try:
+        asyncio.run(servir(args.host, args.porta))
+    except KeyboardInterrupt:
+        print("\nSaindo...")
+
+
+if __name__ == "__main__":
+    main()
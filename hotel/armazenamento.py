@@ -0,0 +1,105 @@
+"""
+Interface comum dos backends de persistência e escolha do backend pelo settings.json.
+"""
+
+from hotel.models import Hospede, Quarto, Reserva
+from datetime import date
+from typing import ContextManager, Iterable, Iterator, List, Optional, Tuple
+from contextlib import nullcontext
+from hotel import config, data
+
+
+class Armazenamento:
+    """
+    Interface que todo backend de persistência deve implementar.
+    """
+    def carregar(self, lazy: bool = False) -> Tuple[List[Quarto], List[Hospede], List[Reserva]]:
+        """
+        Lê as entidades salvas e restaura os relacionamentos.
+        No modo lazy, só as reservas ativas são carregadas.
+        """
+        raise NotImplementedError
+
+    def iterar_historico(self, quartos: List[Quarto], hospedes: List[Hospede], documento: Optional[str] = None,
+                         data_inicio: Optional[date] = None, data_fim: Optional[date] = None,
+                         status: Optional[Iterable[str]] = None) -> Iterator[Reserva]:
+        """
+        Gera sob demanda as reservas encerradas que ficaram fora da memória no modo lazy.
+        Os filtros (hóspede, data de entrada em [data_inicio, data_fim) e status) são aplicados pelo backend.
+        """
+        raise NotImplementedError
+
+    def salvar_tudo(self, quartos: List[Quarto], hospedes: List[Hospede], reservas: List[Reserva]):
+        """
+        Grava o estado completo das listas.
+        """
+        raise NotImplementedError
+
+    def salvar_alteracoes(self, entidades: Iterable) -> int:
+        """
+        Grava apenas as entidades alteradas, comparando versões (compare-and-swap): se outro processo gravou
+        uma versão mais nova de alguma delas, nada é gravado e ConflitoVersao é lançada.
+        As entidades gravadas sobem de versão.
+        Retorna quantas alterações aguardam compactação (0 se o backend não precisa compactar).
+        """
+        raise NotImplementedError
+
+    def alteracoes_externas(self) -> Optional[List[Tuple[str, dict]]]:
+        """
+        Eventos (tipo, dados) gravados por outros processos desde a última chamada,
+        ou None se a memória precisa ser recarregada por inteiro.
+        Backends sem registro de alterações retornam [] e só detectam os conflitos ao gravar.
+        """
+        return []
+
+    def travar(self) -> ContextManager:
+        """
+        Trava exclusiva sobre o armazenamento, entre processos, para operações de várias etapas (como a compactação).
+        """
+        return nullcontext()
+
+    def fechar(self):
+        """
+        Libera os recursos abertos pelo backend.
+        """
+        pass
+
+
+class ArmazenamentoJSON(Armazenamento):
+    """
+    Backend original: snapshot em arquivos JSON mais o journal de alterações.
+    """
+    def carregar(self, lazy: bool = False) -> Tuple[List[Quarto], List[Hospede], List[Reserva]]:
+        return data.carregar_dados(lazy)
+
+    def iterar_historico(self, quartos: List[Quarto], hospedes: List[Hospede], documento: Optional[str] = None,
+                         data_inicio: Optional[date] = None, data_fim: Optional[date] = None,
+                         status: Optional[Iterable[str]] = None) -> Iterator[Reserva]:
+        return data.iterar_historico(quartos, hospedes, documento, data_inicio, data_fim, status)
+
+    def salvar_tudo(self, quartos: List[Quarto], hospedes: List[Hospede], reservas: List[Reserva]):
+        data.salvar_dados(quartos, hospedes, reservas)
+
+    def salvar_alteracoes(self, entidades: Iterable) -> int:
+        return data.registrar_alteracoes(entidades)
+
+    def alteracoes_externas(self) -> Optional[List[Tuple[str, dict]]]:
+        return data.alteracoes_externas()
+
+    def travar(self) -> ContextManager:
+        return data.travar_armazenamento()
+
+
+def criar_armazenamento() -> Armazenamento:
+    """
+    Cria o backend configurado em "persistencia.backend" no settings.json ("json" ou "sqlite").
+    """
+    backend = config.get_backend_armazenamento()
+
+    if backend == "json":
+        return ArmazenamentoJSON()
+    if backend == "sqlite":
+        from hotel.data_sqlite import ArmazenamentoSQLite
+        return ArmazenamentoSQLite(config.get_arquivo_sqlite())
+
+    raise ValueError(f"Backend de armazenamento desconhecido: {backend}")
@@ -0,0 +1,92 @@
+"""
+Auditoria noturna: marca os No-Shows do dia, aponta as estadias com check-out atrasado
+e levanta as diárias da noite das estadias em andamento, com uma única gravação no final.
+"""
+
+from datetime import date, datetime, time
+from typing import Dict, List, Optional
+from .models import Reserva, StatusReserva
+from hotel import services, config
+
+
+@services.repetir_em_conflito
+def executar_auditoria(dia: Optional[date] = None, agora: Optional[datetime] = None) -> Dict:
+    """
+    Audita a data de negócio `dia` (padrão: a data de `agora`).
+
+    - No-Shows: as chegadas em aberto até o dia (inclui as de noites em que a auditoria não rodou);
+    - Check-outs atrasados e diárias: só as estadias em andamento (índice de hospedagens).
+
+    Retorna {"dia", "no_shows", "checkouts_atrasados", "diarias", "total_diarias"}.
+    """
+    agora = agora or datetime.now()
+    dia = dia or agora.date()
+
+    no_shows = _marcar_no_shows(dia, agora)
+    atrasados = _checkouts_atrasados(dia, agora)
+    diarias = _diarias_da_noite(dia)
+
+    # Uma única gravação para todas as reservas alteradas (e seus quartos liberados):
+    alteradas = [r for r, _ in no_shows]
+    quartos = {r.quarto.numero: r.quarto for r in alteradas}
+    if alteradas:
+        services.persistir(*alteradas, *quartos.values())
+
+    return {
+        "dia": dia,
+        "no_shows": [{**_identificar(r), "multa": round(multa, 2)} for r, multa in no_shows],
+        "checkouts_atrasados": atrasados,
+        "diarias": diarias,
+        "total_diarias": round(sum((d["valor"] for d in diarias), 0.0), 2)
+    }
+
+
+# ETAPAS:
+
+def _marcar_no_shows(dia: date, agora: datetime) -> List[tuple]:
+    """
+    Marca como NO_SHOW as reservas CONFIRMADAS com chegada até o dia que já passaram da tolerância.
+    Chegadas de dias anteriores também entram: uma noite sem auditoria não deixa reservas para trás.
+    Só as chegadas em aberto são lidas (repositorio.chegadas), e não o histórico de entradas.
+    """
+    marcadas = []
+    for r in services.repositorio.chegadas.ate(dia):
+        if r.status == StatusReserva.CONFIRMADA and agora >= services.limite_noshow(r):
+            marcadas.append((r, services._aplicar_noshow(r)))
+    return marcadas
+
+def _checkouts_atrasados(dia: date, agora: datetime) -> List[Dict]:
+    """
+    Estadias em CHECKIN cuja saída já passou (ou vence hoje e já passou do horário de check-out).
+    """
+    limite_hoje = datetime.combine(dia, _horario_checkout())
+
+    atrasados = []
+    for r in services.repositorio.hospedagens.values():
+        if r.data_saida < dia or (r.data_saida == dia and agora >= limite_hoje):
+            atrasados.append({**_identificar(r), "data_saida": r.data_saida, "dias_atraso": (dia - r.data_saida).days})
+    return sorted(atrasados, key=lambda a: (a["data_saida"], a["quarto"]))
+
+def _diarias_da_noite(dia: date) -> List[Dict]:
+    """
+    Diária da noite do dia para cada estadia em andamento que inclui essa noite.
+    """
+    diarias = []
+    for r in services.repositorio.hospedagens.values():
+        if r.data_entrada <= dia < r.data_saida:
+            valor = services.calcular_valor_diaria(dia, r.quarto.tarifa_base)
+            diarias.append({**_identificar(r), "valor": round(valor, 2)})
+    return sorted(diarias, key=lambda d: d["quarto"])
+
+
+# AUXILIARES:
+
+def _horario_checkout() -> time:
+    """
+    Horário de check-out do settings.json ("HH:MM").
+    """
+    hora, minuto = (int(x) for x in config.get_horarios().get("checkout", "12:00").split(":"))
+    return time(hora, minuto)
+
+def _identificar(reserva: Reserva) -> Dict:
+    return {"reserva_id": reserva.id, "hospede": reserva.hospede.documento, "quarto": reserva.quarto.numero}
@@ -0,0 +1,294 @@
+"""
+Linha de comando não interativa para operações em script (auditoria noturna, integrações).
+Cada comando escreve um objeto JSON por linha na saída padrão; as mensagens dos serviços vão para a saída de erro.
+
+Uso: python run.py <comando> [argumentos]   (sem argumentos, abre o menu interativo)
+     python run.py lote operacoes.txt        (um comando por linha, todos no mesmo processo)
+"""
+
+import argparse
+import contextlib
+import json
+import shlex
+import sys
+from datetime import date
+from typing import Dict, Iterator, List, Optional, TextIO, Union
+from hotel import services, config
+from .models import ConflitoVersao
+from .data import DadosCorrompidos
+from .importacao import ler_data, mensagem_de_erro
+
+
+class _Parser(argparse.ArgumentParser):
+    """
+    Converte os erros de argumentos em ValueError, para que virem uma linha JSON (e não encerrem um lote).
+    """
+    def error(self, message):
+        raise ValueError(f"{self.prog}: {message}")
+
+
+def _data(texto: str) -> date:
+    try:
+        return ler_data(texto)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+# COMANDOS:
+
+def _reserva(reserva) -> Dict:
+    from hotel.exportacao import resumo_reserva
+    return resumo_reserva(reserva)
+
+def _buscar_reserva(args):
+    reserva = services.buscar_reserva(args.documento, args.quarto)
+    if not reserva:
+        raise ValueError("Reserva não encontrada.")
+    return reserva
+
+def _cmd_quarto(args):
+    quarto = services.cadastrar_quarto(args.numero, args.tipo.upper(), args.capacidade, args.tarifa)
+    return quarto.to_dict()
+
+def _cmd_hospede(args):
+    hospede = services.cadastrar_hospede(args.nome, args.documento, args.email, args.telefone)
+    return {"nome": hospede.nome, "documento": hospede.documento}
+
+def _cmd_reservar(args):
+    reserva = services.realizar_reserva(args.documento, args.quarto, args.entrada, args.saida, args.hospedes)
+    return _reserva(reserva)
+
+def _cmd_confirmar(args):
+    services.confirmar_reserva(args.documento, args.quarto)
+    return _reserva(_buscar_reserva(args))
+
+def _cmd_cancelar(args):
+    services.cancelar_reserva(args.documento, args.quarto)
+    return _reserva(_buscar_reserva(args))
+
+def _cmd_checkin(args):
+    services.realizar_checkin(args.documento, args.quarto)
+    return _reserva(_buscar_reserva(args))
+
+def _cmd_checkout(args):
+    services.realizar_checkout(args.documento, args.quarto)
+    return _reserva(_buscar_reserva(args))
+
+def _cmd_pagar(args):
+    services.registrar_pagamento(args.documento, args.quarto, args.valor, args.forma.upper())
+    return _reserva(_buscar_reserva(args))
+
+def _cmd_adicional(args):
+    services.registrar_adicional(args.documento, args.quarto, args.descricao, args.valor)
+    return _reserva(_buscar_reserva(args))
+
+def _cmd_disponibilidade(args):
+    opcoes = services.buscar_quartos_disponiveis(args.entrada, args.saida, args.hospedes, args.tipo)
+    return [{"quarto": q.numero, "tipo": q.tipo, "valor": round(valor, 2)} for q, valor in opcoes]
+
+def _cmd_relatorio(args):
+    if args.tipo == "ocupacao":
+        return {"ocupacao": services.gerar_relatorio_ocupacao()}
+    if args.tipo == "financeiro":
+        return services.gerar_relatorio_financeiro(paralelo=args.paralelo)
+
+    if args.inicio is None or args.fim is None:
+        raise ValueError(f"O relatório {args.tipo} exige --inicio e --fim.")
+    if args.tipo == "periodo":
+        return services.gerar_relatorio_periodo(args.inicio, args.fim)
+    return services.gerar_relatorio_analitico(args.inicio, args.fim, args.binario)
+
+def _cmd_importar(args):
+    from hotel import importacao
+    resultado = importacao.importar_reservas(args.caminho, tudo_ou_nada=args.tudo_ou_nada)
+    if args.erros and resultado["erros"]:
+        importacao.salvar_relatorio_erros(resultado["erros"], args.erros)
+    return {
+        "importadas": len(resultado["importadas"]),
+        "hospedes_novos": len(resultado["hospedes_novos"]),
+        "erros": [{"linha": linha, "erro": erro} for linha, erro in resultado["erros"]]
+    }
+
+def _cmd_exportar(args):
+    from hotel import exportacao
+    return exportacao.exportar_reservas(args.caminho, args.formato, args.inicio, args.fim, args.status)
+
+def _cmd_auditoria(args):
+    from hotel import auditoria
+    return auditoria.executar_auditoria(args.dia)
+
+def _cmd_binario(args):
+    from hotel import snapshot_binario
+    if args.acao == "gerar":
+        return {"reservas": snapshot_binario.gerar_do_json(args.caminho)}
+    destino = args.destino or args.caminho + ".json"
+    return {"reservas": snapshot_binario.converter_para_json(args.caminho, destino), "destino": destino}
+
+def _cmd_lote(args):
+    # O lote é tratado em main(); uma linha "lote" dentro de outro lote não é executada:
+    raise ValueError("O comando lote não pode ser usado dentro de um lote.")
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    """
+    Monta o parser com um subcomando por operação dos serviços.
+    """
+    parser = _Parser(prog="hotel", description="Operações do sistema de hotel sem interação (saída em JSON).")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    def com_reserva(nome: str, ajuda: str, funcao):
+        sub = comandos.add_parser(nome, help=ajuda)
+        sub.add_argument("documento", help="CPF do hóspede")
+        sub.add_argument("quarto", type=int, help="número do quarto")
+        sub.set_defaults(funcao=funcao)
+        return sub
+
+    sub = comandos.add_parser("quarto", help="cadastra um quarto")
+    sub.add_argument("numero", type=int)
+    sub.add_argument("tipo")
+    sub.add_argument("capacidade", type=int)
+    sub.add_argument("tarifa", type=float)
+    sub.set_defaults(funcao=_cmd_quarto)
+
+    sub = comandos.add_parser("hospede", help="cadastra um hóspede")
+    sub.add_argument("nome")
+    sub.add_argument("documento")
+    sub.add_argument("email")
+    sub.add_argument("telefone")
+    sub.set_defaults(funcao=_cmd_hospede)
+
+    sub = com_reserva("reservar", "cria uma reserva", _cmd_reservar)
+    sub.add_argument("entrada", type=_data)
+    sub.add_argument("saida", type=_data)
+    sub.add_argument("hospedes", type=int)
+
+    com_reserva("confirmar", "confirma uma reserva pendente", _cmd_confirmar)
+    com_reserva("cancelar", "cancela uma reserva (com multa fora do prazo)", _cmd_cancelar)
+    com_reserva("checkin", "realiza o check-in", _cmd_checkin)
+    com_reserva("checkout", "realiza o check-out (exige a conta quitada)", _cmd_checkout)
+
+    sub = com_reserva("pagar", "registra um pagamento", _cmd_pagar)
+    sub.add_argument("valor", type=float)
+    sub.add_argument("--forma", default="DINHEIRO")
+
+    sub = com_reserva("adicional", "lança um consumo na conta", _cmd_adicional)
+    sub.add_argument("descricao")
+    sub.add_argument("valor", type=float)
+
+    sub = comandos.add_parser("disponibilidade", help="lista os quartos livres com o valor cotado")
+    sub.add_argument("entrada", type=_data)
+    sub.add_argument("saida", type=_data)
+    sub.add_argument("hospedes", type=int)
+    sub.add_argument("--tipo", type=str.upper)
+    sub.set_defaults(funcao=_cmd_disponibilidade)
+
+    sub = comandos.add_parser("relatorio", help="gera um relatório")
+    sub.add_argument("tipo", choices=["ocupacao", "financeiro", "periodo", "analitico"])
+    sub.add_argument("--inicio", type=_data)
+    sub.add_argument("--fim", type=_data)
+    sub.add_argument("--paralelo", action="store_true", help="precifica em vários processos (financeiro)")
+    sub.add_argument("--binario", help="lê as reservas de um snapshot binário (analitico)")
+    sub.set_defaults(funcao=_cmd_relatorio)
+
+    sub = comandos.add_parser("importar", help="importa reservas de um CSV ou JSON Lines")
+    sub.add_argument("caminho")
+    sub.add_argument("--tudo-ou-nada", action="store_true")
+    sub.add_argument("--erros", help="arquivo CSV para o relatório de linhas com erro")
+    sub.set_defaults(funcao=_cmd_importar)
+
+    sub = comandos.add_parser("exportar", help="exporta reservas para CSV, JSON Lines ou Parquet")
+    sub.add_argument("caminho")
+    sub.add_argument("--formato", choices=["csv", "jsonl", "parquet"])
+    sub.add_argument("--inicio", type=_data)
+    sub.add_argument("--fim", type=_data)
+    sub.add_argument("--status", nargs="+", type=str.upper)
+    sub.set_defaults(funcao=_cmd_exportar)
+
+    sub = comandos.add_parser("auditoria", help="auditoria noturna: No-Shows, check-outs atrasados e diárias da noite")
+    sub.add_argument("--dia", type=_data, help="data de negócio auditada (padrão: hoje)")
+    sub.set_defaults(funcao=_cmd_auditoria)
+
+    sub = comandos.add_parser("binario", help="gera o snapshot binário das reservas ou o converte de volta para JSON")
+    sub.add_argument("acao", choices=["gerar", "para-json"])
+    sub.add_argument("caminho", help="arquivo do snapshot binário")
+    sub.add_argument("--destino", help="arquivo JSON gerado por para-json (padrão: <caminho>.json)")
+    sub.set_defaults(funcao=_cmd_binario)
+
+    sub = comandos.add_parser("lote", help="executa um comando por linha do arquivo ('-' lê da entrada padrão)")
+    sub.add_argument("arquivo")
+    sub.set_defaults(funcao=_cmd_lote)
+
+    return parser
+
+
+# EXECUÇÃO:
+
+def executar(argv: Union[List[str], str], parser: Optional[argparse.ArgumentParser] = None) -> Dict:
+    """
+    Executa um comando e devolve o resultado no formato da saída: {"ok", "comando", "resultado" | "erro"}.
+    Uma linha de lote (texto) é dividida aqui, para que aspas sem fechamento virem o erro só daquela linha;
+    da mesma forma, --help e dados corrompidos encontrados durante o comando viram um resultado com "ok": False.
+    """
+    parser = parser or criar_parser()
+    partes = argv.split() if isinstance(argv, str) else argv
+    comando = partes[0] if partes else None
+    try:
+        if isinstance(argv, str):
+            argv = shlex.split(argv)
+        args = parser.parse_args(argv)
+        comando = args.comando
+        return {"ok": True, "comando": comando, "resultado": args.funcao(args)}
+    except (ValueError, KeyError, TypeError, OSError, ImportError, ConflitoVersao, DadosCorrompidos) as e:
+        return {"ok": False, "comando": comando, "erro": mensagem_de_erro(e)}
+    except SystemExit as e:
+        # --help (ou outra saída do argparse) não encerra o processo nem o lote: vira uma linha de erro.
+        motivo = "ajuda escrita na saída de erro" if e.code in (0, None) else f"argparse encerrou com código {e.code}"
+        return {"ok": False, "comando": comando, "erro": f"Comando não executado ({motivo})."}
+
+def _linhas_do_lote(arquivo: TextIO) -> Iterator[str]:
+    for linha in arquivo:
+        linha = linha.strip()
+        if linha and not linha.startswith("#"):
+            yield linha
+
+def _escrever(saida: TextIO, resultado: Dict):
+    saida.write(json.dumps(resultado, ensure_ascii=False, default=str) + "\n")
+    saida.flush()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Ponto de entrada: carrega configurações e dados uma vez e executa o comando (ou o lote).
+    Retorna 0 se todas as operações deram certo, 1 caso contrário.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    saida = sys.stdout
+    parser = criar_parser()
+    falhas = 0
+
+    # Tudo o que os serviços imprimem vai para a saída de erro; a saída padrão fica só com o JSON:
+    with contextlib.redirect_stdout(sys.stderr):
+        config.carregar_configuracoes()
+        try:
+            services.inicializar_sistema(dados_exemplo=False)
+        except DadosCorrompidos as e:
+            # Nenhum comando roda sobre dados corrompidos:
+            _escrever(saida, {"ok": False, "comando": argv[0] if argv else None, "erro": mensagem_de_erro(e)})
+            return 1
+
+        if argv[:1] == ["lote"] and len(argv) == 2:
+            with contextlib.ExitStack() as pilha:
+                arquivo = sys.stdin if argv[1] == "-" else pilha.enter_context(open(argv[1], encoding="utf-8"))
+                for comando in _linhas_do_lote(arquivo):
+                    resultado = executar(comando, parser)
+                    falhas += not resultado["ok"]
+                    _escrever(saida, resultado)
+        else:
+            resultado = executar(argv, parser)
+            falhas += not resultado["ok"]
+            _escrever(saida, resultado)
+
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
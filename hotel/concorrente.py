@@ -0,0 +1,105 @@
+"""
+Fachada de hotel.services segura para várias threads (terminais, workers de uma API com threads).
+
+- Reservas e transições da estadia travam apenas o quarto envolvido: operações em quartos diferentes não se bloqueiam;
+- O cadastro de hóspedes usa uma trava própria;
+- Buscas e cotações não usam as travas dos quartos, só a trava global do repositório em leitura.
+
+A trava global (Repositorio.trava_global) é tomada em leitura por todas as operações e consultas
+e em escrita pela recarga e pela sincronização com outros processos, que substituem o conteúdo do repositório.
+
+A verificação de disponibilidade e a inclusão da reserva acontecem sob a mesma trava do quarto,
+o que impede duas threads de reservarem o mesmo quarto no mesmo período.
+"""
+
+import threading
+from datetime import date
+from functools import wraps
+from typing import Callable, Dict
+from .models import Hospede, Quarto, Reserva
+from hotel import services
+
+
+_travas_quartos: Dict[int, threading.Lock] = {}
+_trava_criacao = threading.Lock()
+_trava_hospedes = threading.Lock()
+
+
+def trava_do_quarto(numero: int) -> threading.Lock:
+    """
+    Trava exclusiva do quarto, criada na primeira utilização.
+    """
+    trava = _travas_quartos.get(numero)
+    if trava is None:
+        with _trava_criacao:
+            trava = _travas_quartos.setdefault(numero, threading.Lock())
+    return trava
+
+
+# CADASTROS:
+
+def cadastrar_quarto(numero: int, tipo: str, capacidade: int, tarifa_base: float) -> Quarto:
+    with trava_do_quarto(numero):
+        return services.cadastrar_quarto(numero, tipo, capacidade, tarifa_base)
+
+def cadastrar_hospede(nome: str, documento: str, email: str, telefone: str) -> Hospede:
+    with _trava_hospedes:
+        return services.cadastrar_hospede(nome, documento, email, telefone)
+
+
+# RESERVAS E ESTADIA:
+
+def realizar_reserva(doc_hospede: str, num_quarto: int, data_entrada: date, data_saida: date, num_hospedes: int) -> Reserva:
+    with trava_do_quarto(num_quarto):
+        return services.realizar_reserva(doc_hospede, num_quarto, data_entrada, data_saida, num_hospedes)
+
+def bloquear_quarto(num_quarto: int, data_inicio: date, data_fim: date, motivo: str):
+    with trava_do_quarto(num_quarto):
+        services.bloquear_quarto(num_quarto, data_inicio, data_fim, motivo)
+
+def confirmar_reserva(doc_hospede: str, num_quarto: int):
+    with trava_do_quarto(num_quarto):
+        services.confirmar_reserva(doc_hospede, num_quarto)
+
+def cancelar_reserva(doc_hospede: str, num_quarto: int):
+    with trava_do_quarto(num_quarto):
+        services.cancelar_reserva(doc_hospede, num_quarto)
+
+def realizar_noshow(doc_hospede: str, num_quarto: int, forcar: bool = False):
+    with trava_do_quarto(num_quarto):
+        services.realizar_noshow(doc_hospede, num_quarto, forcar)
+
+def realizar_checkin(doc_hospede: str, num_quarto: int):
+    with trava_do_quarto(num_quarto):
+        services.realizar_checkin(doc_hospede, num_quarto)
+
+def realizar_checkout(doc_hospede: str, num_quarto: int):
+    with trava_do_quarto(num_quarto):
+        services.realizar_checkout(doc_hospede, num_quarto)
+
+def registrar_pagamento(doc_hospede: str, num_quarto: int, valor: float, forma: str):
+    with trava_do_quarto(num_quarto):
+        services.registrar_pagamento(doc_hospede, num_quarto, valor, forma)
+
+def registrar_adicional(doc_hospede: str, num_quarto: int, descricao: str, valor: float):
+    with trava_do_quarto(num_quarto):
+        services.registrar_adicional(doc_hospede, num_quarto, descricao, valor)
+
+
+# CONSULTAS (sem trava de quarto):
+
+def _em_leitura(consulta: Callable) -> Callable:
+    """
+    Roda a consulta com a trava global em leitura, para que não veja o repositório no meio de uma recarga.
+    """
+    @wraps(consulta)
+    def executar(*args, **kwargs):
+        with services.repositorio.trava_global.leitura():
+            return consulta(*args, **kwargs)
+    return executar
+
+buscar_quarto = _em_leitura(services.buscar_quarto)
+buscar_hospede = _em_leitura(services.buscar_hospede)
+buscar_reserva = _em_leitura(services.buscar_reserva)
+buscar_quartos_disponiveis = _em_leitura(services.buscar_quartos_disponiveis)
+calcular_total_reserva = _em_leitura(services.calcular_total_reserva)
@@ -4,12 +4,23 @@ Módulo para carregar as configurações do arquivo settings.json.
 
 import json
 import os
-from typing import List, Dict
+from datetime import date, timedelta
+from typing import List, Dict, Tuple
 
 ARQUIVO_SETTINGS = "settings.json"
 
 regras = {}
 
+# Incrementada a cada recarga das regras; serve para invalidar valores calculados com as regras antigas:
+versao = 0
+
+# Temporadas compiladas em ((mes, dia) inicial, (mes, dia) final, multiplicador):
+_temporadas_compiladas: List[Tuple[Tuple[int, int], Tuple[int, int], float]] = []
+
+# Calendários por ano (multiplicador por dia do ano) e seus segmentos, montados sob demanda:
+_calendarios: Dict[int, List[float]] = {}
+_segmentos: Dict[int, List[Tuple[int, int, float]]] = {}
+
 class Cores:
     VERDE = '\033[92m'
     VERMELHO = '\033[91m'
@@ -34,6 +45,24 @@ def carregar_configuracoes():
     except Exception as e:
         print(f"{Cores.VERMELHO}Erro ao ler configurações: {e}{Cores.RESET}")
 
+    _compilar_temporadas()
+
+def _compilar_temporadas():
+    """
+    Converte as temporadas "dd-mm" em tuplas e descarta os calendários montados com as regras antigas.
+    """
+    global _temporadas_compiladas, versao
+    compiladas = []
+    for temp in regras.get("temporadas", []):
+        dia_ini, mes_ini = (int(x) for x in temp["inicio"].split("-"))
+        dia_fim, mes_fim = (int(x) for x in temp["fim"].split("-"))
+        compiladas.append(((mes_ini, dia_ini), (mes_fim, dia_fim), temp["multiplicador"]))
+
+    _temporadas_compiladas = compiladas
+    _calendarios.clear()
+    _segmentos.clear()
+    versao += 1
+
 
 # GETTERS HOTEL
 
@@ -90,10 +119,151 @@ def get_multa_noshow() -> float:
     return regras.get("politica_cancelamento", {}).get("multa_noshow", 1.0)
 
 
+# GETTERS PERSISTÊNCIA
+
+def get_limite_journal() -> int:
+    """
+    Retorna quantos eventos o journal acumula antes de ser compactado em um snapshot.
+    """
+    return regras.get("persistencia", {}).get("limite_journal", 500)
+
+def get_carregamento_lazy() -> bool:
+    """
+    Indica se apenas as reservas ativas devem ser carregadas na inicialização.
+    """
+    return regras.get("persistencia", {}).get("carregamento_lazy", False)
+
+def get_fsync() -> bool:
+    """
+    Indica se as gravações esperam a confirmação do disco (fsync) antes de serem dadas como feitas.
+    """
+    return regras.get("persistencia", {}).get("fsync", True)
+
+def get_serializador() -> str:
+    """
+    Retorna o serializador JSON dos arquivos de dados ("auto", "orjson", "msgspec" ou "json").
+    """
+    return regras.get("persistencia", {}).get("serializador", "auto")
+
+def get_json_formatado() -> bool:
+    """
+    Indica se os arquivos de dados devem ser gravados com indentação (mais legíveis, porém maiores e mais lentos).
+    """
+    return regras.get("persistencia", {}).get("json_formatado", False)
+
+def get_backend_armazenamento() -> str:
+    """
+    Retorna o backend de persistência escolhido ("json" ou "sqlite").
+    """
+    return regras.get("persistencia", {}).get("backend", "json")
+
+def get_arquivo_sqlite() -> str:
+    """
+    Retorna o caminho do banco usado pelo backend SQLite.
+    """
+    return regras.get("persistencia", {}).get("arquivo_sqlite", "hotel.db")
+
+
+# GETTERS RELATÓRIOS
+
+def get_processos_relatorio() -> int:
+    """
+    Retorna quantos processos o relatório financeiro paralelo usa (0 = um por núcleo da máquina).
+    """
+    return regras.get("relatorios", {}).get("processos", 0)
+
+def get_tamanho_lote_relatorio() -> int:
+    """
+    Retorna quantas reservas cada processo recebe por vez no relatório paralelo.
+    """
+    return regras.get("relatorios", {}).get("tamanho_lote", 5000)
+
+
+# GETTERS API
+
+def get_endereco_api() -> Tuple[str, int]:
+    """
+    Retorna o endereço (host, porta) em que a API HTTP escuta.
+    """
+    api = regras.get("api", {})
+    return api.get("host", "127.0.0.1"), api.get("porta", 8080)
+
+def get_lote_maximo_api() -> int:
+    """
+    Retorna quantas alterações a API aplica por vez antes de gravar o lote.
+    """
+    return regras.get("api", {}).get("lote_maximo", 256)
+
+
 # GETTERS TEMPORADAS
 
 def get_temporadas() -> List[Dict]:
     """
     Retorna a lista de temporadas configuradas.
     """
-    return regras.get("temporadas", [])
\ No newline at end of file
+    return regras.get("temporadas", [])
+
+def _indice_do_dia(ano: int, mes: int, dia: int, final: bool = False) -> int:
+    """
+    Converte (mes, dia) no índice do dia dentro do ano (0 = 1º de janeiro).
+    Datas inexistentes, como 29-02 em ano comum, viram o dia válido mais próximo no sentido da temporada.
+    """
+    try:
+        dia_data = date(ano, mes, dia)
+    except ValueError:
+        primeiro_do_mes_seguinte = date(ano + mes // 12, mes % 12 + 1, 1)
+        dia_data = primeiro_do_mes_seguinte - timedelta(days=1) if final else primeiro_do_mes_seguinte
+    return (dia_data - date(ano, 1, 1)).days
+
+def get_calendario_temporadas(ano: int) -> List[float]:
+    """
+    Retorna o multiplicador de temporada de cada dia do ano, indexado por (dia do ano - 1).
+    O calendário é montado na primeira consulta do ano e reaproveitado até as configurações serem recarregadas.
+    """
+    calendario = _calendarios.get(ano)
+    if calendario is not None:
+        return calendario
+
+    total_dias = (date(ano + 1, 1, 1) - date(ano, 1, 1)).days
+    calendario = [1.0] * total_dias
+
+    # Percorre de trás para frente para que a primeira temporada da lista prevaleça:
+    for (mes_ini, dia_ini), (mes_fim, dia_fim), multiplicador in reversed(_temporadas_compiladas):
+        i_ini = _indice_do_dia(ano, mes_ini, dia_ini)
+        i_fim = _indice_do_dia(ano, mes_fim, dia_fim, final=True)
+
+        if (mes_ini, dia_ini) <= (mes_fim, dia_fim):
+            faixas = [(i_ini, i_fim)]
+        else:  # Temporada que cruza o ano novo
+            faixas = [(i_ini, total_dias - 1), (0, i_fim)]
+
+        for inicio, fim in faixas:
+            calendario[inicio:fim + 1] = [multiplicador] * (fim - inicio + 1)
+
+    _calendarios[ano] = calendario
+    return calendario
+
+def get_segmentos_temporada(ano: int) -> List[Tuple[int, int, float]]:
+    """
+    Retorna o calendário do ano agrupado em segmentos (indice_inicio, indice_fim_exclusivo, multiplicador).
+    """
+    segmentos = _segmentos.get(ano)
+    if segmentos is not None:
+        return segmentos
+
+    calendario = get_calendario_temporadas(ano)
+    segmentos = []
+    inicio = 0
+    for i in range(1, len(calendario) + 1):
+        if i == len(calendario) or calendario[i] != calendario[inicio]:
+            segmentos.append((inicio, i, calendario[inicio]))
+            inicio = i
+
+    _segmentos[ano] = segmentos
+    return segmentos
+
+def get_multiplicador_temporada(data: date) -> float:
+    """
+    Retorna o multiplicador de temporada de uma data com uma única consulta ao calendário do ano.
+    """
+    return get_calendario_temporadas(data.year)[data.toordinal() - date(data.year, 1, 1).toordinal()]
@@ -2,13 +2,24 @@
 Módulo responsável por salvar e carregar os dados do sistema em arquivos JSON.
 """
 
-from hotel.models import Pessoa, Hospede, Quarto, QuartoLuxo, Pagamento, Adicional, Reserva
-from datetime import datetime
-from typing import List, Tuple
-from time import sleep
+from hotel.models import Pessoa, Hospede, Quarto, QuartoLuxo, Pagamento, Adicional, Reserva, ConflitoVersao, STATUS_ATIVOS, STATUS_LIBERADOS
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+from uuid import uuid4
 from .config import Cores
+from hotel import config, serializacao
+from array import array
+import codecs
+import hashlib
 import json
 import os
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 
 # CONFIGURAÇÃO DOS ARQUIVOS
@@ -16,94 +27,847 @@ import os
 ARQUIVO_QUARTOS = "quartos.json"
 ARQUIVO_HOSPEDES = "hospedes.json"
 ARQUIVO_RESERVAS = "reservas.json"
+ARQUIVO_JOURNAL = "journal.jsonl"
+
+# Quantidade de eventos gravados no journal desde o último snapshot:
+eventos_pendentes = 0
+
+# Reservas lidas do disco cujo hóspede ou quarto não existe mais (preservadas no próximo snapshot):
+reservas_orfas: List[dict] = []
+
+# Indica que o histórico ficou no disco (carregamento lazy) e precisa ser preservado pelo snapshot:
+historico_em_disco = False
+
+class DadosCorrompidos(RuntimeError):
+    """
+    Os arquivos de dados não conferem com o manifesto do último snapshot ou não são JSON válido.
+    O sistema não deve iniciar sobre eles (nem criar dados de exemplo por cima).
+    """
+
+
+class _LeituraJournal:
+    """
+    Até onde este processo já leu o journal. O que estiver depois foi gravado por outros processos.
+    """
+    __slots__ = ("caminho", "geracao", "posicao", "assinatura", "externas", "recarregar")
+
+    def __init__(self):
+        self.caminho: Optional[str] = None
+        # Identificador gravado na primeira linha do journal (muda a cada snapshot):
+        self.geracao: Optional[str] = None
+        self.posicao = 0
+        # (inode, tamanho, mtime) do journal na última leitura, para não reler um arquivo que não mudou:
+        self.assinatura: Optional[tuple] = None
+        # Eventos de outros processos ainda não entregues por alteracoes_externas():
+        self.externas: List[Tuple[str, dict]] = []
+        # Outro processo gravou um snapshot: a memória precisa ser recarregada por inteiro.
+        self.recarregar = False
+
+    def reiniciar(self, geracao: Optional[str], posicao: int, assinatura: Optional[tuple]):
+        self.caminho = ARQUIVO_JOURNAL
+        self.geracao = geracao
+        self.posicao = posicao
+        self.assinatura = assinatura
+        self.externas = []
+        self.recarregar = False
+
+
+_leitura = _LeituraJournal()
+
+
+class _CacheHistorico:
+    """
+    O que iterar_historico já extraiu dos arquivos, para que cada consulta não releia tudo:
+    - as reservas do journal (versão mais nova por id), atualizadas só com as linhas novas enquanto a geração não muda;
+    - as posições em bytes das reservas de cada hóspede no snapshot, refeitas só quando o arquivo muda.
+    """
+    __slots__ = ("journal_caminho", "journal_assinatura", "journal_geracao", "journal_posicao", "reservas_journal",
+                 "snapshot_assinatura", "posicoes_por_documento")
+
+    def __init__(self):
+        self.journal_caminho: Optional[str] = None
+        self.journal_assinatura: Optional[tuple] = None
+        self.journal_geracao: Optional[str] = None
+        self.journal_posicao = 0
+        self.reservas_journal: Dict[str, dict] = {}
+        self.snapshot_assinatura: Optional[tuple] = None
+        # documento -> array com (posição na lista, byte inicial, byte final) de cada reserva, em sequência:
+        self.posicoes_por_documento: Dict[str, array] = {}
+
+
+_cache_historico = _CacheHistorico()
+_trava_cache_historico = threading.Lock()
+
+# Trava entre processos (arquivo .lock ao lado do journal), reentrante dentro do processo:
+_trava_local = threading.RLock()
+_arquivo_trava = None
+_pid_trava = None
+_profundidade_trava = 0
+
+
+# TRAVA DO ARMAZENAMENTO:
+
+@contextmanager
+def travar_armazenamento():
+    """
+    Trava exclusiva sobre os arquivos de dados, compartilhada entre processos (flock).
+    Pode ser aninhada no mesmo processo. Sem fcntl (Windows), vale apenas entre as threads do processo.
+    """
+    global _arquivo_trava, _pid_trava, _profundidade_trava
+    with _trava_local:
+        if _profundidade_trava == 0:
+            # O arquivo da trava fica aberto entre as gravações. É reaberto se o diretório de dados mudar
+            # e também depois de um fork: o flock vale por arquivo aberto, e o herdado seria compartilhado com o pai.
+            caminho = ARQUIVO_JOURNAL + ".lock"
+            if _arquivo_trava is None or _arquivo_trava.name != caminho or _pid_trava != os.getpid():
+                if _arquivo_trava is not None and _pid_trava == os.getpid():
+                    _arquivo_trava.close()
+                _arquivo_trava = open(caminho, "a")
+                _pid_trava = os.getpid()
+            if fcntl is not None:
+                fcntl.flock(_arquivo_trava.fileno(), fcntl.LOCK_EX)
+        _profundidade_trava += 1
+        try:
+            yield
+        finally:
+            _profundidade_trava -= 1
+            if _profundidade_trava == 0 and fcntl is not None:
+                fcntl.flock(_arquivo_trava.fileno(), fcntl.LOCK_UN)
 
 
 # FUNÇÕES DE LEITURA E ESCRITA DE ARQUIVOS:
 
-def _salvar_arquivo(caminho: str, dados: List[dict]):
+def _salvar_arquivo(caminho: str, dados: List[dict]) -> Dict:
     """
-    Escreve uma lista de dicionários em um arquivo JSON.
+    Escreve uma lista de dicionários em <caminho>.tmp (o arquivo só é trocado na confirmação do snapshot).
+    Retorna o resumo (soma e tamanho) para o manifesto.
     """
-    try:
-        with open(caminho, "w", encoding="utf-8") as f:
-            json.dump(dados, f, indent=4, ensure_ascii=False)
-    except Exception as e:
-        print(f"Erro ao salvar {caminho}: {e}")
+    return _escrever_temporario(caminho, [serializacao.codificar(dados)])
 
-def _carregar_arquivo(caminho: str) -> List[dict]:
+def _carregar_arquivo(caminho: str, esquema: Optional[str] = None) -> List[dict]:
     """
-    Lê um arquivo JSON e retorna a lista de dicionários.
+    Lê um arquivo JSON e retorna a lista de dicionários (`esquema` é repassado a serializacao.decodificar).
+    Um arquivo ilegível lança DadosCorrompidos: tratá-lo como vazio apagaria os dados no próximo snapshot.
     """
     if not os.path.exists(caminho):
         return []
+    try:
+        with open(caminho, "rb") as f:
+            return serializacao.decodificar(f.read(), esquema)
+    except ValueError as e:
+        raise DadosCorrompidos(f"{Cores.VERMELHO}{caminho} está corrompido ({e}). Restaure um backup antes de iniciar o sistema.{Cores.RESET}")
+
+def _iterar_arquivo(caminho: str, tamanho_bloco: int = 1 << 16) -> Iterator[dict]:
+    """
+    Lê um arquivo com uma lista JSON de objetos item a item, sem carregar o arquivo inteiro na memória.
+    """
+    if not os.path.exists(caminho):
+        return
+
+    with open(caminho, "rb") as f:
+        for item, _, _ in _itens_da_lista(f, caminho, tamanho_bloco):
+            yield item
+
+def _itens_da_lista(f, caminho: str, tamanho_bloco: int = 1 << 16, posicoes: bool = False) -> Iterator[Tuple[dict, int, int]]:
+    """
+    Gera (item, byte inicial, byte final) de cada objeto da lista JSON do arquivo binário `f`, lido em blocos.
+    As posições só são calculadas com posicoes=True (senão vêm como 0).
+    """
+    decodificador = json.JSONDecoder()
+    decodificar_bloco = codecs.getincrementaldecoder("utf-8")().decode
+    buffer = ""
+    pos = 0
+    abriu_lista = False
+    # Posição em bytes do caractere buffer[marca]:
+    marca = 0
+    bytes_marca = 0
+
+    while True:
+        # Pula espaços e vírgulas entre os itens:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+
+        if pos < len(buffer):
+            if not abriu_lista:
+                if buffer[pos] != "[":
+                    raise ValueError(f"{caminho} não contém uma lista JSON.")
+                abriu_lista = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                item, fim = decodificador.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                pass  # Item incompleto: lê mais um bloco
+            else:
+                inicio_bytes = fim_bytes = 0
+                if posicoes:
+                    inicio_bytes = bytes_marca + len(buffer[marca:pos].encode("utf-8"))
+                    fim_bytes = inicio_bytes + len(buffer[pos:fim].encode("utf-8"))
+                    marca, bytes_marca = fim, fim_bytes
+                pos = fim
+                yield item, inicio_bytes, fim_bytes
+                continue
+
+        dados = f.read(tamanho_bloco)
+        bloco = decodificar_bloco(dados, final=not dados)
+        if not dados:
+            if abriu_lista:
+                raise ValueError(f"{caminho} terminou antes do fim da lista JSON.")
+            return
+        if posicoes:
+            bytes_marca += len(buffer[marca:pos].encode("utf-8"))
+            marca = 0
+        buffer = buffer[pos:] + bloco
+        pos = 0
+
+def _salvar_arquivo_em_fluxo(caminho: str, dados: Iterable[dict]) -> Dict:
+    """
+    Escreve uma lista JSON item a item em <caminho>.tmp, sem montá-la inteira na memória.
+    Retorna o resumo (soma e tamanho) para o manifesto.
+    """
+    formatado = config.get_json_formatado()
+
+    def partes():
+        yield b"["
+        vazia = True
+        for dado in dados:
+            if formatado:
+                yield b"\n  " if vazia else b",\n  "
+                yield serializacao.codificar(dado, formatado=True).replace(b"\n", b"\n  ")
+            else:
+                yield b"" if vazia else b","
+                yield serializacao.codificar(dado, formatado=False)
+            vazia = False
+        yield b"\n]" if formatado and not vazia else b"]"
+    return _escrever_temporario(caminho, partes())
+
+
+# GRAVAÇÃO ATÔMICA E MANIFESTO DO SNAPSHOT:
+
+def _escrever_temporario(caminho: str, partes: Iterable[bytes]) -> Dict:
+    """
+    Escreve as partes em <caminho>.tmp, calculando a soma SHA-256 no caminho, e força o conteúdo para o disco.
+    """
+    soma = hashlib.sha256()
+    tamanho = 0
+    with open(caminho + ".tmp", "wb") as f:
+        for bloco in partes:
+            soma.update(bloco)
+            tamanho += len(bloco)
+            f.write(bloco)
+        _descarregar(f)
+    return {"sha256": soma.hexdigest(), "tamanho": tamanho}
+
+def _descarregar(f):
+    """
+    Esvazia o buffer do arquivo e, com persistencia.fsync ligado, espera o disco confirmar a escrita.
+    """
+    f.flush()
+    if config.get_fsync():
+        os.fsync(f.fileno())
+
+def _sincronizar_diretorio(caminho: str):
+    """
+    Torna duráveis as trocas de nome (os.replace) feitas no diretório do arquivo.
+    """
+    if not config.get_fsync() or os.name == "nt":
+        return
+    descritor = os.open(os.path.dirname(os.path.abspath(caminho)), os.O_RDONLY)
+    try:
+        os.fsync(descritor)
+    finally:
+        os.close(descritor)
+
+def _caminho_manifesto() -> str:
+    return os.path.join(os.path.dirname(ARQUIVO_RESERVAS), "manifesto.json")
+
+def _ler_manifesto() -> Optional[dict]:
+    """
+    Manifesto do último snapshot confirmado: {"geracao", "arquivos": {nome: {"sha256", "tamanho"}}}.
+    None em dados gravados antes do manifesto (ou em um sistema vazio).
+    """
+    caminho = _caminho_manifesto()
+    if not os.path.exists(caminho):
+        return None
     try:
         with open(caminho, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Erro ao ler {caminho}: {e}")
+            manifesto = json.load(f)
+        manifesto["arquivos"], manifesto["geracao"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise DadosCorrompidos(f"{Cores.VERMELHO}{caminho} está corrompido ({e}). Restaure um backup antes de iniciar o sistema.{Cores.RESET}")
+    return manifesto
+
+def _resumo_do_arquivo(caminho: str) -> Optional[Dict]:
+    """
+    Soma SHA-256 e tamanho de um arquivo gravado (None se ele não existir).
+    """
+    if not os.path.exists(caminho):
+        return None
+    soma = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            soma.update(bloco)
+    return {"sha256": soma.hexdigest(), "tamanho": os.path.getsize(caminho)}
+
+def _confirmar_snapshot(resumos: Dict[str, Dict]):
+    """
+    Publica os temporários do snapshot como uma transação:
+    1. o manifesto com as somas dos novos arquivos é trocado atomicamente (é o ponto de confirmação);
+    2. os temporários substituem os arquivos e o journal recomeça na geração do manifesto.
+    Uma queda entre 1 e 2 é completada na próxima carga (_verificar_snapshot); antes de 1, vale o snapshot anterior.
+    O fsync é pago uma vez por arquivo novo e uma vez por etapa no diretório, não a cada escrita.
+    """
+    caminho = _caminho_manifesto()
+    geracao = uuid4().hex
+    manifesto = {"geracao": geracao, "arquivos": {os.path.basename(c): r for c, r in resumos.items()}}
+    with open(caminho + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, indent=2)
+        _descarregar(f)
+    os.replace(caminho + ".tmp", caminho)
+    _sincronizar_diretorio(caminho)
+
+    for destino in resumos:
+        os.replace(destino + ".tmp", destino)
+    _novo_journal(geracao)
+    _sincronizar_diretorio(caminho)
+
+def _verificar_snapshot() -> Optional[str]:
+    """
+    Confere os arquivos do snapshot com o manifesto e retorna a geração do journal que os acompanha.
+    Um arquivo que não confere, mas cujo temporário confere, é uma troca interrompida e é completado;
+    qualquer outra diferença lança DadosCorrompidos.
+    """
+    manifesto = _ler_manifesto()
+    if manifesto is None:
+        return None
+
+    for caminho in (ARQUIVO_QUARTOS, ARQUIVO_HOSPEDES, ARQUIVO_RESERVAS):
+        esperado = manifesto["arquivos"].get(os.path.basename(caminho))
+        if esperado is None or _resumo_do_arquivo(caminho) == esperado:
+            continue
+        if _resumo_do_arquivo(caminho + ".tmp") == esperado:
+            os.replace(caminho + ".tmp", caminho)
+            continue
+        raise DadosCorrompidos(f"{Cores.VERMELHO}{caminho} não confere com o manifesto do último snapshot (arquivo truncado ou alterado). "
+                               f"Restaure um backup antes de iniciar o sistema.{Cores.RESET}")
+    return manifesto["geracao"]
+
+
+# JOURNAL DE ALTERAÇÕES (JSON LINES):
+
+def _tipo_entidade(entidade) -> str:
+    """
+    Retorna o nome usado no journal para o tipo da entidade.
+    """
+    if isinstance(entidade, Quarto):
+        return "quarto"
+    if isinstance(entidade, Hospede):
+        return "hospede"
+    if isinstance(entidade, Reserva):
+        return "reserva"
+    raise TypeError(f"Entidade não suportada no journal: {type(entidade).__name__}")
+
+def registrar_alteracoes(entidades: Iterable) -> int:
+    """
+    Acrescenta ao journal uma linha com o estado atual de cada entidade alterada (compare-and-swap):
+    sob a trava do armazenamento, lê o que outros processos gravaram desde a última leitura e recusa
+    a gravação com ConflitoVersao se alguma entidade mudou no meio tempo. As gravadas sobem de versão.
+    Retorna quantos eventos aguardam a próxima compactação.
+    """
+    global eventos_pendentes
+    entidades = list(entidades)
+
+    with travar_armazenamento():
+        _ler_novidades()
+        _verificar_versoes(entidades)
+
+        dicionarios = []
+        for e in entidades:
+            dado = e.to_dict()
+            dado["versao"] = e.versao + 1
+            dicionarios.append({"tipo": _tipo_entidade(e), "dados": dado})
+        linhas = [serializacao.codificar(d, formatado=False) + b"\n" for d in dicionarios]
+        _anexar_ao_journal(linhas)
+
+    for e in entidades:
+        e.versao += 1
+    eventos_pendentes += len(linhas)
+    return eventos_pendentes
+
+def alteracoes_externas() -> Optional[List[Tuple[str, dict]]]:
+    """
+    Retorna (tipo, dados) de cada evento gravado por outros processos desde a última chamada,
+    ou None se outro processo compactou o armazenamento (a memória deve ser recarregada com carregar_dados).
+    """
+    if not _leitura.externas and not _leitura.recarregar and _leitura.caminho == ARQUIVO_JOURNAL \
+            and _assinatura_journal() == _leitura.assinatura:
+        return []
+
+    with travar_armazenamento():
+        _ler_novidades()
+        if _leitura.recarregar:
+            return None
+        externas, _leitura.externas = _leitura.externas, []
+        return externas
+
+def _assinatura_journal() -> Optional[tuple]:
+    try:
+        st = os.stat(ARQUIVO_JOURNAL)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+def _geracao(linha: bytes) -> Optional[str]:
+    """
+    Geração gravada no cabeçalho do journal (None para journals sem cabeçalho).
+    """
+    try:
+        cabecalho = json.loads(linha)
+    except json.JSONDecodeError:
+        return None
+    return cabecalho.get("geracao") if isinstance(cabecalho, dict) and "tipo" not in cabecalho else None
+
+def _geracao_do_journal() -> Optional[str]:
+    if not os.path.exists(ARQUIVO_JOURNAL):
+        return None
+    with open(ARQUIVO_JOURNAL, "rb") as f:
+        return _geracao(f.readline())
+
+def _ler_novidades():
+    """
+    Lê, com a trava já obtida, os eventos gravados por outros processos depois da posição já lida.
+    Se o journal foi trocado por um snapshot de outro processo, marca que a memória precisa ser recarregada.
+    """
+    global eventos_pendentes
+    if _leitura.caminho != ARQUIVO_JOURNAL:
+        # Nada foi lido ainda deste journal: só um journal vazio serve de ponto de partida.
+        _leitura.reiniciar(None, 0, None)
+
+    assinatura = _assinatura_journal()
+    if assinatura == _leitura.assinatura:
+        return
+    if assinatura is None:
+        _leitura.recarregar = _leitura.recarregar or _leitura.geracao is not None or _leitura.posicao > 0
+        _leitura.assinatura = None
+        return
+
+    with open(ARQUIVO_JOURNAL, "rb") as f:
+        primeira = f.readline()
+        geracao = _geracao(primeira)
+        if geracao != _leitura.geracao or assinatura[1] < _leitura.posicao:
+            _leitura.recarregar = True
+            return
+        f.seek(max(_leitura.posicao, len(primeira) if geracao else 0))
+        inicio = f.tell()
+        novo = f.read()
+
+    # Uma linha sem o "\n" final ainda não está completa e fica para a próxima leitura:
+    completo = novo[:novo.rfind(b"\n") + 1]
+    for linha in completo.splitlines():
+        if linha.strip():
+            try:
+                evento = serializacao.decodificar(linha)
+            except ValueError as e:
+                raise DadosCorrompidos(f"{Cores.VERMELHO}{ARQUIVO_JOURNAL} tem uma linha corrompida ({e}).{Cores.RESET}")
+            _leitura.externas.append((evento["tipo"], evento["dados"]))
+            eventos_pendentes += 1
+    _leitura.posicao = inicio + len(completo)
+    _leitura.assinatura = assinatura if len(completo) == len(novo) else None
+
+def _verificar_versoes(entidades: List):
+    """
+    Compare-and-swap: a versão de cada entidade precisa ser a última gravada no armazenamento.
+    Uma reserva nova também é recusada se outro processo gravou, no mesmo quarto, uma reserva ativa que se sobrepõe a ela.
+    """
+    if _leitura.recarregar:
+        raise ConflitoVersao(f"{Cores.VERMELHO}Os dados foram compactados por outro processo; recarregue e tente novamente.{Cores.RESET}")
+    if not _leitura.externas:
+        return
+
+    chaves = {"quarto": "numero", "hospede": "documento", "reserva": "id"}
+    versoes = {(tipo, dados[chaves[tipo]]): dados.get("versao", 0) for tipo, dados in _leitura.externas}
+    reservas_externas = [dados for tipo, dados in _leitura.externas if tipo == "reserva"]
+
+    for e in entidades:
+        tipo = _tipo_entidade(e)
+        chave = getattr(e, chaves[tipo])
+        gravada = versoes.get((tipo, chave))
+        if gravada is not None and gravada != e.versao:
+            raise ConflitoVersao(f"{Cores.VERMELHO}{tipo.capitalize()} {chave} foi alterado por outro processo (versão {gravada}, esperada {e.versao}).{Cores.RESET}")
+
+        if tipo == "reserva" and e.versao == 0 and e.status not in STATUS_LIBERADOS:
+            entrada, saida = e.data_entrada.isoformat(), e.data_saida.isoformat()
+            for dados in reservas_externas:
+                if (dados["quarto_numero"] == e.quarto.numero and dados["id"] != e.id
+                        and dados["status"] not in STATUS_LIBERADOS
+                        and dados["data_entrada"] < saida and dados["data_saida"] > entrada):
+                    raise ConflitoVersao(f"{Cores.VERMELHO}O Quarto {e.quarto.numero} foi reservado por outro processo neste período.{Cores.RESET}")
+
+def _anexar_ao_journal(linhas: List[bytes]):
+    """
+    Acrescenta as linhas ao journal (com a trava já obtida), com um único fsync para todas elas.
+    Um journal novo recebe o cabeçalho de geração (a do último snapshot, se houver);
+    um resto de linha incompleta deixado por uma queda é descartado antes, para não ficar no meio do arquivo.
+    """
+    with open(ARQUIVO_JOURNAL, "ab") as f:
+        if f.tell() == 0:
+            manifesto = _ler_manifesto()
+            _leitura.geracao = manifesto["geracao"] if manifesto else uuid4().hex
+            f.write((json.dumps({"geracao": _leitura.geracao}) + "\n").encode("utf-8"))
+        elif f.tell() > _leitura.posicao and _leitura.assinatura is None:
+            f.truncate(_leitura.posicao)
+        f.write(b"".join(linhas))
+        _descarregar(f)
+        _leitura.posicao = f.tell()
+    _leitura.assinatura = _assinatura_journal()
+
+def _novo_journal(geracao: str):
+    """
+    Troca o journal por um vazio, só com o cabeçalho da geração do snapshot que acabou de ser confirmado.
+    """
+    temporario = ARQUIVO_JOURNAL + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"geracao": geracao}) + "\n")
+        _descarregar(f)
+    os.replace(temporario, ARQUIVO_JOURNAL)
+    _leitura.reiniciar(geracao, os.path.getsize(ARQUIVO_JOURNAL), _assinatura_journal())
+
+def _marcar_journal_lido():
+    """
+    Registra que o journal inteiro (até a última linha completa) já está refletido na memória deste processo.
+    """
+    assinatura = _assinatura_journal()
+    if assinatura is None:
+        _leitura.reiniciar(None, 0, None)
+        return
+
+    with open(ARQUIVO_JOURNAL, "rb") as f:
+        geracao = _geracao(f.readline())
+        conteudo = f.read()
+        posicao = f.tell()
+    if conteudo and not conteudo.endswith(b"\n"):
+        _leitura.reiniciar(geracao, posicao - len(conteudo) + conteudo.rfind(b"\n") + 1, None)
+    else:
+        _leitura.reiniciar(geracao, posicao, assinatura)
+
+def _ler_journal() -> List[dict]:
+    """
+    Lê os eventos do journal (sem o cabeçalho de geração). Uma última linha incompleta (queda durante a escrita) é descartada.
+    """
+    if not os.path.exists(ARQUIVO_JOURNAL):
         return []
 
+    with open(ARQUIVO_JOURNAL, "r", encoding="utf-8") as f:
+        linhas = f.read().splitlines()
+
+    eventos = []
+    for i, linha in enumerate(linhas):
+        if not linha.strip():
+            continue
+        try:
+            evento = serializacao.decodificar(linha)
+        except ValueError as e:
+            if i == len(linhas) - 1:
+                print(f"{Cores.AMARELO}Aviso: última linha do journal incompleta foi ignorada.{Cores.RESET}")
+                continue
+            raise DadosCorrompidos(f"{Cores.VERMELHO}{ARQUIVO_JOURNAL}, linha {i + 1}, está corrompida ({e}). "
+                                   f"Restaure um backup antes de iniciar o sistema.{Cores.RESET}")
+        if "tipo" in evento:
+            eventos.append(evento)
+    return eventos
+
+def _aplicar_journal(dados_quartos: List[dict], dados_hospedes: List[dict], eventos: List[dict]):
+    """
+    Reaplica os eventos de quartos e hóspedes do journal sobre os dicionários do snapshot,
+    substituindo cada entidade pela versão mais nova.
+    """
+    chaves = {"quarto": "numero", "hospede": "documento"}
+    listas = {"quarto": dados_quartos, "hospede": dados_hospedes}
+    posicoes = {
+        tipo: {d[chave]: i for i, d in enumerate(listas[tipo])}
+        for tipo, chave in chaves.items()
+    }
+
+    for evento in eventos:
+        tipo = evento["tipo"]
+        if tipo not in chaves:
+            continue
+        dados = evento["dados"]
+        chave = dados[chaves[tipo]]
+        pos = posicoes[tipo].get(chave)
+        if pos is None:
+            posicoes[tipo][chave] = len(listas[tipo])
+            listas[tipo].append(dados)
+        else:
+            listas[tipo][pos] = dados
+
+def _reservas_do_journal(eventos: List[dict]) -> Dict[str, dict]:
+    """
+    Retorna a versão mais nova de cada reserva presente no journal, pelo id.
+    """
+    return {e["dados"]["id"]: e["dados"] for e in eventos if e["tipo"] == "reserva"}
+
+def _sobrepor_journal(dados_reservas: Iterable[dict], reservas_journal: Dict[str, dict]) -> Iterator[dict]:
+    """
+    Percorre as reservas do snapshot trocando cada uma pela versão do journal, quando houver,
+    e acrescenta ao final as reservas que só existem no journal.
+    """
+    pendentes = dict(reservas_journal)
+    for i, dado in enumerate(dados_reservas):
+        # Reservas gravadas antes da existência de ids recebem um id estável pela posição no arquivo:
+        dado.setdefault("id", f"legado-{i}")
+        yield pendentes.pop(dado["id"], dado)
+    yield from pendentes.values()
+
 
 # FUNÇÃO PARA SALVAR TUDO
 
 def salvar_dados(quartos: List[Quarto], hospedes: List[Hospede], reservas: List[Reserva]):
     """
-    Recebe as listas de objetos da memória e salva nos arquivos JSON.
+    Recebe as listas de objetos da memória, grava um snapshot completo nos arquivos JSON
+    e começa um journal vazio (nova geração), já que o anterior passa a ser redundante.
+
+    Os três arquivos são escritos em temporários e publicados juntos por _confirmar_snapshot:
+    uma queda no meio deixa o snapshot anterior (ou o novo) inteiro, nunca um arquivo truncado.
+    Tudo acontece sob a trava do armazenamento; quem chama deve ter aplicado antes as alterações externas.
     """
-    quartos_dicts = [q.to_dict() for q in quartos]
-    _salvar_arquivo(ARQUIVO_QUARTOS, quartos_dicts)
+    global eventos_pendentes
+    with travar_armazenamento():
+        resumos = {}
+        quartos_dicts = [q.to_dict() for q in quartos]
+        resumos[ARQUIVO_QUARTOS] = _salvar_arquivo(ARQUIVO_QUARTOS, quartos_dicts)
+
+        hospedes_dicts = [h.to_dict() for h in hospedes]
+        resumos[ARQUIVO_HOSPEDES] = _salvar_arquivo(ARQUIVO_HOSPEDES, hospedes_dicts)
 
-    hospedes_dicts = [h.to_dict() for h in hospedes]
-    _salvar_arquivo(ARQUIVO_HOSPEDES, hospedes_dicts)
+        if historico_em_disco:
+            resumos[ARQUIVO_RESERVAS] = _salvar_arquivo_em_fluxo(ARQUIVO_RESERVAS, _mesclar_historico(reservas))
+        else:
+            reservas_dicts = [r.to_dict() for r in reservas]
+            ids_em_memoria = {d["id"] for d in reservas_dicts}
+            reservas_dicts.extend(d for d in reservas_orfas if d["id"] not in ids_em_memoria)
+            resumos[ARQUIVO_RESERVAS] = _salvar_arquivo(ARQUIVO_RESERVAS, reservas_dicts)
 
-    reservas_dicts = [r.to_dict() for r in reservas]
-    _salvar_arquivo(ARQUIVO_RESERVAS, reservas_dicts)
+        _confirmar_snapshot(resumos)
+        eventos_pendentes = 0
 
     print(f"{Cores.VERDE}Dados salvos com sucesso!{Cores.RESET}")
 
+def _mesclar_historico(reservas: List[Reserva]) -> Iterator[dict]:
+    """
+    Gera as reservas da memória seguidas das que só existem no disco (histórico não carregado).
+    """
+    ids_em_memoria = set()
+    for r in reservas:
+        ids_em_memoria.add(r.id)
+        yield r.to_dict()
+
+    reservas_journal = _reservas_do_journal(_ler_journal())
+    for dado in _sobrepor_journal(_iterar_arquivo(ARQUIVO_RESERVAS), reservas_journal):
+        if dado["id"] not in ids_em_memoria:
+            yield dado
+
 
 # FUNÇÃO PARA CARREGAR TUDO
 
-def carregar_dados() -> Tuple[List[Quarto], List[Hospede], List[Reserva]]:
+def carregar_dados(lazy: bool = False) -> Tuple[List[Quarto], List[Hospede], List[Reserva]]:
     """
-    Lê os arquivos JSON, reconstrói os objetos e restaura os relacionamentos.
+    Lê o snapshot JSON, reaplica o journal, reconstrói os objetos e restaura os relacionamentos.
+    No modo lazy, só as reservas ativas (PENDENTE/CONFIRMADA/CHECKIN) vão para a memória;
+    o histórico é lido sob demanda por iterar_historico.
     """
+    global eventos_pendentes, historico_em_disco
     print("Carregando dados do disco...")
-    sleep(3)
 
-    dados_quartos = _carregar_arquivo(ARQUIVO_QUARTOS)
-    lista_quartos = [Quarto.from_dict(d) for d in dados_quartos]
+    with travar_armazenamento():
+        geracao = _verificar_snapshot()
+        if geracao is not None and _geracao_do_journal() != geracao:
+            # Journal anterior ao último snapshot (queda durante a compactação): tudo nele já está no snapshot.
+            _novo_journal(geracao)
+
+        dados_quartos = _carregar_arquivo(ARQUIVO_QUARTOS, "quartos")
+        dados_hospedes = _carregar_arquivo(ARQUIVO_HOSPEDES, "hospedes")
+
+        eventos = _ler_journal()
+        _marcar_journal_lido()
+        _aplicar_journal(dados_quartos, dados_hospedes, eventos)
+        eventos_pendentes = len(eventos)
+
+        if lazy:
+            fonte_reservas = _iterar_arquivo(ARQUIVO_RESERVAS)
+        else:
+            fonte_reservas = _carregar_arquivo(ARQUIVO_RESERVAS, "reservas")
+
+        dados_reservas = [
+            d for d in _sobrepor_journal(fonte_reservas, _reservas_do_journal(eventos))
+            if not lazy or d["status"] in STATUS_ATIVOS
+        ]
+        historico_em_disco = lazy
 
-    dados_hospedes = _carregar_arquivo(ARQUIVO_HOSPEDES)
+    lista_quartos = [Quarto.from_dict(d) for d in dados_quartos]
     lista_hospedes = [Hospede.from_dict(d) for d in dados_hospedes]
+    lista_reservas, orfas = _reconstruir_reservas(dados_reservas, lista_quartos, lista_hospedes)
+
+    reservas_orfas[:] = orfas
+    if orfas:
+        print(f"{Cores.AMARELO}Aviso: {len(orfas)} reserva(s) referenciam hóspede ou quarto inexistente e foram mantidas à parte:{Cores.RESET}")
+        for dado in orfas:
+            print(f"   • Reserva {dado['id']}: hóspede {dado['hospede_documento']} / quarto {dado['quarto_numero']}")
+
+    return lista_quartos, lista_hospedes, lista_reservas
+
+def iterar_historico(quartos: List[Quarto], hospedes: List[Hospede], documento: Optional[str] = None,
+                     data_inicio: Optional[date] = None, data_fim: Optional[date] = None,
+                     status: Optional[Iterable[str]] = None) -> Iterator[Reserva]:
+    """
+    Lê do disco, em fluxo, as reservas encerradas (fora de STATUS_ATIVOS), opcionalmente de um único hóspede,
+    com data de entrada em [data_inicio, data_fim) e com um dos status pedidos.
+    Os filtros são aplicados sobre os dicionários, antes de montar os objetos.
+    As reservas geradas não são anexadas ao histórico do hóspede, para não crescer a memória.
+
+    O journal já lido fica em cache, e a consulta de um hóspede lê do snapshot só as reservas dele,
+    pelas posições indexadas na primeira consulta a cada snapshot.
+    """
+    quartos_por_numero = {q.numero: q for q in quartos}
+    hospedes_por_documento = {h.documento: h for h in hospedes}
+    reservas_journal = _reservas_do_journal_em_cache()
+
+    # Datas ISO podem ser comparadas como texto:
+    inicio_iso = data_inicio.isoformat() if data_inicio else None
+    fim_iso = data_fim.isoformat() if data_fim else None
+    status_aceitos = set(status) if status is not None else None
+
+    if documento is None:
+        fonte = _sobrepor_journal(_iterar_arquivo(ARQUIVO_RESERVAS), reservas_journal)
+    else:
+        fonte = _historico_do_documento(documento, reservas_journal)
+
+    for dado in fonte:
+        if dado["status"] in STATUS_ATIVOS:
+            continue
+        if documento is not None and dado["hospede_documento"] != documento:
+            continue
+        if inicio_iso is not None and dado["data_entrada"] < inicio_iso:
+            continue
+        if fim_iso is not None and dado["data_entrada"] >= fim_iso:
+            continue
+        if status_aceitos is not None and dado["status"] not in status_aceitos:
+            continue
+        reserva = _reserva_de_dicionario(dado, quartos_por_numero, hospedes_por_documento)
+        if reserva is not None:
+            yield reserva
+
+def _historico_do_documento(documento: str, reservas_journal: Dict[str, dict]) -> Iterator[dict]:
+    """
+    Mesmo resultado de _sobrepor_journal restrito a um hóspede, lendo do snapshot só os trechos das reservas dele.
+    """
+    pendentes = {id_: d for id_, d in reservas_journal.items() if d["hospede_documento"] == documento}
+    if os.path.exists(ARQUIVO_RESERVAS):
+        with open(ARQUIVO_RESERVAS, "rb") as f:
+            posicoes = _posicoes_do_documento(f, documento)
+            for i in range(0, len(posicoes), 3):
+                ordem, inicio, fim = posicoes[i:i + 3]
+                f.seek(inicio)
+                dado = serializacao.decodificar(f.read(fim - inicio))
+                dado.setdefault("id", f"legado-{ordem}")
+                yield pendentes.pop(dado["id"], dado)
+    yield from pendentes.values()
+
+def _posicoes_do_documento(f, documento: str) -> array:
+    """
+    Posições das reservas do hóspede no snapshot aberto em `f`, indexando o arquivo inteiro se ele mudou.
+    """
+    st = os.fstat(f.fileno())
+    assinatura = (ARQUIVO_RESERVAS, st.st_ino, st.st_size, st.st_mtime_ns)
+    with _trava_cache_historico:
+        if _cache_historico.snapshot_assinatura != assinatura:
+            por_documento: Dict[str, array] = {}
+            for ordem, (dado, inicio, fim) in enumerate(_itens_da_lista(f, ARQUIVO_RESERVAS, posicoes=True)):
+                por_documento.setdefault(dado["hospede_documento"], array("q")).extend((ordem, inicio, fim))
+            _cache_historico.posicoes_por_documento = por_documento
+            _cache_historico.snapshot_assinatura = assinatura
+        return _cache_historico.posicoes_por_documento.get(documento, array("q"))
+
+def _reservas_do_journal_em_cache() -> Dict[str, dict]:
+    """
+    Versão mais nova de cada reserva do journal, como _reservas_do_journal(_ler_journal()),
+    lendo só as linhas acrescentadas desde a última chamada enquanto a geração do journal não muda.
+    O dicionário devolvido nunca é alterado depois (cada atualização monta outro), e pode ser lido sem trava.
+    """
+    with _trava_cache_historico:
+        return _atualizar_reservas_do_journal(_cache_historico)
+
+def _atualizar_reservas_do_journal(cache: _CacheHistorico) -> Dict[str, dict]:
+    assinatura = _assinatura_journal()
+    if cache.journal_caminho == ARQUIVO_JOURNAL and cache.journal_assinatura == assinatura:
+        return cache.reservas_journal
+    if assinatura is None:
+        cache.journal_caminho, cache.journal_assinatura, cache.journal_geracao = ARQUIVO_JOURNAL, None, None
+        cache.journal_posicao, cache.reservas_journal = 0, {}
+        return cache.reservas_journal
+
+    with open(ARQUIVO_JOURNAL, "rb") as f:
+        primeira = f.readline()
+        geracao = _geracao(primeira)
+        reservas = dict(cache.reservas_journal)
+        if cache.journal_caminho != ARQUIVO_JOURNAL or geracao != cache.journal_geracao or assinatura[1] < cache.journal_posicao:
+            # Journal novo (snapshot) ou de outra pasta: lê desde o começo.
+            reservas = {}
+            cache.journal_posicao = len(primeira) if geracao else 0
+        f.seek(cache.journal_posicao)
+        novo = f.read()
+
+    # Uma linha sem o "\n" final ainda está sendo escrita e fica para a próxima leitura:
+    completo = novo[:novo.rfind(b"\n") + 1]
+    for linha in completo.splitlines():
+        if not linha.strip():
+            continue
+        try:
+            evento = serializacao.decodificar(linha)
+        except ValueError as e:
+            raise DadosCorrompidos(f"{Cores.VERMELHO}{ARQUIVO_JOURNAL} tem uma linha corrompida ({e}).{Cores.RESET}")
+        if evento.get("tipo") == "reserva":
+            reservas[evento["dados"]["id"]] = evento["dados"]
+
+    cache.reservas_journal = reservas
+    cache.journal_caminho = ARQUIVO_JOURNAL
+    cache.journal_geracao = geracao
+    cache.journal_posicao += len(completo)
+    cache.journal_assinatura = assinatura if len(completo) == len(novo) else None
+    return cache.reservas_journal
+
+def _reconstruir_reservas(dados_reservas: List[dict], quartos: List[Quarto], hospedes: List[Hospede]) -> Tuple[List[Reserva], List[dict]]:
+    """
+    Recria os objetos Reserva ligando hóspede e quarto por dicionários montados uma única vez.
+    Retorna as reservas reconstruídas e os dicionários das reservas órfãs.
+    """
+    quartos_por_numero = {q.numero: q for q in quartos}
+    hospedes_por_documento = {h.documento: h for h in hospedes}
 
-    dados_reservas = _carregar_arquivo(ARQUIVO_RESERVAS)
     lista_reservas = []
+    orfas = []
 
     for dado in dados_reservas:
-        hospede_obj = next((h for h in lista_hospedes if h.documento == dado["hospede_documento"]), None)
-        
-        quarto_obj = next((q for q in lista_quartos if q.numero == dado["quarto_numero"]), None)
-
-        if hospede_obj and quarto_obj:
-            
-            dt_entrada = datetime.fromisoformat(dado["data_entrada"]).date()
-            dt_saida = datetime.fromisoformat(dado["data_saida"]).date()
-
-            reserva = Reserva(
-                hospede = hospede_obj,
-                quarto = quarto_obj,
-                data_entrada = dt_entrada,
-                data_saida = dt_saida,
-                num_hospedes = dado["num_hospedes"],
-                status = dado["status"]
-            )
-
-            reserva.pagamentos = [Pagamento.from_dict(p) for p in dado["pagamentos"]]
-            reserva.adicionais = [Adicional.from_dict(a) for a in dado["adicionais"]]
-
-            hospede_obj.historico_reservas.append(reserva)
-            
-            lista_reservas.append(reserva)
-
-    return lista_quartos, lista_hospedes, lista_reservas
\ No newline at end of file
+        reserva = _reserva_de_dicionario(dado, quartos_por_numero, hospedes_por_documento)
+        if reserva is None:
+            orfas.append(dado)
+            continue
+
+        reserva.hospede.historico_reservas.append(reserva)
+        lista_reservas.append(reserva)
+
+    return lista_reservas, orfas
+
+def _reserva_de_dicionario(dado: dict, quartos_por_numero: Dict[int, Quarto], hospedes_por_documento: Dict[str, Hospede]) -> Optional[Reserva]:
+    """
+    Cria uma Reserva a partir do dicionário salvo. Retorna None se o hóspede ou o quarto não existir.
+    """
+    hospede_obj = hospedes_por_documento.get(dado["hospede_documento"])
+    quarto_obj = quartos_por_numero.get(dado["quarto_numero"])
+
+    if hospede_obj is None or quarto_obj is None:
+        return None
+
+    return Reserva.from_dict(dado, hospede_obj, quarto_obj)
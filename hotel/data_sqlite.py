@@ -0,0 +1,378 @@
+"""
+Backend de persistência em SQLite, alternativo aos arquivos JSON do módulo data.
+"""
+
+from hotel.models import Hospede, Quarto, Pagamento, Adicional, Reserva, ConflitoVersao, STATUS_ATIVOS, STATUS_LIBERADOS
+from hotel.config import Cores
+from hotel.armazenamento import Armazenamento
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import sqlite3
+
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS quartos (
+    numero      INTEGER PRIMARY KEY,
+    tipo        TEXT    NOT NULL,
+    capacidade  INTEGER NOT NULL,
+    tarifa_base REAL    NOT NULL,
+    status      TEXT    NOT NULL,
+    versao      INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS bloqueios (
+    quarto_numero INTEGER NOT NULL REFERENCES quartos (numero),
+    seq           INTEGER NOT NULL,
+    inicio        TEXT    NOT NULL,
+    fim           TEXT    NOT NULL,
+    motivo        TEXT    NOT NULL,
+    PRIMARY KEY (quarto_numero, seq)
+);
+
+CREATE TABLE IF NOT EXISTS hospedes (
+    documento TEXT PRIMARY KEY,
+    nome      TEXT NOT NULL,
+    email     TEXT NOT NULL,
+    telefone  TEXT NOT NULL,
+    versao    INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS reservas (
+    id                TEXT    PRIMARY KEY,
+    hospede_documento TEXT    NOT NULL REFERENCES hospedes (documento),
+    quarto_numero     INTEGER NOT NULL REFERENCES quartos (numero),
+    data_entrada      TEXT    NOT NULL,
+    data_saida        TEXT    NOT NULL,
+    num_hospedes      INTEGER NOT NULL,
+    status            TEXT    NOT NULL,
+    versao            INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_reservas_quarto_periodo ON reservas (quarto_numero, data_entrada, data_saida);
+CREATE INDEX IF NOT EXISTS idx_reservas_hospede_quarto ON reservas (hospede_documento, quarto_numero);
+CREATE INDEX IF NOT EXISTS idx_reservas_status ON reservas (status, data_entrada);
+CREATE INDEX IF NOT EXISTS idx_reservas_entrada ON reservas (data_entrada);
+
+CREATE TABLE IF NOT EXISTS pagamentos (
+    reserva_id TEXT    NOT NULL REFERENCES reservas (id),
+    seq        INTEGER NOT NULL,
+    valor      REAL    NOT NULL,
+    forma      TEXT    NOT NULL,
+    data       TEXT    NOT NULL,
+    PRIMARY KEY (reserva_id, seq)
+);
+
+CREATE TABLE IF NOT EXISTS adicionais (
+    reserva_id TEXT    NOT NULL REFERENCES reservas (id),
+    seq        INTEGER NOT NULL,
+    descricao  TEXT    NOT NULL,
+    valor      REAL    NOT NULL,
+    PRIMARY KEY (reserva_id, seq)
+);
+"""
+
+# Reservas carregadas na memória no modo lazy (models.STATUS_ATIVOS):
+FILTRO_ATIVAS = "status IN (" + ", ".join(f"'{status}'" for status in STATUS_ATIVOS) + ")"
+
+# Tabela e coluna da chave de cada entidade versionada:
+TABELAS_VERSIONADAS = {Quarto: ("quartos", "numero"), Hospede: ("hospedes", "documento"), Reserva: ("reservas", "id")}
+
+# Reservas do histórico lidas por vez (cada lote busca seus pagamentos e adicionais em uma consulta):
+LOTE_HISTORICO = 500
+
+
+class ArmazenamentoSQLite(Armazenamento):
+    """
+    Guarda cada entidade em uma tabela indexada. Cada alteração vira um UPSERT de linha única,
+    executado dentro de uma transação, condicionado à versão da linha (compare-and-swap):
+    vários processos podem usar o mesmo banco, e o SQLite serializa as transações de escrita.
+    """
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        # A conexão pode ser usada por várias threads; services serializa as gravações:
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self._conexao.execute("PRAGMA foreign_keys = ON")
+        self._conexao.execute("PRAGMA journal_mode = WAL")
+        self._conexao.executescript(ESQUEMA)
+        self._migrar()
+
+    def _migrar(self):
+        """
+        Acrescenta a coluna versao às tabelas criadas antes do controle de versões.
+        """
+        for tabela, _ in TABELAS_VERSIONADAS.values():
+            colunas = {linha[1] for linha in self._conexao.execute(f"PRAGMA table_info ({tabela})")}
+            if "versao" not in colunas:
+                with self._conexao:
+                    self._conexao.execute(f"ALTER TABLE {tabela} ADD COLUMN versao INTEGER NOT NULL DEFAULT 0")
+
+    def fechar(self):
+        self._conexao.close()
+
+    # LEITURA:
+
+    def carregar(self, lazy: bool = False) -> Tuple[List[Quarto], List[Hospede], List[Reserva]]:
+        cursor = self._conexao.cursor()
+
+        lista_quartos = []
+        for numero, tipo, capacidade, tarifa_base, status, versao in cursor.execute(
+            "SELECT numero, tipo, capacidade, tarifa_base, status, versao FROM quartos ORDER BY rowid"
+        ):
+            quarto = Quarto(numero, tipo, capacidade, tarifa_base, status)
+            quarto.versao = versao
+            lista_quartos.append(quarto)
+        quartos = {q.numero: q for q in lista_quartos}
+        for numero, inicio, fim, motivo in cursor.execute(
+            "SELECT quarto_numero, inicio, fim, motivo FROM bloqueios ORDER BY quarto_numero, seq"
+        ):
+            quartos[numero].bloqueios.append((date.fromisoformat(inicio), date.fromisoformat(fim), motivo))
+
+        lista_hospedes = []
+        for documento, nome, email, telefone, versao in cursor.execute(
+            "SELECT documento, nome, email, telefone, versao FROM hospedes ORDER BY rowid"
+        ):
+            hospede = Hospede(nome, documento, email, telefone)
+            hospede.versao = versao
+            lista_hospedes.append(hospede)
+
+        hospedes = {h.documento: h for h in lista_hospedes}
+        filtro = f"WHERE {FILTRO_ATIVAS}" if lazy else ""
+        das_reservas = f"reserva_id IN (SELECT id FROM reservas {filtro})"
+        pagamentos = self._agrupar_pagamentos(das_reservas)
+        adicionais = self._agrupar_adicionais(das_reservas)
+
+        lista_reservas = []
+        for linha in cursor.execute(
+            "SELECT id, hospede_documento, quarto_numero, data_entrada, data_saida, num_hospedes, status, versao "
+            f"FROM reservas {filtro} ORDER BY rowid"
+        ):
+            reserva = self._montar_reserva(linha, hospedes, quartos)
+            reserva.pagamentos = pagamentos.get(reserva.id, [])
+            reserva.adicionais = adicionais.get(reserva.id, [])
+            reserva.hospede.historico_reservas.append(reserva)
+            lista_reservas.append(reserva)
+
+        return lista_quartos, lista_hospedes, lista_reservas
+
+    def iterar_historico(self, quartos: List[Quarto], hospedes: List[Hospede], documento: Optional[str] = None,
+                         data_inicio: Optional[date] = None, data_fim: Optional[date] = None,
+                         status: Optional[Iterable[str]] = None) -> Iterator[Reserva]:
+        quartos_por_numero = {q.numero: q for q in quartos}
+        hospedes_por_documento = {h.documento: h for h in hospedes}
+
+        # Os filtros viram condições do WHERE e usam os índices de reservas:
+        sql = (
+            "SELECT id, hospede_documento, quarto_numero, data_entrada, data_saida, num_hospedes, status, versao "
+            f"FROM reservas WHERE NOT {FILTRO_ATIVAS}"
+        )
+        parametros: list = []
+        if documento is not None:
+            sql += " AND hospede_documento = ?"
+            parametros.append(documento)
+        if data_inicio is not None:
+            sql += " AND data_entrada >= ?"
+            parametros.append(data_inicio.isoformat())
+        if data_fim is not None:
+            sql += " AND data_entrada < ?"
+            parametros.append(data_fim.isoformat())
+        if status is not None:
+            status = list(status)
+            sql += f" AND status IN ({', '.join('?' for _ in status)})"
+            parametros.extend(status)
+
+        # Cursor próprio: as linhas são lidas em lotes, e os pagamentos e adicionais de cada lote
+        # vêm em uma consulta só (por id da reserva), em vez de duas consultas por reserva.
+        cursor = self._conexao.cursor()
+        cursor.execute(sql + " ORDER BY rowid", tuple(parametros))
+        while True:
+            linhas = cursor.fetchmany(LOTE_HISTORICO)
+            if not linhas:
+                break
+            ids = tuple(linha[0] for linha in linhas)
+            condicao = f"reserva_id IN ({', '.join('?' for _ in ids)})"
+            pagamentos = self._agrupar_pagamentos(condicao, ids)
+            adicionais = self._agrupar_adicionais(condicao, ids)
+            for linha in linhas:
+                reserva = self._montar_reserva(linha, hospedes_por_documento, quartos_por_numero)
+                reserva.pagamentos = pagamentos.get(reserva.id, [])
+                reserva.adicionais = adicionais.get(reserva.id, [])
+                yield reserva
+
+    def _montar_reserva(self, linha: tuple, hospedes: Dict[str, Hospede], quartos: Dict[int, Quarto]) -> Reserva:
+        """
+        Cria o objeto Reserva a partir de uma linha da tabela reservas.
+        """
+        id_reserva, documento, numero, entrada, saida, num_hospedes, status, versao = linha
+        reserva = Reserva(
+            hospede = hospedes[documento],
+            quarto = quartos[numero],
+            data_entrada = date.fromisoformat(entrada),
+            data_saida = date.fromisoformat(saida),
+            num_hospedes = num_hospedes,
+            status = status,
+            id = id_reserva
+        )
+        reserva.versao = versao
+        return reserva
+
+    def _agrupar_pagamentos(self, condicao: str, parametros: tuple = ()) -> Dict[str, List[Pagamento]]:
+        """
+        Lê os pagamentos que atendem à condição (sobre reserva_id), agrupados pelo id da reserva.
+        """
+        grupos: Dict[str, List[Pagamento]] = {}
+        for reserva_id, valor, forma, data_pagamento in self._conexao.execute(
+            f"SELECT reserva_id, valor, forma, data FROM pagamentos WHERE {condicao} ORDER BY reserva_id, seq", parametros
+        ):
+            grupos.setdefault(reserva_id, []).append(Pagamento(valor, forma, datetime.fromisoformat(data_pagamento)))
+        return grupos
+
+    def _agrupar_adicionais(self, condicao: str, parametros: tuple = ()) -> Dict[str, List[Adicional]]:
+        """
+        Lê os adicionais que atendem à condição (sobre reserva_id), agrupados pelo id da reserva.
+        """
+        grupos: Dict[str, List[Adicional]] = {}
+        for reserva_id, descricao, valor in self._conexao.execute(
+            f"SELECT reserva_id, descricao, valor FROM adicionais WHERE {condicao} ORDER BY reserva_id, seq", parametros
+        ):
+            grupos.setdefault(reserva_id, []).append(Adicional(descricao, valor))
+        return grupos
+
+    # ESCRITA:
+
+    def salvar_tudo(self, quartos: List[Quarto], hospedes: List[Hospede], reservas: List[Reserva]):
+        """
+        Grava todas as entidades com o mesmo compare-and-swap de salvar_alteracoes, em uma transação:
+        um processo com a memória desatualizada recebe ConflitoVersao em vez de sobrescrever linhas mais novas.
+        """
+        self.salvar_alteracoes([*quartos, *hospedes, *reservas])
+
+    def salvar_alteracoes(self, entidades: Iterable) -> int:
+        entidades = list(entidades)
+        with self._conexao:
+            for e in entidades:
+                if isinstance(e, Quarto):
+                    self._trocar_versao(e)
+                    self._upsert_quarto(e, e.versao + 1)
+                elif isinstance(e, Hospede):
+                    self._trocar_versao(e)
+                    self._upsert_hospede(e, e.versao + 1)
+                elif isinstance(e, Reserva):
+                    if not self._trocar_versao(e) and e.status not in STATUS_LIBERADOS:
+                        self._verificar_sobreposicao(e)
+                    self._upsert_reserva(e, e.versao + 1)
+                else:
+                    raise TypeError(f"Entidade não suportada: {type(e).__name__}")
+
+        for e in entidades:
+            e.versao += 1
+        return 0
+
+    def _trocar_versao(self, entidade) -> bool:
+        """
+        Compare-and-swap da linha da entidade: sobe a versão se a gravada ainda for a da memória.
+        Retorna False se a linha ainda não existe; lança ConflitoVersao se outro processo gravou uma versão mais nova.
+        """
+        tabela, coluna = next(nomes for classe, nomes in TABELAS_VERSIONADAS.items() if isinstance(entidade, classe))
+        chave = getattr(entidade, coluna)
+        cursor = self._conexao.execute(
+            f"UPDATE {tabela} SET versao = ? WHERE {coluna} = ? AND versao = ?", (entidade.versao + 1, chave, entidade.versao)
+        )
+        if cursor.rowcount:
+            return True
+
+        gravada = self._conexao.execute(f"SELECT versao FROM {tabela} WHERE {coluna} = ?", (chave,)).fetchone()
+        if gravada is None:
+            return False
+        raise ConflitoVersao(f"{Cores.VERMELHO}{chave} ({tabela}) foi alterado por outro processo (versão {gravada[0]}, esperada {entidade.versao}).{Cores.RESET}")
+
+    def _verificar_sobreposicao(self, reserva: Reserva):
+        """
+        Uma reserva nova não pode se sobrepor a outra reserva ativa do quarto gravada por outro processo.
+        """
+        if not self.quarto_disponivel(reserva.quarto.numero, reserva.data_entrada, reserva.data_saida, ignorar_id=reserva.id):
+            raise ConflitoVersao(f"{Cores.VERMELHO}O Quarto {reserva.quarto.numero} foi reservado por outro processo neste período.{Cores.RESET}")
+
+    def _upsert_quarto(self, quarto: Quarto, versao: int):
+        """
+        Insere ou atualiza a linha do quarto e sincroniza seus bloqueios pela posição na lista.
+        """
+        self._conexao.execute(
+            "INSERT INTO quartos (numero, tipo, capacidade, tarifa_base, status, versao) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (numero) DO UPDATE SET tipo = excluded.tipo, capacidade = excluded.capacidade, "
+            "tarifa_base = excluded.tarifa_base, status = excluded.status, versao = excluded.versao",
+            (quarto.numero, quarto.tipo, quarto.capacidade, quarto.tarifa_base, quarto.status, versao)
+        )
+
+        self._conexao.executemany(
+            "INSERT INTO bloqueios (quarto_numero, seq, inicio, fim, motivo) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (quarto_numero, seq) DO UPDATE SET inicio = excluded.inicio, fim = excluded.fim, motivo = excluded.motivo",
+            [(quarto.numero, i, inicio.isoformat(), fim.isoformat(), motivo) for i, (inicio, fim, motivo) in enumerate(quarto.bloqueios)]
+        )
+        self._conexao.execute("DELETE FROM bloqueios WHERE quarto_numero = ? AND seq >= ?", (quarto.numero, len(quarto.bloqueios)))
+
+    def _upsert_hospede(self, hospede: Hospede, versao: int):
+        """
+        Insere ou atualiza a linha do hóspede.
+        """
+        self._conexao.execute(
+            "INSERT INTO hospedes (documento, nome, email, telefone, versao) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (documento) DO UPDATE SET nome = excluded.nome, email = excluded.email, "
+            "telefone = excluded.telefone, versao = excluded.versao",
+            (hospede.documento, hospede.nome, hospede.email, hospede.telefone, versao)
+        )
+
+    def _upsert_reserva(self, reserva: Reserva, versao: int):
+        """
+        Grava a linha da reserva e sincroniza seus pagamentos e adicionais pela posição na lista.
+        """
+        self._conexao.execute(
+            "INSERT INTO reservas (id, hospede_documento, quarto_numero, data_entrada, data_saida, num_hospedes, status, versao) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET hospede_documento = excluded.hospede_documento, "
+            "quarto_numero = excluded.quarto_numero, data_entrada = excluded.data_entrada, "
+            "data_saida = excluded.data_saida, num_hospedes = excluded.num_hospedes, status = excluded.status, "
+            "versao = excluded.versao",
+            (reserva.id, reserva.hospede.documento, reserva.quarto.numero, reserva.data_entrada.isoformat(),
+             reserva.data_saida.isoformat(), reserva.num_hospedes, reserva.status, versao)
+        )
+
+        self._conexao.executemany(
+            "INSERT INTO pagamentos (reserva_id, seq, valor, forma, data) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (reserva_id, seq) DO UPDATE SET valor = excluded.valor, forma = excluded.forma, data = excluded.data",
+            [(reserva.id, i, p.valor, p.forma, p.data.isoformat()) for i, p in enumerate(reserva.pagamentos)]
+        )
+        self._conexao.execute("DELETE FROM pagamentos WHERE reserva_id = ? AND seq >= ?", (reserva.id, len(reserva.pagamentos)))
+
+        self._conexao.executemany(
+            "INSERT INTO adicionais (reserva_id, seq, descricao, valor) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (reserva_id, seq) DO UPDATE SET descricao = excluded.descricao, valor = excluded.valor",
+            [(reserva.id, i, a.descricao, a.valor) for i, a in enumerate(reserva.adicionais)]
+        )
+        self._conexao.execute("DELETE FROM adicionais WHERE reserva_id = ? AND seq >= ?", (reserva.id, len(reserva.adicionais)))
+
+    # CONSULTAS DIRETAS NO BANCO:
+
+    def quarto_disponivel(self, numero_quarto: int, data_inicio: date, data_fim: date, ignorar_id: Optional[str] = None) -> bool:
+        """
+        Verifica pelo índice (quarto, período) se existe estadia conflitante com [data_inicio, data_fim),
+        desconsiderando a reserva ignorar_id.
+        """
+        marcadores = ", ".join("?" for _ in STATUS_LIBERADOS)
+        conflito = self._conexao.execute(
+            f"SELECT 1 FROM reservas WHERE quarto_numero = ? AND data_entrada < ? AND data_saida > ? "
+            f"AND status NOT IN ({marcadores}) AND id IS NOT ? LIMIT 1",
+            (numero_quarto, data_fim.isoformat(), data_inicio.isoformat(), *STATUS_LIBERADOS, ignorar_id)
+        ).fetchone()
+        return conflito is None
+
+    def buscar_id_reserva(self, documento: str, numero_quarto: int) -> Optional[str]:
+        """
+        Retorna o id da reserva ativa mais antiga do hóspede no quarto ou, sem ativas, da mais recente.
+        """
+        linha = self._conexao.execute(
+            "SELECT id FROM reservas WHERE hospede_documento = ? AND quarto_numero = ? "
+            f"ORDER BY {FILTRO_ATIVAS} DESC, CASE WHEN {FILTRO_ATIVAS} THEN rowid ELSE -rowid END "
+            "LIMIT 1",
+            (documento, numero_quarto)
+        ).fetchone()
+        return linha[0] if linha else None
@@ -0,0 +1,188 @@
+"""
+Exportação em fluxo das reservas e de suas contas (pagamentos e adicionais) para CSV, JSON Lines ou Parquet.
+Nenhum formato monta a lista completa de dicionários: cada reserva é escrita assim que é lida.
+"""
+
+import csv
+import json
+import os
+from contextlib import ExitStack
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional
+from .models import Reserva
+from .config import Cores
+from hotel import services
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+FORMATOS = ("csv", "jsonl", "parquet")
+
+# Colunas de cada tabela exportada em CSV e Parquet:
+COLUNAS_RESERVAS = ["id", "hospede_documento", "quarto_numero", "data_entrada", "data_saida",
+                    "num_hospedes", "status", "total", "total_pago"]
+COLUNAS_PAGAMENTOS = ["reserva_id", "seq", "valor", "forma", "data"]
+COLUNAS_ADICIONAIS = ["reserva_id", "seq", "descricao", "valor"]
+
+# Linhas acumuladas por grupo de linhas (row group) do Parquet:
+TAMANHO_LOTE_PARQUET = 10_000
+
+
+def exportar_reservas(caminho: str, formato: Optional[str] = None, data_inicio: Optional[date] = None,
+                      data_fim: Optional[date] = None, status: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """
+    Exporta as reservas com data de entrada em [data_inicio, data_fim) e status entre os pedidos.
+    O formato vem do parâmetro ou da extensão do arquivo.
+
+    - jsonl: uma linha por reserva, com pagamentos e adicionais aninhados;
+    - csv e parquet: o arquivo pedido recebe as reservas e dois arquivos irmãos
+      (<nome>_pagamentos e <nome>_adicionais) recebem as contas.
+
+    Retorna quantas linhas foram escritas em cada tabela.
+    """
+    formato = (formato or os.path.splitext(caminho)[1].lstrip(".")).lower()
+    if formato not in FORMATOS:
+        raise ValueError(f"{Cores.VERMELHO}Formato de exportação desconhecido: {formato} (use {', '.join(FORMATOS)}).{Cores.RESET}")
+
+    reservas = services.iterar_reservas(data_inicio, data_fim, status)
+
+    if formato == "jsonl":
+        return _exportar_jsonl(caminho, reservas)
+    if formato == "csv":
+        return _exportar_csv(caminho, reservas)
+    return _exportar_parquet(caminho, reservas)
+
+def caminhos_das_contas(caminho: str) -> Dict[str, str]:
+    """
+    Caminhos dos arquivos de pagamentos e adicionais que acompanham uma exportação CSV ou Parquet.
+    """
+    base, extensao = os.path.splitext(caminho)
+    return {
+        "pagamentos": f"{base}_pagamentos{extensao}",
+        "adicionais": f"{base}_adicionais{extensao}"
+    }
+
+
+# LINHAS:
+
+def resumo_reserva(reserva: Reserva) -> dict:
+    """
+    Dados da reserva com o total da conta e o total pago.
+    """
+    return {
+        "id": reserva.id,
+        "hospede_documento": reserva.hospede.documento,
+        "quarto_numero": reserva.quarto.numero,
+        "data_entrada": reserva.data_entrada.isoformat(),
+        "data_saida": reserva.data_saida.isoformat(),
+        "num_hospedes": reserva.num_hospedes,
+        "status": reserva.status,
+        "total": round(services.calcular_total_reserva(reserva), 2),
+        "total_pago": reserva.total_pago
+    }
+
+def _linhas_pagamentos(reserva: Reserva) -> Iterator[dict]:
+    for seq, p in enumerate(reserva.pagamentos):
+        yield {"reserva_id": reserva.id, "seq": seq, "valor": p.valor, "forma": p.forma, "data": p.data.isoformat()}
+
+def _linhas_adicionais(reserva: Reserva) -> Iterator[dict]:
+    for seq, a in enumerate(reserva.adicionais):
+        yield {"reserva_id": reserva.id, "seq": seq, "descricao": a.descricao, "valor": a.valor}
+
+
+# FORMATOS:
+
+def _exportar_jsonl(caminho: str, reservas: Iterator[Reserva]) -> Dict[str, int]:
+    contagem = {"reservas": 0, "pagamentos": 0, "adicionais": 0}
+    with open(caminho, "w", encoding="utf-8") as f:
+        for r in reservas:
+            linha = resumo_reserva(r)
+            linha["pagamentos"] = list(_linhas_pagamentos(r))
+            linha["adicionais"] = list(_linhas_adicionais(r))
+            f.write(json.dumps(linha, ensure_ascii=False) + "\n")
+
+            contagem["reservas"] += 1
+            contagem["pagamentos"] += len(linha["pagamentos"])
+            contagem["adicionais"] += len(linha["adicionais"])
+    return contagem
+
+def _exportar_csv(caminho: str, reservas: Iterator[Reserva]) -> Dict[str, int]:
+    contas = caminhos_das_contas(caminho)
+    contagem = {"reservas": 0, "pagamentos": 0, "adicionais": 0}
+
+    with ExitStack() as pilha:
+        escritores = {}
+        for tabela, destino, colunas in (("reservas", caminho, COLUNAS_RESERVAS),
+                                         ("pagamentos", contas["pagamentos"], COLUNAS_PAGAMENTOS),
+                                         ("adicionais", contas["adicionais"], COLUNAS_ADICIONAIS)):
+            arquivo = pilha.enter_context(open(destino, "w", encoding="utf-8", newline=""))
+            escritores[tabela] = csv.DictWriter(arquivo, fieldnames=colunas)
+            escritores[tabela].writeheader()
+
+        for r in reservas:
+            escritores["reservas"].writerow(resumo_reserva(r))
+            contagem["reservas"] += 1
+            for linha in _linhas_pagamentos(r):
+                escritores["pagamentos"].writerow(linha)
+                contagem["pagamentos"] += 1
+            for linha in _linhas_adicionais(r):
+                escritores["adicionais"].writerow(linha)
+                contagem["adicionais"] += 1
+
+    return contagem
+
+def _exportar_parquet(caminho: str, reservas: Iterator[Reserva]) -> Dict[str, int]:
+    """
+    Escreve as três tabelas em lotes de TAMANHO_LOTE_PARQUET linhas (um row group por lote).
+    """
+    if pyarrow is None:
+        raise ImportError(f"{Cores.VERMELHO}A exportação em Parquet precisa do pyarrow (pip install pyarrow).{Cores.RESET}")
+
+    contas = caminhos_das_contas(caminho)
+    esquemas = {
+        "reservas": pyarrow.schema([
+            ("id", pyarrow.string()), ("hospede_documento", pyarrow.string()), ("quarto_numero", pyarrow.int64()),
+            ("data_entrada", pyarrow.string()), ("data_saida", pyarrow.string()), ("num_hospedes", pyarrow.int64()),
+            ("status", pyarrow.string()), ("total", pyarrow.float64()), ("total_pago", pyarrow.float64())
+        ]),
+        "pagamentos": pyarrow.schema([
+            ("reserva_id", pyarrow.string()), ("seq", pyarrow.int64()), ("valor", pyarrow.float64()),
+            ("forma", pyarrow.string()), ("data", pyarrow.string())
+        ]),
+        "adicionais": pyarrow.schema([
+            ("reserva_id", pyarrow.string()), ("seq", pyarrow.int64()),
+            ("descricao", pyarrow.string()), ("valor", pyarrow.float64())
+        ])
+    }
+    destinos = {"reservas": caminho, **contas}
+    contagem = {"reservas": 0, "pagamentos": 0, "adicionais": 0}
+    lotes: Dict[str, List[dict]] = {"reservas": [], "pagamentos": [], "adicionais": []}
+
+    with ExitStack() as pilha:
+        escritores = {
+            tabela: pilha.enter_context(pyarrow.parquet.ParquetWriter(destinos[tabela], esquemas[tabela]))
+            for tabela in esquemas
+        }
+
+        def descarregar(tabela: str):
+            if lotes[tabela]:
+                escritores[tabela].write_table(pyarrow.Table.from_pylist(lotes[tabela], schema=esquemas[tabela]))
+                contagem[tabela] += len(lotes[tabela])
+                lotes[tabela] = []
+
+        for r in reservas:
+            lotes["reservas"].append(resumo_reserva(r))
+            lotes["pagamentos"].extend(_linhas_pagamentos(r))
+            lotes["adicionais"].extend(_linhas_adicionais(r))
+            for tabela in lotes:
+                if len(lotes[tabela]) >= TAMANHO_LOTE_PARQUET:
+                    descarregar(tabela)
+
+        for tabela in lotes:
+            descarregar(tabela)
+
+    return contagem
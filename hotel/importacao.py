@@ -0,0 +1,229 @@
+"""
+Importação em lote de reservas (grupos e OTAs) a partir de arquivos CSV ou JSON Lines.
+"""
+
+import csv
+import json
+import os
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Tuple
+from .models import Hospede, Reserva, StatusReserva
+from .indices import IndiceDisponibilidade
+from .config import Cores
+from hotel import services
+
+
+# Colunas obrigatórias de cada linha (nome, email e telefone só são exigidos para hóspedes novos):
+COLUNAS_OBRIGATORIAS = ("documento", "quarto", "data_entrada", "data_saida", "num_hospedes")
+
+# Status aceitos na importação:
+STATUS_IMPORTAVEIS = (StatusReserva.PENDENTE, StatusReserva.CONFIRMADA)
+
+
+def importar_reservas(caminho: str, tudo_ou_nada: bool = False) -> Dict:
+    """
+    Lê o arquivo linha a linha, valida cada reserva e grava todas as válidas de uma só vez.
+    Com tudo_ou_nada=True, um único erro impede a gravação de todo o arquivo.
+
+    Retorna {"importadas": [...reservas], "hospedes_novos": [...], "erros": [(linha, mensagem), ...]}.
+    """
+    novas: List[Tuple[int, Reserva]] = []
+    hospedes_novos: Dict[str, Hospede] = {}
+    erros: List[Tuple[int, str]] = []
+
+    # Estadias aceitas neste arquivo (ainda fora do repositório), para detectar conflitos entre as linhas:
+    lote = IndiceDisponibilidade()
+
+    for numero_linha, dados in _ler_linhas(caminho):
+        try:
+            reserva = _validar_linha(dados, hospedes_novos, lote)
+        except (ValueError, KeyError, TypeError) as e:
+            erros.append((numero_linha, mensagem_de_erro(e)))
+            continue
+        lote.adicionar(reserva)
+        novas.append((numero_linha, reserva))
+
+    if erros and tudo_ou_nada:
+        return {"importadas": [], "hospedes_novos": [], "erros": erros}
+
+    gravadas, hospedes_gravados, conflitos = _efetivar(novas, list(hospedes_novos.values()), tudo_ou_nada)
+    return {"importadas": [r for _, r in gravadas], "hospedes_novos": hospedes_gravados, "erros": sorted(erros + conflitos)}
+
+def salvar_relatorio_erros(erros: List[Tuple[int, str]], caminho: str):
+    """
+    Grava o relatório de erros em CSV (linha, erro).
+    """
+    with open(caminho, "w", encoding="utf-8", newline="") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(["linha", "erro"])
+        escritor.writerows(erros)
+
+
+# LEITURA:
+
+def _ler_linhas(caminho: str) -> Iterator[Tuple[int, dict]]:
+    """
+    Gera (número da linha no arquivo, dicionário) sem carregar o arquivo inteiro.
+    O formato é escolhido pela extensão: .csv ou .jsonl.
+    """
+    extensao = os.path.splitext(caminho)[1].lower()
+
+    with open(caminho, "r", encoding="utf-8", newline="") as f:
+        if extensao == ".csv":
+            leitor = csv.DictReader(f)
+            for dados in leitor:
+                yield leitor.line_num, dados
+        elif extensao in (".jsonl", ".ndjson"):
+            for numero_linha, linha in enumerate(f, start=1):
+                if not linha.strip():
+                    continue
+                try:
+                    dados = json.loads(linha)
+                except json.JSONDecodeError as e:
+                    dados = {"_erro": f"JSON inválido: {e.msg}"}
+                yield numero_linha, dados
+        else:
+            raise ValueError(f"{Cores.VERMELHO}Formato de arquivo não suportado: {extensao} (use .csv ou .jsonl).{Cores.RESET}")
+
+
+# VALIDAÇÃO:
+
+def _validar_linha(dados: dict, hospedes_novos: Dict[str, Hospede], lote: IndiceDisponibilidade) -> Reserva:
+    """
+    Converte a linha em uma Reserva validada contra os modelos, o índice de disponibilidade,
+    os bloqueios do quarto e as linhas já aceitas do mesmo arquivo.
+    """
+    if "_erro" in dados:
+        raise ValueError(dados["_erro"])
+
+    faltando = [coluna for coluna in COLUNAS_OBRIGATORIAS if not str(dados.get(coluna) or "").strip()]
+    if faltando:
+        raise ValueError(f"Colunas obrigatórias ausentes: {', '.join(faltando)}")
+
+    documento = str(dados["documento"]).strip()
+    numero_quarto = _ler_inteiro(dados, "quarto")
+    data_entrada = ler_data(dados["data_entrada"])
+    data_saida = ler_data(dados["data_saida"])
+    num_hospedes = _ler_inteiro(dados, "num_hospedes")
+    status = str(dados.get("status") or StatusReserva.PENDENTE).strip().upper()
+
+    if status not in STATUS_IMPORTAVEIS:
+        raise ValueError(f"Status {status} não pode ser importado (use PENDENTE ou CONFIRMADA).")
+    if data_saida <= data_entrada:
+        raise ValueError("A data de saída deve ser posterior à data de entrada.")
+
+    quarto = services.buscar_quarto(numero_quarto)
+    if not quarto:
+        raise ValueError(f"Quarto {numero_quarto} não encontrado.")
+
+    hospede = services.buscar_hospede(documento) or hospedes_novos.get(documento)
+    if not hospede:
+        if not dados.get("nome"):
+            raise ValueError(f"Hóspede {documento} não encontrado (informe nome, email e telefone para cadastrá-lo).")
+        hospede = Hospede(dados["nome"], documento, dados.get("email") or "", dados.get("telefone") or "")
+
+    if not services._verificar_disponibilidade(numero_quarto, data_entrada, data_saida):
+        raise ValueError(f"O Quarto {numero_quarto} já está ocupado neste período.")
+    if not lote.esta_livre(numero_quarto, data_entrada, data_saida):
+        raise ValueError(f"O Quarto {numero_quarto} já foi reservado por outra linha do arquivo neste período.")
+    if services.repositorio.inventario.periodo_bloqueado(numero_quarto, data_entrada, data_saida):
+        raise ValueError(f"O Quarto {numero_quarto} está bloqueado neste período.")
+
+    # O construtor valida o número de hóspedes contra a capacidade do quarto:
+    reserva = Reserva(hospede, quarto, data_entrada, data_saida, num_hospedes, status)
+
+    # O hóspede novo só entra no cadastro quando a linha inteira é válida:
+    if services.buscar_hospede(documento) is None:
+        hospedes_novos.setdefault(documento, hospede)
+    return reserva
+
+def _ler_inteiro(dados: dict, coluna: str) -> int:
+    """
+    Converte a coluna para inteiro com uma mensagem de erro legível.
+    """
+    try:
+        return int(dados[coluna])
+    except (TypeError, ValueError):
+        raise ValueError(f"Valor inválido na coluna {coluna}: {dados[coluna]}")
+
+def ler_data(valor) -> date:
+    """
+    Aceita datas ISO (AAAA-MM-DD) ou no formato da interface (DD/MM/AAAA).
+    """
+    texto = str(valor).strip()
+    try:
+        return date.fromisoformat(texto)
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(texto, "%d/%m/%Y").date()
+    except ValueError:
+        raise ValueError(f"Data inválida: {texto}")
+
+def mensagem_de_erro(erro: Exception) -> str:
+    """
+    Texto do erro para o relatório, sem os códigos de cor do terminal.
+    """
+    if isinstance(erro, KeyError):
+        return f"Coluna ausente: {erro.args[0]}"
+    mensagem = str(erro)
+    for cor in (Cores.VERDE, Cores.VERMELHO, Cores.AMARELO, Cores.AZUL, Cores.RESET, Cores.NEGRITO):
+        mensagem = mensagem.replace(cor, "")
+    return mensagem
+
+
+# GRAVAÇÃO:
+
+@services.repetir_em_conflito
+def _efetivar(linhas: List[Tuple[int, Reserva]], hospedes_novos: List[Hospede],
+              tudo_ou_nada: bool = False) -> Tuple[List[Tuple[int, Reserva]], List[Hospede], List[Tuple[int, str]]]:
+    """
+    Inclui as entidades no repositório e grava tudo em uma única operação do backend.
+    Se outro processo gravou antes, a memória é recarregada e o lote é conferido de novo contra ela:
+    as linhas que deixaram de valer (quarto ocupado ou removido nesse meio tempo) viram erros com o número
+    da linha e as demais são gravadas (com tudo_ou_nada=True, nenhuma é).
+
+    Retorna (linhas gravadas, hóspedes novos gravados, erros).
+    """
+    if not linhas:
+        return [], [], []
+
+    # Um hóspede cadastrado por outro processo durante a importação não é cadastrado de novo:
+    # as reservas dele passam a usar o cadastro existente.
+    novos = {}
+    for h in hospedes_novos:
+        if services.buscar_hospede(h.documento) is None:
+            h.historico_reservas.clear()
+            novos[h.documento] = h
+
+    aceitas: List[Tuple[int, Reserva]] = []
+    erros: List[Tuple[int, str]] = []
+    for numero_linha, r in linhas:
+        # Depois de uma recarga, quartos e hóspedes já cadastrados são outros objetos:
+        quarto = services.buscar_quarto(r.quarto.numero)
+        hospede = novos.get(r.hospede.documento) or services.buscar_hospede(r.hospede.documento)
+        if quarto is None or hospede is None:
+            erros.append((numero_linha, "O quarto ou o hóspede da reserva foi removido por outro processo durante a importação."))
+        elif (not services._verificar_disponibilidade(quarto.numero, r.data_entrada, r.data_saida)
+                or services.repositorio.inventario.periodo_bloqueado(quarto.numero, r.data_entrada, r.data_saida)):
+            erros.append((numero_linha, f"O Quarto {quarto.numero} foi ocupado por outro processo durante a importação."))
+        else:
+            r.quarto, r.hospede = quarto, hospede
+            aceitas.append((numero_linha, r))
+
+    if erros and tudo_ou_nada:
+        return [], [], erros
+
+    # Hóspedes novos cujas linhas viraram erro não são cadastrados:
+    documentos = {r.hospede.documento for _, r in aceitas}
+    hospedes = [h for h in novos.values() if h.documento in documentos]
+    for h in hospedes:
+        services.repositorio.adicionar_hospede(h)
+    for _, r in aceitas:
+        services.repositorio.adicionar_reserva(r)
+        r.hospede.historico_reservas.append(r)
+
+    # Uma única escrita no journal (ou uma única transação no SQLite) para o lote inteiro:
+    if aceitas:
+        services.persistir(*hospedes, *(r for _, r in aceitas))
+    return aceitas, hospedes, erros
@@ -0,0 +1,312 @@
+"""
+Estruturas de índice em memória usadas pelos serviços para acelerar as consultas.
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from .models import Quarto, Reserva, StatusReserva, STATUS_LIBERADOS
+
+
+class IndiceDisponibilidade:
+    """
+    Índice de intervalos por quarto, ordenado por (data_entrada, data_saida).
+    Guarda apenas as estadias que ocupam o quarto, ignorando CANCELADA e NO_SHOW.
+    """
+    def __init__(self):
+        self._chaves: Dict[int, List[Tuple[date, date]]] = {}
+        self._reservas: Dict[int, List[Reserva]] = {}
+
+    def adicionar(self, reserva: Reserva):
+        """
+        Insere a reserva na posição ordenada do seu quarto.
+        """
+        if reserva.status in STATUS_LIBERADOS:
+            return
+
+        numero = reserva.quarto.numero
+        self.purgar(numero)
+        chaves = self._chaves.setdefault(numero, [])
+        reservas = self._reservas.setdefault(numero, [])
+
+        chave = (reserva.data_entrada, reserva.data_saida)
+        pos = bisect_right(chaves, chave)
+        chaves.insert(pos, chave)
+        reservas.insert(pos, reserva)
+
+    def remover(self, reserva: Reserva) -> bool:
+        """
+        Retira a reserva do índice. Retorna False se ela não estava indexada.
+        """
+        numero = reserva.quarto.numero
+        chaves = self._chaves.get(numero, [])
+        reservas = self._reservas.get(numero, [])
+
+        chave = (reserva.data_entrada, reserva.data_saida)
+        pos = bisect_left(chaves, chave)
+        while pos < len(chaves) and chaves[pos] == chave:
+            if reservas[pos] is reserva:
+                del chaves[pos]
+                del reservas[pos]
+                return True
+            pos += 1
+        return False
+
+    def purgar(self, numero_quarto: int):
+        """
+        Retira do quarto as reservas canceladas diretamente pelo modelo, que esta_livre apenas ignora.
+        Altera o índice: deve ser chamado com a trava do repositório.
+        """
+        reservas = self._reservas.get(numero_quarto)
+        if not reservas or not any(r.status in STATUS_LIBERADOS for r in reservas):
+            return
+        chaves = self._chaves[numero_quarto]
+        manter = [i for i, r in enumerate(reservas) if r.status not in STATUS_LIBERADOS]
+        self._chaves[numero_quarto] = [chaves[i] for i in manter]
+        self._reservas[numero_quarto] = [reservas[i] for i in manter]
+
+    def esta_livre(self, numero_quarto: int, data_inicio: date, data_fim: date) -> bool:
+        """
+        Verifica em O(log n) se o período [data_inicio, data_fim) não conflita com nenhuma estadia do quarto.
+
+        Como as estadias indexadas de um quarto não se sobrepõem, as datas de saída
+        também ficam em ordem. Basta então olhar a última estadia que começa antes de data_fim.
+        Só lê o índice: as reservas canceladas diretamente pelo modelo são puladas aqui e retiradas por purgar().
+        """
+        chaves = self._chaves.get(numero_quarto)
+        if not chaves:
+            return True
+
+        reservas = self._reservas[numero_quarto]
+        pos = bisect_left(chaves, (data_fim,))
+
+        while pos > 0:
+            if reservas[pos - 1].status in STATUS_LIBERADOS:
+                pos -= 1
+                continue
+
+            entrada, saida = chaves[pos - 1]
+            return not (data_inicio < saida and data_fim > entrada)
+
+        return True
+
+    def reconstruir(self, reservas: Iterable[Reserva]):
+        """
+        Recria o índice completo a partir de uma coleção de reservas.
+        """
+        self.limpar()
+        ordenadas = sorted(
+            (r for r in reservas if r.status not in STATUS_LIBERADOS),
+            key=lambda r: (r.quarto.numero, r.data_entrada, r.data_saida)
+        )
+        for r in ordenadas:
+            numero = r.quarto.numero
+            self._chaves.setdefault(numero, []).append((r.data_entrada, r.data_saida))
+            self._reservas.setdefault(numero, []).append(r)
+
+    def limpar(self):
+        """
+        Esvazia o índice.
+        """
+        self._chaves.clear()
+        self._reservas.clear()
+
+
+class MapaOcupacao:
+    """
+    Bitmap de ocupação: cada quarto recebe uma posição de bit fixa e cada dia (ordinal da data)
+    guarda um inteiro com os bits dos quartos ocupados naquela noite.
+    Buscar quartos livres em um período é um OR dos dias da estadia, sem percorrer os quartos.
+    """
+    def __init__(self):
+        self._quartos: List[Quarto] = []
+        self._bit_por_quarto: Dict[int, int] = {}
+        self._bits_por_tipo: Dict[str, int] = {}
+        self._todos = 0
+        self._dias: Dict[int, int] = {}
+        self._bloqueios: Dict[int, int] = {}
+        self._marcadas: Set[str] = set()
+
+    def registrar_quarto(self, quarto: Quarto):
+        """
+        Reserva uma posição de bit para o quarto.
+        """
+        if quarto.numero in self._bit_por_quarto:
+            return
+        bit = 1 << len(self._quartos)
+        self._quartos.append(quarto)
+        self._bit_por_quarto[quarto.numero] = bit
+        self._bits_por_tipo[quarto.tipo] = self._bits_por_tipo.get(quarto.tipo, 0) | bit
+        self._todos |= bit
+        for inicio, fim, _ in quarto.bloqueios:
+            self.bloquear(quarto.numero, inicio, fim)
+
+    def bloquear(self, numero_quarto: int, data_inicio: date, data_fim: date):
+        """
+        Marca as noites [data_inicio, data_fim) do quarto como indisponíveis (separadas das reservas).
+        """
+        bit = self._bit_por_quarto[numero_quarto]
+        for dia in range(data_inicio.toordinal(), data_fim.toordinal()):
+            self._bloqueios[dia] = self._bloqueios.get(dia, 0) | bit
+
+    def adicionar(self, reserva: Reserva):
+        """
+        Marca as noites da reserva no quarto. Reservas canceladas ou em no-show não ocupam o quarto.
+        """
+        if reserva.status in STATUS_LIBERADOS or reserva.id in self._marcadas:
+            return
+        bit = self._bit_por_quarto.get(reserva.quarto.numero)
+        if bit is None:
+            return
+
+        dias = self._dias
+        for dia in range(reserva.data_entrada.toordinal(), reserva.data_saida.toordinal()):
+            dias[dia] = dias.get(dia, 0) | bit
+        self._marcadas.add(reserva.id)
+
+    def remover(self, reserva: Reserva):
+        """
+        Desmarca as noites da reserva. Só age se a reserva estiver marcada, para não apagar a ocupação de outra.
+        """
+        if reserva.id not in self._marcadas:
+            return
+        self._marcadas.discard(reserva.id)
+
+        bit = self._bit_por_quarto[reserva.quarto.numero]
+        dias = self._dias
+        for dia in range(reserva.data_entrada.toordinal(), reserva.data_saida.toordinal()):
+            restante = dias.get(dia, 0) & ~bit
+            if restante:
+                dias[dia] = restante
+            else:
+                dias.pop(dia, None)
+
+    def livres(self, data_inicio: date, data_fim: date, tipo: Optional[str] = None) -> List[Quarto]:
+        """
+        Retorna os quartos (do tipo pedido, se houver) sem nenhuma noite ocupada ou bloqueada em [data_inicio, data_fim).
+        """
+        ocupados = 0
+        dias = self._dias
+        bloqueios = self._bloqueios
+        for dia in range(data_inicio.toordinal(), data_fim.toordinal()):
+            ocupados |= dias.get(dia, 0) | bloqueios.get(dia, 0)
+
+        candidatos = self._todos if tipo is None else self._bits_por_tipo.get(tipo, 0)
+        candidatos &= ~ocupados
+
+        quartos = []
+        while candidatos:
+            bit = candidatos & -candidatos
+            quartos.append(self._quartos[bit.bit_length() - 1])
+            candidatos ^= bit
+        return quartos
+
+    def reconstruir(self, quartos: Iterable[Quarto], reservas: Iterable[Reserva]):
+        """
+        Recria o bitmap a partir dos quartos e das reservas.
+        """
+        self.limpar()
+        for q in quartos:
+            self.registrar_quarto(q)
+        for r in reservas:
+            self.adicionar(r)
+
+    def limpar(self):
+        """
+        Esvazia o bitmap.
+        """
+        self._quartos.clear()
+        self._bit_por_quarto.clear()
+        self._bits_por_tipo.clear()
+        self._todos = 0
+        self._dias.clear()
+        self._bloqueios.clear()
+        self._marcadas.clear()
+
+
+class IndiceEntradas:
+    """
+    Reservas ordenadas pela data de entrada, para percorrer só as chegadas de um período.
+    Inclui todas as reservas (também as canceladas): o filtro de status é feito na leitura.
+    """
+    def __init__(self):
+        self._datas: List[date] = []
+        self._reservas: List[Reserva] = []
+
+    def adicionar(self, reserva: Reserva):
+        """
+        Insere a reserva depois das que têm a mesma data de entrada (mantém a ordem de inclusão).
+        """
+        pos = bisect_right(self._datas, reserva.data_entrada)
+        self._datas.insert(pos, reserva.data_entrada)
+        self._reservas.insert(pos, reserva)
+
+    def entre(self, data_inicio: Optional[date] = None, data_fim: Optional[date] = None) -> Iterator[Reserva]:
+        """
+        Gera as reservas com data_entrada em [data_inicio, data_fim). Limites None ficam abertos.
+        """
+        inicio = 0 if data_inicio is None else bisect_left(self._datas, data_inicio)
+        fim = len(self._datas) if data_fim is None else bisect_left(self._datas, data_fim)
+        for pos in range(inicio, fim):
+            yield self._reservas[pos]
+
+    def reconstruir(self, reservas: Iterable[Reserva]):
+        """
+        Recria o índice ordenando as reservas uma única vez.
+        """
+        ordenadas = sorted(reservas, key=lambda r: r.data_entrada)
+        self._datas = [r.data_entrada for r in ordenadas]
+        self._reservas = ordenadas
+
+    def limpar(self):
+        """
+        Esvazia o índice.
+        """
+        self._datas.clear()
+        self._reservas.clear()
+
+
+class ChegadasEmAberto:
+    """
+    Reservas que ainda podem chegar (PENDENTE ou CONFIRMADA), por data de entrada e id.
+    A reserva sai do índice no check-in, no cancelamento ou no No-Show, então a auditoria
+    percorre só as chegadas em aberto, e não todas as entradas do histórico.
+    PENDENTE também fica no índice porque confirmar a reserva não passa pelo repositório.
+    """
+    EM_ABERTO = (StatusReserva.PENDENTE, StatusReserva.CONFIRMADA)
+
+    def __init__(self):
+        self._por_data: Dict[date, Dict[str, Reserva]] = {}
+
+    def atualizar(self, reserva: Reserva):
+        """
+        Inclui ou retira a reserva conforme o status atual.
+        """
+        if reserva.status in self.EM_ABERTO:
+            self._por_data.setdefault(reserva.data_entrada, {})[reserva.id] = reserva
+            return
+
+        do_dia = self._por_data.get(reserva.data_entrada)
+        if do_dia is not None and do_dia.pop(reserva.id, None) is not None and not do_dia:
+            del self._por_data[reserva.data_entrada]
+
+    def ate(self, dia: date) -> List[Reserva]:
+        """
+        Chegadas em aberto com entrada até o dia, em ordem de entrada (lista nova: pode ser alterada durante a leitura).
+        """
+        datas = sorted(d for d in self._por_data if d <= dia)
+        return [r for d in datas for r in self._por_data[d].values()]
+
+    def entre(self, data_inicio: Optional[date] = None, data_fim: Optional[date] = None) -> List[Reserva]:
+        """
+        Chegadas em aberto com entrada em [data_inicio, data_fim), em ordem de entrada. Limites None ficam abertos.
+        """
+        datas = sorted(d for d in self._por_data
+                       if (data_inicio is None or d >= data_inicio) and (data_fim is None or d < data_fim))
+        return [r for d in datas for r in self._por_data[d].values()]
+
+    def limpar(self):
+        """
+        Esvazia o índice.
+        """
+        self._por_data.clear()
@@ -0,0 +1,159 @@
+"""
+Calendário de inventário: quem ocupa cada quarto em cada noite e quantos quartos de cada tipo restam por dia.
+"""
+
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+from .models import Quarto, Reserva, STATUS_LIBERADOS
+
+
+class CalendarioInventario:
+    """
+    Mapeia (quarto, noite) -> id da reserva e (quarto, noite) -> motivo do bloqueio,
+    mantendo por (tipo, noite) os contadores de vendidos e bloqueados.
+    As noites são guardadas pelo ordinal da data.
+    """
+    def __init__(self):
+        self._reservas: Dict[Tuple[int, int], str] = {}
+        self._bloqueios: Dict[Tuple[int, int], str] = {}
+        self._vendidos: Dict[Tuple[str, int], int] = {}
+        self._bloqueados: Dict[Tuple[str, int], int] = {}
+        self._tipo_por_quarto: Dict[int, str] = {}
+        self._quartos_por_tipo: Dict[str, int] = {}
+
+    # ALTERAÇÕES:
+
+    def registrar_quarto(self, quarto: Quarto):
+        """
+        Inclui o quarto no total do seu tipo e aplica os bloqueios já cadastrados nele.
+        """
+        if quarto.numero in self._tipo_por_quarto:
+            return
+        self._tipo_por_quarto[quarto.numero] = quarto.tipo
+        self._quartos_por_tipo[quarto.tipo] = self._quartos_por_tipo.get(quarto.tipo, 0) + 1
+        for inicio, fim, motivo in quarto.bloqueios:
+            self.bloquear(quarto.numero, inicio, fim, motivo)
+
+    def ocupar(self, reserva: Reserva):
+        """
+        Marca as noites da reserva no quarto. Reservas canceladas ou em no-show não ocupam o quarto.
+        """
+        if reserva.status in STATUS_LIBERADOS:
+            return
+
+        numero = reserva.quarto.numero
+        tipo = self._tipo_por_quarto.get(numero)
+        if tipo is None:
+            return
+
+        for noite in range(reserva.data_entrada.toordinal(), reserva.data_saida.toordinal()):
+            chave = (numero, noite)
+            if chave in self._reservas:
+                continue
+            self._reservas[chave] = reserva.id
+            self._vendidos[(tipo, noite)] = self._vendidos.get((tipo, noite), 0) + 1
+
+    def liberar(self, reserva: Reserva):
+        """
+        Devolve ao estoque as noites que ainda estão marcadas com esta reserva.
+        """
+        numero = reserva.quarto.numero
+        tipo = self._tipo_por_quarto.get(numero)
+        if tipo is None:
+            return
+
+        for noite in range(reserva.data_entrada.toordinal(), reserva.data_saida.toordinal()):
+            chave = (numero, noite)
+            if self._reservas.get(chave) == reserva.id:
+                del self._reservas[chave]
+                self._vendidos[(tipo, noite)] -= 1
+
+    def bloquear(self, numero_quarto: int, data_inicio: date, data_fim: date, motivo: str):
+        """
+        Retira do estoque as noites [data_inicio, data_fim) do quarto.
+        """
+        tipo = self._tipo_por_quarto[numero_quarto]
+        for noite in range(data_inicio.toordinal(), data_fim.toordinal()):
+            chave = (numero_quarto, noite)
+            if chave in self._bloqueios:
+                continue
+            self._bloqueios[chave] = motivo
+            self._bloqueados[(tipo, noite)] = self._bloqueados.get((tipo, noite), 0) + 1
+
+    # CONSULTAS:
+
+    def reserva_em(self, numero_quarto: int, dia: date) -> Optional[str]:
+        """
+        Id da reserva que ocupa o quarto na noite do dia, se houver.
+        """
+        return self._reservas.get((numero_quarto, dia.toordinal()))
+
+    def motivo_bloqueio(self, numero_quarto: int, dia: date) -> Optional[str]:
+        """
+        Motivo do bloqueio do quarto na noite do dia, se houver.
+        """
+        return self._bloqueios.get((numero_quarto, dia.toordinal()))
+
+    def periodo_livre(self, numero_quarto: int, data_inicio: date, data_fim: date) -> bool:
+        """
+        Indica se nenhuma noite de [data_inicio, data_fim) do quarto está vendida ou bloqueada.
+        """
+        for noite in range(data_inicio.toordinal(), data_fim.toordinal()):
+            chave = (numero_quarto, noite)
+            if chave in self._reservas or chave in self._bloqueios:
+                return False
+        return True
+
+    def periodo_bloqueado(self, numero_quarto: int, data_inicio: date, data_fim: date) -> bool:
+        """
+        Indica se alguma noite de [data_inicio, data_fim) do quarto está bloqueada.
+        """
+        return any((numero_quarto, noite) in self._bloqueios
+                   for noite in range(data_inicio.toordinal(), data_fim.toordinal()))
+
+    def vendidos(self, tipo: str, dia: date) -> int:
+        """
+        Quartos do tipo vendidos na noite do dia.
+        """
+        return self._vendidos.get((tipo, dia.toordinal()), 0)
+
+    def disponiveis(self, tipo: str, dia: date) -> int:
+        """
+        Quartos do tipo que ainda podem ser vendidos na noite do dia.
+        """
+        noite = dia.toordinal()
+        return (self._quartos_por_tipo.get(tipo, 0)
+                - self._vendidos.get((tipo, noite), 0)
+                - self._bloqueados.get((tipo, noite), 0))
+
+    def disponiveis_no_periodo(self, data_inicio: date, data_fim: date) -> Dict[date, Dict[str, int]]:
+        """
+        Quartos disponíveis por tipo em cada noite de [data_inicio, data_fim).
+        """
+        resultado = {}
+        dia = data_inicio
+        while dia < data_fim:
+            resultado[dia] = {tipo: self.disponiveis(tipo, dia) for tipo in self._quartos_por_tipo}
+            dia += timedelta(days=1)
+        return resultado
+
+    def reconstruir(self, quartos: Iterable[Quarto], reservas: Iterable[Reserva]):
+        """
+        Recria o calendário a partir dos quartos (com seus bloqueios) e das reservas.
+        """
+        self.limpar()
+        for q in quartos:
+            self.registrar_quarto(q)
+        for r in reservas:
+            self.ocupar(r)
+
+    def limpar(self):
+        """
+        Esvazia o calendário.
+        """
+        self._reservas.clear()
+        self._bloqueios.clear()
+        self._vendidos.clear()
+        self._bloqueados.clear()
+        self._tipo_por_quarto.clear()
+        self._quartos_por_tipo.clear()
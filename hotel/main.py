@@ -97,6 +97,7 @@ def menu_reservas():
     print("2. Buscar Reserva")
     print("3. Cancelar Reserva (Com cálculo de multa)")
     print("4. Confirmar Reserva")
+    print("5. Importar Reservas em Lote (CSV/JSONL)")
     print("0. Voltar")
     print("-" * 50)
     
@@ -136,6 +137,16 @@ def menu_reservas():
             services.confirmar_reserva(doc, num)
             pausar()
 
+        elif opcao == "5":
+            from hotel import importacao
+            caminho = input("Caminho do arquivo: ").strip()
+            resultado = importacao.importar_reservas(caminho)
+            print(f"{Cores.VERDE}{len(resultado['importadas'])} reserva(s) importada(s).{Cores.RESET}")
+            if resultado["erros"]:
+                caminho_erros = caminho + ".erros.csv"
+                importacao.salvar_relatorio_erros(resultado["erros"], caminho_erros)
+                print(f"{Cores.AMARELO}{len(resultado['erros'])} linha(s) com erro. Relatório salvo em {caminho_erros}.{Cores.RESET}")
+
     except Exception as e:
         print(f"{Cores.VERMELHO}Erro: {e}{Cores.RESET}")
         
@@ -150,6 +161,7 @@ def menu_recepcao():
     print("3. Registrar No-Show (Não compareceu)")
     print("4. Registrar Pagamento (Adiantamento)")
     print("5. Lançar Consumo Extra (Frigobar/Serviços)")
+    print("6. Auditoria Noturna (No-Shows e Check-outs Atrasados)")
     print("0. Voltar")
     print("-" * 50)
     
@@ -170,7 +182,15 @@ def menu_recepcao():
         elif opcao == "3":
             documento = input("CPF do Hóspede: ")
             numero = int(input("Número do Quarto: "))
-            services.realizar_noshow(documento, numero)
+            reserva = services.buscar_reserva(documento, numero)
+            limite = services.limite_noshow(reserva) if reserva else None
+
+            if limite and datetime.now() < limite:
+                print(f"Atenção: Ainda está dentro do prazo de tolerância (Limite: {limite}).")
+                if input("Deseja registrar o No-Show mesmo assim? (S/N): ").upper() == 'S':
+                    services.realizar_noshow(documento, numero, forcar=True)
+            else:
+                services.realizar_noshow(documento, numero)
 
         elif opcao == "4":
             print("\n--- NOVO PAGAMENTO ---")
@@ -198,6 +218,16 @@ def menu_recepcao():
             services.registrar_adicional(doc, num, item, valor)
             print(f"{Cores.VERDE}Item adicionado à conta com sucesso!{Cores.RESET}")
 
+        elif opcao == "6":
+            from hotel import auditoria
+            resultado = auditoria.executar_auditoria()
+            print(f"\n--- AUDITORIA DE {resultado['dia'].strftime('%d/%m/%Y')} ---")
+            for ns in resultado["no_shows"]:
+                print(f"No-Show: quarto {ns['quarto']} ({ns['hospede']}) - multa R$ {ns['multa']:.2f}")
+            for at in resultado["checkouts_atrasados"]:
+                print(f"{Cores.AMARELO}Check-out atrasado: quarto {at['quarto']} ({at['hospede']}), saída prevista {at['data_saida'].strftime('%d/%m/%Y')}{Cores.RESET}")
+            print(f"Diárias da noite: {len(resultado['diarias'])} estadia(s), total R$ {resultado['total_diarias']:.2f}")
+
     except Exception as e:
         print(f"{Cores.VERMELHO}Erro: {e}{Cores.RESET}")
         
@@ -209,6 +239,7 @@ def menu_relatorios():
     print("-" * 50)
     print("1. Ocupação Atual")
     print("2. Financeiro Completo (ADR/RevPAR)")
+    print("3. Exportar Reservas (CSV/JSONL/Parquet)")
     print("0. Voltar")
     print("-" * 50)
     
@@ -220,6 +251,15 @@ def menu_relatorios():
     elif opcao == "2":
         services.gerar_relatorio_financeiro()
         pausar()
+    elif opcao == "3":
+        try:
+            from hotel import exportacao
+            caminho = input("Arquivo de destino (.csv, .jsonl ou .parquet): ").strip()
+            contagem = exportacao.exportar_reservas(caminho)
+            print(f"{Cores.VERDE}{contagem['reservas']} reserva(s) exportada(s) para {caminho}.{Cores.RESET}")
+        except Exception as e:
+            print(f"{Cores.VERMELHO}Erro: {e}{Cores.RESET}")
+        pausar()
 
 
 # LOOP PRINCIPAL
@@ -3,12 +3,60 @@ Armazena as definições de classe para o Sistema de Reservas de Hotel.
 """
 
 from datetime import date, datetime
-from typing import List
+from typing import Callable, Iterator, List, Optional, Tuple
+from uuid import uuid4
+import sys
+
+
+class StatusReserva:
+    """
+    Status possíveis de uma reserva. São strings internadas: todas as reservas
+    compartilham o mesmo objeto de texto, inclusive as lidas do disco.
+    """
+    PENDENTE = sys.intern("PENDENTE")
+    CONFIRMADA = sys.intern("CONFIRMADA")
+    CHECKIN = sys.intern("CHECKIN")
+    CHECKOUT = sys.intern("CHECKOUT")
+    CANCELADA = sys.intern("CANCELADA")
+    NO_SHOW = sys.intern("NO_SHOW")
+
+
+# Status que não ocupam mais o quarto:
+STATUS_LIBERADOS = (StatusReserva.CANCELADA, StatusReserva.NO_SHOW)
+
+# Status em que a reserva ainda está em andamento (no modo lazy, só estes ficam na memória):
+STATUS_ATIVOS = (StatusReserva.PENDENTE, StatusReserva.CONFIRMADA, StatusReserva.CHECKIN)
+
+
+class StatusQuarto:
+    """
+    Status possíveis de um quarto (strings internadas).
+    """
+    DISPONIVEL = sys.intern("DISPONIVEL")
+    OCUPADO = sys.intern("OCUPADO")
+    MANUTENCAO = sys.intern("MANUTENCAO")
+
+
+class ConflitoVersao(RuntimeError):
+    """
+    Outro processo gravou uma versão mais nova da entidade (ou uma reserva concorrente no mesmo quarto)
+    depois que ela foi lida: a gravação foi recusada e a operação deve ser refeita sobre os dados atuais.
+    """
+
+
+def para_centavos(valor: float) -> int:
+    """
+    Converte um valor em reais para centavos inteiros, evitando o acúmulo de erro do float.
+    """
+    return int(round(valor * 100))
+
 
 class Pessoa:
     """
     Classe base para representar uma pessoa com dados cadastrais.
     """
+    __slots__ = ("nome", "documento", "email", "telefone")
+
     def __init__(self, nome: str, documento: str, email: str, telefone: str):
         self.nome = nome
         self.documento = documento
@@ -20,9 +68,29 @@ class Hospede(Pessoa):
     """
     Representa um hóspede do hotel, herdando de Pessoa e contendo histórico de reservas.
     """
+    __slots__ = ("historico_reservas", "fonte_historico", "versao")
+
     def __init__(self, nome: str, documento: str, email: str, telefone: str):
         super().__init__(nome, documento, email, telefone)
         self.historico_reservas: List['Reserva'] = []
+        self.fonte_historico: Optional[Callable[[], Iterator['Reserva']]] = None
+        # Versão gravada no armazenamento (0 = ainda não gravado):
+        self.versao = 0
+
+    def iterar_historico(self) -> Iterator['Reserva']:
+        """
+        Percorre todas as reservas do hóspede: as que estão na memória e,
+        se houver uma fonte de histórico (carregamento lazy), as que são lidas sob demanda do disco.
+        """
+        vistas = set()
+        for reserva in self.historico_reservas:
+            vistas.add(reserva.id)
+            yield reserva
+
+        if self.fonte_historico is not None:
+            for reserva in self.fonte_historico():
+                if reserva.id not in vistas:
+                    yield reserva
 
     def to_dict(self):
         """
@@ -32,7 +100,8 @@ class Hospede(Pessoa):
             "nome": self.nome,
             "documento": self.documento,
             "email": self.email,
-            "telefone": self.telefone
+            "telefone": self.telefone,
+            "versao": self.versao
         }
 
     @classmethod
@@ -40,24 +109,33 @@ class Hospede(Pessoa):
         """
         Cria um objeto Hospede a partir dos dados salvos.
         """
-        return cls(
+        hospede = cls(
             nome = dados["nome"],
             documento = dados["documento"],
             email = dados["email"],
             telefone = dados["telefone"]
         )
+        hospede.versao = dados.get("versao", 0)
+        return hospede
 
 
 class Quarto:
     """
     Classe base que representa um quarto e define seus atributos e regras principais.
+    A tarifa é guardada em centavos inteiros.
     """
-    def __init__(self, numero: int, tipo: str, capacidade: int, tarifa_base: float, status: str = "DISPONIVEL"):
+    __slots__ = ("numero", "tipo", "status", "capacidade", "tarifa_centavos", "bloqueios", "versao")
+
+    def __init__(self, numero: int, tipo: str, capacidade: int, tarifa_base: float, status: str = StatusQuarto.DISPONIVEL):
         self.numero = numero
-        self.tipo = tipo
-        self.status = status
+        self.tipo = sys.intern(tipo)
+        self.status = sys.intern(status)
         self.definir_capacidade(capacidade)
         self.definir_tarifa(tarifa_base)
+        # Períodos [inicio, fim) em que o quarto não pode ser vendido, com o motivo:
+        self.bloqueios: List[Tuple[date, date, str]] = []
+        # Versão gravada no armazenamento (0 = ainda não gravado):
+        self.versao = 0
 
     def definir_capacidade(self, capacidade: int):
         """
@@ -72,22 +150,40 @@ class Quarto:
         """
         Validação: Deve ser um valor positivo.
         """
-        if tarifa_base <= 0:
+        centavos = para_centavos(tarifa_base)
+        if centavos <= 0:
             raise ValueError("A tarifa base deve ser maior que zero.")
         else:
-            self.tarifa_base = tarifa_base
+            self.tarifa_centavos = centavos
+
+    @property
+    def tarifa_base(self) -> float:
+        """
+        Tarifa base em reais.
+        """
+        return self.tarifa_centavos / 100
+
+    @tarifa_base.setter
+    def tarifa_base(self, tarifa_base: float):
+        self.definir_tarifa(tarifa_base)
 
     def bloquear_quarto(self, data_inicio: date, data_fim: date, motivo: str):
         """
-        Altera o status do quarto para MANUTENCAO por um período determinado.
+        Bloqueia as noites de [data_inicio, data_fim) para venda.
+        O status só muda para MANUTENCAO se o bloqueio já estiver valendo hoje.
         """
-        self.status = "MANUTENCAO"
+        if data_fim <= data_inicio:
+            raise ValueError("A data final do bloqueio deve ser posterior à inicial.")
+
+        self.bloqueios.append((data_inicio, data_fim, motivo))
+        if data_inicio <= date.today() < data_fim:
+            self.status = StatusQuarto.MANUTENCAO
 
     def liberar_quarto(self):
         """
         Define o status do quarto como DISPONIVEL.
         """
-        self.status = "DISPONIVEL"
+        self.status = StatusQuarto.DISPONIVEL
 
     def __str__(self) -> str:
         """
@@ -110,7 +206,12 @@ class Quarto:
             "tipo": self.tipo,
             "capacidade": self.capacidade,
             "tarifa_base": self.tarifa_base,
-            "status": self.status
+            "status": self.status,
+            "bloqueios": [
+                {"inicio": inicio.isoformat(), "fim": fim.isoformat(), "motivo": motivo}
+                for inicio, fim, motivo in self.bloqueios
+            ],
+            "versao": self.versao
         }
 
     @classmethod
@@ -118,13 +219,19 @@ class Quarto:
         """
         Cria um objeto Quarto a partir dos dados salvos.
         """
-        return cls(
+        quarto = cls(
             numero = dados["numero"],
             tipo = dados["tipo"],
             capacidade = dados["capacidade"],
             tarifa_base = dados["tarifa_base"],
             status = dados["status"]
         )
+        quarto.bloqueios = [
+            (date.fromisoformat(b["inicio"]), date.fromisoformat(b["fim"]), b["motivo"])
+            for b in dados.get("bloqueios", [])
+        ]
+        quarto.versao = dados.get("versao", 0)
+        return quarto
 
 
 class QuartoLuxo(Quarto):
@@ -132,7 +239,9 @@ class QuartoLuxo(Quarto):
     Subclasse de Quarto, representando um quarto tipo LUXO.
     Pode sobrescrever regras de tarifa.
     """
-    def __init__(self, numero: int, tarifa_base: float, status: str = "DISPONIVEL"):
+    __slots__ = ()
+
+    def __init__(self, numero: int, tarifa_base: float, status: str = StatusQuarto.DISPONIVEL):
         tarifa_luxo = tarifa_base * 1.5
         super().__init__(numero, "LUXO", 4, tarifa_luxo, status)
 
@@ -140,20 +249,31 @@ class QuartoLuxo(Quarto):
 class Pagamento:
     """
     Representa um pagamento (parcial ou total) associado a uma Reserva.
+    O valor é guardado em centavos inteiros.
     """
+    __slots__ = ("valor_centavos", "forma", "data")
+
     def __init__(self, valor: float, forma: str, data: datetime = None):
         self.definir_valor(valor)
-        self.forma = forma
+        self.forma = sys.intern(forma)
         self.data = data or datetime.now()
 
     def definir_valor(self, valor: float):
         """
         Validação: Deve ser um valor positivo.
         """
-        if valor <= 0:
+        centavos = para_centavos(valor)
+        if centavos <= 0:
             raise ValueError("O valor do pagamento deve ser maior que zero.")
         else:
-            self.valor = valor
+            self.valor_centavos = centavos
+
+    @property
+    def valor(self) -> float:
+        """
+        Valor do pagamento em reais.
+        """
+        return self.valor_centavos / 100
 
     def to_dict(self):
         """
@@ -180,7 +300,10 @@ class Pagamento:
 class Adicional:
     """
     Representa um consumo extra (ex.: frigobar, estacionamento) lançado na Reserva.
+    O valor é guardado em centavos inteiros.
     """
+    __slots__ = ("descricao", "valor_centavos")
+
     def __init__(self, descricao: str, valor: float):
         self.descricao = descricao
         self.definir_valor(valor)
@@ -189,10 +312,18 @@ class Adicional:
         """
         Validação: Deve ser um valor positivo.
         """
-        if valor <= 0:
+        centavos = para_centavos(valor)
+        if centavos <= 0:
             raise ValueError("O valor do adicional deve ser maior que zero.")
         else:
-            self.valor = valor
+            self.valor_centavos = centavos
+
+    @property
+    def valor(self) -> float:
+        """
+        Valor do adicional em reais.
+        """
+        return self.valor_centavos / 100
 
     def to_dict(self):
         """
@@ -214,19 +345,119 @@ class Adicional:
         )
 
 
+class ListaLancamentos(list):
+    """
+    Lista de pagamentos ou adicionais que mantém a soma dos valores (em centavos) sempre atualizada.
+    Inclusões somam em O(1); remoções e substituições recalculam a soma.
+    """
+    __slots__ = ("total_centavos",)
+
+    def __init__(self, itens=()):
+        super().__init__(itens)
+        self.total_centavos = sum(item.valor_centavos for item in self)
+
+    @property
+    def total(self) -> float:
+        """
+        Soma dos valores da lista em reais.
+        """
+        return self.total_centavos / 100
+
+    def append(self, item):
+        super().append(item)
+        self.total_centavos += item.valor_centavos
+
+    def extend(self, itens):
+        itens = list(itens)
+        super().extend(itens)
+        self.total_centavos += sum(item.valor_centavos for item in itens)
+
+    def __iadd__(self, itens):
+        self.extend(itens)
+        return self
+
+    def _recalcular(self):
+        """
+        Refaz a soma depois de uma alteração que não é uma simples inclusão.
+        """
+        self.total_centavos = sum(item.valor_centavos for item in self)
+
+    def insert(self, posicao, item):
+        super().insert(posicao, item)
+        self._recalcular()
+
+    def remove(self, item):
+        super().remove(item)
+        self._recalcular()
+
+    def pop(self, posicao=-1):
+        item = super().pop(posicao)
+        self._recalcular()
+        return item
+
+    def clear(self):
+        super().clear()
+        self.total_centavos = 0
+
+    def __setitem__(self, posicao, valor):
+        super().__setitem__(posicao, valor)
+        self._recalcular()
+
+    def __delitem__(self, posicao):
+        super().__delitem__(posicao)
+        self._recalcular()
+
+
 class Reserva:
     """
     Classe que gerencia as informações de reserva, conectando um Hóspede, um Quarto e um período de tempo.
     """
-    def __init__(self, hospede: Hospede, quarto: Quarto, data_entrada: date, data_saida: date, num_hospedes: int, status: str = "PENDENTE"):
+    __slots__ = ("id", "hospede", "quarto", "data_entrada", "data_saida", "num_hospedes", "status",
+                 "_pagamentos", "_adicionais", "cache_total", "versao")
+
+    def __init__(self, hospede: Hospede, quarto: Quarto, data_entrada: date, data_saida: date, num_hospedes: int, status: str = StatusReserva.PENDENTE, id: str = None):
+        self.id = id or uuid4().hex
         self.hospede = hospede
         self.quarto = quarto
         self.data_entrada = data_entrada
         self.definir_data_saida(data_saida)
         self.definir_num_hospedes(num_hospedes)
-        self.status = status
+        self.status = sys.intern(status)
         self.pagamentos: List['Pagamento'] = []
         self.adicionais: List['Adicional'] = []
+        # Último total calculado pelos serviços, junto com a chave das informações usadas no cálculo:
+        self.cache_total: Optional[tuple] = None
+        # Versão gravada no armazenamento (0 = ainda não gravada):
+        self.versao = 0
+
+    @property
+    def pagamentos(self) -> ListaLancamentos:
+        """
+        Pagamentos da reserva, com o total pago sempre atualizado.
+        """
+        return self._pagamentos
+
+    @pagamentos.setter
+    def pagamentos(self, pagamentos: List['Pagamento']):
+        self._pagamentos = ListaLancamentos(pagamentos)
+
+    @property
+    def adicionais(self) -> ListaLancamentos:
+        """
+        Consumos extras da reserva, com o total sempre atualizado.
+        """
+        return self._adicionais
+
+    @adicionais.setter
+    def adicionais(self, adicionais: List['Adicional']):
+        self._adicionais = ListaLancamentos(adicionais)
+
+    @property
+    def total_pago(self) -> float:
+        """
+        Soma dos pagamentos em reais.
+        """
+        return self._pagamentos.total
     
     def definir_data_saida(self, data_saida: date):
         """
@@ -252,8 +483,8 @@ class Reserva:
         """
         Muda o status da reserva para CONFIRMADA.
         """
-        if self.status == "PENDENTE":
-            self.status = "CONFIRMADA"
+        if self.status == StatusReserva.PENDENTE:
+            self.status = StatusReserva.CONFIRMADA
             return True
         else: 
             return False
@@ -262,9 +493,9 @@ class Reserva:
         """
         Verifica se a data está correta e muda o status para CHECKIN.
         """
-        if self.status == "CONFIRMADA" and date.today() >= self.data_entrada and date.today() <= self.data_saida:
-            self.status = "CHECKIN"
-            self.quarto.status = "OCUPADO"
+        if self.status == StatusReserva.CONFIRMADA and date.today() >= self.data_entrada and date.today() <= self.data_saida:
+            self.status = StatusReserva.CHECKIN
+            self.quarto.status = StatusQuarto.OCUPADO
             return True
         else: 
             return False
@@ -273,8 +504,8 @@ class Reserva:
         """
         Realiza o fechamento da conta e muda o status para CHECKOUT.
         """
-        if self.status == "CHECKIN":
-            self.status = "CHECKOUT"
+        if self.status == StatusReserva.CHECKIN:
+            self.status = StatusReserva.CHECKOUT
             self.quarto.liberar_quarto()
             return True
         else: 
@@ -284,8 +515,8 @@ class Reserva:
         """
         Cancela a reserva e verifica regras de multa.
         """
-        if self.status in ["PENDENTE", "CONFIRMADA"]:
-            self.status = "CANCELADA"
+        if self.status in (StatusReserva.PENDENTE, StatusReserva.CONFIRMADA):
+            self.status = StatusReserva.CANCELADA
             self.quarto.liberar_quarto()
             return True
         else: 
@@ -296,8 +527,7 @@ class Reserva:
         Calcula o valor total da reserva com base nas diárias, ajustes de temporada e adicionais.
         """
         total_diarias = self.quarto.tarifa_base * len(self)
-        total_adicionais = sum(adicional.valor for adicional in self.adicionais)
-        return total_diarias + total_adicionais
+        return total_diarias + self.adicionais.total
 
     def __len__(self) -> int:
         """
@@ -321,6 +551,7 @@ class Reserva:
         Converte a reserva em dicionário, salvando apenas os identificadores (IDs) do hóspede e do quarto, e convertendo datas para texto.
         """
         return {
+            "id": self.id,
             "hospede_documento": self.hospede.documento,
             "quarto_numero": self.quarto.numero,
             "data_entrada": self.data_entrada.isoformat(),
@@ -328,5 +559,25 @@ class Reserva:
             "num_hospedes": self.num_hospedes,
             "status": self.status,
             "pagamentos": [p.to_dict() for p in self.pagamentos],
-            "adicionais": [a.to_dict() for a in self.adicionais]
-        }
\ No newline at end of file
+            "adicionais": [a.to_dict() for a in self.adicionais],
+            "versao": self.versao
+        }
+
+    @classmethod
+    def from_dict(cls, dados, hospede: Hospede, quarto: Quarto):
+        """
+        Recria a reserva a partir dos dados salvos, ligada ao hóspede e ao quarto já carregados.
+        """
+        reserva = cls(
+            hospede = hospede,
+            quarto = quarto,
+            data_entrada = datetime.fromisoformat(dados["data_entrada"]).date(),
+            data_saida = datetime.fromisoformat(dados["data_saida"]).date(),
+            num_hospedes = dados["num_hospedes"],
+            status = dados["status"],
+            id = dados["id"]
+        )
+        reserva.pagamentos = [Pagamento.from_dict(p) for p in dados["pagamentos"]]
+        reserva.adicionais = [Adicional.from_dict(a) for a in dados["adicionais"]]
+        reserva.versao = dados.get("versao", 0)
+        return reserva
\ No newline at end of file
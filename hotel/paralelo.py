@@ -0,0 +1,83 @@
+"""
+Precificação de reservas em vários processos, usada pelo relatório financeiro no modo paralelo.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+from .models import Reserva, para_centavos
+from . import config
+
+
+# Estadia enviada aos processos: (data_entrada, data_saida, tarifa_base, total_adicionais).
+Estadia = Tuple[date, date, float, float]
+
+# Lotes enviados e ainda sem resultado, por processo: mantém os processos ocupados sem ler o histórico inteiro antes.
+LOTES_POR_PROCESSO = 2
+
+
+def _iniciar_processo(regras: Dict):
+    """
+    Carrega nos processos as mesmas regras do processo principal (necessário quando eles não são criados por fork).
+    """
+    config.regras = regras
+    config._compilar_temporadas()
+
+def _precificar_lote(estadias: Sequence[Estadia]) -> List[int]:
+    """
+    Calcula o total de cada estadia do lote, em centavos, na ordem recebida.
+    """
+    from hotel.services import _total_da_estadia
+    return [para_centavos(_total_da_estadia(*estadia)) for estadia in estadias]
+
+def estadia_da_reserva(reserva: Reserva) -> Estadia:
+    """
+    Valores da reserva usados no cálculo do total, sem os objetos (que arrastariam hóspede e histórico).
+    """
+    return (reserva.data_entrada, reserva.data_saida, reserva.quarto.tarifa_base, reserva.adicionais.total)
+
+def _montar_lotes(estadias: Iterable[Estadia], tamanho_lote: int) -> Iterator[List[Estadia]]:
+    """
+    Agrupa as estadias por mês de entrada (estadias próximas usam os mesmos segmentos de temporada)
+    e entrega cada mês assim que junta tamanho_lote estadias; os meses incompletos saem no final.
+    """
+    por_mes: Dict[Tuple[int, int], List[Estadia]] = {}
+    for estadia in estadias:
+        mes = (estadia[0].year, estadia[0].month)
+        lote = por_mes.setdefault(mes, [])
+        lote.append(estadia)
+        if len(lote) >= tamanho_lote:
+            del por_mes[mes]
+            yield lote
+    for mes in sorted(por_mes):
+        yield por_mes[mes]
+
+def somar_totais_em_paralelo(estadias: Iterable[Estadia]) -> int:
+    """
+    Soma o total das estadias em centavos, com o mesmo resultado da soma serial
+    (somas de inteiros não dependem da ordem em que os lotes terminam).
+
+    As estadias são lidas em fluxo e cada lote é enviado aos processos assim que fica pronto,
+    com no máximo LOTES_POR_PROCESSO lotes por processo aguardando.
+    """
+    processos = config.get_processos_relatorio() or os.cpu_count() or 1
+    lotes = _montar_lotes(estadias, max(1, config.get_tamanho_lote_relatorio()))
+
+    primeiro = next(lotes, None)
+    segundo = next(lotes, None)
+    if processos == 1 or segundo is None:
+        return sum(sum(_precificar_lote(lote)) for lote in filter(None, chain((primeiro, segundo), lotes)))
+
+    total = 0
+    with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_processo, initargs=(config.regras,)) as executor:
+        em_andamento = deque()
+        for lote in chain((primeiro, segundo), lotes):
+            if len(em_andamento) >= processos * LOTES_POR_PROCESSO:
+                total += sum(em_andamento.popleft().result())
+            em_andamento.append(executor.submit(_precificar_lote, lote))
+        for futuro in em_andamento:
+            total += sum(futuro.result())
+    return total
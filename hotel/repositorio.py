@@ -0,0 +1,314 @@
+"""
+Repositório em memória das entidades do sistema, com índices para busca direta.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+from .models import Hospede, Quarto, Reserva, StatusReserva, STATUS_ATIVOS, STATUS_LIBERADOS
+from .indices import ChegadasEmAberto, IndiceDisponibilidade, IndiceEntradas, MapaOcupacao
+from .agregados import AgregadoDiario
+from .inventario import CalendarioInventario
+from contextlib import contextmanager
+from datetime import date
+import threading
+
+
+class TravaLeituraEscrita:
+    """
+    Trava de leitura e escrita reentrante: várias threads leem ao mesmo tempo; quem escreve espera
+    as leituras em andamento e tem preferência sobre novas leituras.
+    Uma thread que já lê pode ler de novo e quem escreve pode ler ou escrever de novo;
+    passar de leitura para escrita não é permitido (duas threads fazendo isso travariam uma à outra).
+    """
+    def __init__(self):
+        self._condicao = threading.Condition()
+        self._leitores = 0
+        self._escritores_esperando = 0
+        self._escritor: Optional[int] = None
+        self._profundidade_escrita = 0
+        self._local = threading.local()
+
+    def lendo(self) -> bool:
+        """
+        Indica se a thread atual está dentro de uma leitura (e não é quem escreve).
+        """
+        return getattr(self._local, "leituras", 0) > 0 and self._escritor != threading.get_ident()
+
+    @contextmanager
+    def leitura(self):
+        local = self._local
+        if getattr(local, "leituras", 0) > 0 or self._escritor == threading.get_ident():
+            local.leituras = getattr(local, "leituras", 0) + 1
+            try:
+                yield
+            finally:
+                local.leituras -= 1
+            return
+
+        with self._condicao:
+            while self._escritor is not None or self._escritores_esperando:
+                self._condicao.wait()
+            self._leitores += 1
+        local.leituras = 1
+        try:
+            yield
+        finally:
+            local.leituras = 0
+            with self._condicao:
+                self._leitores -= 1
+                if self._leitores == 0:
+                    self._condicao.notify_all()
+
+    @contextmanager
+    def escrita(self):
+        eu = threading.get_ident()
+        if self.lendo():
+            raise RuntimeError("A trava de escrita não pode ser obtida dentro de uma leitura da mesma thread.")
+
+        with self._condicao:
+            if self._escritor == eu:
+                self._profundidade_escrita += 1
+            else:
+                self._escritores_esperando += 1
+                while self._escritor is not None or self._leitores:
+                    self._condicao.wait()
+                self._escritores_esperando -= 1
+                self._escritor = eu
+                self._profundidade_escrita = 1
+        try:
+            yield
+        finally:
+            with self._condicao:
+                self._profundidade_escrita -= 1
+                if self._profundidade_escrita == 0:
+                    self._escritor = None
+                    self._condicao.notify_all()
+
+
+class Repositorio:
+    """
+    Guarda as listas de quartos, hóspedes e reservas junto com os índices derivados delas.
+    As listas são sempre alteradas no lugar, para que referências externas continuem válidas.
+
+    As alterações passam pela trava do repositório (os índices têm estruturas compartilhadas entre quartos,
+    como os bitsets por dia); as buscas não usam trava.
+
+    A trava_global protege o repositório inteiro: as operações dos serviços (e as buscas da fachada
+    concorrente) leem; recarregar tudo e aplicar o que outros processos gravaram escrevem,
+    para que ninguém veja o repositório vazio ou pela metade.
+    """
+    def __init__(self):
+        self.trava = threading.RLock()
+        self.trava_global = TravaLeituraEscrita()
+        self.quartos: List[Quarto] = []
+        self.hospedes: List[Hospede] = []
+        self.reservas: List[Reserva] = []
+
+        self._quartos_por_numero: Dict[int, Quarto] = {}
+        self._hospedes_por_documento: Dict[str, Hospede] = {}
+        self._reservas_por_chave: Dict[Tuple[str, int], List[Reserva]] = {}
+        # Estadias em andamento (CHECKIN), por id da reserva:
+        self.hospedagens: Dict[str, Reserva] = {}
+        self.disponibilidade = IndiceDisponibilidade()
+        self.ocupacao = MapaOcupacao()
+        self.inventario = CalendarioInventario()
+        self.entradas = IndiceEntradas()
+        self.chegadas = ChegadasEmAberto()
+        self.agregados = AgregadoDiario()
+
+    # BUSCAS:
+
+    def buscar_quarto(self, numero: int) -> Optional[Quarto]:
+        """
+        Busca um quarto pelo número.
+        """
+        return self._quartos_por_numero.get(numero)
+
+    def buscar_hospede(self, documento: str) -> Optional[Hospede]:
+        """
+        Busca um hóspede pelo documento.
+        """
+        return self._hospedes_por_documento.get(documento)
+
+    def buscar_reserva(self, documento: str, numero: int) -> Optional[Reserva]:
+        """
+        Retorna a reserva ativa mais antiga do hóspede no quarto.
+        Se não houver nenhuma ativa, retorna a reserva mais recente.
+        """
+        reservas = self._reservas_por_chave.get((documento, numero))
+        if not reservas:
+            return None
+
+        for r in reservas:
+            if r.status in STATUS_ATIVOS:
+                return r
+        return reservas[-1]
+
+    # ALTERAÇÕES:
+
+    def adicionar_quarto(self, quarto: Quarto):
+        """
+        Registra um quarto na lista e no índice por número.
+        """
+        with self.trava:
+            self._quartos_por_numero[quarto.numero] = quarto
+            self.quartos.append(quarto)
+            self.ocupacao.registrar_quarto(quarto)
+            self.inventario.registrar_quarto(quarto)
+
+    def adicionar_hospede(self, hospede: Hospede):
+        """
+        Registra um hóspede na lista e no índice por documento.
+        """
+        with self.trava:
+            self._hospedes_por_documento[hospede.documento] = hospede
+            self.hospedes.append(hospede)
+
+    def adicionar_reserva(self, reserva: Reserva):
+        """
+        Registra uma reserva na lista e em todos os índices.
+        """
+        with self.trava:
+            self._indexar_reserva(reserva)
+            self.reservas.append(reserva)
+
+    def atualizar_reserva(self, reserva: Reserva):
+        """
+        Atualiza os índices após uma mudança de status ou de valores da reserva.
+        """
+        with self.trava:
+            if reserva.status in STATUS_LIBERADOS:
+                self.disponibilidade.remover(reserva)
+                self.ocupacao.remover(reserva)
+                self.inventario.liberar(reserva)
+            self._atualizar_hospedagem(reserva)
+            self.agregados.atualizar(reserva)
+
+    def bloquear_quarto(self, quarto: Quarto, data_inicio: date, data_fim: date, motivo: str):
+        """
+        Bloqueia as noites do quarto no modelo, no bitmap de ocupação e no inventário.
+        """
+        with self.trava:
+            quarto.bloquear_quarto(data_inicio, data_fim, motivo)
+            self.ocupacao.bloquear(quarto.numero, data_inicio, data_fim)
+            self.inventario.bloquear(quarto.numero, data_inicio, data_fim, motivo)
+
+    # ALTERAÇÕES GRAVADAS POR OUTROS PROCESSOS:
+
+    def sincronizar_quarto(self, gravado: Quarto) -> Quarto:
+        """
+        Aplica a versão de um quarto gravada por outro processo: inclui o quarto novo ou
+        copia status e bloqueios novos para o quarto da memória.
+        """
+        with self.trava:
+            quarto = self._quartos_por_numero.get(gravado.numero)
+            if quarto is None:
+                self.adicionar_quarto(gravado)
+                return gravado
+
+            # Bloqueios só são acrescentados:
+            for inicio, fim, motivo in gravado.bloqueios[len(quarto.bloqueios):]:
+                self.bloquear_quarto(quarto, inicio, fim, motivo)
+            quarto.tarifa_centavos = gravado.tarifa_centavos
+            quarto.status = gravado.status
+            quarto.versao = gravado.versao
+            return quarto
+
+    def sincronizar_hospede(self, gravado: Hospede) -> Hospede:
+        """
+        Aplica a versão de um hóspede gravada por outro processo (cadastro novo ou dados de contato).
+        """
+        with self.trava:
+            hospede = self._hospedes_por_documento.get(gravado.documento)
+            if hospede is None:
+                self.adicionar_hospede(gravado)
+                return gravado
+
+            hospede.nome, hospede.email, hospede.telefone = gravado.nome, gravado.email, gravado.telefone
+            hospede.versao = gravado.versao
+            return hospede
+
+    def sincronizar_reserva(self, gravada: Reserva, incluir: bool = True) -> Optional[Reserva]:
+        """
+        Aplica a versão de uma reserva gravada por outro processo: copia status e lançamentos para a reserva
+        da memória com o mesmo id e atualiza os índices. Uma reserva que não está na memória só é incluída com incluir=True.
+        """
+        with self.trava:
+            chave = (gravada.hospede.documento, gravada.quarto.numero)
+            reserva = next((r for r in self._reservas_por_chave.get(chave, ()) if r.id == gravada.id), None)
+            if reserva is None:
+                if not incluir:
+                    return None
+                self.adicionar_reserva(gravada)
+                gravada.hospede.historico_reservas.append(gravada)
+                return gravada
+
+            reserva.status = gravada.status
+            reserva.num_hospedes = gravada.num_hospedes
+            reserva.pagamentos = gravada.pagamentos
+            reserva.adicionais = gravada.adicionais
+            reserva.versao = gravada.versao
+            self.atualizar_reserva(reserva)
+            return reserva
+
+    def carregar(self, quartos: Iterable[Quarto], hospedes: Iterable[Hospede], reservas: Iterable[Reserva]):
+        """
+        Substitui todo o conteúdo do repositório e reconstrói os índices.
+        """
+        with self.trava:
+            self.limpar()
+            for q in quartos:
+                self.adicionar_quarto(q)
+            for h in hospedes:
+                self.adicionar_hospede(h)
+            for r in reservas:
+                self._reservas_por_chave.setdefault((r.hospede.documento, r.quarto.numero), []).append(r)
+                self.reservas.append(r)
+                self._atualizar_hospedagem(r)
+            self.disponibilidade.reconstruir(self.reservas)
+            for r in self.reservas:
+                self.ocupacao.adicionar(r)
+                self.inventario.ocupar(r)
+            self.entradas.reconstruir(self.reservas)
+
+    def limpar(self):
+        """
+        Esvazia as listas e os índices.
+        """
+        with self.trava:
+            self.quartos.clear()
+            self.hospedes.clear()
+            self.reservas.clear()
+            self._quartos_por_numero.clear()
+            self._hospedes_por_documento.clear()
+            self._reservas_por_chave.clear()
+            self.hospedagens.clear()
+            self.disponibilidade.limpar()
+            self.ocupacao.limpar()
+            self.inventario.limpar()
+            self.entradas.limpar()
+            self.chegadas.limpar()
+            self.agregados.limpar()
+
+    def _indexar_reserva(self, reserva: Reserva):
+        """
+        Inclui a reserva nos índices por (documento, quarto), de hospedagens e chegadas em aberto, de disponibilidade, no bitmap de ocupação, no inventário, nas entradas e nos agregados diários.
+        """
+        chave = (reserva.hospede.documento, reserva.quarto.numero)
+        self._reservas_por_chave.setdefault(chave, []).append(reserva)
+        self._atualizar_hospedagem(reserva)
+        self.disponibilidade.adicionar(reserva)
+        self.ocupacao.adicionar(reserva)
+        self.inventario.ocupar(reserva)
+        self.entradas.adicionar(reserva)
+        self.agregados.atualizar(reserva)
+
+    def _atualizar_hospedagem(self, reserva: Reserva):
+        """
+        Mantém no índice de hospedagens apenas as reservas com status CHECKIN
+        e no de chegadas apenas as que ainda podem chegar.
+        """
+        if reserva.status == StatusReserva.CHECKIN:
+            self.hospedagens[reserva.id] = reserva
+        else:
+            self.hospedagens.pop(reserva.id, None)
+        self.chegadas.atualizar(reserva)
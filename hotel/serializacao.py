@@ -0,0 +1,141 @@
+"""
+Serialização JSON dos arquivos de dados e do journal.
+
+O orjson ou o msgspec são usados quando instalados; sem eles, o json da biblioteca padrão.
+A saída é JSON compacto em UTF-8; a indentação é opcional (persistencia.json_formatado),
+só para quem precisa ler os arquivos à mão. Os três backends leem os arquivos uns dos outros.
+"""
+
+import json
+from typing import Any, List, Optional, TypedDict, Union
+from .config import Cores
+from hotel import config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+# Ordem de preferência quando persistencia.serializador é "auto":
+BACKENDS = ("orjson", "msgspec", "json")
+
+
+# ESQUEMAS DOS ARQUIVOS (validados na leitura pelo msgspec):
+
+class PagamentoDict(TypedDict):
+    valor: float
+    forma: str
+    data: str
+
+class AdicionalDict(TypedDict):
+    descricao: str
+    valor: float
+
+class BloqueioDict(TypedDict):
+    inicio: str
+    fim: str
+    motivo: str
+
+class _QuartoObrigatorio(TypedDict):
+    numero: int
+    tipo: str
+    capacidade: int
+    tarifa_base: float
+    status: str
+
+class QuartoDict(_QuartoObrigatorio, total=False):
+    bloqueios: List[BloqueioDict]
+    versao: int
+
+class _HospedeObrigatorio(TypedDict):
+    nome: str
+    documento: str
+    email: str
+    telefone: str
+
+class HospedeDict(_HospedeObrigatorio, total=False):
+    versao: int
+
+class _ReservaObrigatoria(TypedDict):
+    hospede_documento: str
+    quarto_numero: int
+    data_entrada: str
+    data_saida: str
+    num_hospedes: int
+    status: str
+    pagamentos: List[PagamentoDict]
+    adicionais: List[AdicionalDict]
+
+class ReservaDict(_ReservaObrigatoria, total=False):
+    id: str  # Ausente em arquivos antigos
+    versao: int
+
+ESQUEMAS = {"quartos": List[QuartoDict], "hospedes": List[HospedeDict], "reservas": List[ReservaDict]}
+
+
+# ESCOLHA DO BACKEND:
+
+def backends_disponiveis() -> List[str]:
+    """
+    Backends instalados, na ordem de preferência.
+    """
+    instalados = {"orjson": orjson is not None, "msgspec": msgspec is not None, "json": True}
+    return [nome for nome in BACKENDS if instalados[nome]]
+
+def backend_atual() -> str:
+    """
+    Backend configurado em persistencia.serializador ("auto" escolhe o primeiro instalado).
+    """
+    escolhido = config.get_serializador()
+    disponiveis = backends_disponiveis()
+    if escolhido == "auto":
+        return disponiveis[0]
+    if escolhido not in BACKENDS:
+        raise ValueError(f"{Cores.VERMELHO}Serializador desconhecido: {escolhido} (use auto, {', '.join(BACKENDS)}).{Cores.RESET}")
+    if escolhido not in disponiveis:
+        raise ImportError(f"{Cores.VERMELHO}O serializador {escolhido} não está instalado (pip install {escolhido}).{Cores.RESET}")
+    return escolhido
+
+
+# CODIFICAÇÃO E DECODIFICAÇÃO:
+
+def codificar(dados: Any, formatado: Optional[bool] = None, backend: Optional[str] = None) -> bytes:
+    """
+    Converte os dados em JSON (UTF-8). Compacto por padrão; formatado usa o valor de persistencia.json_formatado.
+    O JSON formatado usa 2 espaços (a única indentação do orjson) e sai igual em todos os backends.
+    O JSON compacto nunca tem quebras de linha, então serve também para uma linha do journal.
+    """
+    backend = backend or backend_atual()
+    if formatado is None:
+        formatado = config.get_json_formatado()
+
+    if backend == "orjson":
+        return orjson.dumps(dados, option=orjson.OPT_INDENT_2 if formatado else 0)
+    if backend == "msgspec":
+        texto = msgspec.json.encode(dados)
+        return msgspec.json.format(texto, indent=2) if formatado else texto
+    if formatado:
+        return json.dumps(dados, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(dados, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def decodificar(conteudo: Union[bytes, str], esquema: Optional[str] = None, backend: Optional[str] = None) -> Any:
+    """
+    Lê um documento JSON. Com o msgspec, `esquema` ("quartos", "hospedes" ou "reservas") valida a estrutura
+    na própria leitura. Erros de sintaxe ou de esquema viram ValueError em todos os backends.
+    """
+    backend = backend or backend_atual()
+
+    if backend == "orjson":
+        return orjson.loads(conteudo)  # orjson.JSONDecodeError já é um ValueError
+    if backend == "msgspec":
+        try:
+            return msgspec.json.decode(conteudo, type=ESQUEMAS[esquema] if esquema else Any)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+    return json.loads(conteudo)
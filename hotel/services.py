@@ -2,45 +2,105 @@
 Implementa as regras de negócio e operações principais do Sistema de Reservas de Hotel.
 """
 
-from .models import Pessoa, Hospede, Quarto, QuartoLuxo, Pagamento, Adicional, Reserva
-from hotel.data import salvar_dados, carregar_dados
+from .models import Pessoa, Hospede, Quarto, QuartoLuxo, Pagamento, Adicional, Reserva, ConflitoVersao, para_centavos, STATUS_ATIVOS
+from hotel.armazenamento import Armazenamento, criar_armazenamento
+from hotel.repositorio import Repositorio
 from hotel import config
 from datetime import datetime, date, timedelta
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from .config import Cores
-from time import sleep
+from functools import partial, wraps
+from contextlib import contextmanager
+import random
+import threading
+import time
 
 
 # PERSISTÊNCIA TEMPORÁRIA EM MEMÓRIA: 
 
-quartos_db: List[Quarto] = []
-hospedes_db: List[Hospede] = []
-reservas_db: List[Reserva] = []
+repositorio = Repositorio()
+
+# Atalhos para as listas do repositório (sempre alteradas no lugar):
+quartos_db: List[Quarto] = repositorio.quartos
+hospedes_db: List[Hospede] = repositorio.hospedes
+reservas_db: List[Reserva] = repositorio.reservas
+
+# Backend de persistência escolhido no settings.json (criado sob demanda):
+armazenamento: Optional[Armazenamento] = None
+
+# Indica que só as reservas ativas foram carregadas e o histórico continua no disco:
+historico_lazy = False
+
+# Entidades acumuladas, por thread, enquanto a gravação está adiada (ver adiar_persistencia):
+_gravacao_adiada = threading.local()
+
+# Serializa o acesso ao backend (journal, compactação e conexão do SQLite) entre threads:
+_trava_persistencia = threading.RLock()
+
+# Quantas vezes uma operação é refeita quando outro processo grava as mesmas entidades antes dela:
+TENTATIVAS_EM_CONFLITO = 5
+
+# Trabalho que exige a trava global em escrita, pedido dentro de uma operação e feito por sincronizar():
+_recarga_pendente = False        # a memória precisa ser recarregada do armazenamento
+_compactacao_pendente = False    # o journal passou do limite e deve virar um snapshot
+_externas_pendentes: List[Tuple[str, dict]] = []  # alterações de outros processos já lidas, na ordem do journal
+
+
+# CONCORRÊNCIA ENTRE PROCESSOS:
+
+def repetir_em_conflito(operacao):
+    """
+    Decorador das operações que alteram dados: cada tentativa parte do estado mais novo do armazenamento
+    e, se a gravação for recusada por ConflitoVersao (outro processo gravou antes), a memória é recarregada
+    e a operação é refeita, com uma pequena espera aleatória. As regras de negócio são validadas de novo a cada tentativa.
+
+    A operação roda com a trava global do repositório em leitura; a recarga e a sincronização, que precisam
+    dela em escrita, acontecem entre as tentativas. Uma operação chamada dentro de outra roda direto,
+    e quem repete é a de fora.
+    """
+    trava = repositorio.trava_global
+
+    @wraps(operacao)
+    def executar(*args, **kwargs):
+        if trava.lendo():
+            return operacao(*args, **kwargs)
+
+        for tentativa in range(TENTATIVAS_EM_CONFLITO):
+            sincronizar()
+            try:
+                with trava.leitura():
+                    resultado = operacao(*args, **kwargs)
+            except ConflitoVersao:
+                if tentativa == TENTATIVAS_EM_CONFLITO - 1:
+                    sincronizar()
+                    raise
+                time.sleep(random.uniform(0, 0.002 * (tentativa + 1)))
+                continue
+            # persistir() já leu o armazenamento: só falta aplicar o que ficou pendente.
+            if _recarga_pendente or _externas_pendentes or _compactacao_pendente:
+                sincronizar()
+            return resultado
+    return executar
 
 
 # FUNCÕES DE BUSCA:
 
 def buscar_quarto(numero: int) -> Optional[Quarto]:
     """
-    Busca um quarto na lista pelo número.
+    Busca um quarto pelo número.
     """
-    for q in quartos_db:
-        if q.numero == numero:
-            return q
-    return None
+    return repositorio.buscar_quarto(numero)
 
 def buscar_hospede(documento: str) -> Optional[Hospede]:
     """
-    Busca um hóspede na lista pelo documento.
+    Busca um hóspede pelo documento.
     """
-    for h in hospedes_db:
-        if h.documento == documento:
-            return h
-    return None
+    return repositorio.buscar_hospede(documento)
 
 
 # FUNÇÕES DE CADASTRO (CRUD):
 
+@repetir_em_conflito
 def cadastrar_quarto(numero: int, tipo: str, capacidade: int, tarifa_base: float) -> Quarto:
     """
     Verifica se o quarto já existe e o cadastra se não existir.
@@ -50,9 +110,11 @@ def cadastrar_quarto(numero: int, tipo: str, capacidade: int, tarifa_base: float
     
     novo_quarto = Quarto(numero, tipo, capacidade, tarifa_base)
     
-    quartos_db.append(novo_quarto)
+    repositorio.adicionar_quarto(novo_quarto)
+    persistir(novo_quarto)
     return novo_quarto
 
+@repetir_em_conflito
 def cadastrar_hospede(nome: str, documento: str, email: str, telefone: str) -> Hospede:
     """
     Verifica se o hóspede já existe e o cadastra se não existir.
@@ -61,7 +123,8 @@ def cadastrar_hospede(nome: str, documento: str, email: str, telefone: str) -> H
         raise ValueError(f"{Cores.VERMELHO}Erro: Hóspede com documento {documento} já está cadastrado.{Cores.RESET}")
         
     novo_hospede = Hospede(nome, documento, email, telefone)
-    hospedes_db.append(novo_hospede)
+    repositorio.adicionar_hospede(novo_hospede)
+    persistir(novo_hospede)
     return novo_hospede
 
 
@@ -71,12 +134,31 @@ def _verificar_disponibilidade(numero_quarto: int, data_inicio: date, data_fim:
     """
     Verifica se o quarto está livre no período solicitado.
     """
-    for r in reservas_db:
-        if r.quarto.numero == numero_quarto and r.status != "CANCELADA":
-            if data_inicio < r.data_saida and data_fim > r.data_entrada:
-                return False
-    return True
+    return repositorio.disponibilidade.esta_livre(numero_quarto, data_inicio, data_fim)
+
+def buscar_quartos_disponiveis(data_entrada: date, data_saida: date, num_hospedes: int, tipo: Optional[str] = None) -> List[Tuple[Quarto, float]]:
+    """
+    Lista os quartos livres no período que comportam os hóspedes (opcionalmente de um tipo),
+    cada um com o valor cotado da estadia, do mais barato para o mais caro.
+    Quartos com alguma noite bloqueada no período ficam de fora.
+    """
+    if data_saida <= data_entrada:
+        raise ValueError(f"{Cores.VERMELHO}A data de saída deve ser posterior à data de entrada.{Cores.RESET}")
+
+    opcoes = []
+    # Quartos com a mesma tarifa têm a mesma cotação no período (em geral, todos os de um tipo):
+    cotacoes: Dict[float, float] = {}
+    for quarto in repositorio.ocupacao.livres(data_entrada, data_saida, tipo):
+        if quarto.capacidade >= num_hospedes:
+            valor = cotacoes.get(quarto.tarifa_base)
+            if valor is None:
+                valor = cotacoes[quarto.tarifa_base] = _total_da_estadia(data_entrada, data_saida, quarto.tarifa_base, 0.0)
+            opcoes.append((quarto, valor))
 
+    opcoes.sort(key=lambda opcao: (opcao[1], opcao[0].numero))
+    return opcoes
+
+@repetir_em_conflito
 def realizar_reserva(doc_hospede: str, num_quarto: int, data_entrada: date, data_saida: date, num_hospedes: int) -> Reserva:
     """
     Tenta criar uma reserva vinculando um hóspede e um quarto.
@@ -92,16 +174,49 @@ def realizar_reserva(doc_hospede: str, num_quarto: int, data_entrada: date, data
     if not _verificar_disponibilidade(num_quarto, data_entrada, data_saida):
         raise ValueError(f"{Cores.VERMELHO}O Quarto {num_quarto} já está ocupado neste período!{Cores.RESET}")
 
+    if repositorio.inventario.periodo_bloqueado(num_quarto, data_entrada, data_saida):
+        raise ValueError(f"{Cores.VERMELHO}O Quarto {num_quarto} está bloqueado neste período!{Cores.RESET}")
+
     if num_hospedes > quarto.capacidade:
         raise ValueError(f"{Cores.VERMELHO}Capacidade excedida. O quarto comporta {quarto.capacidade} pessoas.{Cores.RESET}")
     
     nova_reserva = Reserva(hospede, quarto, data_entrada, data_saida, num_hospedes)
     
-    reservas_db.append(nova_reserva)
+    repositorio.adicionar_reserva(nova_reserva)
     hospede.historico_reservas.append(nova_reserva)
+    persistir(nova_reserva)
     
     return nova_reserva
 
+@repetir_em_conflito
+def bloquear_quarto(num_quarto: int, data_inicio: date, data_fim: date, motivo: str):
+    """
+    Bloqueia as noites [data_inicio, data_fim) do quarto (ex: manutenção), desde que não haja estadia marcada no período.
+    """
+    quarto = buscar_quarto(num_quarto)
+    if not quarto:
+        raise ValueError(f"{Cores.VERMELHO}Erro: Quarto não encontrado.{Cores.RESET}")
+
+    if not _verificar_disponibilidade(num_quarto, data_inicio, data_fim):
+        raise ValueError(f"{Cores.VERMELHO}O Quarto {num_quarto} tem reservas neste período. Cancele-as antes de bloquear.{Cores.RESET}")
+
+    repositorio.bloquear_quarto(quarto, data_inicio, data_fim, motivo)
+    persistir(quarto)
+    print(f"{Cores.VERDE}Quarto {num_quarto} bloqueado de {data_inicio.strftime('%d/%m/%Y')} a {data_fim.strftime('%d/%m/%Y')} ({motivo}).{Cores.RESET}")
+
+def quartos_restantes(tipo: str, dia: date) -> int:
+    """
+    Quantos quartos do tipo ainda podem ser vendidos na noite do dia.
+    """
+    return repositorio.inventario.disponiveis(tipo, dia)
+
+def disponibilidade_por_tipo(data_inicio: date, data_fim: date) -> Dict[date, Dict[str, int]]:
+    """
+    Quartos disponíveis por tipo em cada noite de [data_inicio, data_fim).
+    """
+    return repositorio.inventario.disponiveis_no_periodo(data_inicio, data_fim)
+
+@repetir_em_conflito
 def confirmar_reserva(doc_hospede: str, num_quarto: int):
     """
     Busca uma reserva PENDENTE e muda para CONFIRMADA.
@@ -115,11 +230,13 @@ def confirmar_reserva(doc_hospede: str, num_quarto: int):
         raise ValueError(f"{Cores.VERMELHO}Apenas reservas PENDENTES podem ser confirmadas. Status atual: {reserva.status}{Cores.RESET}")
 
     if reserva.confirmar():
-        salvar_tudo()
+        repositorio.atualizar_reserva(reserva)
+        persistir(reserva)
         print(f"{Cores.VERDE}Reserva confirmada com sucesso para {reserva.hospede.nome}!{Cores.RESET}")
     else:
         raise ValueError(f"{Cores.VERMELHO}Não foi possível confirmar a reserva.{Cores.RESET}")
 
+@repetir_em_conflito
 def cancelar_reserva(doc_hospede: str, num_quarto: int):
     """
     Cancela uma reserva e aplica multa se estiver fora do prazo.
@@ -157,11 +274,15 @@ def cancelar_reserva(doc_hospede: str, num_quarto: int):
         print("Cancelamento dentro do prazo. Sem multa.")
 
     reserva.cancelar()
+    repositorio.atualizar_reserva(reserva)
+    persistir(reserva, reserva.quarto)
     print(f"{Cores.VERDE}Reserva cancelada com sucesso e quarto liberado.{Cores.RESET}")
 
-def realizar_noshow(doc_hospede: str, num_quarto: int):
+@repetir_em_conflito
+def realizar_noshow(doc_hospede: str, num_quarto: int, forcar: bool = False):
     """
     Registra o não-comparecimento, aplica multa total e cancela a reserva.
+    Dentro do prazo de tolerância só registra com forcar=True (a confirmação fica a cargo da interface).
     """
     reserva = buscar_reserva(doc_hospede, num_quarto)
     
@@ -171,20 +292,31 @@ def realizar_noshow(doc_hospede: str, num_quarto: int):
     if reserva.status != "CONFIRMADA":
         raise ValueError(f"{Cores.VERMELHO}Apenas reservas CONFIRMADAS podem sofrer No-Show. Status atual: {reserva.status}.{Cores.RESET}")
 
+    data_limite = limite_noshow(reserva)
+    if datetime.now() < data_limite and not forcar:
+        raise ValueError(f"{Cores.VERMELHO}Ainda está dentro do prazo de tolerância (Limite: {data_limite}).{Cores.RESET}")
+
+    valor_multa = _aplicar_noshow(reserva)
+    persistir(reserva, reserva.quarto)
+    
+    print(f"No-Show registrado para {reserva.hospede.nome}.")
+    print(f"Multa aplicada: R$ {valor_multa:.2f}")
+
+def limite_noshow(reserva: Reserva) -> datetime:
+    """
+    Momento a partir do qual a reserva pode ser marcada como No-Show (14h do dia de entrada + tolerância).
+    """
     horarios = config.get_horarios()
     tolerancia_min = horarios.get("tolerancia_noshow_minutos", 60)
     
     data_limite = datetime.combine(reserva.data_entrada, datetime.min.time())
-    data_limite = data_limite.replace(hour=14) + timedelta(minutes=tolerancia_min)
-    
-    agora = datetime.now()
-    
-    if agora < data_limite:
-        print(f"Atenção: Ainda está dentro do prazo de tolerância (Limite: {data_limite}).")
-        confirmacao = input("Deseja registrar o No-Show mesmo assim? (S/N): ")
-        if confirmacao.upper() != 'S':
-            return
+    return data_limite.replace(hour=14) + timedelta(minutes=tolerancia_min)
 
+def _aplicar_noshow(reserva: Reserva) -> float:
+    """
+    Lança a multa de No-Show, muda o status, libera o quarto e atualiza os índices, sem gravar.
+    Retorna o valor da multa.
+    """
     multa_pct = config.get_multa_noshow()
     valor_total = calcular_total_reserva(reserva)
     valor_multa = valor_total * multa_pct
@@ -192,43 +324,77 @@ def realizar_noshow(doc_hospede: str, num_quarto: int):
     reserva.adicionais.append(Adicional("Multa NO-SHOW", valor_multa))
     reserva.status = "NO_SHOW"
     reserva.quarto.liberar_quarto()
-    
-    print(f"No-Show registrado para {reserva.hospede.nome}.")
-    print(f"Multa aplicada: R$ {valor_multa:.2f}")
+    repositorio.atualizar_reserva(reserva)
+    return valor_multa
 
 
 # CÁLCULO DE VALORES E TARIFAS:
 
 def calcular_total_reserva(reserva: Reserva) -> float:
     """
-    Calcula o valor final da reserva percorrendo dia a dia e aplicando
-    as regras de temporada e fim de semana.
+    Calcula o valor final da reserva dividindo a estadia em segmentos
+    de temporada e aplicando as regras de temporada e fim de semana.
     Soma também os adicionais e aplica a taxa de serviço.
+
+    O resultado fica guardado na reserva e só é recalculado quando mudam
+    as datas, a tarifa do quarto, os adicionais ou as configurações.
     """
-    total_diarias = 0.0
-    dia_atual = reserva.data_entrada
-    
-    # LOOP: Percorre do dia da entrada até o dia da saída
-    while dia_atual < reserva.data_saida:
-        # Usa a função que já criamos para saber o preço daquele dia específico
-        valor_do_dia = calcular_valor_diaria(dia_atual, reserva.quarto.tarifa_base)
-        total_diarias += valor_do_dia
-        
-        # Avança para o próximo dia
-        dia_atual += timedelta(days=1)
-    
-    # Soma os consumos extras
-    total_adicionais = sum(item.valor for item in reserva.adicionais)
-    
-    subtotal = total_diarias + total_adicionais
+    chave = (reserva.data_entrada, reserva.data_saida, reserva.quarto.tarifa_centavos,
+             reserva.adicionais.total_centavos, config.versao)
+    if reserva.cache_total is not None and reserva.cache_total[0] == chave:
+        return reserva.cache_total[1]
+
+    total_final = _total_da_estadia(reserva.data_entrada, reserva.data_saida,
+                                    reserva.quarto.tarifa_base, reserva.adicionais.total)
     
-    # Aplica Taxa de Serviço (ex: 10%) definida no settings.json
+    reserva.cache_total = (chave, total_final)
+    return total_final
+
+def _total_da_estadia(data_entrada: date, data_saida: date, tarifa_base: float, total_adicionais: float) -> float:
+    """
+    Diárias do período + adicionais + taxa de serviço.
+    Usado também pelos processos do relatório paralelo, que recebem só esses valores.
+    """
+    total_diarias = _somar_diarias(data_entrada, data_saida, tarifa_base)
+    return _com_taxa_de_servico(total_diarias + total_adicionais)
+
+def _com_taxa_de_servico(subtotal: float) -> float:
+    """
+    Aplica a Taxa de Serviço (ex: 10%) definida no settings.json.
+    """
     taxa_servico_pct = config.get_taxa_servico() # ex: 0.10
     valor_taxa = subtotal * taxa_servico_pct
-    
-    total_final = subtotal + valor_taxa
-    
-    return total_final
+    return subtotal + valor_taxa
+
+def _totais_acumulados(data_entrada: date, data_saida: date, tarifa_base: float, total_adicionais: float) -> List[float]:
+    """
+    _total_da_estadia de data_entrada até cada noite da estadia: a posição k vale
+    _total_da_estadia(data_entrada, data_entrada + k dias, ...), com as mesmas operações de _somar_diarias
+    e _com_taxa_de_servico (e portanto o mesmo float), calculado em uma passada só. Usado pelos agregados diários.
+    """
+    mult_fds = config.get_multiplicador_fim_de_semana()
+    taxa_servico_pct = config.get_taxa_servico()
+
+    subtotal = 0.0 + total_adicionais
+    acumulados = [subtotal + subtotal * taxa_servico_pct]
+    total = 0.0
+    for seg_inicio, seg_fim, mult_temp in _segmentos_temporada(data_entrada, data_saida):
+        diaria = tarifa_base * mult_temp
+        diaria_fds = diaria * mult_fds
+        dia_semana = seg_inicio.weekday()
+        noites = noites_fds = 0
+        for _ in range((seg_fim - seg_inicio).days):
+            noites += 1
+            if dia_semana >= 5:
+                noites_fds += 1
+            dia_semana = (dia_semana + 1) % 7
+            subtotal = total + diaria * (noites - noites_fds)
+            subtotal += diaria_fds * noites_fds
+            subtotal += total_adicionais
+            acumulados.append(subtotal + subtotal * taxa_servico_pct)
+        total += diaria * (noites - noites_fds)
+        total += diaria_fds * noites_fds
+    return acumulados
 
 
 # FLUXO DA ESTADIA (CHECK-IN / CHECK-OUT):
@@ -236,12 +402,11 @@ def calcular_total_reserva(reserva: Reserva) -> float:
 def buscar_reserva(hospede_doc: str, quarto_num: int) -> Optional[Reserva]:
     """
     Busca uma reserva ativa pelo documento do hóspede e número do quarto.
+    Sem reserva ativa, retorna a mais recente daquele hóspede no quarto.
     """
-    for r in reservas_db:
-        if r.hospede.documento == hospede_doc and r.quarto.numero == quarto_num:
-            return r
-    return None
+    return repositorio.buscar_reserva(hospede_doc, quarto_num)
 
+@repetir_em_conflito
 def realizar_checkin(doc_hospede: str, num_quarto: int):
     """
     Busca a reserva e tenta fazer o check-in, atualizando o status do quarto.
@@ -252,14 +417,16 @@ def realizar_checkin(doc_hospede: str, num_quarto: int):
         raise ValueError(f"{Cores.VERMELHO}Reserva não encontrada para este hóspede/quarto.{Cores.RESET}")
     
     if reserva.checkin():
+        repositorio.atualizar_reserva(reserva)
         quarto_real = buscar_quarto(num_quarto)
         if quarto_real:
             quarto_real.status = "OCUPADO"
         
-        salvar_tudo()
+        persistir(reserva, reserva.quarto)
     else:
         raise ValueError(f"{Cores.VERMELHO}Não foi possível realizar o check-in (Verifique se a reserva está CONFIRMADA).{Cores.RESET}")
 
+@repetir_em_conflito
 def realizar_checkout(doc_hospede: str, num_quarto: int):
     """
     Busca a reserva, calcula total, verifica pagamento e libera o quarto.
@@ -270,7 +437,7 @@ def realizar_checkout(doc_hospede: str, num_quarto: int):
         raise ValueError(f"{Cores.VERMELHO}Reserva não encontrada para este hóspede/quarto.{Cores.RESET}")
     
     total_conta = calcular_total_reserva(reserva)
-    total_pago = sum(p.valor for p in reserva.pagamentos)
+    total_pago = reserva.total_pago
     
     print(f"\n--- FECHAMENTO DE CONTA ---")
     print(f"Total da Hospedagem: R$ {total_conta:.2f}")
@@ -281,11 +448,12 @@ def realizar_checkout(doc_hospede: str, num_quarto: int):
         raise ValueError(f"{Cores.VERMELHO}Conta pendente! Faltam R$ {faltando:.2f} para liberar a saída.{Cores.RESET}")
     
     if reserva.checkout():
+        repositorio.atualizar_reserva(reserva)
         quarto_real = buscar_quarto(num_quarto)
         if quarto_real:
             quarto_real.status = "DISPONIVEL"
             
-        salvar_tudo()
+        persistir(reserva, reserva.quarto)
         
         print(f"{Cores.VERDE}Check-out realizado com sucesso! Quarto {num_quarto} liberado.{Cores.RESET}")
     else:
@@ -294,6 +462,7 @@ def realizar_checkout(doc_hospede: str, num_quarto: int):
 
 # TRANSAÇÕES FINANCEIRAS:
 
+@repetir_em_conflito
 def registrar_pagamento(doc_hospede: str, num_quarto: int, valor: float, forma: str):
     """
     Registra um pagamento para a reserva especificada e salva no banco.
@@ -305,8 +474,9 @@ def registrar_pagamento(doc_hospede: str, num_quarto: int, valor: float, forma:
     pagamento = Pagamento(valor, forma)
     reserva.pagamentos.append(pagamento)
     
-    salvar_tudo() 
+    persistir(reserva)
 
+@repetir_em_conflito
 def registrar_adicional(doc_hospede: str, num_quarto: int, descricao: str, valor: float):
     """
     Lança um consumo extra e salva no banco.
@@ -317,32 +487,38 @@ def registrar_adicional(doc_hospede: str, num_quarto: int, descricao: str, valor
 
     adicional = Adicional(descricao, valor)
     reserva.adicionais.append(adicional)
+    repositorio.atualizar_reserva(reserva)
     
-    salvar_tudo()
+    persistir(reserva)
 
 
 # PERSISTÊNCIA DE DADOS:
 
-def inicializar_sistema():
+def inicializar_sistema(dados_exemplo: bool = True):
     """
     Carrega os dados salvos ao iniciar o sistema.
+    Com dados_exemplo=True, um sistema vazio recebe quartos e um hóspede de exemplo.
     """
-    global quartos_db, hospedes_db, reservas_db
-    quartos_db, hospedes_db, reservas_db = carregar_dados()
+    global armazenamento, historico_lazy
+    if armazenamento is not None:
+        armazenamento.fechar()
+    armazenamento = criar_armazenamento()
+    historico_lazy = config.get_carregamento_lazy()
+    _recarregar()
 
     # Dados de Seed:
-    if len(quartos_db) == 0:
+    if dados_exemplo and len(quartos_db) == 0:
         print(f"{Cores.AMARELO}Sistema vazio detectado. Criando dados de exemplo para teste...{Cores.RESET}")
-        sleep(3)
         
         q1 = Quarto(101, "SIMPLES", 1, 100.0)
         q2 = Quarto(201, "DUPLO", 2, 150.0)
         q3 = Quarto(401, "LUXO", 2, 300.0)
         
-        quartos_db.extend([q1, q2, q3])
+        for q in (q1, q2, q3):
+            repositorio.adicionar_quarto(q)
         
         h1 = Hospede("Jayr Alencar", "000.000.000-00", "jayr@ufca.edu.br", "(88) 99999-9999")
-        hospedes_db.append(h1)
+        repositorio.adicionar_hospede(h1)
         
         salvar_tudo()
             
@@ -350,9 +526,210 @@ def inicializar_sistema():
 
 def salvar_tudo():
     """
-    Salva o estado atual das listas nos arquivos JSON.
+    Salva o estado atual completo das listas no backend configurado.
+    Antes, sob a trava do armazenamento, traz para a memória o que outros processos gravaram,
+    para que o snapshot não apague as alterações deles.
+    Usa a trava global em escrita: nenhuma operação altera as listas no meio do snapshot.
+    Se o backend recusar a gravação por ConflitoVersao, a memória será recarregada no próximo sincronizar().
+    """
+    global _recarga_pendente, _compactacao_pendente
+    with repositorio.trava_global.escrita(), _trava_persistencia:
+        backend = _obter_armazenamento()
+        with backend.travar():
+            _coletar_alteracoes_externas(backend)
+            _aplicar_pendencias()
+            try:
+                backend.salvar_tudo(quartos_db, hospedes_db, reservas_db)
+            except ConflitoVersao:
+                _recarga_pendente = True
+                raise
+        _compactacao_pendente = False
+
+def iterar_reservas(data_inicio: Optional[date] = None, data_fim: Optional[date] = None,
+                    status: Optional[Iterable[str]] = None) -> Iterator[Reserva]:
+    """
+    Percorre todas as reservas: as da memória e, no carregamento lazy,
+    o histórico lido do disco sob demanda (sem repetir as que já estão na memória).
+
+    Os filtros opcionais (data de entrada em [data_inicio, data_fim) e status) usam o índice
+    de entradas na memória e são repassados ao backend para o histórico. Quando só status ativos
+    são pedidos, a memória é lida dos índices de chegadas em aberto e de hospedagens, em ordem de entrada.
+    """
+    status_aceitos = set(status) if status is not None else None
+
+    if status_aceitos is not None and status_aceitos <= set(STATUS_ATIVOS):
+        em_memoria = _ativas_por_entrada(data_inicio, data_fim, status_aceitos)
+    elif data_inicio is None and data_fim is None:
+        em_memoria = reservas_db
+    else:
+        em_memoria = repositorio.entradas.entre(data_inicio, data_fim)
+
+    for r in em_memoria:
+        if status_aceitos is None or r.status in status_aceitos:
+            yield r
+    yield from _iterar_historico_fora_da_memoria(data_inicio, data_fim, status_aceitos)
+
+def _ativas_por_entrada(data_inicio: Optional[date], data_fim: Optional[date], status: set) -> List[Reserva]:
+    """
+    Reservas com entrada em [data_inicio, data_fim) tiradas só dos índices de chegadas em aberto
+    (PENDENTE e CONFIRMADA) e de hospedagens (CHECKIN), sem percorrer o histórico. O status é conferido depois.
+    """
+    ativas = []
+    if status & set(repositorio.chegadas.EM_ABERTO):
+        ativas.extend(repositorio.chegadas.entre(data_inicio, data_fim))
+    if "CHECKIN" in status:
+        ativas.extend(r for r in list(repositorio.hospedagens.values())
+                      if (data_inicio is None or r.data_entrada >= data_inicio) and (data_fim is None or r.data_entrada < data_fim))
+    ativas.sort(key=lambda r: r.data_entrada)
+    return ativas
+
+def _iterar_historico_fora_da_memoria(data_inicio: Optional[date] = None, data_fim: Optional[date] = None,
+                                      status: Optional[Iterable[str]] = None) -> Iterator[Reserva]:
+    """
+    No carregamento lazy, gera as reservas do disco que não estão na memória.
+    """
+    if historico_lazy:
+        ids_em_memoria = {r.id for r in reservas_db}
+        for r in _obter_armazenamento().iterar_historico(quartos_db, hospedes_db, None, data_inicio, data_fim, status):
+            if r.id not in ids_em_memoria:
+                yield r
+
+def _historico_em_disco(documento: str) -> Iterator[Reserva]:
+    """
+    Fonte de histórico ligada a cada hóspede no carregamento lazy.
+    """
+    return _obter_armazenamento().iterar_historico(quartos_db, hospedes_db, documento)
+
+def _obter_armazenamento() -> Armazenamento:
+    """
+    Retorna o backend de persistência, criando-o na primeira utilização.
+    """
+    global armazenamento
+    if armazenamento is None:
+        with _trava_persistencia:
+            if armazenamento is None:
+                armazenamento = criar_armazenamento()
+    return armazenamento
+
+def persistir(*entidades):
     """
-    salvar_dados(quartos_db, hospedes_db, reservas_db)
+    Grava apenas as entidades alteradas (journal no backend JSON, UPSERT no SQLite).
+    Quando o journal passa do limite configurado, compacta tudo em um novo snapshot.
+
+    Dentro de uma operação (trava global em leitura), a recarga após um conflito, as alterações
+    de outros processos e a compactação ficam pendentes para sincronizar(), chamado pelo
+    decorador repetir_em_conflito ao fim da operação; fora dela, sincronizar() roda aqui mesmo.
+    """
+    global _recarga_pendente, _compactacao_pendente
+    adiadas = getattr(_gravacao_adiada, "entidades", None)
+    if adiadas is not None:
+        for e in entidades:
+            adiadas[id(e)] = e
+        return
+
+    try:
+        with _trava_persistencia:
+            backend = _obter_armazenamento()
+            try:
+                pendentes = backend.salvar_alteracoes(entidades)
+            except ConflitoVersao:
+                # As alterações desta operação ficaram só na memória: volta ao que está gravado.
+                _recarga_pendente = True
+                raise
+            _coletar_alteracoes_externas(backend)
+            if pendentes >= config.get_limite_journal():
+                _compactacao_pendente = True
+    finally:
+        if not repositorio.trava_global.lendo():
+            sincronizar()
+
+def sincronizar():
+    """
+    Traz para a memória as alterações gravadas por outros processos desde a última leitura
+    e faz a recarga ou a compactação pendentes, com a trava global em escrita.
+    Não faz nada enquanto a gravação da thread está adiada (as alterações do lote ainda não foram gravadas)
+    ou dentro de uma operação (a thread já tem a trava global em leitura).
+    """
+    if getattr(_gravacao_adiada, "entidades", None) is not None or repositorio.trava_global.lendo():
+        return
+    with _trava_persistencia:
+        _coletar_alteracoes_externas(_obter_armazenamento())
+        if not (_recarga_pendente or _externas_pendentes or _compactacao_pendente):
+            return
+
+    with repositorio.trava_global.escrita(), _trava_persistencia:
+        _aplicar_pendencias()
+        if _compactacao_pendente:
+            salvar_tudo()
+
+def _coletar_alteracoes_externas(backend: Armazenamento):
+    """
+    Lê (com _trava_persistencia) o que outros processos gravaram e guarda para _aplicar_pendencias.
+    """
+    global _recarga_pendente
+    eventos = backend.alteracoes_externas()
+    if eventos is None:
+        _recarga_pendente = True
+    else:
+        _externas_pendentes.extend(eventos)
+
+def _aplicar_pendencias():
+    """
+    Com a trava global em escrita: recarrega a memória, se pedido, ou aplica as alterações externas lidas.
+    """
+    if _recarga_pendente:
+        _recarregar()
+    else:
+        eventos = list(_externas_pendentes)
+        _externas_pendentes.clear()
+        _aplicar_alteracoes_externas(eventos)
+
+def _aplicar_alteracoes_externas(eventos: List[Tuple[str, dict]]):
+    """
+    Aplica no repositório os eventos (tipo, dados) de outros processos.
+    """
+    for tipo, dados in eventos:
+        if tipo == "quarto":
+            repositorio.sincronizar_quarto(Quarto.from_dict(dados))
+        elif tipo == "hospede":
+            hospede = repositorio.sincronizar_hospede(Hospede.from_dict(dados))
+            if historico_lazy and hospede.fonte_historico is None:
+                hospede.fonte_historico = partial(_historico_em_disco, hospede.documento)
+        elif tipo == "reserva":
+            hospede = buscar_hospede(dados["hospede_documento"])
+            quarto = buscar_quarto(dados["quarto_numero"])
+            if hospede is not None and quarto is not None:
+                # No carregamento lazy, reservas encerradas de outros processos ficam no disco:
+                incluir = not historico_lazy or dados["status"] in STATUS_ATIVOS
+                repositorio.sincronizar_reserva(Reserva.from_dict(dados, hospede, quarto), incluir)
+
+def _recarregar():
+    """
+    Substitui a memória pelo que está gravado no armazenamento (com a trava global em escrita).
+    """
+    global _recarga_pendente
+    with repositorio.trava_global.escrita(), _trava_persistencia:
+        _recarga_pendente = False
+        _externas_pendentes.clear()
+        repositorio.carregar(*_obter_armazenamento().carregar(historico_lazy))
+        if historico_lazy:
+            for h in hospedes_db:
+                h.fonte_historico = partial(_historico_em_disco, h.documento)
+
+
+@contextmanager
+def adiar_persistencia() -> Iterator[List]:
+    """
+    Dentro do bloco, persistir() apenas acumula as entidades (sem repetições) da thread atual.
+    Na saída, a lista devolvida recebe as entidades acumuladas, para quem abriu o bloco gravá-las de uma vez.
+    """
+    entidades: List = []
+    _gravacao_adiada.entidades = {}
+    try:
+        yield entidades
+    finally:
+        entidades.extend(_gravacao_adiada.entidades.values())
+        _gravacao_adiada.entidades = None
 
 
 # RELATÓRIOS E ESTATÍSTICAS:
@@ -386,23 +763,44 @@ def gerar_relatorio_ocupacao():
     
     return taxa
 
-def gerar_relatorio_financeiro():
+def gerar_relatorio_financeiro(paralelo: bool = False):
     """
     - ADR (Diária Média): Quanto pagam em média por quarto.
     - RevPAR: Receita dividida pelo total de quartos (sucesso financeiro).
     - Taxa de Cancelamento.
+
+    Com paralelo=True, as reservas são precificadas em vários processos (ver hotel/paralelo.py).
     """
     total_quartos = len(quartos_db)
     if total_quartos == 0:
         print("Nenhum quarto cadastrado. Impossível calcular métricas.")
         return
 
-    reservas_validas = [r for r in reservas_db if r.status in ["CONFIRMADA", "CHECKIN", "CHECKOUT"]]
-    reservas_canceladas = [r for r in reservas_db if r.status == "CANCELADA"]
-    
-    total_receita = sum(calcular_total_reserva(r) for r in reservas_validas)
-    quartos_vendidos = len(reservas_validas)
-    total_reservas = len(reservas_db)
+    # Uma única passada, para que o histórico lido do disco no modo lazy não precise ficar em memória.
+    # A receita soma o total de cada reserva arredondado ao centavo, como nos agregados diários e no motor analítico:
+    receita_centavos = 0
+    quartos_vendidos = 0
+    total_canceladas = 0
+    total_reservas = 0
+
+    def com_receita() -> Iterator[Reserva]:
+        nonlocal quartos_vendidos, total_canceladas, total_reservas
+        for r in iterar_reservas():
+            total_reservas += 1
+            if r.status in ["CONFIRMADA", "CHECKIN", "CHECKOUT"]:
+                quartos_vendidos += 1
+                yield r
+            elif r.status == "CANCELADA":
+                total_canceladas += 1
+
+    if paralelo:
+        from hotel.paralelo import estadia_da_reserva, somar_totais_em_paralelo
+        # Os lotes vão para os processos enquanto o histórico é lido; a soma segue a ordem da versão serial:
+        receita_centavos = somar_totais_em_paralelo(estadia_da_reserva(r) for r in com_receita())
+    else:
+        for r in com_receita():
+            receita_centavos += para_centavos(calcular_total_reserva(r))
+    total_receita = receita_centavos / 100
     
     # ADR (Average Daily Rate):
     adr = total_receita / quartos_vendidos if quartos_vendidos > 0 else 0.0
@@ -411,7 +809,7 @@ def gerar_relatorio_financeiro():
     revpar = total_receita / total_quartos
     
     # Taxa de Cancelamento:
-    taxa_cancelamento = (len(reservas_canceladas) / total_reservas * 100) if total_reservas > 0 else 0.0
+    taxa_cancelamento = (total_canceladas / total_reservas * 100) if total_reservas > 0 else 0.0
 
     print("\n" + "="*40)
     print(f"RELATÓRIO FINANCEIRO DO HOTEL")
@@ -424,7 +822,7 @@ def gerar_relatorio_financeiro():
     print("-" * 40)
     print(f"Estatísticas:")
     print(f"   • Reservas Totais:      {total_reservas}")
-    print(f"   • Cancelamentos:        {len(reservas_canceladas)} ({taxa_cancelamento:.1f}%)")
+    print(f"   • Cancelamentos:        {total_canceladas} ({taxa_cancelamento:.1f}%)")
     print("="*40 + "\n")
 
     return {
@@ -434,33 +832,166 @@ def gerar_relatorio_financeiro():
         "cancelamento": taxa_cancelamento
     }
 
+def gerar_relatorio_periodo(data_inicio: date, data_fim: date):
+    """
+    Ocupação, ADR, RevPAR e cancelamentos das noites em [data_inicio, data_fim),
+    lidos da tabela de agregados diários (montada na primeira consulta e depois mantida a cada alteração).
+    """
+    if data_fim <= data_inicio:
+        raise ValueError(f"{Cores.VERMELHO}A data final do período deve ser posterior à inicial.{Cores.RESET}")
+
+    total_quartos = len(quartos_db)
+    if total_quartos == 0:
+        print("Nenhum quarto cadastrado. Impossível calcular métricas.")
+        return
+
+    agregados = repositorio.agregados
+    if not agregados.atualizado():
+        agregados.reconstruir(reservas_db, _iterar_historico_fora_da_memoria())
+
+    totais = agregados.consultar(data_inicio, data_fim)
+    noites_disponiveis = total_quartos * (data_fim - data_inicio).days
+
+    # Ocupação: diárias vendidas sobre diárias disponíveis no período.
+    ocupacao = totais["noites"] / noites_disponiveis * 100
+    # ADR (Average Daily Rate): receita por diária vendida.
+    adr = totais["receita"] / totais["noites"] if totais["noites"] > 0 else 0.0
+    # RevPAR (Revenue Per Available Room): receita por diária disponível.
+    revpar = totais["receita"] / noites_disponiveis
+    taxa_cancelamento = (totais["cancelamentos"] / totais["reservas"] * 100) if totais["reservas"] > 0 else 0.0
+
+    print("\n" + "="*40)
+    print(f"RELATÓRIO DO PERÍODO {data_inicio.strftime('%d/%m/%Y')} A {data_fim.strftime('%d/%m/%Y')}")
+    print("="*40)
+    print(f"Receita do Período:     R$ {totais['receita']:.2f}")
+    print(f"Diárias Vendidas:       {totais['noites']} de {noites_disponiveis}")
+    print(f"Taxa de Ocupação:       {ocupacao:.2f}%")
+    print("-" * 40)
+    print(f"   • ADR (Diária Média):   R$ {adr:.2f}")
+    print(f"   • RevPAR (Eficiência):  R$ {revpar:.2f}")
+    print(f"   • Cancelamentos:        {totais['cancelamentos']} ({taxa_cancelamento:.1f}%)")
+    print("="*40 + "\n")
+
+    return {
+        "receita": totais["receita"],
+        "noites_vendidas": totais["noites"],
+        "ocupacao": ocupacao,
+        "adr": adr,
+        "revpar": revpar,
+        "cancelamento": taxa_cancelamento
+    }
+
+def gerar_relatorio_analitico(data_inicio: date, data_fim: date, snapshot: Optional[str] = None):
+    """
+    Relatório detalhado do período calculado pelo motor analítico (NumPy):
+    métricas financeiras, permanência e ocupação por tipo de quarto e por dia da semana.
+
+    Com `snapshot` (caminho de um snapshot binário, ver hotel/snapshot_binario.py), as reservas
+    são lidas do arquivo por mmap, sem montar objetos Reserva.
+    """
+    from hotel import analitico
+
+    if data_fim <= data_inicio:
+        raise ValueError(f"{Cores.VERMELHO}A data final do período deve ser posterior à inicial.{Cores.RESET}")
+
+    total_quartos = len(quartos_db)
+    if total_quartos == 0:
+        print("Nenhum quarto cadastrado. Impossível calcular métricas.")
+        return
+
+    if snapshot is None:
+        colunas = analitico.ColunasReservas(iterar_reservas())
+    else:
+        from hotel.snapshot_binario import SnapshotBinario
+        with SnapshotBinario(snapshot) as arquivo:
+            colunas = analitico.ColunasReservas.do_snapshot_binario(arquivo, quartos_db)
+    periodo = analitico.relatorio_periodo(colunas, total_quartos, data_inicio, data_fim)
+    permanencia = analitico.distribuicao_permanencia(colunas)
+    por_tipo = analitico.ocupacao_por_tipo(colunas, quartos_db, data_inicio, data_fim)
+    por_dia_semana = analitico.ocupacao_por_dia_semana(colunas, total_quartos, data_inicio, data_fim)
+
+    nomes_dias = ["Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom"]
+
+    print("\n" + "="*40)
+    print(f"RELATÓRIO ANALÍTICO {data_inicio.strftime('%d/%m/%Y')} A {data_fim.strftime('%d/%m/%Y')}")
+    print("="*40)
+    print(f"Receita do Período:     R$ {periodo['receita']:.2f}")
+    print(f"Taxa de Ocupação:       {periodo['ocupacao']:.2f}%")
+    print(f"   • ADR (Diária Média):   R$ {periodo['adr']:.2f}")
+    print(f"   • RevPAR (Eficiência):  R$ {periodo['revpar']:.2f}")
+    print("-" * 40)
+    print("Ocupação por Tipo:")
+    for tipo, taxa in por_tipo.items():
+        print(f"   • {tipo:<12} {taxa:.2f}%")
+    print("Ocupação por Dia da Semana:")
+    for dia_semana, taxa in por_dia_semana.items():
+        print(f"   • {nomes_dias[dia_semana]:<12} {taxa:.2f}%")
+    print("Permanência (noites: reservas):")
+    for noites, quantidade in permanencia.items():
+        print(f"   • {noites:<12} {quantidade}")
+    print("="*40 + "\n")
+
+    return {
+        **periodo,
+        "permanencia": permanencia,
+        "ocupacao_por_tipo": por_tipo,
+        "ocupacao_por_dia_semana": por_dia_semana
+    }
+
 # CÁLCULO DE TARIFAS
 
 def _verificar_temporada(data: date) -> float:
     """
     Verifica se a data cai em alguma temporada e retorna o multiplicador.
     """
-    temporadas = config.get_temporadas()
-    
-    for temp in temporadas:
-        inicio_str = temp["inicio"]
-        fim_str = temp["fim"]
-        
-        ano_atual = data.year
-        
-        d_inicio = datetime.strptime(f"{inicio_str}-{ano_atual}", "%d-%m-%Y").date()
-        d_fim = datetime.strptime(f"{fim_str}-{ano_atual}", "%d-%m-%Y").date()
-        
-        if d_inicio > d_fim:  # Temporada que cruza o ano novo
-            if data < d_inicio: 
-                d_inicio = d_inicio.replace(year=ano_atual - 1)
-            else:
-                d_fim = d_fim.replace(year=ano_atual + 1)
-
-        if d_inicio <= data <= d_fim:
-            return temp["multiplicador"]
-            
-    return 1.0 # Tarifa normal
+    return config.get_multiplicador_temporada(data)
+
+def _contar_fins_de_semana(inicio: date, fim: date) -> int:
+    """
+    Conta os sábados e domingos no intervalo [inicio, fim) sem percorrer as semanas completas.
+    """
+    dias = (fim - inicio).days
+    semanas, resto = divmod(dias, 7)
+    dia_semana = inicio.weekday()
+    extras = sum(1 for i in range(resto) if (dia_semana + i) % 7 >= 5)
+    return semanas * 2 + extras
+
+def _segmentos_temporada(inicio: date, fim: date):
+    """
+    Divide o intervalo [inicio, fim) em segmentos consecutivos de mesmo multiplicador de temporada.
+    Gera tuplas (inicio_segmento, fim_segmento, multiplicador).
+    """
+    for ano in range(inicio.year, fim.year + 1):
+        primeiro_dia = date(ano, 1, 1)
+        # Compara os índices dos dias no ano; só os segmentos que cruzam o intervalo viram datas:
+        i_inicio = (inicio - primeiro_dia).days
+        i_limite = (fim - primeiro_dia).days
+        for i_ini, i_fim, multiplicador in config.get_segmentos_temporada(ano):
+            if i_fim <= i_inicio:
+                continue
+            if i_ini >= i_limite:
+                break
+            yield primeiro_dia + timedelta(days=max(i_ini, i_inicio)), primeiro_dia + timedelta(days=min(i_fim, i_limite)), multiplicador
+
+def _somar_diarias(data_entrada: date, data_saida: date, tarifa_base: float) -> float:
+    """
+    Soma as diárias de [data_entrada, data_saida) por segmento de temporada,
+    contando os fins de semana de cada segmento de uma vez.
+    Cada segmento vale a diária sem arredondamento vezes o número de noites, e as parcelas
+    são somadas em ordem: o resultado é o da soma de calcular_valor_diaria noite a noite.
+    """
+    if data_saida <= data_entrada:
+        return 0.0
+
+    mult_fds = config.get_multiplicador_fim_de_semana()
+
+    total = 0.0
+    for seg_inicio, seg_fim, mult_temp in _segmentos_temporada(data_entrada, data_saida):
+        noites = (seg_fim - seg_inicio).days
+        noites_fds = _contar_fins_de_semana(seg_inicio, seg_fim)
+        total += tarifa_base * mult_temp * (noites - noites_fds)
+        total += tarifa_base * mult_temp * mult_fds * noites_fds
+    return total
 
 def calcular_valor_diaria(data: date, tarifa_base: float) -> float:
     """
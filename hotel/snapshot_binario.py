@@ -0,0 +1,335 @@
+"""
+Snapshot binário das reservas, lido com mmap e sob demanda: os relatórios percorrem milhões de estadias
+sem montar objetos Reserva (nem dicionários).
+
+Layout do arquivo (little-endian; as seções começam em múltiplos de 8 bytes):
+- cabeçalho (CABECALHO) com as quantidades e o início de cada seção;
+- reservas: um registro de tamanho fixo (REGISTRO_RESERVA) por reserva, com o quarto, as datas em ordinais,
+  o código do status, os hóspedes, os totais pagos e de adicionais em centavos e a faixa dos seus lançamentos;
+- pagamentos (REGISTRO_PAGAMENTO) e adicionais (REGISTRO_ADICIONAL), contíguos por reserva;
+- status: o índice, na tabela de textos, do nome de cada código de status;
+- tabela de textos sem repetições (ids, documentos, formas de pagamento, descrições):
+  as posições (uint64) de cada texto, seguidas dos textos em UTF-8.
+
+Conversores: gerar_do_json (arquivos JSON atuais, já com o journal aplicado) e converter_para_json.
+"""
+
+import mmap
+import os
+import struct
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from .models import para_centavos
+from .analitico import CODIGOS_STATUS
+from .config import Cores
+from hotel import data
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+MAGICA = b"HOTELBIN"
+VERSAO_FORMATO = 1
+
+# magica, versao, qtd_status, qtd_reservas, qtd_pagamentos, qtd_adicionais, qtd_textos,
+# início das seções: status, reservas, pagamentos, adicionais, posições dos textos e textos
+CABECALHO = struct.Struct("<8sIIQQQQQQQQQQ")
+
+# id (texto), documento (texto), quarto, entrada e saída (ordinais), status (código), hóspedes, versão,
+# primeiro pagamento, qtd de pagamentos, primeiro adicional, qtd de adicionais, total pago e total de adicionais (centavos)
+REGISTRO_RESERVA = struct.Struct("<IIiiiBxHIIIII4xqq")
+
+# valor (centavos), data (microssegundos desde 01/01/0001), forma (texto)
+REGISTRO_PAGAMENTO = struct.Struct("<qqI4x")
+
+# valor (centavos), descrição (texto)
+REGISTRO_ADICIONAL = struct.Struct("<qI4x")
+
+_EPOCA = datetime(1, 1, 1)
+_MICROSSEGUNDO = timedelta(microseconds=1)
+
+# Registros acumulados antes de cada escrita no arquivo:
+_TAMANHO_BLOCO = 1 << 20
+
+if np is not None:
+    # Mesma disposição de REGISTRO_RESERVA, para ler a seção inteira como um array sem cópia:
+    DTYPE_RESERVA = np.dtype({
+        "names": ["id", "documento", "quarto", "entrada", "saida", "status", "num_hospedes", "versao",
+                  "primeiro_pagamento", "qtd_pagamentos", "primeiro_adicional", "qtd_adicionais",
+                  "pago_centavos", "adicionais_centavos"],
+        "formats": ["<u4", "<u4", "<i4", "<i4", "<i4", "u1", "<u2", "<u4",
+                    "<u4", "<u4", "<u4", "<u4", "<i8", "<i8"],
+        "offsets": [0, 4, 8, 12, 16, 20, 22, 24, 28, 32, 36, 40, 48, 56],
+        "itemsize": REGISTRO_RESERVA.size
+    })
+
+
+class RegistroReserva(NamedTuple):
+    """
+    Uma reserva lida do snapshot binário, sem textos nem lançamentos (ver SnapshotBinario.reserva_dict).
+    """
+    posicao: int
+    quarto_numero: int
+    entrada: int  # Ordinal da data
+    saida: int
+    status: str
+    num_hospedes: int
+    pago_centavos: int
+    adicionais_centavos: int
+
+
+# GRAVAÇÃO:
+
+class _TabelaTextos:
+    """
+    Textos sem repetição, cada um identificado pela ordem de inclusão.
+    """
+    def __init__(self):
+        self.indices: Dict[str, int] = {}
+        self.textos: List[bytes] = []
+
+    def indice(self, texto: str) -> int:
+        indice = self.indices.get(texto)
+        if indice is None:
+            indice = self.indices[texto] = len(self.textos)
+            self.textos.append(texto.encode("utf-8"))
+        return indice
+
+def _microssegundos(texto_iso: str) -> int:
+    momento = datetime.fromisoformat(texto_iso)
+    if momento.tzinfo is not None:
+        raise ValueError(f"{Cores.VERMELHO}Data de pagamento com fuso horário não é suportada: {texto_iso}{Cores.RESET}")
+    return (momento - _EPOCA) // _MICROSSEGUNDO
+
+def _alinhar(f):
+    f.write(bytes(-f.tell() % 8))
+
+def gravar(caminho: str, reservas: Iterable[dict]) -> int:
+    """
+    Grava o snapshot binário a partir dos dicionários das reservas (formato de Reserva.to_dict).
+    As reservas vão para o arquivo em blocos; só os lançamentos e os textos ficam na memória até o fim.
+    O arquivo é escrito em <caminho>.tmp e trocado no final. Retorna quantas reservas foram gravadas.
+    """
+    textos = _TabelaTextos()
+    codigo_por_status = {status: codigo for codigo, status in enumerate(CODIGOS_STATUS)}
+    pagamentos = bytearray()
+    adicionais = bytearray()
+    qtd_reservas = qtd_pagamentos = qtd_adicionais = 0
+
+    with open(caminho + ".tmp", "wb") as f:
+        f.write(bytes(CABECALHO.size))  # Preenchido no final
+        inicio_reservas = f.tell()
+
+        bloco = bytearray()
+        for dado in reservas:
+            status = dado["status"]
+            codigo = codigo_por_status.get(status)
+            if codigo is None:
+                codigo = codigo_por_status[status] = len(codigo_por_status)
+
+            primeiro_pagamento, pago = qtd_pagamentos, 0
+            for p in dado["pagamentos"]:
+                centavos = para_centavos(p["valor"])
+                pagamentos += REGISTRO_PAGAMENTO.pack(centavos, _microssegundos(p["data"]), textos.indice(p["forma"]))
+                pago += centavos
+            qtd_pagamentos += len(dado["pagamentos"])
+
+            primeiro_adicional, extras = qtd_adicionais, 0
+            for a in dado["adicionais"]:
+                centavos = para_centavos(a["valor"])
+                adicionais += REGISTRO_ADICIONAL.pack(centavos, textos.indice(a["descricao"]))
+                extras += centavos
+            qtd_adicionais += len(dado["adicionais"])
+
+            bloco += REGISTRO_RESERVA.pack(
+                textos.indice(dado["id"]), textos.indice(dado["hospede_documento"]), dado["quarto_numero"],
+                date.fromisoformat(dado["data_entrada"]).toordinal(), date.fromisoformat(dado["data_saida"]).toordinal(),
+                codigo, dado["num_hospedes"], dado.get("versao", 0),
+                primeiro_pagamento, len(dado["pagamentos"]), primeiro_adicional, len(dado["adicionais"]),
+                pago, extras
+            )
+            qtd_reservas += 1
+            if len(bloco) >= _TAMANHO_BLOCO:
+                f.write(bloco)
+                bloco.clear()
+        f.write(bloco)
+
+        inicio_pagamentos = f.tell()
+        f.write(pagamentos)
+        inicio_adicionais = f.tell()
+        f.write(adicionais)
+
+        inicio_status = f.tell()
+        nomes_status = sorted(codigo_por_status, key=codigo_por_status.get)
+        f.write(struct.pack(f"<{len(nomes_status)}I", *(textos.indice(s) for s in nomes_status)))
+        _alinhar(f)
+
+        posicoes = [0]
+        for texto in textos.textos:
+            posicoes.append(posicoes[-1] + len(texto))
+        inicio_posicoes = f.tell()
+        f.write(struct.pack(f"<{len(posicoes)}Q", *posicoes))
+        inicio_textos = f.tell()
+        f.write(b"".join(textos.textos))
+
+        f.seek(0)
+        f.write(CABECALHO.pack(MAGICA, VERSAO_FORMATO, len(nomes_status), qtd_reservas, qtd_pagamentos, qtd_adicionais,
+                               len(textos.textos), inicio_status, inicio_reservas, inicio_pagamentos, inicio_adicionais,
+                               inicio_posicoes, inicio_textos))
+        data._descarregar(f)
+
+    os.replace(caminho + ".tmp", caminho)
+    return qtd_reservas
+
+
+# LEITURA:
+
+class SnapshotBinario:
+    """
+    Snapshot binário aberto com mmap (somente leitura). Nada é lido antes de ser pedido:
+    iterar() desempacota um registro de cada vez e os textos só são decodificados por posição.
+    """
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        with open(caminho, "rb") as f:
+            tamanho = os.fstat(f.fileno()).st_size
+            if tamanho < CABECALHO.size:
+                raise ValueError(f"{Cores.VERMELHO}{caminho} não é um snapshot binário de reservas.{Cores.RESET}")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magica, versao, qtd_status, self.qtd_reservas, self.qtd_pagamentos, self.qtd_adicionais, self.qtd_textos,
+         self._inicio_status, self._inicio_reservas, self._inicio_pagamentos, self._inicio_adicionais,
+         self._inicio_posicoes, self._inicio_textos) = CABECALHO.unpack_from(self._mmap)
+
+        if magica != MAGICA or versao != VERSAO_FORMATO:
+            self.fechar()
+            raise ValueError(f"{Cores.VERMELHO}{caminho} não é um snapshot binário de reservas (versão {VERSAO_FORMATO}).{Cores.RESET}")
+        if (self._inicio_posicoes + 8 * (self.qtd_textos + 1) > tamanho
+                or self._inicio_textos + self._posicao_texto(self.qtd_textos) > tamanho):
+            self.fechar()
+            raise ValueError(f"{Cores.VERMELHO}{caminho} está truncado.{Cores.RESET}")
+
+        indices = struct.unpack_from(f"<{qtd_status}I", self._mmap, self._inicio_status)
+        self.status: Tuple[str, ...] = tuple(self.texto(i) for i in indices)
+
+    def __len__(self) -> int:
+        return self.qtd_reservas
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.fechar()
+
+    def fechar(self):
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # Ainda há arrays apontando para o mapa; ele é liberado quando eles forem descartados
+
+    def _posicao_texto(self, indice: int) -> int:
+        return struct.unpack_from("<Q", self._mmap, self._inicio_posicoes + 8 * indice)[0]
+
+    def texto(self, indice: int) -> str:
+        """
+        Texto da tabela pelo índice gravado nos registros.
+        """
+        inicio, fim = struct.unpack_from("<QQ", self._mmap, self._inicio_posicoes + 8 * indice)
+        return self._mmap[self._inicio_textos + inicio:self._inicio_textos + fim].decode("utf-8")
+
+    def _registro(self, posicao: int) -> tuple:
+        if not 0 <= posicao < self.qtd_reservas:
+            raise IndexError(posicao)
+        return REGISTRO_RESERVA.unpack_from(self._mmap, self._inicio_reservas + posicao * REGISTRO_RESERVA.size)
+
+    def iterar(self, data_inicio: Optional[date] = None, data_fim: Optional[date] = None,
+               status: Optional[Iterable[str]] = None) -> Iterator[RegistroReserva]:
+        """
+        Percorre as reservas com data de entrada em [data_inicio, data_fim) e status entre os pedidos.
+        Os filtros comparam os números do registro, antes de montar a tupla.
+        """
+        inicio = data_inicio.toordinal() if data_inicio else None
+        fim = data_fim.toordinal() if data_fim else None
+        status_aceitos = set(status) if status is not None else None
+        codigos = {c for c, s in enumerate(self.status) if s in status_aceitos} if status_aceitos is not None else None
+
+        fim_reservas = self._inicio_reservas + self.qtd_reservas * REGISTRO_RESERVA.size
+        with memoryview(self._mmap)[self._inicio_reservas:fim_reservas] as secao:
+            for posicao, (_, _, quarto, entrada, saida, codigo, hospedes, _, _, _, _, _, pago, extras) in enumerate(
+                    REGISTRO_RESERVA.iter_unpack(secao)):
+                if inicio is not None and entrada < inicio:
+                    continue
+                if fim is not None and entrada >= fim:
+                    continue
+                if codigos is not None and codigo not in codigos:
+                    continue
+                yield RegistroReserva(posicao, quarto, entrada, saida, self.status[codigo], hospedes, pago, extras)
+
+    def documento(self, posicao: int) -> str:
+        return self.texto(self._registro(posicao)[1])
+
+    def id(self, posicao: int) -> str:
+        return self.texto(self._registro(posicao)[0])
+
+    def reserva_dict(self, posicao: int) -> dict:
+        """
+        Reserva completa no formato de Reserva.to_dict (com pagamentos e adicionais).
+        """
+        (id_texto, documento, quarto, entrada, saida, codigo, hospedes, versao,
+         primeiro_pagamento, qtd_pagamentos, primeiro_adicional, qtd_adicionais, _, _) = self._registro(posicao)
+
+        pagamentos = []
+        for i in range(primeiro_pagamento, primeiro_pagamento + qtd_pagamentos):
+            centavos, micros, forma = REGISTRO_PAGAMENTO.unpack_from(self._mmap, self._inicio_pagamentos + i * REGISTRO_PAGAMENTO.size)
+            pagamentos.append({"valor": centavos / 100, "forma": self.texto(forma),
+                               "data": (_EPOCA + micros * _MICROSSEGUNDO).isoformat()})
+
+        adicionais = []
+        for i in range(primeiro_adicional, primeiro_adicional + qtd_adicionais):
+            centavos, descricao = REGISTRO_ADICIONAL.unpack_from(self._mmap, self._inicio_adicionais + i * REGISTRO_ADICIONAL.size)
+            adicionais.append({"descricao": self.texto(descricao), "valor": centavos / 100})
+
+        return {
+            "id": self.texto(id_texto),
+            "hospede_documento": self.texto(documento),
+            "quarto_numero": quarto,
+            "data_entrada": date.fromordinal(entrada).isoformat(),
+            "data_saida": date.fromordinal(saida).isoformat(),
+            "num_hospedes": hospedes,
+            "status": self.status[codigo],
+            "pagamentos": pagamentos,
+            "adicionais": adicionais,
+            "versao": versao
+        }
+
+    def registros_numpy(self):
+        """
+        Seção de reservas como array estruturado NumPy (DTYPE_RESERVA) apontando direto para o mapa, sem cópia.
+        """
+        if np is None:
+            raise ImportError(f"{Cores.VERMELHO}A leitura em colunas precisa do NumPy (pip install numpy).{Cores.RESET}")
+        return np.frombuffer(self._mmap, dtype=DTYPE_RESERVA, count=self.qtd_reservas, offset=self._inicio_reservas)
+
+
+# CONVERSORES:
+
+def gerar_do_json(destino: str) -> int:
+    """
+    Converte as reservas dos arquivos JSON atuais (snapshot + journal) para o snapshot binário em `destino`.
+    """
+    with data.travar_armazenamento():
+        data._verificar_snapshot()
+        reservas = data._sobrepor_journal(data._iterar_arquivo(data.ARQUIVO_RESERVAS),
+                                          data._reservas_do_journal(data._ler_journal()))
+        return gravar(destino, reservas)
+
+def converter_para_json(origem: str, destino: str) -> int:
+    """
+    Converte o snapshot binário `origem` de volta para uma lista JSON de reservas (formato do reservas.json) em `destino`.
+    """
+    with SnapshotBinario(origem) as snapshot:
+        data._salvar_arquivo_em_fluxo(destino, (snapshot.reserva_dict(i) for i in range(len(snapshot))))
+        os.replace(destino + ".tmp", destino)
+        return len(snapshot)
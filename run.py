@@ -1,12 +1,23 @@
 """
 Módulo de inicialização rápida do sistema.
+Sem argumentos abre o menu interativo; com argumentos executa um comando da CLI não interativa (hotel/cli.py).
 """
 
-from hotel.main import main
+import sys
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        from hotel.cli import main as cli
+        sys.exit(cli(sys.argv[1:]))
+
+    from hotel.main import main
+    from hotel.data import DadosCorrompidos
     try:
         main()
     except KeyboardInterrupt:
-        print("\nSaindo...")
\ No newline at end of file
+        print("\nSaindo...")
+    except DadosCorrompidos as e:
+        # Não inicia (nem cria dados de exemplo) sobre um armazenamento corrompido:
+        print(e)
+        sys.exit(1)
@@ -0,0 +1,31 @@
+"""
+Fixtures compartilhadas pelos testes.
+"""
+
+from hotel import services, config, data
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def setup_inicial(tmp_path, monkeypatch):
+    """
+    Cada teste começa com os arquivos de dados em uma pasta temporária, o estado do journal
+    zerado, o repositório vazio e as configurações recarregadas do settings.json.
+    """
+    monkeypatch.setattr(data, "ARQUIVO_QUARTOS", str(tmp_path / "quartos.json"))
+    monkeypatch.setattr(data, "ARQUIVO_HOSPEDES", str(tmp_path / "hospedes.json"))
+    monkeypatch.setattr(data, "ARQUIVO_RESERVAS", str(tmp_path / "reservas.json"))
+    monkeypatch.setattr(data, "ARQUIVO_JOURNAL", str(tmp_path / "journal.jsonl"))
+    monkeypatch.setattr(data, "eventos_pendentes", 0)
+    monkeypatch.setattr(data, "reservas_orfas", [])
+    monkeypatch.setattr(data, "historico_em_disco", False)
+    monkeypatch.setattr(data, "_leitura", data._LeituraJournal())
+    monkeypatch.setattr(data, "_cache_historico", data._CacheHistorico())
+
+    monkeypatch.setattr(services, "armazenamento", None)
+    monkeypatch.setattr(services, "historico_lazy", False)
+    monkeypatch.setattr(services, "_recarga_pendente", False)
+    monkeypatch.setattr(services, "_compactacao_pendente", False)
+    monkeypatch.setattr(services, "_externas_pendentes", [])
+    services.repositorio.limpar()
+    config.carregar_configuracoes()
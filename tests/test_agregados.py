@@ -0,0 +1,82 @@
+"""
+Conjunto de testes para a tabela de agregados diários usada nos relatórios por período.
+"""
+
+from hotel.models import Adicional, Hospede, Quarto, Reserva, para_centavos
+from hotel.agregados import AgregadoDiario
+from datetime import date, timedelta
+import pytest
+
+
+def _reserva(quarto, entrada, saida, status="CONFIRMADA"):
+    hospede = Hospede("Jayr Alencar", "123", "e", "t")
+    return Reserva(hospede, quarto, entrada, saida, 1, status)
+
+
+# TESTES DOS AGREGADOS DIÁRIOS:
+
+def test_agregado_distribui_diarias_por_noite():
+    quarto = Quarto(101, "SIMPLES", 1, 100.0)
+    reserva = _reserva(quarto, date(2025, 6, 10), date(2025, 6, 13))
+    agregado = AgregadoDiario()
+    agregado.reconstruir([reserva])
+
+    totais = agregado.consultar(date(2025, 6, 11), date(2025, 6, 12))
+    assert totais["noites"] == 1
+    assert totais["receita"] == pytest.approx(110.0)
+    assert totais["reservas"] == 0
+
+    totais = agregado.consultar(date(2025, 6, 1), date(2025, 7, 1))
+    assert totais["noites"] == 3
+    assert totais["reservas"] == 1
+
+def test_agregado_receita_igual_total_da_reserva():
+    from hotel import services
+    quarto = Quarto(101, "SIMPLES", 1, 100.0)
+    reserva = _reserva(quarto, date(2025, 11, 20), date(2026, 3, 10))
+    reserva.adicionais.append(Adicional("Pizza", 40.0))
+    agregado = AgregadoDiario()
+    agregado.reconstruir([], [reserva])
+
+    totais = agregado.consultar(date(2025, 1, 1), date(2027, 1, 1))
+    assert totais["noites"] == len(reserva)
+    assert totais["receita"] == pytest.approx(services.calcular_total_reserva(reserva))
+
+def test_agregado_receita_em_centavos_com_tarifa_fracionada():
+    from hotel import services
+    quarto = Quarto(101, "SIMPLES", 1, 133.33)
+    reserva = _reserva(quarto, date(2025, 12, 1), date(2026, 3, 1), "CHECKOUT")
+    agregado = AgregadoDiario()
+    agregado.reconstruir([reserva])
+
+    total = agregado.consultar(date(2025, 12, 1), date(2026, 3, 1))["receita"]
+    assert total == para_centavos(services.calcular_total_reserva(reserva)) / 100
+    # As noites de cada lado da mudança de temporada somam o mesmo total, sem resto:
+    antes = agregado.consultar(date(2025, 12, 1), date(2025, 12, 20))["receita"]
+    depois = agregado.consultar(date(2025, 12, 20), date(2026, 3, 1))["receita"]
+    assert para_centavos(antes) + para_centavos(depois) == para_centavos(total)
+
+def test_agregado_atualiza_incrementalmente():
+    quarto = Quarto(101, "SIMPLES", 1, 100.0)
+    reserva = _reserva(quarto, date(2025, 6, 10), date(2025, 6, 12))
+    agregado = AgregadoDiario()
+    agregado.reconstruir([reserva])
+
+    reserva.adicionais.append(Adicional("Pizza", 40.0))
+    agregado.atualizar(reserva)
+    assert agregado.consultar(date(2025, 6, 10), date(2025, 6, 12))["receita"] == pytest.approx(264.0)
+
+    reserva.cancelar()
+    agregado.atualizar(reserva)
+    totais = agregado.consultar(date(2025, 6, 10), date(2025, 6, 12))
+    assert totais["noites"] == 0
+    assert totais["receita"] == pytest.approx(0.0)
+    assert totais["cancelamentos"] == 1
+    assert totais["reservas"] == 1
+
+def test_agregado_ignora_atualizacao_antes_de_montar():
+    quarto = Quarto(101, "SIMPLES", 1, 100.0)
+    agregado = AgregadoDiario()
+    agregado.atualizar(_reserva(quarto, date(2025, 6, 10), date(2025, 6, 12)))
+    assert not agregado.atualizado()
+    assert agregado.consultar(date(2025, 6, 1), date(2025, 7, 1))["noites"] == 0
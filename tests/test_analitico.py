@@ -0,0 +1,102 @@
+"""
+Conjunto de testes para o motor analítico (NumPy), comparado com os relatórios já existentes.
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from hotel import services, analitico
+from hotel.models import Adicional, Reserva
+from datetime import date, timedelta
+import random
+
+
+def _popular(total=300):
+    """
+    Cria reservas aleatórias (com sobreposições e todos os status) direto no repositório.
+    """
+    gerador = random.Random(42)
+    for i, tipo in enumerate(["SIMPLES", "DUPLO", "LUXO"]):
+        for j in range(3):
+            services.cadastrar_quarto(100 * (i + 1) + j, tipo, 2, 133.33 + 41.17 * i + j / 100)
+    services.cadastrar_hospede("Jayr", "123", "e", "t")
+
+    estados = ["PENDENTE", "CONFIRMADA", "CHECKIN", "CHECKOUT", "CANCELADA", "NO_SHOW"]
+    for _ in range(total):
+        quarto = gerador.choice(services.quartos_db)
+        entrada = date(2024, 11, 1) + timedelta(days=gerador.randrange(500))
+        reserva = Reserva(services.hospedes_db[0], quarto, entrada, entrada + timedelta(days=gerador.randint(1, 14)), 1, gerador.choice(estados))
+        if gerador.random() < 0.3:
+            reserva.adicionais.append(Adicional("Frigobar", gerador.randint(1, 9000) / 100))
+        services.repositorio.adicionar_reserva(reserva)
+
+
+# TESTES DO MOTOR ANALÍTICO:
+
+def test_colunas_reservas():
+    _popular(20)
+    colunas = analitico.ColunasReservas(services.reservas_db)
+    assert len(colunas) == 20
+    assert colunas.entrada[0] == services.reservas_db[0].data_entrada.toordinal()
+    assert colunas.tarifa_centavos.dtype == np.int64
+
+def test_totais_iguais_ao_calculo_por_reserva():
+    _popular()
+    totais = analitico.calcular_totais(analitico.ColunasReservas(services.reservas_db))
+    esperado = [services.calcular_total_reserva(r) for r in services.reservas_db]
+    assert totais.tolist() == esperado
+
+def test_relatorio_financeiro_igual_ao_servico():
+    _popular()
+    esperado = services.gerar_relatorio_financeiro()
+    obtido = analitico.relatorio_financeiro(analitico.ColunasReservas(services.reservas_db), len(services.quartos_db))
+    assert obtido == esperado
+
+def test_relatorio_periodo_igual_ao_servico():
+    _popular()
+    colunas = analitico.ColunasReservas(services.reservas_db)
+    periodos = [(date(2025, 1, 1), date(2025, 2, 1)), (date(2025, 2, 10), date(2025, 2, 25)),
+                (date(2024, 12, 24), date(2025, 1, 3)), (date(2025, 1, 1), date(2026, 1, 1)), (date(2024, 1, 1), date(2027, 1, 1))]
+    for inicio, fim in periodos:
+        esperado = services.gerar_relatorio_periodo(inicio, fim)
+        obtido = analitico.relatorio_periodo(colunas, len(services.quartos_db), inicio, fim)
+        assert obtido == esperado
+    # O último período cobre todas as estadias:
+    assert obtido["receita"] == services.gerar_relatorio_financeiro()["receita"]
+
+def test_ocupacao_por_tipo_e_dia_semana():
+    services.cadastrar_quarto(101, "SIMPLES", 1, 100.0)
+    services.cadastrar_quarto(401, "LUXO", 2, 300.0)
+    services.cadastrar_hospede("Jayr", "123", "e", "t")
+    services.realizar_reserva("123", 101, date(2025, 6, 9), date(2025, 6, 16), 1)  # segunda a segunda
+    services.confirmar_reserva("123", 101)
+
+    colunas = analitico.ColunasReservas(services.reservas_db)
+    por_tipo = analitico.ocupacao_por_tipo(colunas, services.quartos_db, date(2025, 6, 9), date(2025, 6, 23))
+    assert por_tipo == {"SIMPLES": 50.0, "LUXO": 0.0}
+
+    por_dia = analitico.ocupacao_por_dia_semana(colunas, 2, date(2025, 6, 9), date(2025, 6, 23))
+    assert por_dia == {d: 25.0 for d in range(7)}
+    assert analitico.distribuicao_permanencia(colunas) == {7: 1}
+
+def test_gerar_relatorio_analitico():
+    _popular(50)
+    metricas = services.gerar_relatorio_analitico(date(2025, 1, 1), date(2025, 4, 1))
+    assert metricas["receita"] == services.gerar_relatorio_periodo(date(2025, 1, 1), date(2025, 4, 1))["receita"]
+    assert set(metricas["ocupacao_por_tipo"]) == {"SIMPLES", "DUPLO", "LUXO"}
+
+def test_relatorio_analitico_do_snapshot_binario(tmp_path):
+    from hotel import snapshot_binario
+    _popular()
+    services.salvar_tudo()
+    binario = str(tmp_path / "reservas.bin")
+    snapshot_binario.gerar_do_json(binario)
+
+    inicio, fim = date(2025, 1, 1), date(2026, 1, 1)
+    esperado = services.gerar_relatorio_analitico(inicio, fim)
+    obtido = services.gerar_relatorio_analitico(inicio, fim, snapshot=binario)
+    for chave in ("receita", "noites_vendidas", "ocupacao", "adr", "revpar", "cancelamento"):
+        assert obtido[chave] == pytest.approx(esperado[chave])
+    assert obtido["permanencia"] == esperado["permanencia"]
+    assert obtido["ocupacao_por_tipo"] == pytest.approx(esperado["ocupacao_por_tipo"])
@@ -0,0 +1,144 @@
+"""
+Conjunto de testes para a API HTTP assíncrona.
+"""
+
+from hotel import services, data
+from hotel.api import ServidorAPI
+from hotel.models import ConflitoVersao
+import asyncio
+import json
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def dados_iniciais(setup_inicial):
+    services.cadastrar_quarto(101, "SIMPLES", 1, 100.0)
+    services.cadastrar_quarto(201, "DUPLO", 2, 150.0)
+    services.cadastrar_hospede("Jayr", "123", "e", "t")
+
+
+async def _requisicao(porta, metodo, caminho, corpo=None):
+    leitor, escritor = await asyncio.open_connection("127.0.0.1", porta)
+    dados = json.dumps(corpo).encode() if corpo is not None else b""
+    escritor.write(f"{metodo} {caminho} HTTP/1.1\r\nHost: x\r\nConnection: close\r\n"
+                   f"Content-Length: {len(dados)}\r\n\r\n".encode() + dados)
+    resposta = await leitor.read()
+    escritor.close()
+    cabecalho, _, conteudo = resposta.partition(b"\r\n\r\n")
+    return int(cabecalho.split()[1]), json.loads(conteudo)
+
+def _com_servidor(cenario):
+    """
+    Executa o cenário com um servidor em uma porta livre e o encerra no final.
+    """
+    async def executar():
+        servidor = ServidorAPI()
+        await servidor.iniciar("127.0.0.1", 0)
+        try:
+            return await cenario(servidor)
+        finally:
+            await servidor.encerrar()
+    return asyncio.run(executar())
+
+
+# TESTES DA API:
+
+def test_fluxo_da_reserva():
+    async def cenario(servidor):
+        p = servidor.porta
+        status, livres = await _requisicao(p, "GET", "/disponibilidade?entrada=2026-11-10&saida=2026-11-12&hospedes=2")
+        assert status == 200 and [q["quarto"] for q in livres] == [201]
+
+        status, reserva = await _requisicao(p, "POST", "/reservas", {"documento": "123", "quarto": 201,
+                                                                     "entrada": "2026-11-10", "saida": "2026-11-12", "hospedes": 2})
+        assert status == 201 and reserva["status"] == "PENDENTE"
+
+        status, reserva = await _requisicao(p, "POST", "/reservas/confirmar", {"documento": "123", "quarto": 201})
+        assert status == 200 and reserva["status"] == "CONFIRMADA"
+
+        status, reserva = await _requisicao(p, "POST", "/pagamentos", {"documento": "123", "quarto": 201, "valor": 100, "forma": "pix"})
+        assert reserva["total_pago"] == 100.0
+
+        status, consulta = await _requisicao(p, "GET", "/reservas?documento=123&quarto=201")
+        assert consulta == reserva
+
+    _com_servidor(cenario)
+    # As alterações foram gravadas no journal:
+    assert data.eventos_pendentes > 0
+
+def test_erros_viram_status_http():
+    async def cenario(servidor):
+        p = servidor.porta
+        assert (await _requisicao(p, "GET", "/quartos/999"))[0] == 404
+        assert (await _requisicao(p, "GET", "/nada"))[0] == 404
+
+        status, erro = await _requisicao(p, "POST", "/reservas", {"documento": "123", "quarto": 101})
+        assert status == 400 and "entrada" in erro["erro"]
+
+        status, erro = await _requisicao(p, "POST", "/reservas", {"documento": "999", "quarto": 101,
+                                                                  "entrada": "2026-11-10", "saida": "2026-11-12"})
+        assert status == 400 and "Hóspede não encontrado" in erro["erro"]
+
+        status, quarto = await _requisicao(p, "GET", "/quartos/101")
+        assert status == 200 and quarto["tipo"] == "SIMPLES"
+
+    _com_servidor(cenario)
+
+def test_alteracoes_concorrentes_sao_serializadas_e_gravadas_em_lote():
+    services.cadastrar_hospede("Maria", "456", "e", "t")
+
+    async def cenario(servidor):
+        conflitantes = [_requisicao(servidor.porta, "POST", "/reservas",
+                                    {"documento": "123", "quarto": 101, "entrada": "2026-11-10", "saida": "2026-11-12"})
+                        for _ in range(10)]
+        pagamentos = [_requisicao(servidor.porta, "POST", "/adicionais",
+                                  {"documento": "456", "quarto": 201, "descricao": "Frigobar", "valor": 1})
+                      for _ in range(10)]
+        await _requisicao(servidor.porta, "POST", "/reservas",
+                          {"documento": "456", "quarto": 201, "entrada": "2026-11-10", "saida": "2026-11-12"})
+        respostas = await asyncio.gather(*conflitantes, *pagamentos)
+        return respostas, servidor.operacoes, servidor.gravacoes
+
+    respostas, operacoes, gravacoes = _com_servidor(cenario)
+
+    # Só uma das reservas concorrentes para o mesmo quarto e período é aceita:
+    assert sorted(status for status, _ in respostas[:10]) == [201] + [400] * 9
+    assert len(services.reservas_db) == 2
+    # Nenhuma alteração se perdeu e as dez foram gravadas em lotes, não uma a uma:
+    assert len(services.buscar_reserva("456", 201).adicionais) == 10
+    assert operacoes == 21
+    assert gravacoes < 11
+
+def test_lote_recusado_volta_a_memoria_ao_que_esta_gravado(monkeypatch):
+    backend = services._obter_armazenamento()
+    salvar_alteracoes = backend.salvar_alteracoes
+    leituras = []
+
+    async def ler_a_reserva(porta):
+        leituras.append(asyncio.ensure_future(_requisicao(porta, "GET", "/reservas?documento=123&quarto=101")))
+        await asyncio.sleep(0.05)
+
+    async def cenario(servidor):
+        laco = asyncio.get_running_loop()
+
+        def salvar_com_conflito(entidades):
+            # Uma leitura chega enquanto o lote grava; ela espera a gravação (recusada) terminar.
+            asyncio.run_coroutine_threadsafe(ler_a_reserva(servidor.porta), laco).result()
+            raise ConflitoVersao("Outro processo gravou antes.")
+
+        monkeypatch.setattr(backend, "salvar_alteracoes", salvar_com_conflito)
+        status, erro = await _requisicao(servidor.porta, "POST", "/reservas",
+                                         {"documento": "123", "quarto": 101, "entrada": "2026-11-10", "saida": "2026-11-12"})
+        durante = await leituras[0]
+        monkeypatch.setattr(backend, "salvar_alteracoes", salvar_alteracoes)
+        depois = await _requisicao(servidor.porta, "GET", "/reservas?documento=123&quarto=101")
+        return status, erro, durante, depois, servidor.gravacoes
+
+    status, erro, durante, depois, gravacoes = _com_servidor(cenario)
+
+    assert status == 409 and "Outro processo" in erro["erro"]
+    assert gravacoes == 0
+    # A reserva recusada não aparece nem durante a gravação nem depois: a memória foi recarregada.
+    assert durante[0] == 404 and depois[0] == 404
+    assert services.buscar_reserva("123", 101) is None
+    assert services.buscar_hospede("123").historico_reservas == []
@@ -0,0 +1,107 @@
+"""
+Conjunto de testes para a auditoria noturna.
+"""
+
+from hotel import services, data, auditoria
+from datetime import date, datetime, timedelta
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def dados_iniciais(setup_inicial):
+    for numero in (101, 102, 103, 104):
+        services.cadastrar_quarto(numero, "SIMPLES", 1, 100.0)
+    services.cadastrar_hospede("Jayr", "123", "e", "t")
+    services.cadastrar_hospede("Maria", "456", "e", "t")
+
+
+def _hospedar(documento, numero, entrada, saida):
+    """
+    Cria a reserva já em CHECKIN (o check-in pelo serviço só aceita a data de hoje).
+    """
+    reserva = services.realizar_reserva(documento, numero, entrada, saida, 1)
+    reserva.status = "CHECKIN"
+    services.repositorio.atualizar_reserva(reserva)
+    return reserva
+
+
+# TESTES DA AUDITORIA NOTURNA:
+
+def test_auditoria_marca_no_shows_do_dia():
+    dia = date(2026, 11, 10)
+    atrasada = services.realizar_reserva("123", 101, dia, dia + timedelta(days=2), 1)
+    atrasada.confirmar()
+    pendente = services.realizar_reserva("456", 102, dia, dia + timedelta(days=1), 1)
+    amanha = services.realizar_reserva("456", 103, dia + timedelta(days=1), dia + timedelta(days=2), 1)
+    amanha.confirmar()
+    eventos_antes = data.eventos_pendentes
+
+    # Antes do fim da tolerância (14h + 60 min), ninguém vira No-Show:
+    resultado = auditoria.executar_auditoria(dia, datetime(2026, 11, 10, 14, 30))
+    assert resultado["no_shows"] == []
+
+    resultado = auditoria.executar_auditoria(dia, datetime(2026, 11, 10, 23, 0))
+    assert [ns["reserva_id"] for ns in resultado["no_shows"]] == [atrasada.id]
+    assert resultado["no_shows"][0]["multa"] == 220.0
+    assert atrasada.status == "NO_SHOW"
+    assert pendente.status == "PENDENTE" and amanha.status == "CONFIRMADA"
+    assert services._verificar_disponibilidade(101, dia, dia + timedelta(days=2))
+    # Uma única gravação no journal: a reserva e o quarto liberado.
+    assert data.eventos_pendentes == eventos_antes + 2
+
+def test_auditoria_depois_de_uma_noite_sem_auditoria():
+    dia = date(2026, 11, 10)
+    esquecida = services.realizar_reserva("123", 101, dia, dia + timedelta(days=3), 1)
+    esquecida.confirmar()
+    de_hoje = services.realizar_reserva("456", 102, dia + timedelta(days=1), dia + timedelta(days=2), 1)
+    de_hoje.confirmar()
+
+    # A auditoria do dia 10 não rodou; a do dia 11, antes da tolerância, pega só a chegada do dia 10:
+    resultado = auditoria.executar_auditoria(dia + timedelta(days=1), datetime(2026, 11, 11, 9, 0))
+    assert [ns["reserva_id"] for ns in resultado["no_shows"]] == [esquecida.id]
+    assert esquecida.status == "NO_SHOW" and de_hoje.status == "CONFIRMADA"
+
+def test_auditoria_nao_percorre_o_historico(monkeypatch):
+    dia = date(2026, 11, 10)
+    for i in range(50):
+        encerrada = services.realizar_reserva("456", 104, dia - timedelta(days=100 - 2 * i), dia - timedelta(days=99 - 2 * i), 1)
+        encerrada.status = "CHECKOUT"
+        services.repositorio.atualizar_reserva(encerrada)
+    confirmada = services.realizar_reserva("123", 101, dia, dia + timedelta(days=1), 1)
+    services.confirmar_reserva("123", 101)
+
+    # A auditoria lê as chegadas em aberto, não o índice de todas as entradas:
+    monkeypatch.setattr(services.repositorio.entradas, "entre", None)
+    assert services.repositorio.chegadas.ate(dia) == [confirmada]
+    resultado = auditoria.executar_auditoria(dia, datetime(2026, 11, 10, 23, 0))
+    assert [ns["reserva_id"] for ns in resultado["no_shows"]] == [confirmada.id]
+    assert services.repositorio.chegadas.ate(dia) == []
+
+def test_auditoria_checkouts_atrasados_e_diarias():
+    dia = date(2026, 11, 10)
+    vencida = _hospedar("123", 101, dia - timedelta(days=3), dia - timedelta(days=1))
+    sai_hoje = _hospedar("456", 102, dia - timedelta(days=2), dia)
+    em_casa = _hospedar("456", 103, dia - timedelta(days=1), dia + timedelta(days=2))
+
+    resultado = auditoria.executar_auditoria(dia, datetime(2026, 11, 10, 11, 0))
+    assert [a["reserva_id"] for a in resultado["checkouts_atrasados"]] == [vencida.id]
+    assert resultado["checkouts_atrasados"][0]["dias_atraso"] == 1
+
+    resultado = auditoria.executar_auditoria(dia, datetime(2026, 11, 10, 13, 0))
+    assert [a["reserva_id"] for a in resultado["checkouts_atrasados"]] == [vencida.id, sai_hoje.id]
+
+    assert [d["reserva_id"] for d in resultado["diarias"]] == [em_casa.id]
+    assert resultado["total_diarias"] == services.calcular_valor_diaria(dia, 100.0)
+
+def test_hospedagens_acompanham_o_status():
+    hoje = date.today()
+    reserva = services.realizar_reserva("123", 101, hoje, hoje + timedelta(days=1), 1)
+    services.confirmar_reserva("123", 101)
+    assert services.repositorio.hospedagens == {}
+
+    services.realizar_checkin("123", 101)
+    assert list(services.repositorio.hospedagens) == [reserva.id]
+
+    services.registrar_pagamento("123", 101, services.calcular_total_reserva(reserva), "PIX")
+    services.realizar_checkout("123", 101)
+    assert services.repositorio.hospedagens == {}
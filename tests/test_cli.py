@@ -0,0 +1,111 @@
+"""
+Conjunto de testes para a linha de comando não interativa.
+"""
+
+from hotel import services, data, cli
+import json
+
+
+def _rodar(capsys, *argv):
+    codigo = cli.main(list(argv))
+    saida = capsys.readouterr().out
+    return codigo, [json.loads(linha) for linha in saida.splitlines()]
+
+
+# TESTES DA CLI:
+
+def test_comandos_avulsos_sem_dados_de_exemplo(capsys):
+    codigo, [resultado] = _rodar(capsys, "quarto", "101", "simples", "1", "100")
+    assert codigo == 0
+    assert resultado["ok"] and resultado["resultado"]["tipo"] == "SIMPLES"
+    # O sistema vazio não recebe os dados de exemplo do menu interativo:
+    assert [q.numero for q in services.quartos_db] == [101]
+
+    codigo, [resultado] = _rodar(capsys, "reservar", "123", "101", "2026-11-10", "2026-11-12", "1")
+    assert codigo == 1
+    assert resultado == {"ok": False, "comando": "reservar", "erro": "Erro: Hóspede não encontrado. Cadastre-o antes."}
+
+def test_lote_continua_apos_erros(tmp_path, capsys):
+    lote = tmp_path / "operacoes.txt"
+    lote.write_text(
+        "quarto 101 SIMPLES 1 100\n"
+        "hospede Jayr 123 e t\n"
+        "# comentário\n"
+        "reservar 123 101 10/11/2026 2026-11-12 1\n"
+        "reservar 123 101 2026-11-11 2026-11-13 1\n"
+        "confirmar 123 101\n"
+        "pagar 123 101 50 --forma pix\n"
+        "adicional 123 101 \"Frigobar duplo\" 12.5\n"
+        "comando-inexistente\n"
+        "relatorio financeiro\n", encoding="utf-8")
+
+    codigo, resultados = _rodar(capsys, "lote", str(lote))
+
+    assert codigo == 1
+    assert [r["ok"] for r in resultados] == [True, True, True, False, True, True, True, False, True]
+    assert "ocupado" in resultados[3]["erro"]
+    assert resultados[6]["resultado"]["total_pago"] == 50.0
+    assert resultados[8]["resultado"]["receita"] == resultados[6]["resultado"]["total"]
+
+    reserva = services.buscar_reserva("123", 101)
+    assert reserva.status == "CONFIRMADA"
+    assert reserva.adicionais[0].descricao == "Frigobar duplo"
+
+def test_lote_linha_com_aspas_sem_fechamento(tmp_path, capsys):
+    lote = tmp_path / "operacoes.txt"
+    lote.write_text(
+        "quarto 101 SIMPLES 1 100\n"
+        "hospede \"Jayr Alencar 123 e t\n"
+        "quarto 102 SIMPLES 1 100\n", encoding="utf-8")
+
+    codigo, resultados = _rodar(capsys, "lote", str(lote))
+
+    assert codigo == 1
+    assert [r["ok"] for r in resultados] == [True, False, True]
+    assert resultados[1]["comando"] == "hospede" and "quotation" in resultados[1]["erro"]
+    assert [q.numero for q in services.quartos_db] == [101, 102]
+
+def test_lote_continua_apos_ajuda_e_dados_corrompidos(tmp_path, capsys, monkeypatch):
+    def historico_corrompido(**_):
+        raise data.DadosCorrompidos("reservas.json não confere com o manifesto.")
+    monkeypatch.setattr(services, "gerar_relatorio_financeiro", historico_corrompido)
+
+    lote = tmp_path / "operacoes.txt"
+    lote.write_text(
+        "quarto 101 SIMPLES 1 100\n"
+        "quarto --help\n"
+        "relatorio financeiro\n"
+        "quarto 102 SIMPLES 1 100\n", encoding="utf-8")
+
+    codigo, resultados = _rodar(capsys, "lote", str(lote))
+
+    assert codigo == 1
+    assert [r["ok"] for r in resultados] == [True, False, False, True]
+    assert resultados[1]["comando"] == "quarto" and "ajuda" in resultados[1]["erro"]
+    assert resultados[2] == {"ok": False, "comando": "relatorio", "erro": "reservas.json não confere com o manifesto."}
+    assert [q.numero for q in services.quartos_db] == [101, 102]
+
+def test_mensagens_dos_servicos_vao_para_saida_de_erro(capsys):
+    cli.main(["quarto", "101", "SIMPLES", "1", "100"])
+    cli.main(["relatorio", "ocupacao"])
+    capturado = capsys.readouterr()
+    assert "RELATÓRIO DE OCUPAÇÃO" in capturado.err
+    assert json.loads(capturado.out.splitlines()[-1])["resultado"] == {"ocupacao": 0.0}
+
+def test_relatorio_periodo_exige_datas(capsys):
+    codigo, [resultado] = _rodar(capsys, "relatorio", "periodo")
+    assert codigo == 1
+    assert "--inicio" in resultado["erro"]
+
+def test_armazenamento_corrompido_nao_inicia(capsys):
+    _rodar(capsys, "quarto", "101", "simples", "1", "100")
+    services.salvar_tudo()
+    capsys.readouterr()
+    with open(data.ARQUIVO_QUARTOS, "w", encoding="utf-8") as f:
+        f.write("[")
+
+    codigo, [resultado] = _rodar(capsys, "hospede", "Jayr", "123", "e", "t")
+    assert codigo == 1
+    assert not resultado["ok"] and ("corrompido" in resultado["erro"] or "não confere" in resultado["erro"])
+    # O arquivo corrompido não foi sobrescrito:
+    assert open(data.ARQUIVO_QUARTOS, encoding="utf-8").read() == "["
@@ -0,0 +1,123 @@
+"""
+Conjunto de testes para a fachada de serviços segura para threads.
+"""
+
+from hotel import services, config, data, concorrente
+from datetime import date, timedelta
+import random
+import sys
+import threading
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def dados_iniciais(setup_inicial, monkeypatch):
+    monkeypatch.setattr(config, "get_limite_journal", lambda: 10**9)
+
+    # Trocas de thread bem mais frequentes, para expor condições de corrida:
+    intervalo = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(intervalo)
+
+
+def _em_threads(quantidade, alvo):
+    threads = [threading.Thread(target=alvo, args=(i,)) for i in range(quantidade)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+# TESTES DE CONCORRÊNCIA:
+
+def test_reservas_concorrentes_sem_overbooking():
+    for numero in range(101, 106):
+        services.cadastrar_quarto(numero, "SIMPLES", 1, 100.0)
+    services.cadastrar_hospede("Jayr", "123", "e", "t")
+    eventos_antes = data.eventos_pendentes
+    aceitas = []
+
+    def reservar(semente):
+        sorteio = random.Random(semente)
+        for _ in range(100):
+            entrada = date(2026, 11, 1) + timedelta(days=sorteio.randrange(20))
+            try:
+                reserva = concorrente.realizar_reserva("123", sorteio.randrange(101, 106), entrada,
+                                                       entrada + timedelta(days=sorteio.randrange(1, 4)), 1)
+                aceitas.append(reserva)
+            except ValueError:
+                pass
+
+    _em_threads(8, reservar)
+
+    assert len(services.reservas_db) == len(aceitas)
+    for numero in range(101, 106):
+        do_quarto = sorted((r for r in aceitas if r.quarto.numero == numero), key=lambda r: r.data_entrada)
+        for anterior, seguinte in zip(do_quarto, do_quarto[1:]):
+            assert anterior.data_saida <= seguinte.data_entrada
+
+    # Índices compartilhados entre quartos continuam coerentes com as reservas:
+    for r in aceitas:
+        noite = r.data_entrada
+        while noite < r.data_saida:
+            assert services.repositorio.inventario.reserva_em(r.quarto.numero, noite) == r.id
+            assert r.quarto not in services.repositorio.ocupacao.livres(noite, noite + timedelta(days=1))
+            noite += timedelta(days=1)
+    assert len(list(services.repositorio.entradas.entre())) == len(aceitas)
+    # Cada reserva aceita foi gravada exatamente uma vez no journal:
+    assert data.eventos_pendentes == eventos_antes + len(aceitas)
+
+def test_cadastro_concorrente_de_hospedes():
+    resultados = []
+
+    def cadastrar(i):
+        try:
+            concorrente.cadastrar_hospede("Jayr", "123", "e", "t")
+            resultados.append("ok")
+        except ValueError:
+            resultados.append("duplicado")
+
+    _em_threads(8, cadastrar)
+
+    assert resultados.count("ok") == 1
+    assert len(services.hospedes_db) == 1
+
+def test_pagamentos_concorrentes_na_mesma_conta():
+    services.cadastrar_quarto(101, "SIMPLES", 1, 100.0)
+    services.cadastrar_hospede("Jayr", "123", "e", "t")
+    reserva = concorrente.realizar_reserva("123", 101, date(2026, 11, 10), date(2026, 11, 12), 1)
+
+    _em_threads(8, lambda i: [concorrente.registrar_pagamento("123", 101, 1.0, "PIX") for _ in range(25)])
+
+    assert len(reserva.pagamentos) == 200
+    assert reserva.total_pago == 200.0
+
+
+def test_consultas_nao_veem_recarga_pela_metade():
+    # Bastante dados para que cada recarga demore:
+    for numero in range(101, 401):
+        services.cadastrar_quarto(numero, "SIMPLES", 1, 100.0)
+    services.cadastrar_hospede("Jayr", "123", "e", "t")
+    parar = threading.Event()
+    falhas = []
+
+    def consultar():
+        while not parar.is_set():
+            if concorrente.buscar_quarto(400) is None or concorrente.buscar_hospede("123") is None:
+                falhas.append("repositório vazio")
+
+    leitor = threading.Thread(target=consultar)
+    leitor.start()
+    try:
+        for dia in range(20):
+            # Como depois de um conflito de versão: a próxima operação recarrega tudo do armazenamento.
+            services._recarga_pendente = True
+            entrada = date(2026, 11, 1) + timedelta(days=2 * dia)
+            concorrente.realizar_reserva("123", 101, entrada, entrada + timedelta(days=1), 1)
+    finally:
+        parar.set()
+        leitor.join()
+
+    assert falhas == []
+    assert len(services.reservas_db) == 20
@@ -0,0 +1,47 @@
+"""
+Conjunto de testes para a leitura das configurações e o calendário de temporadas.
+"""
+
+from hotel import config
+from datetime import date
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def setup_inicial():
+    config.carregar_configuracoes()
+    yield
+    config.carregar_configuracoes()
+
+
+# TESTES DO CALENDÁRIO DE TEMPORADAS:
+
+def test_calendario_temporada_cruzando_ano_novo():
+    assert config.get_multiplicador_temporada(date(2025, 12, 19)) == 1.0
+    assert config.get_multiplicador_temporada(date(2025, 12, 20)) == 1.5
+    assert config.get_multiplicador_temporada(date(2025, 12, 31)) == 1.5
+    assert config.get_multiplicador_temporada(date(2026, 1, 1)) == 1.5
+    assert config.get_multiplicador_temporada(date(2026, 1, 5)) == 1.5
+    assert config.get_multiplicador_temporada(date(2026, 1, 6)) == 1.0
+
+def test_calendario_tamanho_ano_bissexto():
+    assert len(config.get_calendario_temporadas(2024)) == 366
+    assert len(config.get_calendario_temporadas(2025)) == 365
+    assert config.get_multiplicador_temporada(date(2024, 12, 31)) == 1.5
+
+def test_segmentos_cobrem_o_ano():
+    segmentos = config.get_segmentos_temporada(2025)
+    assert segmentos[0][0] == 0
+    assert segmentos[-1][1] == 365
+    for (_, fim, _), (inicio, _, _) in zip(segmentos, segmentos[1:]):
+        assert fim == inicio
+
+def test_calendario_invalidado_ao_recarregar():
+    assert config.get_multiplicador_temporada(date(2025, 3, 15)) == 1.0
+
+    config.regras["temporadas"] = [{"nome": "Teste", "inicio": "29-02", "fim": "20-03", "multiplicador": 2.0}]
+    config._compilar_temporadas()
+
+    assert config.get_multiplicador_temporada(date(2025, 3, 15)) == 2.0
+    assert config.get_multiplicador_temporada(date(2025, 2, 28)) == 1.0
+    assert config.get_multiplicador_temporada(date(2024, 2, 29)) == 2.0
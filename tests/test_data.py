@@ -0,0 +1,376 @@
+"""
+Conjunto de testes para a persistência em arquivos JSON e o journal de alterações.
+"""
+
+from hotel import data, services, config
+from hotel.data import DadosCorrompidos
+from hotel.models import Hospede, Quarto, Reserva, Pagamento, Adicional, ConflitoVersao
+from datetime import date
+import json
+import multiprocessing
+import os
+import pytest
+
+
+def _entidades():
+    quarto = Quarto(101, "SIMPLES", 2, 100.0)
+    hospede = Hospede("Jayr Alencar", "123", "e", "t")
+    reserva = Reserva(hospede, quarto, date(2025, 6, 10), date(2025, 6, 12), 1)
+    return quarto, hospede, reserva
+
+
+# TESTES DO SNAPSHOT:
+
+def test_salvar_e_carregar_dados():
+    quarto, hospede, reserva = _entidades()
+    data.salvar_dados([quarto], [hospede], [reserva])
+
+    quartos, hospedes, reservas = data.carregar_dados()
+    assert quartos[0].numero == 101
+    assert hospedes[0].documento == "123"
+    assert reservas[0].id == reserva.id
+    assert reservas[0] in hospedes[0].historico_reservas
+
+
+# TESTES DO JOURNAL:
+
+def test_journal_reaplicado_sobre_snapshot():
+    quarto, hospede, reserva = _entidades()
+    data.salvar_dados([quarto], [hospede], [])
+
+    data.registrar_alteracoes([reserva])
+    reserva.pagamentos.append(Pagamento(80.0, "PIX"))
+    quarto.status = "OCUPADO"
+    assert data.registrar_alteracoes([reserva, quarto]) == 3
+
+    quartos, _, reservas = data.carregar_dados()
+    assert quartos[0].status == "OCUPADO"
+    assert len(reservas) == 1
+    assert reservas[0].pagamentos[0].valor == 80.0
+    assert data.eventos_pendentes == 3
+
+def test_snapshot_esvazia_journal():
+    quarto, hospede, reserva = _entidades()
+    data.registrar_alteracoes([quarto, hospede, reserva])
+    data.salvar_dados([quarto], [hospede], [reserva])
+
+    assert data.eventos_pendentes == 0
+    assert data._ler_journal() == []
+
+def test_journal_ignora_ultima_linha_incompleta():
+    quarto, hospede, _ = _entidades()
+    data.registrar_alteracoes([quarto, hospede])
+    with open(data.ARQUIVO_JOURNAL, "a", encoding="utf-8") as f:
+        f.write('{"tipo": "quarto", "dad')
+
+    quartos, hospedes, _ = data.carregar_dados()
+    assert len(quartos) == 1
+    assert len(hospedes) == 1
+
+def test_reservas_legadas_sem_id():
+    quarto, hospede, reserva = _entidades()
+    dado_reserva = reserva.to_dict()
+    del dado_reserva["id"]
+    data.salvar_dados([quarto], [hospede], [])
+    with open(data.ARQUIVO_RESERVAS, "w", encoding="utf-8") as f:
+        json.dump([dado_reserva], f)
+    # Dados legados não têm manifesto:
+    os.remove(data._caminho_manifesto())
+
+    _, _, reservas = data.carregar_dados()
+    assert reservas[0].id == "legado-0"
+
+def test_reservas_orfas_reportadas_e_preservadas():
+    quarto, hospede, reserva = _entidades()
+    outro_hospede = Hospede("Sabrina", "456", "e", "t")
+    orfa = Reserva(outro_hospede, quarto, date(2025, 7, 1), date(2025, 7, 3), 1)
+    data.salvar_dados([quarto], [hospede], [reserva, orfa])
+
+    quartos, hospedes, reservas = data.carregar_dados()
+    assert [r.id for r in reservas] == [reserva.id]
+    assert [d["id"] for d in data.reservas_orfas] == [orfa.id]
+
+    data.salvar_dados(quartos, hospedes, reservas)
+    with open(data.ARQUIVO_RESERVAS, encoding="utf-8") as f:
+        assert {d["id"] for d in json.load(f)} == {reserva.id, orfa.id}
+
+
+# TESTES DO CARREGAMENTO LAZY:
+
+def test_iterar_arquivo_em_blocos_pequenos():
+    quarto, hospede, reserva = _entidades()
+    outra = Reserva(hospede, quarto, date(2025, 7, 1), date(2025, 7, 3), 1)
+    data.salvar_dados([quarto], [hospede], [reserva, outra])
+
+    itens = list(data._iterar_arquivo(data.ARQUIVO_RESERVAS, tamanho_bloco=7))
+    assert [d["id"] for d in itens] == [reserva.id, outra.id]
+    assert list(data._iterar_arquivo("inexistente.json")) == []
+
+def test_posicoes_dos_itens_em_bytes():
+    quarto, hospede, reserva = _entidades()
+    reserva.adicionais.append(Adicional("Café ☕ e pão de queijo", 12.5))
+    outra = Reserva(hospede, quarto, date(2025, 7, 1), date(2025, 7, 3), 1)
+    data.salvar_dados([quarto], [hospede], [reserva, outra])
+
+    with open(data.ARQUIVO_RESERVAS, "rb") as f:
+        conteudo = f.read()
+        f.seek(0)
+        itens = list(data._itens_da_lista(f, data.ARQUIVO_RESERVAS, tamanho_bloco=5, posicoes=True))
+    assert [json.loads(conteudo[inicio:fim]) for _, inicio, fim in itens] == [item for item, _, _ in itens]
+    assert [item["id"] for item, _, _ in itens] == [reserva.id, outra.id]
+
+def test_carregar_lazy_mantem_historico_no_disco():
+    quarto, hospede, ativa = _entidades()
+    encerrada = Reserva(hospede, quarto, date(2025, 1, 1), date(2025, 1, 3), 1, "CHECKOUT")
+    data.salvar_dados([quarto], [hospede], [encerrada, ativa])
+
+    quartos, hospedes, reservas = data.carregar_dados(lazy=True)
+    assert [r.id for r in reservas] == [ativa.id]
+    assert hospedes[0].historico_reservas == reservas
+
+    historico = list(data.iterar_historico(quartos, hospedes))
+    assert [r.id for r in historico] == [encerrada.id]
+    assert list(data.iterar_historico(quartos, hospedes, documento="999")) == []
+
+def test_historico_do_hospede_igual_ao_filtro_do_historico_completo(monkeypatch):
+    quarto = Quarto(101, "SIMPLES", 2, 100.0)
+    jose, ana = Hospede("José", "123", "e", "t"), Hospede("Ana", "456", "e", "t")
+    antigas = [Reserva(h, quarto, date(2025, 1, 1 + i), date(2025, 1, 2 + i), 1, "CHECKOUT")
+               for i, h in enumerate([jose, ana, jose, ana, jose])]
+    ativa = Reserva(jose, quarto, date(2025, 6, 1), date(2025, 6, 3), 1, "CONFIRMADA")
+    data.salvar_dados([quarto], [jose, ana], antigas + [ativa])
+    quartos, hospedes, _ = data.carregar_dados(lazy=True)
+
+    # Alterações no journal: uma encerrada ganha um pagamento, a ativa é encerrada e surge uma só no journal.
+    antigas[2].pagamentos.append(Pagamento(10.0, "PIX"))
+    ativa.status = "CHECKOUT"
+    nova = Reserva(jose, quarto, date(2025, 2, 1), date(2025, 2, 2), 1, "CANCELADA")
+    data.registrar_alteracoes([antigas[2], ativa, nova])
+
+    def por_documento(documento):
+        return [r.to_dict() for r in data.iterar_historico(quartos, hospedes, documento=documento)]
+
+    def filtrado(documento):
+        return [r.to_dict() for r in data.iterar_historico(quartos, hospedes) if r.hospede.documento == documento]
+
+    indexacoes = []
+    itens_da_lista = data._itens_da_lista
+    monkeypatch.setattr(data, "_itens_da_lista", lambda *a, **k: indexacoes.append(k.get("posicoes")) or itens_da_lista(*a, **k))
+
+    for documento in ("123", "456", "999"):
+        assert por_documento(documento) == filtrado(documento)
+    assert [d["id"] for d in por_documento("123")] == [antigas[0].id, antigas[2].id, antigas[4].id, ativa.id, nova.id]
+    assert por_documento("123")[1]["pagamentos"][0]["valor"] == 10.0
+    # O snapshot foi indexado uma única vez para todas as consultas por hóspede:
+    assert indexacoes.count(True) == 1
+
+    # Uma nova linha no journal aparece sem reindexar o snapshot; um novo snapshot é indexado de novo.
+    antigas[1].pagamentos.append(Pagamento(5.0, "PIX"))
+    data.registrar_alteracoes([antigas[1]])
+    assert por_documento("456")[0]["pagamentos"][0]["valor"] == 5.0
+    assert indexacoes.count(True) == 1
+    data.salvar_dados(quartos, hospedes, antigas + [ativa, nova])
+    assert por_documento("456") == filtrado("456")
+    assert indexacoes.count(True) == 2
+
+def test_snapshot_lazy_preserva_historico():
+    quarto, hospede, ativa = _entidades()
+    encerrada = Reserva(hospede, quarto, date(2025, 1, 1), date(2025, 1, 3), 1, "CANCELADA")
+    data.salvar_dados([quarto], [hospede], [encerrada, ativa])
+
+    quartos, hospedes, reservas = data.carregar_dados(lazy=True)
+    reservas[0].status = "CHECKOUT"
+    data.registrar_alteracoes(reservas)
+    data.salvar_dados(quartos, hospedes, reservas)
+
+    data.historico_em_disco = False
+    _, _, todas = data.carregar_dados()
+    assert {r.id: r.status for r in todas} == {ativa.id: "CHECKOUT", encerrada.id: "CANCELADA"}
+
+
+# TESTES DE VERSÕES (VÁRIOS PROCESSOS):
+
+def _gravar_como_outro_processo(tipo: str, dados: dict):
+    """
+    Acrescenta ao journal uma linha como outro processo faria, sem passar pelo estado deste processo.
+    """
+    with open(data.ARQUIVO_JOURNAL, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"tipo": tipo, "dados": dados}) + "\n")
+
+def test_gravacao_sobe_versao():
+    quarto, hospede, reserva = _entidades()
+    data.registrar_alteracoes([quarto, hospede, reserva])
+    data.registrar_alteracoes([reserva])
+    assert (quarto.versao, hospede.versao, reserva.versao) == (1, 1, 2)
+
+    quartos, hospedes, reservas = data.carregar_dados()
+    assert (quartos[0].versao, hospedes[0].versao, reservas[0].versao) == (1, 1, 2)
+
+def test_conflito_quando_outro_processo_grava_a_mesma_reserva():
+    quarto, hospede, reserva = _entidades()
+    data.salvar_dados([quarto], [hospede], [reserva])
+    _, _, (minha,) = data.carregar_dados()
+
+    # Outro processo registra um pagamento na mesma reserva:
+    dados = minha.to_dict()
+    dados["pagamentos"] = [Pagamento(80.0, "PIX").to_dict()]
+    dados["versao"] = 1
+    _gravar_como_outro_processo("reserva", dados)
+
+    minha.status = "CANCELADA"
+    with pytest.raises(ConflitoVersao):
+        data.registrar_alteracoes([minha])
+    assert minha.versao == 0
+
+    # O pagamento do outro processo não foi sobrescrito:
+    _, _, (gravada,) = data.carregar_dados()
+    assert gravada.pagamentos[0].valor == 80.0
+    assert gravada.status == "PENDENTE"
+
+def test_conflito_reserva_nova_sobreposta():
+    quarto, hospede, reserva = _entidades()
+    data.salvar_dados([quarto], [hospede], [])
+    data.carregar_dados()
+
+    outra = Reserva(hospede, quarto, date(2025, 6, 11), date(2025, 6, 13), 1)
+    outra.versao = 1
+    _gravar_como_outro_processo("reserva", outra.to_dict())
+
+    with pytest.raises(ConflitoVersao):
+        data.registrar_alteracoes([reserva])
+
+    # Período sem sobreposição no mesmo quarto é aceito:
+    depois = Reserva(hospede, quarto, date(2025, 6, 13), date(2025, 6, 15), 1)
+    data.registrar_alteracoes([depois])
+    assert depois.versao == 1
+
+def test_alteracoes_externas():
+    quarto, hospede, _ = _entidades()
+    data.registrar_alteracoes([quarto])
+    assert data.alteracoes_externas() == []
+
+    _gravar_como_outro_processo("hospede", {**hospede.to_dict(), "versao": 1})
+    assert data.alteracoes_externas() == [("hospede", {**hospede.to_dict(), "versao": 1})]
+    assert data.alteracoes_externas() == []
+
+    # Outro processo compactou (novo snapshot e journal de outra geração):
+    with open(data.ARQUIVO_JOURNAL, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"geracao": "outra"}) + "\n")
+    assert data.alteracoes_externas() is None
+    with pytest.raises(ConflitoVersao):
+        data.registrar_alteracoes([quarto])
+
+    data.carregar_dados()
+    assert data.alteracoes_externas() == []
+
+
+# TESTES DE GRAVAÇÃO ATÔMICA E VERIFICAÇÃO DO SNAPSHOT:
+
+def test_snapshot_truncado_recusa_carga():
+    quarto, hospede, reserva = _entidades()
+    data.salvar_dados([quarto], [hospede], [reserva])
+    with open(data.ARQUIVO_RESERVAS, "r+", encoding="utf-8") as f:
+        f.truncate(40)
+
+    with pytest.raises(DadosCorrompidos):
+        data.carregar_dados()
+
+def test_arquivo_ilegivel_sem_manifesto_nao_vira_lista_vazia():
+    with open(data.ARQUIVO_RESERVAS, "w", encoding="utf-8") as f:
+        f.write('[{"id": "a", ')
+
+    with pytest.raises(DadosCorrompidos):
+        data.carregar_dados()
+
+def test_journal_corrompido_no_meio_recusa_carga():
+    quarto, hospede, _ = _entidades()
+    data.registrar_alteracoes([quarto])
+    with open(data.ARQUIVO_JOURNAL, "a", encoding="utf-8") as f:
+        f.write("lixo\n")
+    _gravar_como_outro_processo("hospede", hospede.to_dict())
+
+    with pytest.raises(DadosCorrompidos):
+        data.registrar_alteracoes([hospede])
+
+    with pytest.raises(DadosCorrompidos):
+        data.carregar_dados()
+
+def test_queda_antes_da_confirmacao_mantem_snapshot_anterior(monkeypatch):
+    quarto, hospede, reserva = _entidades()
+    data.salvar_dados([quarto], [hospede], [reserva])
+    reserva.status = "CANCELADA"
+    data.registrar_alteracoes([reserva])
+
+    def queda(resumos):
+        raise OSError("queda simulada")
+    with monkeypatch.context() as m, pytest.raises(OSError):
+        m.setattr(data, "_confirmar_snapshot", queda)
+        data.salvar_dados([quarto], [hospede], [])
+
+    # Os temporários são ignorados; o snapshot anterior e o journal continuam valendo:
+    _, _, reservas = data.carregar_dados()
+    assert [(r.id, r.status) for r in reservas] == [(reserva.id, "CANCELADA")]
+
+def test_queda_durante_a_troca_e_completada(monkeypatch):
+    quarto, hospede, reserva = _entidades()
+    data.salvar_dados([quarto], [hospede], [])
+    data.registrar_alteracoes([reserva])
+
+    # Cai depois de confirmar o manifesto e trocar só o primeiro arquivo:
+    trocar = os.replace
+    trocas = []
+    def replace(origem, destino):
+        trocas.append(destino)
+        if len(trocas) == 3:
+            raise OSError("queda simulada")
+        trocar(origem, destino)
+    with monkeypatch.context() as m, pytest.raises(OSError):
+        m.setattr(data.os, "replace", replace)
+        data.salvar_dados([quarto], [hospede], [reserva])
+
+    # A carga completa a troca e descarta o journal antigo (já incluído no snapshot):
+    _, _, reservas = data.carregar_dados()
+    assert [r.id for r in reservas] == [reserva.id]
+    assert data.eventos_pendentes == 0
+    assert not os.path.exists(data.ARQUIVO_RESERVAS + ".tmp")
+
+
+# TESTES COM VÁRIOS PROCESSOS NO MESMO DIRETÓRIO DE DADOS:
+
+def _trabalhar_em_processo(indice, fila):
+    services.inicializar_sistema(dados_exemplo=False)
+    pagos = 0
+    for _ in range(15):
+        services.registrar_pagamento("123", 101, 1.0, "PIX")
+        pagos += 1
+    try:
+        services.realizar_reserva("123", 102, date(2026, 12, 1), date(2026, 12, 3), 1)
+        reservou = True
+    except ValueError:
+        reservou = False
+    fila.put((pagos, reservou))
+
+@pytest.mark.parametrize("limite_journal", [10**9, 7])
+def test_processos_nao_perdem_gravacoes(monkeypatch, limite_journal):
+    monkeypatch.setattr(config, "get_limite_journal", lambda: limite_journal)
+    services.inicializar_sistema(dados_exemplo=False)
+    services.cadastrar_quarto(101, "SIMPLES", 1, 100.0)
+    services.cadastrar_quarto(102, "SIMPLES", 1, 100.0)
+    services.cadastrar_hospede("Jayr", "123", "e", "t")
+    services.realizar_reserva("123", 101, date(2026, 11, 10), date(2026, 11, 12), 1)
+
+    contexto = multiprocessing.get_context("fork")
+    fila = contexto.Queue()
+    processos = [contexto.Process(target=_trabalhar_em_processo, args=(i, fila)) for i in range(3)]
+    for p in processos:
+        p.start()
+    resultados = [fila.get(timeout=60) for _ in processos]
+    for p in processos:
+        p.join()
+
+    # Com o limite baixo, os processos compactam o journal enquanto os outros gravam:
+    services.inicializar_sistema(dados_exemplo=False)
+    reserva = services.buscar_reserva("123", 101)
+    assert len(reserva.pagamentos) == sum(pagos for pagos, _ in resultados) == 45
+    assert [reservou for _, reservou in resultados].count(True) == 1
+    assert len([r for r in services.reservas_db if r.quarto.numero == 102]) == 1
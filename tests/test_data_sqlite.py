@@ -0,0 +1,200 @@
+"""
+Conjunto de testes para o backend de persistência em SQLite.
+"""
+
+from hotel import data_sqlite
+from hotel.data_sqlite import ArmazenamentoSQLite
+from hotel.models import Hospede, Quarto, Reserva, Pagamento, Adicional, ConflitoVersao
+from datetime import date
+import pytest
+
+
+@pytest.fixture
+def banco(tmp_path):
+    armazenamento = ArmazenamentoSQLite(str(tmp_path / "hotel.db"))
+    yield armazenamento
+    armazenamento.fechar()
+
+
+def _entidades():
+    quarto = Quarto(101, "SIMPLES", 2, 100.0)
+    hospede = Hospede("Jayr Alencar", "123", "e", "t")
+    reserva = Reserva(hospede, quarto, date(2025, 6, 10), date(2025, 6, 12), 1)
+    return quarto, hospede, reserva
+
+
+def test_salvar_tudo_e_carregar(banco):
+    quarto, hospede, reserva = _entidades()
+    reserva.pagamentos.append(Pagamento(50.0, "PIX"))
+    reserva.adicionais.append(Adicional("Frigobar", 12.5))
+    banco.salvar_tudo([quarto], [hospede], [reserva])
+
+    quartos, hospedes, reservas = banco.carregar()
+    assert quartos[0].numero == 101
+    assert hospedes[0].documento == "123"
+    assert reservas[0].id == reserva.id
+    assert reservas[0].data_entrada == date(2025, 6, 10)
+    assert reservas[0].pagamentos[0].valor == 50.0
+    assert reservas[0].adicionais[0].descricao == "Frigobar"
+    assert reservas[0] in hospedes[0].historico_reservas
+
+def test_salvar_alteracoes_upsert(banco):
+    quarto, hospede, reserva = _entidades()
+    banco.salvar_alteracoes([quarto, hospede, reserva])
+
+    reserva.status = "CONFIRMADA"
+    reserva.pagamentos.append(Pagamento(30.0, "DINHEIRO"))
+    assert banco.salvar_alteracoes([reserva]) == 0
+
+    _, _, reservas = banco.carregar()
+    assert len(reservas) == 1
+    assert reservas[0].status == "CONFIRMADA"
+    assert len(reservas[0].pagamentos) == 1
+
+def test_bloqueios_do_quarto(banco):
+    quarto, _, _ = _entidades()
+    quarto.bloquear_quarto(date(2030, 1, 10), date(2030, 1, 15), "Reforma")
+    quarto.bloquear_quarto(date(2030, 2, 1), date(2030, 2, 3), "Pintura")
+    banco.salvar_alteracoes([quarto])
+
+    quarto.bloqueios.pop()
+    banco.salvar_alteracoes([quarto])
+
+    quartos, _, _ = banco.carregar()
+    assert quartos[0].bloqueios == [(date(2030, 1, 10), date(2030, 1, 15), "Reforma")]
+
+def test_quarto_disponivel(banco):
+    quarto, hospede, reserva = _entidades()
+    banco.salvar_alteracoes([quarto, hospede, reserva])
+
+    assert not banco.quarto_disponivel(101, date(2025, 6, 11), date(2025, 6, 13))
+    assert banco.quarto_disponivel(101, date(2025, 6, 12), date(2025, 6, 13))
+    assert banco.quarto_disponivel(102, date(2025, 6, 10), date(2025, 6, 12))
+
+    reserva.status = "CANCELADA"
+    banco.salvar_alteracoes([reserva])
+    assert banco.quarto_disponivel(101, date(2025, 6, 11), date(2025, 6, 13))
+
+def test_buscar_id_reserva_prefere_ativa(banco):
+    quarto, hospede, antiga = _entidades()
+    antiga.status = "CHECKOUT"
+    nova = Reserva(hospede, quarto, date(2025, 7, 1), date(2025, 7, 3), 1)
+    banco.salvar_alteracoes([quarto, hospede, antiga])
+    assert banco.buscar_id_reserva("123", 101) == antiga.id
+
+    banco.salvar_alteracoes([nova])
+    assert banco.buscar_id_reserva("123", 101) == nova.id
+    assert banco.buscar_id_reserva("999", 101) is None
+
+def test_carregar_lazy_e_iterar_historico(banco):
+    quarto, hospede, ativa = _entidades()
+    encerrada = Reserva(hospede, quarto, date(2025, 1, 1), date(2025, 1, 3), 1, "CHECKOUT")
+    encerrada.pagamentos.append(Pagamento(200.0, "PIX"))
+    banco.salvar_tudo([quarto], [hospede], [encerrada, ativa])
+
+    quartos, hospedes, reservas = banco.carregar(lazy=True)
+    assert [r.id for r in reservas] == [ativa.id]
+
+    historico = list(banco.iterar_historico(quartos, hospedes, documento="123"))
+    assert [r.id for r in historico] == [encerrada.id]
+    assert historico[0].pagamentos[0].valor == 200.0
+
+def test_iterar_historico_com_filtros(banco):
+    quarto, hospede, ativa = _entidades()
+    janeiro = Reserva(hospede, quarto, date(2025, 1, 1), date(2025, 1, 3), 1, "CHECKOUT")
+    marco = Reserva(hospede, quarto, date(2025, 3, 1), date(2025, 3, 3), 1, "CANCELADA")
+    banco.salvar_tudo([quarto], [hospede], [janeiro, marco, ativa])
+    quartos, hospedes, _ = banco.carregar(lazy=True)
+
+    periodo = banco.iterar_historico(quartos, hospedes, data_inicio=date(2025, 2, 1), data_fim=date(2025, 12, 31))
+    assert [r.id for r in periodo] == [marco.id]
+    por_status = banco.iterar_historico(quartos, hospedes, status=["CHECKOUT"])
+    assert [r.id for r in por_status] == [janeiro.id]
+
+def test_iterar_historico_em_lotes(banco, monkeypatch):
+    monkeypatch.setattr(data_sqlite, "LOTE_HISTORICO", 2)
+    quarto, hospede, _ = _entidades()
+    encerradas = []
+    for i in range(5):
+        r = Reserva(hospede, quarto, date(2025, 1, 1 + 3 * i), date(2025, 1, 3 + 3 * i), 1, "CHECKOUT")
+        r.pagamentos.append(Pagamento(100.0 + i, "PIX"))
+        if i % 2:
+            r.adicionais.append(Adicional(f"Frigobar {i}", 10.0))
+        encerradas.append(r)
+    banco.salvar_tudo([quarto], [hospede], encerradas)
+    quartos, hospedes, _ = banco.carregar(lazy=True)
+
+    consultas = []
+    banco._conexao.set_trace_callback(consultas.append)
+    historico = list(banco.iterar_historico(quartos, hospedes))
+    banco._conexao.set_trace_callback(None)
+
+    assert [r.id for r in historico] == [r.id for r in encerradas]
+    assert [r.pagamentos[0].valor for r in historico] == [100.0, 101.0, 102.0, 103.0, 104.0]
+    assert [[a.descricao for a in r.adicionais] for r in historico] == [[], ["Frigobar 1"], [], ["Frigobar 3"], []]
+    # Uma consulta das reservas mais duas (pagamentos e adicionais) por lote de 2, não duas por reserva:
+    assert len(consultas) == 1 + 2 * 3
+
+def test_salvar_tudo_recusa_memoria_desatualizada(banco):
+    quarto, hospede, reserva = _entidades()
+    banco.salvar_tudo([quarto], [hospede], [reserva])
+    assert reserva.versao == 1
+
+    outro = ArmazenamentoSQLite(banco.caminho)
+    _, _, (copia,) = outro.carregar()
+    copia.status = "CANCELADA"
+    outro.salvar_alteracoes([copia])
+    outro.fechar()
+
+    with pytest.raises(ConflitoVersao):
+        banco.salvar_tudo([quarto], [hospede], [reserva])
+    assert reserva.versao == 1 and quarto.versao == 1
+
+    _, _, (gravada,) = banco.carregar()
+    assert gravada.status == "CANCELADA" and gravada.versao == 2
+
+
+def test_versoes_entre_conexoes(banco):
+    quarto, hospede, reserva = _entidades()
+    banco.salvar_alteracoes([quarto, hospede, reserva])
+    assert reserva.versao == 1
+
+    # Outra conexão (outro processo) lê e grava a mesma reserva:
+    outro = ArmazenamentoSQLite(banco.caminho)
+    _, _, (copia,) = outro.carregar()
+    copia.pagamentos.append(Pagamento(50.0, "PIX"))
+    outro.salvar_alteracoes([copia])
+    assert copia.versao == 2
+
+    reserva.status = "CANCELADA"
+    with pytest.raises(ConflitoVersao):
+        banco.salvar_alteracoes([reserva])
+    assert reserva.versao == 1
+
+    _, _, (gravada,) = banco.carregar()
+    assert gravada.status == "PENDENTE"
+    assert gravada.pagamentos[0].valor == 50.0
+    assert gravada.versao == 2
+
+    # Reserva nova de outro processo sobreposta no mesmo quarto:
+    concorrente = Reserva(copia.hospede, copia.quarto, date(2025, 6, 11), date(2025, 6, 14), 1)
+    with pytest.raises(ConflitoVersao):
+        outro.salvar_alteracoes([concorrente])
+    outro.fechar()
+
+def test_migracao_acrescenta_versao(tmp_path):
+    import sqlite3
+    caminho = str(tmp_path / "antigo.db")
+    conexao = sqlite3.connect(caminho)
+    conexao.execute("CREATE TABLE hospedes (documento TEXT PRIMARY KEY, nome TEXT NOT NULL, email TEXT NOT NULL, telefone TEXT NOT NULL)")
+    conexao.execute("INSERT INTO hospedes VALUES ('123', 'Jayr', 'e', 't')")
+    conexao.commit()
+    conexao.close()
+
+    banco = ArmazenamentoSQLite(caminho)
+    _, (hospede,), _ = banco.carregar()
+    assert hospede.versao == 0
+    hospede.email = "novo"
+    banco.salvar_alteracoes([hospede])
+    assert hospede.versao == 1
+    banco.fechar()
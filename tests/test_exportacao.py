@@ -0,0 +1,111 @@
+"""
+Conjunto de testes para a exportação em fluxo das reservas.
+"""
+
+from hotel import services, config, exportacao
+from hotel.models import Pagamento, Adicional
+from datetime import date
+import csv
+import json
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def dados_iniciais(setup_inicial):
+    services.cadastrar_quarto(101, "SIMPLES", 1, 100.0)
+    services.cadastrar_quarto(102, "SIMPLES", 1, 100.0)
+    services.cadastrar_hospede("Jayr", "123", "e", "t")
+
+
+def _reservas():
+    junho = services.realizar_reserva("123", 101, date(2025, 6, 10), date(2025, 6, 12), 1)
+    junho.confirmar()
+    junho.pagamentos.append(Pagamento(50.0, "PIX"))
+    junho.adicionais.append(Adicional("Frigobar", 12.5))
+    julho = services.realizar_reserva("123", 102, date(2025, 7, 1), date(2025, 7, 2), 1)
+    julho.cancelar()
+    return junho, julho
+
+
+# TESTES DA EXPORTAÇÃO:
+
+def test_exportar_csv_com_contas(tmp_path):
+    junho, julho = _reservas()
+    destino = tmp_path / "reservas.csv"
+
+    contagem = exportacao.exportar_reservas(str(destino))
+    assert contagem == {"reservas": 2, "pagamentos": 1, "adicionais": 1}
+
+    with open(destino, encoding="utf-8") as f:
+        linhas = list(csv.DictReader(f))
+    assert [l["id"] for l in linhas] == [junho.id, julho.id]
+    assert float(linhas[0]["total"]) == round(services.calcular_total_reserva(junho), 2)
+    assert float(linhas[0]["total_pago"]) == 50.0
+
+    with open(tmp_path / "reservas_pagamentos.csv", encoding="utf-8") as f:
+        pagamentos = list(csv.DictReader(f))
+    assert pagamentos[0]["reserva_id"] == junho.id and pagamentos[0]["forma"] == "PIX"
+    with open(tmp_path / "reservas_adicionais.csv", encoding="utf-8") as f:
+        assert list(csv.DictReader(f))[0]["descricao"] == "Frigobar"
+
+def test_exportar_jsonl_com_filtros(tmp_path):
+    junho, julho = _reservas()
+    destino = tmp_path / "reservas.jsonl"
+
+    contagem = exportacao.exportar_reservas(str(destino), data_inicio=date(2025, 6, 1), data_fim=date(2025, 7, 1))
+    assert contagem["reservas"] == 1
+    linha = json.loads(destino.read_text(encoding="utf-8"))
+    assert linha["id"] == junho.id
+    assert linha["pagamentos"][0]["valor"] == 50.0
+    assert linha["adicionais"][0]["descricao"] == "Frigobar"
+
+    exportacao.exportar_reservas(str(destino), status=["CANCELADA"])
+    assert [json.loads(l)["id"] for l in destino.read_text(encoding="utf-8").splitlines()] == [julho.id]
+
+def test_exportar_status_ativos_sem_percorrer_o_historico(tmp_path, monkeypatch):
+    for i in range(20):
+        encerrada = services.realizar_reserva("123", 102, date(2025, 1, 1 + i), date(2025, 1, 2 + i), 1)
+        encerrada.status = "CHECKOUT"
+        services.repositorio.atualizar_reserva(encerrada)
+    hospedado = services.realizar_reserva("123", 101, date(2025, 6, 10), date(2025, 6, 12), 1)
+    hospedado.status = "CHECKIN"
+    services.repositorio.atualizar_reserva(hospedado)
+    pendente = services.realizar_reserva("123", 102, date(2025, 6, 1), date(2025, 6, 3), 1)
+    services.realizar_reserva("123", 102, date(2025, 7, 1), date(2025, 7, 3), 1)
+    destino = tmp_path / "ativas.jsonl"
+
+    # O filtro por status ativos lê os índices de chegadas e de hospedagens, não o de todas as entradas:
+    monkeypatch.setattr(services.repositorio.entradas, "entre", None)
+    exportacao.exportar_reservas(str(destino), data_fim=date(2025, 7, 1), status=["PENDENTE", "CHECKIN"])
+    assert [json.loads(l)["id"] for l in destino.read_text(encoding="utf-8").splitlines()] == [pendente.id, hospedado.id]
+
+    exportacao.exportar_reservas(str(destino), status=["CHECKIN"])
+    assert [json.loads(l)["id"] for l in destino.read_text(encoding="utf-8").splitlines()] == [hospedado.id]
+
+def test_exportar_inclui_historico_lazy(tmp_path, monkeypatch):
+    encerrada = services.realizar_reserva("123", 101, date(2025, 1, 10), date(2025, 1, 12), 1)
+    encerrada.status = "CHECKOUT"
+    ativa = services.realizar_reserva("123", 102, date(2025, 6, 10), date(2025, 6, 12), 1)
+    services.salvar_tudo()
+
+    monkeypatch.setattr(config, "get_carregamento_lazy", lambda: True)
+    services.inicializar_sistema()
+    assert [r.id for r in services.reservas_db] == [ativa.id]
+
+    destino = tmp_path / "janeiro.jsonl"
+    exportacao.exportar_reservas(str(destino), data_inicio=date(2025, 1, 1), data_fim=date(2025, 2, 1))
+    assert [json.loads(l)["id"] for l in destino.read_text(encoding="utf-8").splitlines()] == [encerrada.id]
+
+def test_exportar_formato_desconhecido(tmp_path):
+    with pytest.raises(ValueError):
+        exportacao.exportar_reservas(str(tmp_path / "reservas.xlsx"))
+
+def test_exportar_parquet(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    junho, julho = _reservas()
+    destino = tmp_path / "reservas.parquet"
+
+    contagem = exportacao.exportar_reservas(str(destino))
+    assert contagem["reservas"] == 2
+    assert pq.read_table(str(destino)).column("id").to_pylist() == [junho.id, julho.id]
+    assert pq.read_table(str(tmp_path / "reservas_pagamentos.parquet")).num_rows == 1
@@ -0,0 +1,182 @@
+"""
+Conjunto de testes para a importação em lote de reservas.
+"""
+
+from hotel import services, data, importacao
+from hotel.models import ConflitoVersao, Hospede, Quarto, Reserva
+from datetime import date
+import json
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def dados_iniciais(setup_inicial):
+    services.cadastrar_quarto(101, "SIMPLES", 1, 100.0)
+    services.cadastrar_quarto(201, "DUPLO", 2, 150.0)
+    services.cadastrar_hospede("Jayr", "123", "e", "t")
+    services.salvar_tudo()
+
+
+CSV_GRUPO = """documento,nome,email,telefone,quarto,data_entrada,data_saida,num_hospedes,status
+123,,,,101,2026-12-20,2026-12-23,1,CONFIRMADA
+456,Maria,maria@x.com,(88) 1111-1111,201,20/12/2026,2026-12-22,2,
+456,,,,201,2026-12-21,2026-12-24,2,PENDENTE
+789,,,,201,2026-12-25,2026-12-26,1,
+123,,,,999,2026-12-25,2026-12-26,1,
+123,,,,201,2026-12-25,2026-12-26,3,
+123,,,,201,2026-12-27,2026-12-26,1,
+123,,,,201,amanhã,2026-12-26,1,
+"""
+
+
+# TESTES DA IMPORTAÇÃO EM LOTE:
+
+def test_importar_csv_com_relatorio_de_erros(tmp_path):
+    arquivo = tmp_path / "grupo.csv"
+    arquivo.write_text(CSV_GRUPO, encoding="utf-8")
+
+    resultado = importacao.importar_reservas(str(arquivo))
+
+    assert len(resultado["importadas"]) == 2
+    assert [h.documento for h in resultado["hospedes_novos"]] == ["456"]
+    assert [linha for linha, _ in resultado["erros"]] == [4, 5, 6, 7, 8, 9]
+    assert "outra linha do arquivo" in resultado["erros"][0][1]
+    assert "999" in resultado["erros"][2][1]
+
+    assert services.buscar_hospede("456").nome == "Maria"
+    assert services.buscar_reserva("123", 101).status == "CONFIRMADA"
+    assert not services._verificar_disponibilidade(201, date(2026, 12, 21), date(2026, 12, 22))
+    # Todo o lote foi gravado em uma única escrita no journal (1 hóspede + 2 reservas):
+    assert data.eventos_pendentes == 3
+
+    relatorio = tmp_path / "erros.csv"
+    importacao.salvar_relatorio_erros(resultado["erros"], str(relatorio))
+    assert relatorio.read_text(encoding="utf-8").splitlines()[0] == "linha,erro"
+
+def test_importar_jsonl(tmp_path):
+    arquivo = tmp_path / "ota.jsonl"
+    linhas = [
+        {"documento": "123", "quarto": 101, "data_entrada": "2026-11-01", "data_saida": "2026-11-03", "num_hospedes": 1},
+        "{quebrado",
+        {"documento": "123", "quarto": 201, "data_entrada": "2026-11-01", "data_saida": "2026-11-03", "num_hospedes": 2}
+    ]
+    arquivo.write_text("\n".join(l if isinstance(l, str) else json.dumps(l) for l in linhas), encoding="utf-8")
+
+    resultado = importacao.importar_reservas(str(arquivo))
+    assert len(resultado["importadas"]) == 2
+    assert resultado["erros"][0][0] == 2
+
+    services.inicializar_sistema()
+    assert len(services.reservas_db) == 2
+
+def test_importar_tudo_ou_nada(tmp_path):
+    arquivo = tmp_path / "grupo.csv"
+    arquivo.write_text(CSV_GRUPO, encoding="utf-8")
+
+    resultado = importacao.importar_reservas(str(arquivo), tudo_ou_nada=True)
+    assert resultado["importadas"] == []
+    assert services.reservas_db == []
+    assert services.buscar_hospede("456") is None
+
+def test_hospede_de_linha_invalida_nao_e_cadastrado(tmp_path):
+    services.realizar_reserva("123", 101, date(2026, 12, 20), date(2026, 12, 23), 1)
+    arquivo = tmp_path / "grupo.csv"
+    arquivo.write_text(
+        "documento,nome,email,telefone,quarto,data_entrada,data_saida,num_hospedes\n"
+        "456,Maria,m,t,101,2026-12-21,2026-12-22,1\n"
+        "789,Ana,a,t,201,2026-12-21,2026-12-22,5\n", encoding="utf-8")
+
+    resultado = importacao.importar_reservas(str(arquivo))
+
+    assert [linha for linha, _ in resultado["erros"]] == [2, 3]
+    assert resultado["hospedes_novos"] == []
+    assert services.buscar_hospede("456") is None and services.buscar_hospede("789") is None
+
+def test_importacao_refeita_apos_conflito(tmp_path, monkeypatch):
+    backend = services._obter_armazenamento()
+    salvar_alteracoes = backend.salvar_alteracoes
+    tentativas = []
+
+    def salvar_com_conflito(entidades):
+        tentativas.append(len(entidades))
+        if len(tentativas) == 1:
+            raise ConflitoVersao("Outro processo gravou antes.")
+        return salvar_alteracoes(entidades)
+
+    monkeypatch.setattr(backend, "salvar_alteracoes", salvar_com_conflito)
+    arquivo = tmp_path / "grupo.csv"
+    arquivo.write_text(
+        "documento,nome,email,telefone,quarto,data_entrada,data_saida,num_hospedes\n"
+        "456,Maria,m,t,201,2026-12-21,2026-12-22,2\n"
+        "123,,,,101,2026-12-21,2026-12-22,1\n", encoding="utf-8")
+
+    resultado = importacao.importar_reservas(str(arquivo))
+
+    # A memória foi recarregada e o lote, conferido e gravado de novo (1 hóspede + 2 reservas):
+    assert tentativas == [3, 3]
+    assert len(resultado["importadas"]) == 2
+    assert len(services.buscar_hospede("456").historico_reservas) == 1
+    assert services.buscar_reserva("123", 101).quarto is services.buscar_quarto(101)
+    assert services.buscar_reserva("123", 101) in services.buscar_hospede("123").historico_reservas
+
+def test_quarto_ocupado_por_outro_processo_vira_erro_da_linha(tmp_path, monkeypatch):
+    backend = services._obter_armazenamento()
+    salvar_alteracoes = backend.salvar_alteracoes
+    tentativas = []
+
+    def outro_processo_reserva_antes(entidades):
+        tentativas.append(len(entidades))
+        if len(tentativas) == 1:
+            # Outro processo grava uma reserva no quarto 201 entre a validação e a gravação do lote:
+            quarto = Quarto(201, "DUPLO", 2, 150.0)
+            hospede = Hospede("Jayr", "123", "e", "t")
+            salvar_alteracoes([Reserva(hospede, quarto, date(2026, 12, 21), date(2026, 12, 23), 1)])
+            raise ConflitoVersao("Outro processo gravou antes.")
+        return salvar_alteracoes(entidades)
+
+    monkeypatch.setattr(backend, "salvar_alteracoes", outro_processo_reserva_antes)
+    arquivo = tmp_path / "grupo.csv"
+    arquivo.write_text(
+        "documento,nome,email,telefone,quarto,data_entrada,data_saida,num_hospedes\n"
+        "123,,,,101,2026-12-21,2026-12-22,1\n"
+        "456,Maria,m,t,201,2026-12-22,2026-12-24,2\n"
+        "123,,,,101,2026-12-22,2026-12-23,1\n", encoding="utf-8")
+
+    resultado = importacao.importar_reservas(str(arquivo))
+
+    # A linha 3 virou erro; as outras duas foram gravadas, sem a hóspede nova da linha recusada:
+    assert resultado["erros"] == [(3, "O Quarto 201 foi ocupado por outro processo durante a importação.")]
+    assert [r.data_entrada for r in resultado["importadas"]] == [date(2026, 12, 21), date(2026, 12, 22)]
+    assert resultado["hospedes_novos"] == [] and services.buscar_hospede("456") is None
+    assert tentativas == [4, 2]
+    assert len(services.buscar_hospede("123").historico_reservas) == 3
+
+def test_conflito_com_outro_processo_no_tudo_ou_nada(tmp_path, monkeypatch):
+    backend = services._obter_armazenamento()
+    salvar_alteracoes = backend.salvar_alteracoes
+
+    def outro_processo_reserva_antes(entidades):
+        monkeypatch.setattr(backend, "salvar_alteracoes", salvar_alteracoes)
+        quarto = Quarto(101, "SIMPLES", 1, 100.0)
+        salvar_alteracoes([Reserva(Hospede("Jayr", "123", "e", "t"), quarto, date(2026, 12, 21), date(2026, 12, 22), 1)])
+        raise ConflitoVersao("Outro processo gravou antes.")
+
+    monkeypatch.setattr(backend, "salvar_alteracoes", outro_processo_reserva_antes)
+    arquivo = tmp_path / "grupo.csv"
+    arquivo.write_text(
+        "documento,nome,email,telefone,quarto,data_entrada,data_saida,num_hospedes\n"
+        "123,,,,101,2026-12-21,2026-12-22,1\n"
+        "456,Maria,m,t,201,2026-12-22,2026-12-24,2\n", encoding="utf-8")
+
+    resultado = importacao.importar_reservas(str(arquivo), tudo_ou_nada=True)
+
+    assert resultado == {"importadas": [], "hospedes_novos": [],
+                         "erros": [(2, "O Quarto 101 foi ocupado por outro processo durante a importação.")]}
+    assert services.buscar_hospede("456") is None
+    assert len(services.reservas_db) == 1
+
+def test_importar_formato_invalido(tmp_path):
+    arquivo = tmp_path / "grupo.xlsx"
+    arquivo.write_text("", encoding="utf-8")
+    with pytest.raises(ValueError):
+        importacao.importar_reservas(str(arquivo))
@@ -0,0 +1,138 @@
+"""
+Conjunto de testes para os índices em memória usados pelos serviços.
+"""
+
+from hotel.models import Hospede, Quarto, Reserva
+from hotel.indices import IndiceDisponibilidade, MapaOcupacao, IndiceEntradas, ChegadasEmAberto
+from datetime import date
+
+
+def _reserva(quarto, entrada, saida, status="PENDENTE"):
+    hospede = Hospede("Jayr Alencar", "123", "e", "t")
+    return Reserva(hospede, quarto, entrada, saida, 1, status)
+
+
+# TESTES DO ÍNDICE DE DISPONIBILIDADE:
+
+def test_indice_disponibilidade_sobreposicao():
+    indice = IndiceDisponibilidade()
+    quarto = Quarto(101, "SIMPLES", 1, 100.0)
+    indice.adicionar(_reserva(quarto, date(2025, 6, 10), date(2025, 6, 15)))
+    indice.adicionar(_reserva(quarto, date(2025, 6, 1), date(2025, 6, 5)))
+
+    assert indice.esta_livre(101, date(2025, 6, 5), date(2025, 6, 10))
+    assert not indice.esta_livre(101, date(2025, 6, 4), date(2025, 6, 6))
+    assert not indice.esta_livre(101, date(2025, 6, 12), date(2025, 6, 20))
+    assert not indice.esta_livre(101, date(2025, 5, 1), date(2025, 7, 1))
+    assert indice.esta_livre(102, date(2025, 6, 1), date(2025, 6, 15))
+
+def test_indice_disponibilidade_ignora_canceladas():
+    indice = IndiceDisponibilidade()
+    quarto = Quarto(101, "SIMPLES", 1, 100.0)
+    reserva = _reserva(quarto, date(2025, 6, 10), date(2025, 6, 15))
+    indice.adicionar(reserva)
+    indice.adicionar(_reserva(quarto, date(2025, 6, 1), date(2025, 6, 3), "CANCELADA"))
+
+    assert indice.esta_livre(101, date(2025, 6, 1), date(2025, 6, 3))
+
+    reserva.cancelar()
+    assert indice.esta_livre(101, date(2025, 6, 10), date(2025, 6, 15))
+
+def test_indice_disponibilidade_consulta_sem_alterar():
+    indice = IndiceDisponibilidade()
+    quarto = Quarto(101, "SIMPLES", 1, 100.0)
+    reserva = _reserva(quarto, date(2025, 6, 10), date(2025, 6, 15))
+    indice.adicionar(reserva)
+    reserva.cancelar()
+
+    # A consulta pula a cancelada, mas só a próxima inclusão no quarto a retira do índice:
+    assert indice.esta_livre(101, date(2025, 6, 10), date(2025, 6, 15))
+    assert indice._reservas[101] == [reserva]
+
+    nova = _reserva(quarto, date(2025, 6, 10), date(2025, 6, 15))
+    indice.adicionar(nova)
+    assert indice._reservas[101] == [nova]
+    assert indice._chaves[101] == [(date(2025, 6, 10), date(2025, 6, 15))]
+
+def test_indice_disponibilidade_remover_e_reconstruir():
+    indice = IndiceDisponibilidade()
+    quarto = Quarto(101, "SIMPLES", 1, 100.0)
+    r1 = _reserva(quarto, date(2025, 6, 10), date(2025, 6, 15))
+    r2 = _reserva(quarto, date(2025, 6, 20), date(2025, 6, 25))
+
+    indice.reconstruir([r2, r1])
+    assert not indice.esta_livre(101, date(2025, 6, 21), date(2025, 6, 22))
+
+    assert indice.remover(r2) is True
+    assert indice.remover(r2) is False
+    assert indice.esta_livre(101, date(2025, 6, 21), date(2025, 6, 22))
+    assert not indice.esta_livre(101, date(2025, 6, 14), date(2025, 6, 16))
+
+
+# TESTES DO MAPA DE OCUPAÇÃO:
+
+def test_mapa_ocupacao_livres():
+    mapa = MapaOcupacao()
+    q101 = Quarto(101, "SIMPLES", 1, 100.0)
+    q201 = Quarto(201, "DUPLO", 2, 150.0)
+    q202 = Quarto(202, "DUPLO", 2, 150.0)
+    reserva = _reserva(q201, date(2025, 6, 10), date(2025, 6, 15))
+    mapa.reconstruir([q101, q201, q202], [reserva])
+
+    assert mapa.livres(date(2025, 6, 14), date(2025, 6, 16)) == [q101, q202]
+    assert mapa.livres(date(2025, 6, 15), date(2025, 6, 20)) == [q101, q201, q202]
+    assert mapa.livres(date(2025, 6, 1), date(2025, 6, 30), "DUPLO") == [q202]
+    assert mapa.livres(date(2025, 6, 1), date(2025, 6, 30), "LUXO") == []
+
+def test_mapa_ocupacao_remover():
+    mapa = MapaOcupacao()
+    quarto = Quarto(101, "SIMPLES", 1, 100.0)
+    mapa.registrar_quarto(quarto)
+    cancelada = _reserva(quarto, date(2025, 6, 10), date(2025, 6, 15))
+    mapa.adicionar(cancelada)
+    cancelada.cancelar()
+    mapa.remover(cancelada)
+
+    nova = _reserva(quarto, date(2025, 6, 10), date(2025, 6, 12))
+    mapa.adicionar(nova)
+    # Remover de novo a cancelada não pode liberar as noites da nova reserva:
+    mapa.remover(cancelada)
+    assert mapa.livres(date(2025, 6, 10), date(2025, 6, 11)) == []
+    assert mapa.livres(date(2025, 6, 12), date(2025, 6, 15)) == [quarto]
+
+
+# TESTES DO ÍNDICE DE CHEGADAS:
+
+def test_indice_entradas_entre():
+    indice = IndiceEntradas()
+    quarto = Quarto(101, "SIMPLES", 1, 100.0)
+    junho = _reserva(quarto, date(2025, 6, 10), date(2025, 6, 12))
+    maio = _reserva(quarto, date(2025, 5, 1), date(2025, 5, 3))
+    indice.reconstruir([junho, maio])
+    julho = _reserva(quarto, date(2025, 7, 1), date(2025, 7, 2))
+    indice.adicionar(julho)
+
+    assert list(indice.entre()) == [maio, junho, julho]
+    assert list(indice.entre(date(2025, 6, 1), date(2025, 7, 1))) == [junho]
+    assert list(indice.entre(data_inicio=date(2025, 6, 10))) == [junho, julho]
+    assert list(indice.entre(data_fim=date(2025, 6, 10))) == [maio]
+
+def test_chegadas_em_aberto():
+    indice = ChegadasEmAberto()
+    quarto = Quarto(101, "SIMPLES", 1, 100.0)
+    junho = _reserva(quarto, date(2025, 6, 10), date(2025, 6, 12), "CONFIRMADA")
+    maio = _reserva(quarto, date(2025, 5, 1), date(2025, 5, 3))
+    antiga = _reserva(quarto, date(2024, 1, 1), date(2024, 1, 3), "CHECKOUT")
+    for r in (junho, maio, antiga):
+        indice.atualizar(r)
+
+    assert indice.ate(date(2025, 6, 10)) == [maio, junho]
+    assert indice.ate(date(2025, 6, 9)) == [maio]
+    assert indice.entre(date(2025, 5, 2), None) == [junho]
+    assert indice.entre(None, date(2025, 6, 10)) == [maio]
+
+    junho.status = "CHECKIN"
+    indice.atualizar(junho)
+    maio.status = "NO_SHOW"
+    indice.atualizar(maio)
+    assert indice.ate(date(2030, 1, 1)) == []
@@ -0,0 +1,61 @@
+"""
+Conjunto de testes para o calendário de inventário (quarto x noite).
+"""
+
+from hotel.models import Hospede, Quarto, Reserva
+from hotel.inventario import CalendarioInventario
+from datetime import date
+
+
+def _reserva(quarto, entrada, saida, status="CONFIRMADA"):
+    hospede = Hospede("Jayr Alencar", "123", "e", "t")
+    return Reserva(hospede, quarto, entrada, saida, 1, status)
+
+
+# TESTES DO CALENDÁRIO DE INVENTÁRIO:
+
+def test_inventario_ocupar_e_liberar():
+    q1 = Quarto(201, "DUPLO", 2, 150.0)
+    q2 = Quarto(202, "DUPLO", 2, 150.0)
+    reserva = _reserva(q1, date(2026, 12, 23), date(2026, 12, 26))
+    calendario = CalendarioInventario()
+    calendario.reconstruir([q1, q2], [reserva])
+
+    assert calendario.reserva_em(201, date(2026, 12, 24)) == reserva.id
+    assert calendario.reserva_em(201, date(2026, 12, 26)) is None
+    assert calendario.vendidos("DUPLO", date(2026, 12, 24)) == 1
+    assert calendario.disponiveis("DUPLO", date(2026, 12, 24)) == 1
+    assert not calendario.periodo_livre(201, date(2026, 12, 25), date(2026, 12, 27))
+
+    reserva.cancelar()
+    calendario.liberar(reserva)
+    assert calendario.disponiveis("DUPLO", date(2026, 12, 24)) == 2
+    assert calendario.periodo_livre(201, date(2026, 12, 25), date(2026, 12, 27))
+
+def test_inventario_liberar_nao_afeta_outra_reserva():
+    quarto = Quarto(201, "DUPLO", 2, 150.0)
+    calendario = CalendarioInventario()
+    calendario.registrar_quarto(quarto)
+    cancelada = _reserva(quarto, date(2026, 12, 23), date(2026, 12, 26), "CANCELADA")
+    nova = _reserva(quarto, date(2026, 12, 23), date(2026, 12, 24))
+    calendario.ocupar(cancelada)
+    calendario.ocupar(nova)
+
+    calendario.liberar(cancelada)
+    assert calendario.reserva_em(201, date(2026, 12, 23)) == nova.id
+    assert calendario.vendidos("DUPLO", date(2026, 12, 23)) == 1
+
+def test_inventario_bloqueios():
+    quarto = Quarto(201, "DUPLO", 2, 150.0)
+    quarto.bloquear_quarto(date(2030, 1, 1), date(2030, 1, 3), "Reforma")
+    calendario = CalendarioInventario()
+    calendario.registrar_quarto(quarto)
+    calendario.registrar_quarto(Quarto(101, "SIMPLES", 1, 100.0))
+
+    assert calendario.motivo_bloqueio(201, date(2030, 1, 2)) == "Reforma"
+    assert calendario.periodo_bloqueado(201, date(2029, 12, 30), date(2030, 1, 2))
+    assert not calendario.periodo_bloqueado(201, date(2030, 1, 3), date(2030, 1, 5))
+    assert calendario.disponiveis_no_periodo(date(2030, 1, 2), date(2030, 1, 4)) == {
+        date(2030, 1, 2): {"DUPLO": 0, "SIMPLES": 1},
+        date(2030, 1, 3): {"DUPLO": 1, "SIMPLES": 1}
+    }
@@ -2,7 +2,7 @@
 Conjunto de testes para verificação de comportamento, encapsulamento e lógica das classes.
 """
 
-from hotel.models import Pessoa, Hospede, Quarto, QuartoLuxo, Pagamento, Adicional, Reserva
+from hotel.models import Pessoa, Hospede, Quarto, QuartoLuxo, Pagamento, Adicional, Reserva, StatusReserva
 from datetime import date, timedelta
 import pytest
 
@@ -20,6 +20,17 @@ def test_historico_reservas_hospede():
     hospede = Hospede("Jayr Alencar", "12345678900", "jayr.alencar@gmail.com", "(88) 12345-6789")
     assert hospede.historico_reservas == []
 
+def test_iterar_historico_hospede_com_fonte():
+    hospede = Hospede("Jayr Alencar", "12345678900", "jayr.alencar@gmail.com", "(88) 12345-6789")
+    quarto = Quarto(101, "SIMPLES", 2, 100.0, "DISPONIVEL")
+    ativa = Reserva(hospede, quarto, date(2025, 12, 1), date(2025, 12, 5), 1)
+    antiga = Reserva(hospede, quarto, date(2024, 12, 1), date(2024, 12, 5), 1, "CHECKOUT")
+    hospede.historico_reservas.append(ativa)
+    assert list(hospede.iterar_historico()) == [ativa]
+
+    hospede.fonte_historico = lambda: iter([antiga, ativa])
+    assert [r.id for r in hospede.iterar_historico()] == [ativa.id, antiga.id]
+
 
 # TESTES DE QUARTO E QUARTO DE LUXO:
 
@@ -42,13 +53,26 @@ def test_quarto_tarifa_invalida():
 
 def test_quarto_bloquear_liberar():
     quarto = Quarto(303, "DUPLO", 3, 200.0, "DISPONIVEL")
+    hoje = date.today()
     
-    quarto.bloquear_quarto(date(2025, 12, 1), date(2025, 12, 10), "Reforma")
+    quarto.bloquear_quarto(hoje, hoje + timedelta(days=10), "Reforma")
     assert quarto.status == "MANUTENCAO"
     
     quarto.liberar_quarto()
     assert quarto.status == "DISPONIVEL"
 
+def test_quarto_bloquear_periodo_futuro():
+    quarto = Quarto(303, "DUPLO", 3, 200.0, "DISPONIVEL")
+    inicio = date.today() + timedelta(days=30)
+    
+    quarto.bloquear_quarto(inicio, inicio + timedelta(days=5), "Pintura")
+    assert quarto.status == "DISPONIVEL"
+    assert quarto.bloqueios == [(inicio, inicio + timedelta(days=5), "Pintura")]
+    assert Quarto.from_dict(quarto.to_dict()).bloqueios == quarto.bloqueios
+    
+    with pytest.raises(ValueError):
+        quarto.bloquear_quarto(inicio, inicio, "Inválido")
+
 def test_quarto_str():
     quarto = Quarto(202, "DUPLO", 2, 150.0, "DISPONIVEL")
     assert str(quarto) == "Quarto 202 (DUPLO)"
@@ -181,4 +205,53 @@ def test_reserva_eq():
     reserva_igual = Reserva(hospede, quarto, data_entrada, data_saida, num_hospedes)
     assert reserva == reserva_igual
     reserva_diferente = Reserva(hospede, quarto, date(2025, 12, 2), data_saida, num_hospedes)
-    assert reserva != reserva_diferente
\ No newline at end of file
+    assert reserva != reserva_diferente
+
+# TESTES DE REPRESENTAÇÃO COMPACTA:
+
+def test_modelos_sem_dict():
+    hospede = Hospede("Jayr Alencar", "12345678900", "jayr.alencar@gmail.com", "(88) 12345-6789")
+    quarto = QuartoLuxo(401, 200.0)
+    reserva = Reserva(hospede, quarto, date(2025, 12, 1), date(2025, 12, 5), 1)
+    for obj in (hospede, quarto, reserva, Pagamento(10.0, "PIX"), Adicional("Água", 5.0)):
+        assert not hasattr(obj, "__dict__")
+    with pytest.raises(AttributeError):
+        reserva.atributo_inexistente = 1
+
+def test_valores_em_centavos():
+    pagamento = Pagamento(0.1 + 0.2, "PIX")
+    assert pagamento.valor_centavos == 30
+    assert pagamento.valor == 0.3
+
+    quarto = Quarto(101, "SIMPLES", 1, 99.999, "DISPONIVEL")
+    assert quarto.tarifa_centavos == 10000
+    quarto.tarifa_base = 120.5
+    assert quarto.tarifa_base == 120.5
+
+    with pytest.raises(ValueError):
+        Adicional("Bala", 0.001)
+
+def test_status_internados():
+    hospede = Hospede("Jayr Alencar", "12345678900", "jayr.alencar@gmail.com", "(88) 12345-6789")
+    quarto = Quarto(101, "SIMPLES", 2, 100.0, "DISPONIVEL")
+    status_lido = "".join(["CHECK", "OUT"])
+    reserva = Reserva(hospede, quarto, date(2025, 12, 1), date(2025, 12, 5), 1, status_lido)
+    assert reserva.status is StatusReserva.CHECKOUT
+
+def test_totais_acumulados_dos_lancamentos():
+    hospede = Hospede("Jayr Alencar", "12345678900", "jayr.alencar@gmail.com", "(88) 12345-6789")
+    quarto = Quarto(101, "SIMPLES", 2, 100.0, "DISPONIVEL")
+    reserva = Reserva(hospede, quarto, date(2025, 12, 1), date(2025, 12, 5), 1)
+
+    reserva.pagamentos.append(Pagamento(100.0, "PIX"))
+    reserva.pagamentos.extend([Pagamento(50.5, "DINHEIRO"), Pagamento(0.1, "PIX")])
+    assert reserva.total_pago == 150.6
+
+    reserva.pagamentos.pop()
+    assert reserva.pagamentos.total_centavos == 15050
+
+    reserva.adicionais = [Adicional("Água", 5.0), Adicional("Pizza", 40.0)]
+    assert reserva.adicionais.total == 45.0
+    del reserva.adicionais[0]
+    assert reserva.adicionais.total == 40.0
+    assert reserva.calcular_total() == 440.0
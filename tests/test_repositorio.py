@@ -0,0 +1,51 @@
+"""
+Conjunto de testes para o repositório em memória e seus índices.
+"""
+
+from hotel.models import Hospede, Quarto, Reserva
+from hotel.repositorio import Repositorio
+from datetime import date
+
+
+def test_repositorio_buscas():
+    repo = Repositorio()
+    quarto = Quarto(101, "SIMPLES", 1, 100.0)
+    hospede = Hospede("Jayr Alencar", "123", "e", "t")
+    repo.adicionar_quarto(quarto)
+    repo.adicionar_hospede(hospede)
+
+    assert repo.buscar_quarto(101) is quarto
+    assert repo.buscar_quarto(999) is None
+    assert repo.buscar_hospede("123") is hospede
+    assert repo.buscar_reserva("123", 101) is None
+
+def test_repositorio_buscar_reserva_ativa():
+    repo = Repositorio()
+    quarto = Quarto(101, "SIMPLES", 1, 100.0)
+    hospede = Hospede("Jayr Alencar", "123", "e", "t")
+
+    antiga = Reserva(hospede, quarto, date(2025, 6, 1), date(2025, 6, 3), 1, "CHECKOUT")
+    nova = Reserva(hospede, quarto, date(2025, 7, 1), date(2025, 7, 3), 1)
+    repo.adicionar_reserva(antiga)
+    assert repo.buscar_reserva("123", 101) is antiga
+
+    repo.adicionar_reserva(nova)
+    assert repo.buscar_reserva("123", 101) is nova
+
+def test_repositorio_carregar_mantem_listas():
+    repo = Repositorio()
+    lista_quartos = repo.quartos
+    quarto = Quarto(101, "SIMPLES", 1, 100.0)
+    hospede = Hospede("Jayr Alencar", "123", "e", "t")
+    reserva = Reserva(hospede, quarto, date(2025, 6, 1), date(2025, 6, 3), 1)
+
+    repo.carregar([quarto], [hospede], [reserva])
+
+    assert repo.quartos is lista_quartos
+    assert repo.buscar_quarto(101) is quarto
+    assert repo.buscar_reserva("123", 101) is reserva
+    assert not repo.disponibilidade.esta_livre(101, date(2025, 6, 2), date(2025, 6, 4))
+
+    repo.limpar()
+    assert lista_quartos == []
+    assert repo.buscar_quarto(101) is None
@@ -0,0 +1,148 @@
+"""
+Conjunto de testes para os serializadores JSON dos arquivos de dados.
+"""
+
+from hotel import config, data, serializacao
+from hotel.models import Hospede, Quarto, Reserva, Pagamento, Adicional
+from datetime import date
+import json
+import pytest
+
+
+BACKENDS = serializacao.backends_disponiveis()
+
+
+@pytest.fixture(autouse=True)
+def sem_fsync(setup_inicial, monkeypatch):
+    monkeypatch.setattr(config, "regras", {"persistencia": {"fsync": False}})
+
+
+def _usar(monkeypatch, backend: str, formatado: bool = False):
+    monkeypatch.setitem(config.regras, "persistencia", {"fsync": False, "serializador": backend, "json_formatado": formatado})
+
+
+def _entidades():
+    quarto = Quarto(101, "SIMPLES", 2, 100.0)
+    quarto.bloqueios.append((date(2025, 7, 1), date(2025, 7, 3), "Pintura"))
+    hospede = Hospede("José Conceição", "123", "e", "t")
+    reserva = Reserva(hospede, quarto, date(2025, 6, 10), date(2025, 6, 12), 1, "CHECKOUT")
+    reserva.pagamentos.append(Pagamento(200.5, "PIX"))
+    reserva.adicionais.append(Adicional("Café ☕", 12.0))
+    return quarto, hospede, reserva
+
+
+# TESTES DE CODIFICAÇÃO:
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_json_compacto_por_padrao(monkeypatch, backend):
+    _usar(monkeypatch, backend)
+    dados = [{"nome": "José", "valores": [1, 2.5], "ativo": True, "obs": None}]
+
+    texto = serializacao.codificar(dados)
+    assert b" " not in texto and b"\n" not in texto
+    assert "José".encode("utf-8") in texto  # UTF-8, sem escapes \u
+    assert json.loads(texto) == dados
+    assert serializacao.decodificar(texto) == dados
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_formatacao_e_opcional(monkeypatch, backend):
+    _usar(monkeypatch, backend, formatado=True)
+    texto = serializacao.codificar({"a": [1, 2]})
+    assert b"\n" in texto
+    assert json.loads(texto) == {"a": [1, 2]}
+    assert b"\n" not in serializacao.codificar({"a": [1, 2]}, formatado=False)
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_json_formatado_igual_em_todos_os_backends(backend):
+    quarto, hospede, reserva = _entidades()
+    dados = [quarto.to_dict(), hospede.to_dict(), reserva.to_dict(), {"vazia": [], "objeto": {}}]
+
+    texto = serializacao.codificar(dados, formatado=True, backend=backend)
+    assert texto == serializacao.codificar(dados, formatado=True, backend="json")
+    assert b'\n  {\n    "numero": 101' in texto  # 2 espaços por nível
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_json_invalido_vira_value_error(monkeypatch, backend):
+    _usar(monkeypatch, backend)
+    with pytest.raises(ValueError):
+        serializacao.decodificar(b"[{\"numero\": 1,")
+
+def test_serializador_desconhecido_ou_ausente(monkeypatch):
+    _usar(monkeypatch, "yaml")
+    with pytest.raises(ValueError):
+        serializacao.backend_atual()
+
+    monkeypatch.setattr(serializacao, "msgspec", None)
+    _usar(monkeypatch, "msgspec")
+    with pytest.raises(ImportError):
+        serializacao.backend_atual()
+
+    _usar(monkeypatch, "auto")
+    assert serializacao.backend_atual() == serializacao.backends_disponiveis()[0]
+    assert "msgspec" not in serializacao.backends_disponiveis()
+
+@pytest.mark.skipif(serializacao.msgspec is None, reason="msgspec não instalado")
+def test_msgspec_valida_o_esquema(monkeypatch):
+    _usar(monkeypatch, "msgspec")
+    quarto, _, _ = _entidades()
+    assert serializacao.decodificar(serializacao.codificar([quarto.to_dict()]), "quartos")[0]["numero"] == 101
+
+    invalido = [{**quarto.to_dict(), "capacidade": "dois"}]
+    with pytest.raises(ValueError):
+        serializacao.decodificar(serializacao.codificar(invalido), "quartos")
+
+
+# TESTES COM OS ARQUIVOS DE DADOS:
+
+@pytest.mark.parametrize("gravacao", BACKENDS)
+@pytest.mark.parametrize("leitura", BACKENDS)
+def test_backends_leem_os_arquivos_uns_dos_outros(monkeypatch, gravacao, leitura):
+    quarto, hospede, reserva = _entidades()
+    _usar(monkeypatch, gravacao)
+    data.salvar_dados([quarto], [hospede], [reserva])
+    reserva.status = "CHECKOUT"
+    data.registrar_alteracoes([reserva])
+
+    _usar(monkeypatch, leitura)
+    quartos, hospedes, reservas = data.carregar_dados()
+    assert quartos[0].to_dict() == quarto.to_dict()
+    assert hospedes[0].to_dict() == hospede.to_dict()
+    assert reservas[0].to_dict() == reserva.to_dict()
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_arquivos_formatados_antigos_continuam_legiveis(monkeypatch, backend):
+    quarto, hospede, reserva = _entidades()
+    for caminho, dados in ((data.ARQUIVO_QUARTOS, [quarto.to_dict()]), (data.ARQUIVO_HOSPEDES, [hospede.to_dict()]),
+                           (data.ARQUIVO_RESERVAS, [reserva.to_dict()])):
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(dados, f, indent=4, ensure_ascii=False)
+
+    _usar(monkeypatch, backend)
+    _, hospedes, reservas = data.carregar_dados()
+    assert hospedes[0].nome == "José Conceição"
+    assert reservas[0].adicionais[0].descricao == "Café ☕"
+
+@pytest.mark.parametrize("formatado", [False, True])
+def test_snapshot_em_fluxo_com_historico_no_disco(monkeypatch, formatado):
+    quarto, hospede, reserva = _entidades()
+    _usar(monkeypatch, "auto", formatado)
+    data.salvar_dados([quarto], [hospede], [reserva])
+
+    quartos, hospedes, reservas = data.carregar_dados(lazy=True)
+    assert reservas == []
+    data.salvar_dados(quartos, hospedes, reservas)  # Regrava o histórico item a item
+
+    historico = list(data.iterar_historico(quartos, hospedes))
+    assert [r.id for r in historico] == [reserva.id]
+    with open(data.ARQUIVO_RESERVAS, "rb") as f:
+        assert f.read() == serializacao.codificar([reserva.to_dict()], formatado)
+
+@pytest.mark.parametrize("formatado", [False, True])
+def test_lista_em_fluxo_igual_a_lista_inteira(monkeypatch, formatado):
+    _, _, reserva = _entidades()
+    _usar(monkeypatch, "auto", formatado)
+    caminho = data.ARQUIVO_RESERVAS
+    for dados in ([], [reserva.to_dict()], [reserva.to_dict(), {**reserva.to_dict(), "id": "outra"}]):
+        data._salvar_arquivo_em_fluxo(caminho, iter(dados))
+        with open(caminho + ".tmp", "rb") as f:
+            assert f.read() == serializacao.codificar(dados)
@@ -2,20 +2,14 @@
 Conjunto de testes para o módulo de serviços do sistema de gerenciamento de hotel.
 """
 
-from hotel import services, config
-from hotel.models import Adicional
+from hotel import services, config, data
+from hotel.models import Adicional, para_centavos
 from datetime import date, timedelta
+import json
+import random
 import pytest
 
 
-@pytest.fixture(autouse=True)
-def setup_inicial():
-    services.quartos_db.clear()
-    services.hospedes_db.clear()
-    services.reservas_db.clear()
-    config.carregar_configuracoes()
-
-
 # TESTES DE FUNÇÕES DE CADASTRO:
 
 def test_cadastrar_quarto():
@@ -77,6 +71,92 @@ def test_cancelar_reserva():
     r = services.buscar_reserva("123", 101)
     assert r.status == "CANCELADA"
 
+def test_reserva_conflitante():
+    services.cadastrar_quarto(101, "SIMPLES", 1, 100.0)
+    services.cadastrar_hospede("Jayr", "123", "e", "t")
+
+    futuro = date.today() + timedelta(days=30)
+    services.realizar_reserva("123", 101, futuro, futuro + timedelta(days=3), 1)
+
+    with pytest.raises(ValueError):
+        services.realizar_reserva("123", 101, futuro + timedelta(days=2), futuro + timedelta(days=5), 1)
+
+    reserva = services.realizar_reserva("123", 101, futuro + timedelta(days=3), futuro + timedelta(days=5), 1)
+    assert reserva.status == "PENDENTE"
+
+def test_buscar_quartos_disponiveis():
+    services.cadastrar_quarto(101, "SIMPLES", 1, 100.0)
+    services.cadastrar_quarto(201, "DUPLO", 2, 150.0)
+    services.cadastrar_quarto(202, "DUPLO", 2, 140.0)
+    services.cadastrar_quarto(401, "LUXO", 2, 300.0)
+    services.cadastrar_hospede("Jayr", "123", "e", "t")
+    d1 = date(2025, 6, 10)
+    d2 = date(2025, 6, 12)
+    services.realizar_reserva("123", 201, d1, d2, 2)
+    services.bloquear_quarto(401, d1, d2, "Reforma")
+
+    opcoes = services.buscar_quartos_disponiveis(d1, d2, 2)
+    assert [(q.numero, valor) for q, valor in opcoes] == [(202, 308.0)]
+
+    opcoes = services.buscar_quartos_disponiveis(d1, d2, 1)
+    assert [q.numero for q, _ in opcoes] == [101, 202]
+    assert opcoes[0][1] == services.calcular_total_reserva(services.realizar_reserva("123", 101, d1, d2, 1))
+
+    services.cancelar_reserva("123", 201)
+    assert [q.numero for q, _ in services.buscar_quartos_disponiveis(d1, d2, 2, "DUPLO")] == [202, 201]
+
+    with pytest.raises(ValueError):
+        services.buscar_quartos_disponiveis(d2, d1, 1)
+
+def test_bloquear_quarto_por_periodo():
+    services.cadastrar_quarto(201, "DUPLO", 2, 150.0)
+    services.cadastrar_hospede("Jayr", "123", "e", "t")
+    d1 = date(2025, 6, 10)
+    services.realizar_reserva("123", 201, d1, d1 + timedelta(days=2), 2)
+
+    with pytest.raises(ValueError):
+        services.bloquear_quarto(201, d1 + timedelta(days=1), d1 + timedelta(days=5), "Reforma")
+
+    services.bloquear_quarto(201, d1 + timedelta(days=2), d1 + timedelta(days=5), "Reforma")
+    assert services.buscar_quarto(201).status == "DISPONIVEL"
+    with pytest.raises(ValueError):
+        services.realizar_reserva("123", 201, d1 + timedelta(days=4), d1 + timedelta(days=6), 2)
+    services.realizar_reserva("123", 201, d1 + timedelta(days=5), d1 + timedelta(days=6), 2)
+
+    # O bloqueio é persistido junto com o quarto:
+    services.inicializar_sistema()
+    assert services.repositorio.inventario.motivo_bloqueio(201, d1 + timedelta(days=3)) == "Reforma"
+
+def test_inventario_por_tipo():
+    services.cadastrar_quarto(201, "DUPLO", 2, 150.0)
+    services.cadastrar_quarto(202, "DUPLO", 2, 150.0)
+    services.cadastrar_quarto(203, "DUPLO", 2, 150.0)
+    services.cadastrar_hospede("Jayr", "123", "e", "t")
+    natal = date(2026, 12, 24)
+
+    reserva = services.realizar_reserva("123", 201, natal, natal + timedelta(days=2), 2)
+    services.bloquear_quarto(202, natal, natal + timedelta(days=1), "Pintura")
+    assert services.quartos_restantes("DUPLO", natal) == 1
+    assert services.quartos_restantes("DUPLO", natal + timedelta(days=1)) == 2
+    assert services.repositorio.inventario.reserva_em(201, natal) == reserva.id
+
+    services.cancelar_reserva("123", 201)
+    assert services.quartos_restantes("DUPLO", natal) == 2
+    assert services.disponibilidade_por_tipo(natal, natal + timedelta(days=2)) == {
+        natal: {"DUPLO": 2},
+        natal + timedelta(days=1): {"DUPLO": 3}
+    }
+
+def test_cancelar_reserva_libera_periodo():
+    services.cadastrar_quarto(101, "SIMPLES", 1, 100.0)
+    services.cadastrar_hospede("Jayr", "123", "e", "t")
+
+    futuro = date.today() + timedelta(days=30)
+    services.realizar_reserva("123", 101, futuro, futuro + timedelta(days=2), 1)
+    services.cancelar_reserva("123", 101)
+
+    assert services._verificar_disponibilidade(101, futuro, futuro + timedelta(days=2))
+
 def test_realizar_noshow():
     services.cadastrar_quarto(101, "SIMPLES", 1, 100.0)
     services.cadastrar_hospede("Jayr", "123", "e", "t")
@@ -89,6 +169,21 @@ def test_realizar_noshow():
     
     assert r.status == "NO_SHOW"
 
+def test_realizar_noshow_dentro_da_tolerancia_exige_forcar():
+    services.cadastrar_quarto(101, "SIMPLES", 1, 100.0)
+    services.cadastrar_hospede("Jayr", "123", "e", "t")
+
+    amanha = date.today() + timedelta(days=1)
+    r = services.realizar_reserva("123", 101, amanha, amanha + timedelta(days=1), 1)
+    r.confirmar()
+
+    with pytest.raises(ValueError, match="tolerância"):
+        services.realizar_noshow("123", 101)
+    assert r.status == "CONFIRMADA"
+
+    services.realizar_noshow("123", 101, forcar=True)
+    assert r.status == "NO_SHOW"
+
 
 # TESTES DE VALORES E TARIFAS:
 
@@ -118,6 +213,80 @@ def test_calcular_total_reserva_com_adicional():
     
     assert total == 264.0
 
+def test_calcular_total_reserva_longa_igual_por_diaria():
+    services.cadastrar_quarto(101, "SIMPLES", 1, 100.0)
+    services.cadastrar_hospede("Jayr", "123", "e", "t")
+
+    d1 = date(2025, 11, 20)
+    d2 = date(2026, 3, 10)
+    reserva = services.realizar_reserva("123", 101, d1, d2, 1)
+
+    soma_diarias = sum(services.calcular_valor_diaria(d1 + timedelta(days=i), 100.0) for i in range(len(reserva)))
+    esperado = soma_diarias * (1 + config.get_taxa_servico())
+
+    assert services.calcular_total_reserva(reserva) == pytest.approx(esperado)
+
+def test_somar_diarias_igual_a_soma_noite_a_noite():
+    sorteio = random.Random(2026)
+    for _ in range(500):
+        entrada = date(2024, 1, 1) + timedelta(days=sorteio.randrange(3 * 365))
+        saida = entrada + timedelta(days=sorteio.randrange(1, 400))
+        tarifa = sorteio.randrange(1, 100_000) / 100
+
+        # Cópia do laço original de calcular_total_reserva, sem arredondar as diárias:
+        esperado = 0.0
+        dia = entrada
+        while dia < saida:
+            esperado += services.calcular_valor_diaria(dia, tarifa)
+            dia += timedelta(days=1)
+
+        assert services._somar_diarias(entrada, saida, tarifa) == pytest.approx(esperado, rel=1e-12)
+
+    # Atravessa o fim de ano (1.5) e o Carnaval (1.4): 14599.635 noite a noite, sem arredondar ao centavo.
+    assert services._somar_diarias(date(2025, 12, 1), date(2026, 3, 1), 133.33) == pytest.approx(14599.635, abs=1e-9)
+
+def test_calcular_total_reserva_usa_cache():
+    services.cadastrar_quarto(101, "SIMPLES", 1, 100.0)
+    services.cadastrar_hospede("Jayr", "123", "e", "t")
+    reserva = services.realizar_reserva("123", 101, date(2025, 6, 10), date(2025, 6, 12), 1)
+
+    assert services.calcular_total_reserva(reserva) == 220.0
+    chave, total = reserva.cache_total
+    assert total == 220.0
+
+    # Sem mudanças, o valor guardado é devolvido sem recalcular:
+    reserva.cache_total = (chave, 1.0)
+    assert services.calcular_total_reserva(reserva) == 1.0
+
+def test_calcular_total_reserva_invalida_cache(tmp_path, monkeypatch):
+    services.cadastrar_quarto(101, "SIMPLES", 1, 100.0)
+    services.cadastrar_hospede("Jayr", "123", "e", "t")
+    reserva = services.realizar_reserva("123", 101, date(2025, 6, 10), date(2025, 6, 12), 1)
+    assert services.calcular_total_reserva(reserva) == 220.0
+
+    services.registrar_adicional("123", 101, "Pizza P Calabresa", 40.0)
+    assert services.calcular_total_reserva(reserva) == 264.0
+
+    reserva.quarto.tarifa_base = 200.0
+    assert services.calcular_total_reserva(reserva) == 484.0
+
+    reserva.data_saida = date(2025, 6, 13)
+    assert services.calcular_total_reserva(reserva) == 704.0
+
+    regras = dict(config.regras, financeiro={"taxa_servico": 0})
+    settings = tmp_path / "settings.json"
+    settings.write_text(json.dumps(regras), encoding="utf-8")
+    monkeypatch.setattr(config, "ARQUIVO_SETTINGS", str(settings))
+    config.carregar_configuracoes()
+    assert services.calcular_total_reserva(reserva) == 640.0
+
+def test_contar_fins_de_semana():
+    # 02/06/2025 é uma segunda-feira
+    assert services._contar_fins_de_semana(date(2025, 6, 2), date(2025, 6, 9)) == 2
+    assert services._contar_fins_de_semana(date(2025, 6, 7), date(2025, 6, 8)) == 1
+    assert services._contar_fins_de_semana(date(2025, 6, 2), date(2025, 6, 7)) == 0
+    assert services._contar_fins_de_semana(date(2025, 6, 2), date(2025, 6, 30)) == 8
+
 
 # TESTES DE FLUXO DE ESTADIA:
 
@@ -129,6 +298,18 @@ def test_buscar_reserva():
     encontrada = services.buscar_reserva("123", 101)
     assert encontrada == reserva
 
+def test_buscar_reserva_prefere_ativa():
+    services.cadastrar_quarto(101, "SIMPLES", 1, 100.0)
+    services.cadastrar_hospede("Jayr", "123", "e", "t")
+
+    futuro = date.today() + timedelta(days=30)
+    antiga = services.realizar_reserva("123", 101, futuro, futuro + timedelta(days=2), 1)
+    services.cancelar_reserva("123", 101)
+    assert services.buscar_reserva("123", 101) is antiga
+
+    nova = services.realizar_reserva("123", 101, futuro, futuro + timedelta(days=2), 1)
+    assert services.buscar_reserva("123", 101) is nova
+
 def test_realizar_checkin():
     services.cadastrar_quarto(101, "SIMPLES", 1, 100.0)
     services.cadastrar_hospede("Jayr", "123", "e", "t")
@@ -193,6 +374,35 @@ def test_salvar_tudo():
     services.salvar_tudo()
     assert True
 
+def test_persistir_journal_e_recarregar():
+    services.cadastrar_quarto(101, "SIMPLES", 1, 100.0)
+    services.cadastrar_hospede("Jayr", "123", "e", "t")
+    services.salvar_tudo()
+
+    r = services.realizar_reserva("123", 101, date.today(), date.today() + timedelta(days=2), 1)
+    services.registrar_pagamento("123", 101, 50.0, "PIX")
+    assert data.eventos_pendentes == 2
+
+    services.inicializar_sistema()
+    recarregada = services.buscar_reserva("123", 101)
+    assert recarregada.id == r.id
+    assert recarregada.pagamentos[0].valor == 50.0
+
+def test_persistir_backend_sqlite(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "get_backend_armazenamento", lambda: "sqlite")
+    monkeypatch.setattr(config, "get_arquivo_sqlite", lambda: str(tmp_path / "hotel.db"))
+
+    services.cadastrar_quarto(101, "SIMPLES", 1, 100.0)
+    services.cadastrar_hospede("Jayr", "123", "e", "t")
+    r = services.realizar_reserva("123", 101, date.today(), date.today() + timedelta(days=2), 1)
+    services.registrar_adicional("123", 101, "Pizza P Calabresa", 40.0)
+
+    services.inicializar_sistema()
+    recarregada = services.buscar_reserva("123", 101)
+    assert recarregada.id == r.id
+    assert recarregada.adicionais[0].valor == 40.0
+    services.armazenamento.fechar()
+
 
 # TESTES DE RELATÓRIOS E ESTATÍSTICAS:
 
@@ -221,6 +431,135 @@ def test_gerar_relatorio_financeiro():
     assert metricas["revpar"] == 55.0
     assert metricas["cancelamento"] == 50.0
 
+def test_gerar_relatorio_periodo():
+    services.cadastrar_quarto(101, "S", 1, 100.0)
+    services.cadastrar_quarto(102, "S", 1, 100.0)
+    services.cadastrar_hospede("Jayr", "123", "e", "t")
+    services.cadastrar_hospede("Maria", "456", "e", "t")
+
+    services.realizar_reserva("123", 101, date(2025, 6, 10), date(2025, 6, 12), 1)
+    services.confirmar_reserva("123", 101)
+
+    metricas = services.gerar_relatorio_periodo(date(2025, 6, 1), date(2025, 7, 1))
+    assert metricas["noites_vendidas"] == 2
+    assert metricas["receita"] == pytest.approx(220.0)
+    assert metricas["adr"] == pytest.approx(110.0)
+    assert metricas["revpar"] == pytest.approx(220.0 / 60)
+    assert metricas["ocupacao"] == pytest.approx(2 / 60 * 100)
+
+    # Alterações posteriores entram na tabela já montada:
+    services.registrar_adicional("123", 101, "Pizza P Calabresa", 40.0)
+    services.realizar_reserva("456", 102, date(2025, 6, 10), date(2025, 6, 11), 1)
+    services.confirmar_reserva("456", 102)
+    services.cancelar_reserva("456", 102)
+
+    metricas = services.gerar_relatorio_periodo(date(2025, 6, 1), date(2025, 7, 1))
+    assert metricas["noites_vendidas"] == 2
+    assert metricas["receita"] == pytest.approx(264.0)
+    assert metricas["cancelamento"] == pytest.approx(50.0)
+
+    assert services.gerar_relatorio_periodo(date(2025, 7, 1), date(2025, 8, 1))["receita"] == 0.0
+
+    with pytest.raises(ValueError):
+        services.gerar_relatorio_periodo(date(2025, 7, 1), date(2025, 7, 1))
+
+def test_relatorio_periodo_igual_ao_financeiro_em_centavos():
+    from hotel.models import Reserva
+    for numero, tarifa in ((101, 133.33), (102, 97.15), (103, 211.11)):
+        services.cadastrar_quarto(numero, "S", 1, tarifa)
+    services.cadastrar_hospede("Jayr", "123", "e", "t")
+    sorteio = random.Random(11)
+    for i in range(2000):
+        # Entradas de dezembro a março: atravessam o fim de ano (1.5) e o Carnaval (1.4).
+        entrada = date(2025, 12, 1) + timedelta(days=sorteio.randrange(120))
+        saida = entrada + timedelta(days=sorteio.randrange(1, 20))
+        reserva = Reserva(services.hospedes_db[0], services.quartos_db[i % 3], entrada, saida, 1, "CHECKOUT")
+        if i % 7 == 0:
+            reserva.adicionais.append(Adicional("Frigobar", 13.37))
+        services.repositorio.adicionar_reserva(reserva)
+
+    financeiro = services.gerar_relatorio_financeiro()
+    periodo = services.gerar_relatorio_periodo(date(2025, 12, 1), date(2026, 5, 1))
+    assert periodo["receita"] == financeiro["receita"]
+
+    # A receita de cada dia é inteira em centavos e soma o total de cada reserva arredondado ao centavo:
+    metade = services.gerar_relatorio_periodo(date(2025, 12, 1), date(2026, 1, 15))["receita"]
+    resto = services.gerar_relatorio_periodo(date(2026, 1, 15), date(2026, 5, 1))["receita"]
+    assert round(metade * 100) + round(resto * 100) == round(financeiro["receita"] * 100)
+
+def test_totais_acumulados_iguais_ao_total_da_estadia():
+    sorteio = random.Random(7)
+    for _ in range(200):
+        entrada = date(2025, 1, 1) + timedelta(days=sorteio.randrange(2 * 365))
+        saida = entrada + timedelta(days=sorteio.randrange(0, 60))
+        tarifa = sorteio.randrange(1, 100_000) / 100
+        acumulados = services._totais_acumulados(entrada, saida, tarifa, 13.37)
+        assert len(acumulados) == (saida - entrada).days + 1
+        for k, total in enumerate(acumulados):
+            assert total == services._total_da_estadia(entrada, entrada + timedelta(days=k), tarifa, 13.37)
+
+def test_relatorio_financeiro_paralelo_igual_ao_serial(monkeypatch):
+    from hotel.models import Reserva
+    monkeypatch.setattr(config, "get_processos_relatorio", lambda: 2)
+    monkeypatch.setattr(config, "get_tamanho_lote_relatorio", lambda: 7)
+
+    for numero in range(101, 106):
+        services.cadastrar_quarto(numero, "S", 1, 100.0 + numero / 100)
+    services.cadastrar_hospede("Jayr", "123", "e", "t")
+    estados = ["CONFIRMADA", "CHECKIN", "CHECKOUT", "CANCELADA", "PENDENTE"]
+    for i in range(120):
+        entrada = date(2024, 12, 1) + timedelta(days=i * 3)
+        reserva = Reserva(services.hospedes_db[0], services.quartos_db[i % 5], entrada, entrada + timedelta(days=1 + i % 9), 1, estados[i % 5])
+        if i % 4 == 0:
+            reserva.adicionais.append(Adicional("Frigobar", 13.37))
+        services.repositorio.adicionar_reserva(reserva)
+
+    serial = services.gerar_relatorio_financeiro()
+    assert services.gerar_relatorio_financeiro(paralelo=True) == serial
+
+def test_relatorio_paralelo_le_as_estadias_em_fluxo(monkeypatch):
+    from hotel import paralelo
+    monkeypatch.setattr(config, "get_processos_relatorio", lambda: 1)
+    monkeypatch.setattr(config, "get_tamanho_lote_relatorio", lambda: 7)
+    lidas = []
+
+    def estadias():
+        for i in range(50):
+            lidas.append(i)
+            yield (date(2025, 1, 1), date(2025, 1, 2 + i % 3), 100.0, 0.0)
+
+    lidas_por_lote = []
+    precificar_lote = paralelo._precificar_lote
+    monkeypatch.setattr(paralelo, "_precificar_lote", lambda lote: lidas_por_lote.append(len(lidas)) or precificar_lote(lote))
+
+    total = paralelo.somar_totais_em_paralelo(estadias())
+
+    # Cada lote é precificado assim que fica cheio, sem esperar o fim da leitura:
+    assert lidas_por_lote == [14, 14, 21, 28, 35, 42, 49, 50]
+    assert total == sum(para_centavos(services._total_da_estadia(*estadia)) for estadia in estadias())
+
+def test_relatorio_financeiro_lazy_inclui_historico(monkeypatch):
+    services.cadastrar_quarto(101, "S", 1, 100.0)
+    services.cadastrar_quarto(102, "S", 1, 100.0)
+    services.cadastrar_hospede("Jayr", "123", "e", "t")
+
+    r1 = services.realizar_reserva("123", 101, date(2025, 6, 10), date(2025, 6, 11), 1)
+    r1.confirmar()
+    r2 = services.realizar_reserva("123", 102, date(2025, 6, 10), date(2025, 6, 11), 1)
+    r2.cancelar()
+    services.salvar_tudo()
+
+    monkeypatch.setattr(config, "get_carregamento_lazy", lambda: True)
+    services.inicializar_sistema()
+    assert [r.id for r in services.reservas_db] == [r1.id]
+
+    metricas = services.gerar_relatorio_financeiro()
+    assert metricas["receita"] == 110.0
+    assert metricas["cancelamento"] == 50.0
+
+    hospede = services.buscar_hospede("123")
+    assert {r.id for r in hospede.iterar_historico()} == {r1.id, r2.id}
+
 
 # TESTES DE CÁLCULO DE TARIFAS:
 
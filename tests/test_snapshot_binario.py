@@ -0,0 +1,85 @@
+"""
+Conjunto de testes para o snapshot binário das reservas (mmap) e seus conversores.
+"""
+
+from hotel import data, snapshot_binario
+from hotel.snapshot_binario import SnapshotBinario
+from hotel.models import Hospede, Quarto, Reserva, Pagamento, Adicional
+from datetime import date, datetime
+import json
+import pytest
+
+
+def _dados_salvos():
+    """
+    Snapshot JSON com duas reservas e uma terceira só no journal.
+    """
+    quarto = Quarto(101, "SIMPLES", 2, 100.0)
+    jose = Hospede("José", "123", "e", "t")
+    ana = Hospede("Ana Conceição", "456", "e", "t")
+
+    primeira = Reserva(jose, quarto, date(2025, 6, 10), date(2025, 6, 12), 1, "CHECKOUT")
+    primeira.pagamentos.append(Pagamento(150.25, "PIX", datetime(2025, 6, 10, 14, 30, 5, 123)))
+    primeira.pagamentos.append(Pagamento(80.0, "DINHEIRO", datetime(2025, 6, 12, 11, 0)))
+    primeira.adicionais.append(Adicional("Café ☕", 12.5))
+    segunda = Reserva(ana, quarto, date(2025, 7, 1), date(2025, 7, 5), 2, "CANCELADA")
+    data.salvar_dados([quarto], [jose, ana], [primeira, segunda])
+
+    terceira = Reserva(jose, quarto, date(2025, 8, 1), date(2025, 8, 3), 1, "CONFIRMADA")
+    data.registrar_alteracoes([terceira])
+    return [primeira, segunda, terceira]
+
+
+# TESTES DOS CONVERSORES:
+
+def test_ida_e_volta_preserva_as_reservas(tmp_path):
+    reservas = _dados_salvos()
+    binario = str(tmp_path / "reservas.bin")
+
+    assert snapshot_binario.gerar_do_json(binario) == 3
+
+    destino = str(tmp_path / "volta.json")
+    assert snapshot_binario.converter_para_json(binario, destino) == 3
+    with open(destino, "rb") as f:
+        convertidas = json.load(f)
+
+    esperado = [r.to_dict() for r in reservas]
+    esperado[2]["versao"] = 1  # Gravada no journal
+    assert convertidas == esperado
+
+def test_gravar_e_ler_sob_demanda(tmp_path):
+    reservas = _dados_salvos()
+    binario = str(tmp_path / "reservas.bin")
+    snapshot_binario.gravar(binario, (r.to_dict() for r in reservas))
+
+    with SnapshotBinario(binario) as snapshot:
+        assert len(snapshot) == 3
+        registros = list(snapshot.iterar())
+        assert registros[0].entrada == date(2025, 6, 10).toordinal()
+        assert registros[0].pago_centavos == 23025 and registros[0].adicionais_centavos == 1250
+        assert [r.status for r in registros] == ["CHECKOUT", "CANCELADA", "CONFIRMADA"]
+        assert snapshot.documento(1) == "456" and snapshot.id(2) == reservas[2].id
+
+        assert [r.posicao for r in snapshot.iterar(date(2025, 7, 1), date(2025, 8, 1))] == [1]
+        assert [r.posicao for r in snapshot.iterar(status=["CHECKOUT", "CONFIRMADA"])] == [0, 2]
+        assert snapshot.reserva_dict(0) == reservas[0].to_dict()
+
+def test_snapshot_vazio(tmp_path):
+    binario = str(tmp_path / "reservas.bin")
+    assert snapshot_binario.gravar(binario, []) == 0
+    with SnapshotBinario(binario) as snapshot:
+        assert len(snapshot) == 0 and list(snapshot.iterar()) == []
+
+def test_arquivo_invalido_ou_truncado(tmp_path):
+    reservas = _dados_salvos()
+    binario = tmp_path / "reservas.bin"
+    snapshot_binario.gravar(str(binario), (r.to_dict() for r in reservas))
+    conteudo = binario.read_bytes()
+
+    binario.write_bytes(conteudo[:-10])
+    with pytest.raises(ValueError):
+        SnapshotBinario(str(binario))
+
+    binario.write_bytes(b"[]")
+    with pytest.raises(ValueError):
+        SnapshotBinario(str(binario))